@@ -0,0 +1,167 @@
+# src/benchmarks/bench_classification.py
+"""
+Бенчмарк классификации: генеративная детекция Florence-2 <OD> против одного прямого прохода.
+
+Для каждой модели измеряются загрузка (время, пиковый прирост RSS), задержка на
+изображение через тот же generate, что и в конвейере (декодирование, предобработка,
+модель, постобработка), и пропускная способность. Для моделей прямого прохода
+отдельно измеряется пакетный прямой проход (_classify_batch) на пакетах разного
+размера - так же пакеты собирает сервер пакетирования. Для каждой модели прямого
+прохода считается доля изображений, получивших ту же метку, что и у Florence-2.
+
+Модели берутся из локального хранилища (при отсутствии снимка - скачиваются).
+Синтетический корпус не содержит узнаваемых объектов: согласие меток показательно
+только на реальных фотографиях (--images-dir).
+
+Запуск из директории src:
+    python -m benchmarks.bench_classification --models clip-vit-base-patch32 vit-base-patch16-224 \\
+        --images 64 --output ../bench_classification.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import torch
+
+from benchmarks.corpus import generate_corpus
+from core.generators.base_generator import BaseGenerator
+from core.utils.get_logger import logger
+from core.utils.memory import PeakMemoryTracker
+from core.utils.settings import settings
+
+BATCH_SIZES = (1, 8, 32)
+
+
+def _latency_stats(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def _run_pipeline(generator, images: List[str]) -> dict:
+    """Задержка и пропускная способность generate по одному изображению."""
+    generator.generate(images[0], Path(images[0]).name)
+    labels, samples = [], []
+    for path in images:
+        start = time.perf_counter()
+        labels.append(generator.generate(path, Path(path).name))
+        samples.append(time.perf_counter() - start)
+    return {
+        "latency": _latency_stats(samples),
+        "images_per_second": round(len(images) / sum(samples), 2),
+        "labels": labels,
+    }
+
+
+def _run_batched(generator, images: List[str]) -> Dict[str, dict]:
+    """Пропускная способность пакетного прямого прохода (без декодирования изображений)."""
+    prepared = [generator._prepare_inputs(generator._process_image(path, Path(path).name)) for path in images]
+    results = {}
+    for batch_size in BATCH_SIZES:
+        if batch_size > len(prepared):
+            break
+        batches = [
+            {"pixel_values": torch.cat([item["pixel_values"] for item in prepared[i:i + batch_size]])}
+            for i in range(0, len(prepared) - batch_size + 1, batch_size)
+        ]
+        generator._classify_batch(batches[0])
+        start = time.perf_counter()
+        for batch in batches:
+            generator._classify_batch(batch)
+        elapsed = time.perf_counter() - start
+        results[str(batch_size)] = {
+            "ms_per_image": round(elapsed / (len(batches) * batch_size) * 1000, 3),
+            "images_per_second": round(len(batches) * batch_size / elapsed, 2),
+        }
+    return results
+
+
+def _agreement(reference: Optional[List[str]], labels: List[str]) -> Optional[float]:
+    if not reference:
+        return None
+    return round(sum(a == b for a, b in zip(reference, labels)) / len(reference), 3)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк классификации: Florence-2 <OD> против прямого прохода")
+    parser.add_argument("--florence-model", type=str, default="Florence-2-base",
+                        help="Модель генеративной детекции (пусто - не измерять)")
+    parser.add_argument("--models", type=str, nargs="+", default=["clip-vit-base-patch32", "vit-base-patch16-224"],
+                        help="Модели CLASSIFICATION_MODEL_NAMES")
+    parser.add_argument("--images", type=int, default=64, help="Размер синтетического корпуса")
+    parser.add_argument("--images-dir", type=str, default=None, help="Директория с реальными фотографиями")
+    parser.add_argument("--work-dir", type=str, default=str(Path(tempfile.gettempdir()) / "diploma_bench"),
+                        help="Директория корпусов")
+    parser.add_argument("--output", type=str, default=None, help="Путь для JSON-результатов")
+    args = parser.parse_args()
+
+    from core.generators.classifier_generator import ClassifierGenerator
+    from core.generators.segment_generator import SegmentGenerator
+
+    # Измерение одного потока: без ожидания добора пакета сервером
+    settings.batch_max_size = 1
+
+    if args.images_dir:
+        images = sorted(
+            str(path) for path in Path(args.images_dir).rglob("*")
+            if path.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}
+        )[:args.images]
+    else:
+        images = generate_corpus(Path(args.work_dir) / "corpora", args.images, 1024, 768)
+
+    report = {
+        "device": BaseGenerator.device,
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "images": len(images),
+        "models": {},
+    }
+
+    reference = None
+    if args.florence_model:
+        logger.info("Бенчмарк генеративной детекции: %s", args.florence_model)
+        with PeakMemoryTracker() as load:
+            generator = SegmentGenerator(args.florence_model)
+        result = _run_pipeline(generator, images)
+        reference = result.pop("labels")
+        report["models"][args.florence_model] = {"load": load.report(), **result}
+
+    for model_name in args.models:
+        logger.info("Бенчмарк прямого прохода: %s", model_name)
+        try:
+            with PeakMemoryTracker() as load:
+                generator = ClassifierGenerator(model_name)
+            result = _run_pipeline(generator, images)
+            labels = result.pop("labels")
+            entry = {"load": load.report(), **result, "batched": _run_batched(generator, images)}
+            entry["agreement_with_florence"] = _agreement(reference, labels)
+            if args.florence_model:
+                florence = report["models"][args.florence_model]
+                entry["speedup_p50"] = round(florence["latency"]["p50_ms"] / entry["latency"]["p50_ms"], 1)
+        except Exception as e:
+            logger.error("Модель %s пропущена: %s", model_name, e, exc_info=True)
+            entry = {"error": str(e)}
+        report["models"][model_name] = entry
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        logger.success("Результаты сохранены: %s", args.output)
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
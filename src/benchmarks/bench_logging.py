@@ -0,0 +1,161 @@
+# src/benchmarks/bench_logging.py
+"""
+Бенчмарк стоимости логирования на одно обработанное изображение.
+
+Воспроизводит типичную последовательность вызовов логгера на изображение
+(старт, этапы 1-4, параметры генерации, перевод, успех) и сравнивает:
+  - legacy: синхронные обработчики, f-строки, новый Formatter на каждую запись;
+  - queue: неблокирующая очередь, ленивое %-форматирование, кэш форматтеров,
+    ограничение частоты по месту вызова.
+
+Запуск из директории src:
+    python -m benchmarks.bench_logging --images 2000 --output ../bench_logging.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.utils.get_logger import (
+    CONSOLE_FORMAT,
+    FILE_FORMAT,
+    SUCCESS_LEVEL,
+    ColorFormatter,
+    setup_logger,
+)
+
+
+class LegacyColorFormatter(logging.Formatter):
+    """Прежняя реализация: новый logging.Formatter на каждую запись."""
+
+    def format(self, record):
+        color = ColorFormatter.COLORS.get(record.levelno, "")
+        return logging.Formatter(f"{color}{CONSOLE_FORMAT}{ColorFormatter.RESET}").format(record)
+
+
+def _legacy_logger(log_dir: str, stream) -> logging.Logger:
+    logger = logging.getLogger("bench_legacy")
+    logger.handlers.clear()
+    logger.setLevel(logging.DEBUG)
+    file_handler = logging.FileHandler(os.path.join(log_dir, "legacy.log"), encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+    console_handler = logging.StreamHandler(stream)
+    console_handler.setFormatter(LegacyColorFormatter())
+    console_handler.setLevel(logging.INFO)
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    logger.propagate = False
+    return logger
+
+
+def _per_image_legacy(logger: logging.Logger, index: int, name: str) -> None:
+    size = (512, 384)
+    logger.info(f"Начало обработки изображения [{index}] {name}")
+    logger.debug(f"Обработка элемента {index}: {name}")
+    logger.info(f"Загрузка изображения: {name}")
+    logger.info(f"Изображение готово | Размер: {size} | Объем данных: {size[0] * size[1] * 3 // 1024} KB")
+    logger.debug("Этап 1/4: Изображение обработано")
+    logger.debug(f"Тензоры подготовлены | Устройство: cpu")
+    logger.debug(f"Этап 2/4: Входные данные подготовлены | Ключи: {['pixel_values']}")
+    logger.info(f"Запуск генерации | Параметры: max_length={50}, num_beams={2}, Устройство: cpu")
+    logger.info(f"Генерация завершена | Время: {0.123:.2f}с")
+    logger.debug("Этап 3/4: Подпись сгенерирована")
+    logger.info(f"Результат постобработки | Исходная: {42} симв. Очищенная: {30} симв.")
+    logger.debug("Этап 4/4: Постобработка завершена")
+    logger.log(SUCCESS_LEVEL, f"Успешная генерация для '{name}' | Результат: 'a cat' | Время выполнения: {0.2:.2f}с")
+    logger.info(f"Запрос перевода | Исходный язык: en_XX -> Целевой: Russian | Длина текста: {5} символов")
+    logger.log(SUCCESS_LEVEL, f"Успешная обработка изображения [{index}] {name}")
+
+
+def _per_image_lazy(logger: logging.Logger, index: int, name: str) -> None:
+    size = (512, 384)
+    logger.info("Начало обработки изображения [%s] %s", index, name)
+    logger.debug("Обработка элемента %s: %s", index, name)
+    logger.info("Загрузка изображения: %s", name)
+    logger.info("Изображение готово | Размер: %s | Объем данных: %s KB", size, size[0] * size[1] * 3 // 1024)
+    logger.debug("Этап 1/4: Изображение обработано")
+    logger.debug("Тензоры подготовлены | Устройство: %s", "cpu")
+    logger.debug("Этап 2/4: Входные данные подготовлены | Ключи: %s", ["pixel_values"])
+    logger.info("Запуск генерации | Параметры: max_length=%s, num_beams=%s, Устройство: %s", 50, 2, "cpu")
+    logger.info("Генерация завершена | Время: %.2fс", 0.123)
+    logger.debug("Этап 3/4: Подпись сгенерирована")
+    logger.info("Результат постобработки | Исходная: %s симв. Очищенная: %s симв.", 42, 30)
+    logger.debug("Этап 4/4: Постобработка завершена")
+    logger.success("Успешная генерация для '%s' | Результат: '%s' | Время выполнения: %.2fс", name, "a cat", 0.2)
+    logger.info("Запрос перевода | Исходный язык: %s -> Целевой: %s | Длина текста: %s символов",
+                "en_XX", "Russian", 5)
+    logger.success("Успешная обработка изображения [%s] %s", index, name)
+
+
+def _run(logger: logging.Logger, emit, images: int) -> float:
+    start = time.perf_counter()
+    for i in range(images):
+        emit(logger, i, f"photo_{i:05d}.jpg")
+    return time.perf_counter() - start
+
+
+def _drain(name: str) -> float:
+    """Время, за которое фоновый слушатель допишет очередь (не входит в стоимость вызова)."""
+    from core.utils.get_logger import _listeners
+    start = time.perf_counter()
+    listener = _listeners.pop(name, None)
+    if listener is not None:
+        listener.stop()
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Стоимость логирования на изображение")
+    parser.add_argument("--images", type=int, default=2000, help="Число имитируемых изображений")
+    parser.add_argument("--level", choices=["DEBUG", "INFO"], default="INFO", help="Уровень логгера")
+    parser.add_argument("--rate-limit", type=float, default=5.0, help="Сообщений/с с одной строки (0 - выкл.)")
+    parser.add_argument("--output", type=str, default=None, help="Файл для JSON-отчёта")
+    args = parser.parse_args()
+
+    level = getattr(logging, args.level)
+    report = {"images": args.images, "level": args.level, "rate_limit": args.rate_limit, "results": {}}
+
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w", encoding="utf-8") as devnull:
+        legacy = _legacy_logger(log_dir, devnull)
+        legacy.setLevel(level)
+        elapsed = _run(legacy, _per_image_legacy, args.images)
+        report["results"]["legacy_sync"] = {
+            "seconds": round(elapsed, 4),
+            "us_per_image": round(elapsed / args.images * 1e6, 2),
+        }
+        for handler in legacy.handlers:
+            handler.close()
+
+        for variant, rate in (("queue_lazy", 0.0), ("queue_lazy_rate_limited", args.rate_limit)):
+            name = f"bench_{variant}"
+            queued = setup_logger(name, log_dir=log_dir, console_stream=devnull, rate_limit=rate)
+            queued.setLevel(level)
+            elapsed = _run(queued, _per_image_lazy, args.images)
+            drain = _drain(name)
+            report["results"][variant] = {
+                "seconds": round(elapsed, 4),
+                "us_per_image": round(elapsed / args.images * 1e6, 2),
+                "background_drain_seconds": round(drain, 4),
+            }
+            for handler in queued.handlers:
+                handler.close()
+
+    base = report["results"]["legacy_sync"]["us_per_image"]
+    for result in report["results"].values():
+        result["speedup_vs_legacy"] = round(base / result["us_per_image"], 2) if result["us_per_image"] else None
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# src/benchmarks/bench_precision.py
+"""
+Бенчмарк точности вычислений на CPU: float32 против bfloat16.
+
+Режимы:
+  - fp32:         веса и вычисления в float32 (прежнее поведение);
+  - bf16:         autocast bfloat16, веса float32;
+  - bf16-weights: autocast bfloat16 и веса в bfloat16.
+
+Для каждой модели и режима измеряются загрузка (время, пиковый прирост RSS),
+объём параметров и задержка на элемент через те же генераторы, что и в конвейере,
+а также согласие с float32: доля точных совпадений результатов и средняя схожесть
+строк (difflib). На процессоре без аппаратного bfloat16 режимы bf16 выполняются
+в float32 (это отражается в поле bf16_supported).
+
+Запуск из директории src (модели из локального хранилища):
+    python -m benchmarks.bench_precision --images 16 --output ../bench_precision.json
+Офлайн-проверка на крошечных моделях (согласие для случайных весов не показательно):
+    python -m benchmarks.bench_precision --tiny --images 8
+"""
+
+import argparse
+import difflib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import torch
+
+from benchmarks.corpus import generate_corpus
+from core.creators.captioning_model_creator import CaptioningModelCreator
+from core.creators.segmentation_model_creator import SegmentationModelCreator
+from core.creators.translation_model_creator import TranslationModelCreator
+from core.generators.base_generator import BaseGenerator
+from core.utils.get_logger import logger
+from core.utils.memory import PeakMemoryTracker
+from core.utils.precision import cpu_supports_bf16
+from core.utils.settings import settings
+
+# Режим -> (settings.cpu_precision, settings.bf16_weights)
+MODES = {
+    "fp32": ("fp32", False),
+    "bf16": ("bf16", False),
+    "bf16-weights": ("bf16", True),
+}
+
+PHRASES = (
+    "a man riding a bike down a street", "a cat sitting on a window sill",
+    "two people walking on the beach at sunset", "a plate of food on a wooden table",
+    "a red car parked in front of a house", "a dog playing with a ball in the grass",
+    "a city skyline at night", "a group of children playing in a park",
+)
+
+
+def _unload_all() -> None:
+    for creator in (CaptioningModelCreator, SegmentationModelCreator, TranslationModelCreator):
+        for cache_key in creator.loaded_keys():
+            creator.unload(cache_key)
+
+
+def _parameters_mb(model: torch.nn.Module) -> float:
+    return round(sum(p.numel() * p.element_size() for p in model.parameters()) / 1024 ** 2, 1)
+
+
+def _run_mode(build: Callable[[], object], run: Callable[[object, str], str], items: List[str]) -> dict:
+    with PeakMemoryTracker() as load:
+        generator = build()
+    run(generator, items[0])
+    outputs, samples = [], []
+    for item in items:
+        start = time.perf_counter()
+        outputs.append(str(run(generator, item)))
+        samples.append(time.perf_counter() - start)
+    ordered = sorted(samples)
+    model = getattr(generator, "model_creator", None) or generator.model
+    return {
+        "load": load.report(),
+        "parameters_mb": _parameters_mb(model.model),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "outputs": outputs,
+    }
+
+
+def _agreement(reference: List[str], outputs: List[str]) -> dict:
+    return {
+        "exact_match": round(sum(a == b for a, b in zip(reference, outputs)) / len(reference), 3),
+        "similarity": round(statistics.fmean(
+            difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, outputs)
+        ), 4),
+    }
+
+
+def bench_model(build: Callable[[], object], run: Callable[[object, str], str], items: List[str]) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    for mode, (precision, bf16_weights) in MODES.items():
+        settings.cpu_precision, settings.bf16_weights = precision, bf16_weights
+        _unload_all()
+        try:
+            results[mode] = _run_mode(build, run, items)
+        except Exception as e:
+            logger.error("Режим %s завершился ошибкой: %s", mode, e, exc_info=True)
+            results[mode] = {"error": str(e)}
+
+    reference = results["fp32"].get("outputs")
+    for mode, result in results.items():
+        outputs = result.pop("outputs", None)
+        if reference and outputs and mode != "fp32":
+            result["agreement"] = _agreement(reference, outputs)
+            result["speedup_p50"] = round(results["fp32"]["p50_ms"] / result["p50_ms"], 2)
+    _unload_all()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк bfloat16 на CPU")
+    parser.add_argument("--caption-model", type=str, default="blip-image-captioning-base")
+    parser.add_argument("--segmentation-model", type=str, default="Florence-2-base")
+    parser.add_argument("--translation-model", type=str, default="mbart-large-50-many-to-many-mmt")
+    parser.add_argument("--target-language", type=str, default="Russian")
+    parser.add_argument("--images", type=int, default=16, help="Размер синтетического корпуса")
+    parser.add_argument("--tiny", action="store_true", help="Крошечные модели со случайными весами (офлайн)")
+    parser.add_argument("--work-dir", type=str, default=os.path.join(tempfile.gettempdir(), "diploma_bench"),
+                        help="Директория для крошечных моделей и корпусов")
+    parser.add_argument("--output", type=str, default=None, help="Путь для JSON-результатов")
+    args = parser.parse_args()
+
+    from core.generators.caption_generator import CaptionGenerator
+    from core.generators.segment_generator import SegmentGenerator
+    from core.generators.translation_generator import TranslationGenerator
+
+    # Сравнение на CPU по одному элементу: без пакетирования между вызовами и моделей пар
+    BaseGenerator.device = "cpu"
+    settings.batch_max_size = 1
+    settings.translation_pair_models = False
+
+    work_dir = Path(args.work_dir)
+    if args.tiny:
+        from benchmarks.tiny_models import build_tiny_models
+        build_tiny_models(work_dir / "models")
+        args.caption_model, args.segmentation_model, args.translation_model = "tiny-blip", "tiny-florence-2", "tiny-mbart"
+    images = generate_corpus(work_dir / "corpora", args.images, 1024, 768)
+
+    def translate(generator, text: str) -> str:
+        TranslationGenerator.generate.cache_clear()
+        return generator.generate(text, "en_XX", args.target_language)
+
+    report = {
+        "platform": platform.platform(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "bf16_supported": cpu_supports_bf16(),
+        "models": {},
+    }
+    benches = {
+        args.caption_model: (lambda: CaptionGenerator(args.caption_model), lambda g, p: g.generate(p), images),
+        args.segmentation_model: (
+            lambda: SegmentGenerator(args.segmentation_model), lambda g, p: g.generate(p, Path(p).name), images
+        ),
+        args.translation_model: (lambda: TranslationGenerator(args.translation_model), translate, list(PHRASES)),
+    }
+    for name, (build, run, items) in benches.items():
+        logger.info("Бенчмарк точности: %s", name)
+        report["models"][name] = bench_model(build, run, items)
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        logger.success("Результаты сохранены: %s", args.output)
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
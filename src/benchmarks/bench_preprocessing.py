@@ -0,0 +1,134 @@
+# src/benchmarks/bench_preprocessing.py
+"""
+Бенчмарк предобработки изображений: поэлементный процессор HF против BatchPreprocessor.
+
+Процессоры собираются локально с конфигурацией реальных моделей (без весов и сети):
+  - blip: BlipImageProcessor 384x384, bicubic;
+  - git:  CLIPImageProcessor, короткая сторона 224 + center crop 224;
+  - vit:  ViTImageProcessor 224x224, bilinear.
+
+Для каждого процессора измеряется прежний путь (декодирование, уменьшение до 512px,
+вызов процессора на изображение) и векторный путь (декодирование с draft, одно
+масштабирование, нормализация пакета), а также расхождение pixel_values с HF:
+максимальное на одинаково декодированных изображениях (prepare) и максимальное
+и среднее для draft-пути (load) относительно HF на полном декодировании -
+по нему подобран допуск DRAFT_PARITY_MEAN_ATOL.
+
+Запуск из директории src:
+    python -m benchmarks.bench_preprocessing --images 64 --batch 8 --output ../bench_preprocessing.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import torch
+from PIL import Image
+from transformers import BlipImageProcessor, CLIPImageProcessor, ViTImageProcessor
+
+from benchmarks.corpus import generate_corpus
+from core.generators.preprocessing import BatchPreprocessor
+from core.utils.get_logger import logger
+
+PROCESSORS = {
+    "blip": lambda: BlipImageProcessor(size={"height": 384, "width": 384}),
+    "git": lambda: CLIPImageProcessor(size={"shortest_edge": 224}, crop_size={"height": 224, "width": 224}),
+    "vit": lambda: ViTImageProcessor(size={"height": 224, "width": 224}),
+}
+
+# Прежний предварительный уменьшенный размер в генераторах
+LEGACY_MAX_SIZE = 512
+
+
+def _legacy(processor: Any, images: List[str]) -> float:
+    start = time.perf_counter()
+    for path in images:
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+            img.thumbnail((LEGACY_MAX_SIZE, LEGACY_MAX_SIZE), Image.Resampling.LANCZOS)
+            processor(images=img, return_tensors="pt")
+    return time.perf_counter() - start
+
+
+def _vectorized(preprocessor: BatchPreprocessor, images: List[str], batch: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(images), batch):
+        preprocessor([preprocessor.load(path) for path in images[offset:offset + batch]])
+    return time.perf_counter() - start
+
+
+def _parity(processor: Any, preprocessor: BatchPreprocessor, images: List[str]) -> float:
+    max_diff = 0.0
+    for path in images:
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+            expected = processor(images=img, return_tensors="pt")["pixel_values"]
+            actual = preprocessor([preprocessor.prepare(img)])["pixel_values"]
+        max_diff = max(max_diff, (actual - expected).abs().max().item())
+    return max_diff
+
+
+def _draft_parity(processor: Any, preprocessor: BatchPreprocessor, images: List[str]) -> Dict[str, float]:
+    max_diff, mean_diffs = 0.0, []
+    for path in images:
+        with Image.open(path) as img:
+            expected = processor(images=img.convert("RGB"), return_tensors="pt")["pixel_values"]
+        diff = (preprocessor([preprocessor.load(path)])["pixel_values"] - expected).abs()
+        max_diff = max(max_diff, diff.max().item())
+        mean_diffs.append(diff.mean().item())
+    return {"max_abs_diff": max_diff, "mean_abs_diff": sum(mean_diffs) / len(mean_diffs)}
+
+
+def bench(name: str, images: List[str], batch: int) -> Dict[str, Any]:
+    processor = PROCESSORS[name]()
+    preprocessor = BatchPreprocessor.from_processor(processor, "cpu")
+    if preprocessor is None:
+        return {"error": "векторный путь недоступен для конфигурации процессора"}
+
+    legacy = _legacy(processor, images)
+    vectorized = _vectorized(preprocessor, images, batch)
+    return {
+        "input_size": list(preprocessor.input_size),
+        "legacy_ms_per_image": round(legacy / len(images) * 1000, 3),
+        "vectorized_ms_per_image": round(vectorized / len(images) * 1000, 3),
+        "speedup": round(legacy / vectorized, 2) if vectorized > 0 else None,
+        "max_abs_diff": _parity(processor, preprocessor, images[:8]),
+        "draft": _draft_parity(processor, preprocessor, images[:8]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Поэлементная и векторная предобработка изображений")
+    parser.add_argument("--images", type=int, default=64, help="Размер синтетического корпуса")
+    parser.add_argument("--width", type=int, default=2048, help="Ширина изображений корпуса")
+    parser.add_argument("--height", type=int, default=1536, help="Высота изображений корпуса")
+    parser.add_argument("--batch", type=int, default=8, help="Размер пакета векторного пути")
+    parser.add_argument("--work-dir", type=str, default=os.path.join(tempfile.gettempdir(), "diploma_bench"),
+                        help="Директория для корпусов")
+    parser.add_argument("--output", type=str, default=None, help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(Path(args.work_dir) / "corpora", args.images, args.width, args.height)
+    report = {
+        "corpus": {"images": len(corpus), "width": args.width, "height": args.height},
+        "batch": args.batch,
+        "torch_threads": torch.get_num_threads(),
+        "processors": {name: bench(name, corpus, args.batch) for name in PROCESSORS},
+    }
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        logger.success("Отчёт бенчмарка сохранён: %s", args.output)
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# src/benchmarks/bench_similarity.py
+"""
+Бенчмарк индекса похожих изображений на синтетических эмбеддингах (модели не нужны).
+
+Эмбеддинги - точки вокруг случайных центров (как у фотографий похожих сцен),
+вставляются в индекс пакетами. Измеряются скорость вставки (обучение списков идёт
+в фоне и не блокирует вставку), ожидание завершения обучения, задержка запросов
+top-k и полнота (recall@k) относительно точного перебора.
+
+Запуск из директории src:
+    python -m benchmarks.bench_similarity --rows 1000000 --dim 512 --queries 200 --output ../bench_similarity.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from core.utils.clustering import iter_chunks
+from core.utils.get_logger import logger
+from core.utils.similarity_index import SimilarityIndex
+
+
+def _latency_stats(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def _synthetic(rng: np.random.Generator, centers: np.ndarray, count: int, noise: float) -> np.ndarray:
+    vectors = centers[rng.integers(len(centers), size=count)] + noise * rng.standard_normal((count, centers.shape[1]))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _exact_top(index: SimilarityIndex, query: np.ndarray, k: int) -> set:
+    scores = np.concatenate([block @ query for _, block in iter_chunks(index._vectors)])
+    return {f"img_{row}" for row in np.argpartition(-scores, k - 1)[:k]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк индекса похожих изображений")
+    parser.add_argument("--rows", type=int, default=200_000, help="Число эмбеддингов в индексе")
+    parser.add_argument("--dim", type=int, default=512, help="Размерность эмбеддингов")
+    parser.add_argument("--batch", type=int, default=4096, help="Размер пакета вставки")
+    parser.add_argument("--queries", type=int, default=200, help="Число запросов")
+    parser.add_argument("--k", type=int, default=12, help="Размер выдачи")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32], help="Списков на запрос")
+    parser.add_argument("--recall-queries", type=int, default=50, help="Запросов для оценки полноты")
+    parser.add_argument("--output", type=str, default=None, help="Путь для JSON-результатов")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((max(16, args.rows // 200), args.dim)).astype(np.float32)
+    report = {"rows": args.rows, "dim": args.dim, "k": args.k}
+
+    with tempfile.TemporaryDirectory(prefix="bench_similarity_") as directory:
+        index = SimilarityIndex(directory)
+        insert_times = []
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch):
+            count = min(args.batch, args.rows - offset)
+            vectors = _synthetic(rng, centers, count, 0.5)
+            batch_start = time.perf_counter()
+            index.add([f"img_{offset + i}" for i in range(count)], vectors, "synthetic")
+            insert_times.append(time.perf_counter() - batch_start)
+        elapsed = time.perf_counter() - start
+        report["insert"] = {
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(args.rows / elapsed, 1),
+            "slowest_batch_s": round(max(insert_times), 2),
+        }
+        wait_start = time.perf_counter()
+        index.wait_training()
+        report["train_wait_seconds"] = round(time.perf_counter() - wait_start, 2)
+        report["index"] = index.stats()
+        report["disk_mb"] = round(sum(path.stat().st_size for path in Path(directory).iterdir()) / 2 ** 20, 1)
+
+        queries = _synthetic(rng, centers, args.queries, 0.5)
+        report["search"] = {}
+        for nprobe in args.nprobe:
+            samples, recalls = [], []
+            for number, query in enumerate(queries):
+                query_start = time.perf_counter()
+                found = index.search(query, args.k, nprobe=nprobe)
+                samples.append(time.perf_counter() - query_start)
+                if number < args.recall_queries:
+                    exact = _exact_top(index, query, args.k)
+                    recalls.append(len(exact & {path for path, _, _ in found}) / args.k)
+            report["search"][str(nprobe)] = {
+                "latency": _latency_stats(samples),
+                "recall_at_k": round(statistics.fmean(recalls), 3) if recalls else None,
+            }
+            logger.info("nprobe=%s: %s", nprobe, report["search"][str(nprobe)])
+
+        # Удаление и повторная загрузка индекса с диска
+        removed = sum(index.remove(f"img_{row}") for row in range(0, args.rows, 10))
+        load_start = time.perf_counter()
+        # Индекс загружается с диска при первом обращении
+        reloaded = SimilarityIndex(directory).stats()
+        report["reload_seconds"] = round(time.perf_counter() - load_start, 2)
+        report["after_remove"] = {"removed": removed, "images": reloaded["images"]}
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        logger.success("Результаты сохранены: %s", args.output)
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# src/benchmarks/bench_translation.py
+"""
+Бенчмарк перевода: компактные модели языковых пар (MarianMT) против общей модели mBART-50.
+
+Для каждой пары из TRANSLATION_PAIR_ROUTES (или заданных через --pairs) измеряются
+время и пиковый прирост RSS при загрузке модели, объём её параметров и задержка
+перевода коротких фраз (метки детекции и подписи) через TranslationGenerator -
+тем же путём, что и в конвейере. Те же фразы переводятся общей моделью
+(маршрутизация выключена), чтобы сравнить задержку на одной паре.
+
+Модели берутся из локального хранилища (при отсутствии снимка - скачиваются).
+
+Запуск из директории src:
+    python -m benchmarks.bench_translation --pairs en_XX:ru_RU en_XX:de_DE --output ../bench_translation.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import torch
+
+from core.constants.labels import DETECTION_LABELS
+from core.constants.models import TRANSLATION_PAIR_ROUTES
+from core.constants.web import TRANSLATION_LANGUAGES
+from core.creators.translation_model_creator import TranslationModelCreator
+from core.generators.base_generator import BaseGenerator
+from core.generators.translation_generator import TranslationGenerator
+from core.utils.get_logger import logger
+from core.utils.memory import PeakMemoryTracker
+from core.utils.settings import settings
+
+CAPTIONS = (
+    "a man riding a bike down a street",
+    "a cat sitting on a window sill",
+    "two people walking on the beach at sunset",
+    "a plate of food on a wooden table",
+    "a red car parked in front of a house",
+    "a dog playing with a ball in the grass",
+    "a city skyline at night",
+    "a group of children playing in a park",
+)
+
+# Код языка -> название в TRANSLATION_LANGUAGES (generate принимает название)
+LANGUAGE_NAMES = {code: name for name, code in TRANSLATION_LANGUAGES.items()}
+
+
+def _latency_stats(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def _parameters_mb(model: torch.nn.Module) -> float:
+    return round(sum(p.numel() * p.element_size() for p in model.parameters()) / 1024 ** 2, 1)
+
+
+def _load(model_name: str) -> Dict[str, object]:
+    with PeakMemoryTracker() as tracker:
+        creator = TranslationModelCreator(model_name, BaseGenerator.device)
+    return {"model": model_name, "load": tracker.report(), "parameters_mb": _parameters_mb(creator.model)}
+
+
+def _translate(generator: TranslationGenerator, phrases: List[str], src_lang: str, tgt_name: str) -> dict:
+    # Кэш переводов общий для экземпляров: без очистки второй проход измерял бы попадания в кэш
+    TranslationGenerator.generate.cache_clear()
+    generator.generate("warm up", src_lang, tgt_name)
+    samples = []
+    for phrase in phrases:
+        start = time.perf_counter()
+        generator.generate(phrase, src_lang, tgt_name)
+        samples.append(time.perf_counter() - start)
+    return _latency_stats(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк моделей перевода языковых пар")
+    parser.add_argument("--model", type=str, default="mbart-large-50-many-to-many-mmt", help="Общая модель перевода")
+    parser.add_argument("--pairs", type=str, nargs="*", default=None,
+                        help="Пары в виде en_XX:ru_RU (по умолчанию все пары TRANSLATION_PAIR_ROUTES)")
+    parser.add_argument("--phrases", type=int, default=64, help="Число фраз на пару")
+    parser.add_argument("--output", type=str, default=None, help="Путь для JSON-результатов")
+    args = parser.parse_args()
+
+    pairs = [tuple(pair.split(":", 1)) for pair in args.pairs] if args.pairs else list(TRANSLATION_PAIR_ROUTES)
+    unknown = [pair for pair in pairs if pair not in TRANSLATION_PAIR_ROUTES]
+    if unknown:
+        logger.error("Для пар нет компактных моделей: %s", unknown)
+        return 2
+
+    labels = [label for label in DETECTION_LABELS if label != "unknown"]
+    phrases = [(list(CAPTIONS) + labels)[i % (len(CAPTIONS) + len(labels))] for i in range(args.phrases)]
+    phrases = list(dict.fromkeys(phrases))
+
+    results = {
+        "device": BaseGenerator.device,
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "phrases": len(phrases),
+        "general": _load(args.model),
+        "pairs": {},
+    }
+
+    general = TranslationGenerator(args.model)
+    # Настройка переключается для замеров и восстанавливается после цикла
+    pair_models = settings.translation_pair_models
+    for src_lang, tgt_lang in pairs:
+        key = f"{src_lang}->{tgt_lang}"
+        pair_model = TRANSLATION_PAIR_ROUTES[(src_lang, tgt_lang)]
+        tgt_name = LANGUAGE_NAMES[tgt_lang]
+        try:
+            entry = _load(pair_model)
+            settings.translation_pair_models = True
+            entry["pair_latency"] = _translate(TranslationGenerator(args.model), phrases, src_lang, tgt_name)
+            settings.translation_pair_models = False
+            entry["general_latency"] = _translate(general, phrases, src_lang, tgt_name)
+            entry["speedup_p50"] = round(entry["general_latency"]["p50_ms"] / entry["pair_latency"]["p50_ms"], 2)
+            entry["memory_ratio"] = round(results["general"]["parameters_mb"] / entry["parameters_mb"], 2)
+        except Exception as e:
+            logger.warning("Пара %s пропущена: %s", key, e)
+            entry = {"model": pair_model, "error": str(e)}
+        results["pairs"][key] = entry
+        logger.info("%s: %s", key, entry)
+    settings.translation_pair_models = pair_models
+
+    payload = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        logger.success("Результаты сохранены: %s", args.output)
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# src/benchmarks/corpus.py
+"""Генерация синтетических JPEG-корпусов для бенчмарков."""
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from core.utils.get_logger import logger
+
+
+def _synthetic_image(rng: np.random.Generator, width: int, height: int) -> Image.Image:
+    """Градиентный фон, несколько цветных прямоугольников и шум - похоже на фото по сжимаемости."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = rng.uniform(0, 255, size=3).astype(np.float32)
+    slope = rng.uniform(-0.3, 0.3, size=(3, 2)).astype(np.float32)
+    pixels = np.stack(
+        [base[c] + slope[c, 0] * x + slope[c, 1] * y for c in range(3)], axis=-1
+    )
+
+    for _ in range(int(rng.integers(2, 6))):
+        x0, x1 = sorted(rng.integers(0, width, size=2))
+        y0, y1 = sorted(rng.integers(0, height, size=2))
+        pixels[y0:y1, x0:x1] = rng.uniform(0, 255, size=3)
+
+    pixels += rng.normal(0, 8, size=pixels.shape)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), mode="RGB")
+
+
+def generate_corpus(root: Path, count: int, width: int, height: int,
+                    seed: int = 0, quality: int = 90) -> List[str]:
+    """
+    Создаёт (или переиспользует) корпус из count JPEG-изображений заданного разрешения.
+    Корпуса кэшируются по параметрам в отдельных поддиректориях root.
+    """
+    directory = root / f"corpus_{count}x{width}x{height}_s{seed}_q{quality}"
+    paths = [directory / f"synthetic_{i:05d}.jpg" for i in range(count)]
+    if all(p.exists() for p in paths):
+        logger.info("Используется готовый корпус: %s", directory)
+        return [str(p) for p in paths]
+
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    logger.info("Генерация корпуса: %s изображений %sx%s в %s", count, width, height, directory)
+    for path in paths:
+        _synthetic_image(rng, width, height).save(path, format="JPEG", quality=quality)
+    return [str(p) for p in paths]
@@ -0,0 +1,283 @@
+# src/benchmarks/run_benchmarks.py
+"""
+Офлайн-бенчмарк генераторов и конвейеров обработки на крошечных моделях.
+
+Запуск из директории src:
+    python -m benchmarks.run_benchmarks --images 64 --width 1024 --height 768 --output ../bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Бенчмарк не должен обращаться к сети ни при каких условиях
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+import torch
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.tiny_models import build_tiny_models
+from core.generators.base_generator import BaseGenerator
+from core.utils.get_logger import logger
+from core.utils.memory import PeakMemoryTracker
+
+
+class StageTimer:
+    """Замер длительности этапов через обёртки над методами экземпляра генератора."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.enabled = True
+
+    def wrap(self, obj, method_name: str, stage: str) -> None:
+        original = getattr(obj, method_name)
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                if self.enabled:
+                    self.samples[stage].append(time.perf_counter() - start)
+
+        setattr(obj, method_name, timed)
+
+    def summary(self) -> Dict[str, dict]:
+        return {stage: _latency_stats(values) for stage, values in self.samples.items()}
+
+
+def _latency_stats(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _device_peak_mb() -> Optional[float]:
+    if BaseGenerator.device == "cuda":
+        return round(torch.cuda.max_memory_allocated() / 1024 ** 2, 1)
+    return None
+
+
+def _reset_device_peak() -> None:
+    if BaseGenerator.device == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+
+
+def _measure(run: Callable[[], int], timer: Optional[StageTimer] = None) -> dict:
+    """Выполняет run() (возвращает число обработанных элементов) и собирает метрики."""
+    _reset_device_peak()
+    with PeakMemoryTracker() as tracker:
+        start = time.perf_counter()
+        processed = run()
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "items": processed,
+        "seconds": round(elapsed, 4),
+        "items_per_second": round(processed / elapsed, 3) if elapsed > 0 else None,
+        "memory": {**tracker.report(), "device_peak_mb": _device_peak_mb()},
+    }
+    if timer is not None:
+        report["stages"] = timer.summary()
+    return report
+
+
+def _warmup(timer: StageTimer, fn: Callable[[], None]) -> None:
+    timer.enabled = False
+    try:
+        fn()
+    finally:
+        timer.enabled = True
+
+
+def bench_caption(model_name: str, images: List[str], warmup: int) -> dict:
+    from core.generators.caption_generator import CaptionGenerator
+
+    with PeakMemoryTracker() as load:
+        generator = CaptionGenerator(model_name)
+    timer = StageTimer()
+    for method, stage in (("_process_image", "decode"), ("_prepare_inputs", "preprocess"),
+                          ("_generate_caption", "generate"), ("_postprocess", "postprocess")):
+        timer.wrap(generator, method, stage)
+
+    _warmup(timer, lambda: [generator.generate(p) for p in images[:warmup]])
+
+    def run() -> int:
+        for path in images:
+            generator.generate(path)
+        return len(images)
+
+    return {"load": load.report(), **_measure(run, timer)}
+
+
+def bench_segment(model_name: str, images: List[str], warmup: int) -> dict:
+    from core.generators.segment_generator import SegmentGenerator
+
+    with PeakMemoryTracker() as load:
+        generator = SegmentGenerator(model_name)
+    timer = StageTimer()
+    for method, stage in (("_process_image", "decode"), ("_prepare_inputs", "preprocess"),
+                          ("_generate_segments", "generate"), ("_postprocess", "postprocess")):
+        timer.wrap(generator, method, stage)
+
+    _warmup(timer, lambda: [generator.generate(p, Path(p).name) for p in images[:warmup]])
+
+    def run() -> int:
+        for path in images:
+            generator.generate(path, Path(path).name)
+        return len(images)
+
+    return {"load": load.report(), **_measure(run, timer)}
+
+
+def bench_translation(model_name: str, count: int, warmup: int, target_language: str) -> dict:
+    from benchmarks.tiny_models import WORDS
+    from core.generators.translation_generator import TranslationGenerator
+
+    with PeakMemoryTracker() as load:
+        generator = TranslationGenerator(model_name)
+    timer = StageTimer()
+    for method, stage in (("_prepare_inputs", "preprocess"), ("_generate_translation", "generate"),
+                          ("_decode_output", "postprocess")):
+        timer.wrap(generator, method, stage)
+
+    # Уникальные фразы, чтобы lru_cache генератора не искажал замер
+    phrases = [
+        " ".join(WORDS[(i * 7 + k) % len(WORDS)] for k in range(4)) + f" {i}"
+        for i in range(count + warmup)
+    ]
+    _warmup(timer, lambda: [generator.generate(t, "en_XX", target_language) for t in phrases[:warmup]])
+
+    def run() -> int:
+        for text in phrases[warmup:]:
+            generator.generate(text, "en_XX", target_language)
+        return count
+
+    return {"load": load.report(), **_measure(run, timer)}
+
+
+def bench_pipeline(handler_class, primary_model: str, trans_model: str,
+                   images: List[str], target_language: str) -> dict:
+    """Сквозной прогон обработчика с подсчётом успешных результатов и ошибок."""
+    counters = {"results": 0, "errors": 0}
+
+    def run() -> int:
+        photo_tuple = [(path, Path(path).name) for path in images]
+        for item in handler_class.handle_photo_generator(
+            photo_tuple, primary_model, trans_model, lambda: False, target_language
+        ):
+            if isinstance(item, tuple):
+                index, payload = item
+                if isinstance(payload, str) and payload.startswith("Ошибка"):
+                    counters["errors"] += 1
+                else:
+                    counters["results"] += 1
+        return counters["results"]
+
+    report = _measure(run)
+    report["errors"] = counters["errors"]
+    return report
+
+
+def run_suite(args: argparse.Namespace) -> dict:
+    work_dir = Path(args.work_dir)
+    if args.device:
+        BaseGenerator.device = args.device
+
+    model_status = build_tiny_models(work_dir / "models", rebuild=args.rebuild, seed=args.seed)
+    corpus = generate_corpus(work_dir / "corpora", args.images, args.width, args.height, seed=args.seed)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "torch": torch.__version__,
+            "device": BaseGenerator.device,
+            "torch_threads": torch.get_num_threads(),
+        },
+        "corpus": {"images": len(corpus), "width": args.width, "height": args.height, "seed": args.seed},
+        "skipped": {name: reason for name, reason in model_status.items() if reason},
+        "generators": {},
+        "pipelines": {},
+    }
+
+    def available(name: str) -> bool:
+        return model_status.get(name) is None
+
+    def record(section: str, key: str, fn: Callable[[], dict]) -> None:
+        logger.info("Бенчмарк: %s/%s", section, key)
+        try:
+            report[section][key] = fn()
+        except Exception as e:
+            logger.error("Бенчмарк %s/%s завершился ошибкой: %s", section, key, e, exc_info=True)
+            report[section][key] = {"error": str(e)}
+
+    for name in ("tiny-git", "tiny-blip", "tiny-vit-gpt2"):
+        if available(name):
+            record("generators", name, lambda n=name: bench_caption(n, corpus, args.warmup))
+    if available("tiny-florence-2"):
+        record("generators", "tiny-florence-2", lambda: bench_segment("tiny-florence-2", corpus, args.warmup))
+    if available("tiny-mbart"):
+        record("generators", "tiny-mbart",
+               lambda: bench_translation("tiny-mbart", args.images, args.warmup, args.target_language))
+
+    if available("tiny-mbart"):
+        from core.handlers.renaming_handler import RenamingHandler
+        from core.handlers.classification_handler import ClassificationHandler
+
+        for name in ("tiny-git", "tiny-blip", "tiny-vit-gpt2"):
+            if available(name):
+                record("pipelines", f"renaming/{name}", lambda n=name: bench_pipeline(
+                    RenamingHandler, n, "tiny-mbart", corpus, args.target_language))
+        if available("tiny-florence-2"):
+            record("pipelines", "classification/tiny-florence-2", lambda: bench_pipeline(
+                ClassificationHandler, "tiny-florence-2", "tiny-mbart", corpus, args.target_language))
+
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк генераторов на крошечных моделях")
+    parser.add_argument("--images", type=int, default=32, help="Размер синтетического корпуса")
+    parser.add_argument("--width", type=int, default=1024, help="Ширина изображений корпуса")
+    parser.add_argument("--height", type=int, default=768, help="Высота изображений корпуса")
+    parser.add_argument("--warmup", type=int, default=2, help="Число прогревочных итераций")
+    parser.add_argument("--seed", type=int, default=0, help="Seed для весов и корпуса")
+    parser.add_argument("--device", type=str, default=None, help="Принудительное устройство (cpu/cuda/mps)")
+    parser.add_argument("--target-language", type=str, default="Russian", help="Целевой язык перевода")
+    parser.add_argument("--work-dir", type=str, default=os.path.join(tempfile.gettempdir(), "diploma_bench"),
+                        help="Директория для крошечных моделей и корпусов")
+    parser.add_argument("--rebuild", action="store_true", help="Пересобрать крошечные модели")
+    parser.add_argument("--output", type=str, default=None, help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        logger.success("Отчёт бенчмарка сохранён: %s", args.output)
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# src/benchmarks/tiny_models.py
+"""
+Сборка крошечных моделей со случайными весами для офлайн-бенчмарков.
+
+Каждая поддерживаемая архитектура (GIT, BLIP, VisionEncoderDecoder, Florence-2, mBART)
+собирается из уменьшенной конфигурации локально, без обращения к сети, и сохраняется
+вместе с процессором и токенизатором в обычную директорию. Такие директории
+регистрируются в реестрах моделей и проходят через те же creators/generators,
+что и настоящие чекпоинты.
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import (
+    AutoConfig,
+    AutoModelForCausalLM,
+    AutoProcessor,
+    BertTokenizerFast,
+    BlipConfig,
+    BlipForConditionalGeneration,
+    BlipImageProcessor,
+    BlipProcessor,
+    CLIPImageProcessor,
+    GitConfig,
+    GitForCausalLM,
+    GitProcessor,
+    GPT2Config,
+    MBart50TokenizerFast,
+    MBartConfig,
+    MBartForConditionalGeneration,
+    VisionEncoderDecoderConfig,
+    VisionEncoderDecoderModel,
+    ViTConfig,
+    ViTImageProcessor,
+)
+
+from core.constants.models import CAPTIONING_MODEL_NAMES, SEGMENTATION_MODEL_NAMES, TRANSLATION_MODEL_NAMES
+from core.creators.model_store import model_store
+from core.utils.get_logger import logger
+
+# Общий словарь для токенизаторов: служебные токены + набор слов для подписей/меток
+WORDS = (
+    "a photo of the cat dog car person tree house sky road water bird flower table chair "
+    "red blue green white black small large with on in near two people street city beach "
+    "mountain field building window door food plate cup bottle book phone computer"
+).split()
+
+# Общие размеры крошечных трансформеров
+HIDDEN = 32
+LAYERS = 2
+HEADS = 2
+FFN = 64
+IMAGE_SIZE = 32
+PATCH = 8
+
+MANIFEST_NAME = "tiny_manifest.json"
+
+
+def _bert_tokenizer(workdir: Path) -> BertTokenizerFast:
+    """WordPiece-токенизатор с крошечным словарём."""
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "[unused0]"] + WORDS
+    vocab_file = workdir / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab), encoding="utf-8")
+    return BertTokenizerFast(vocab_file=str(vocab_file), do_lower_case=True)
+
+
+def _mbart_tokenizer(workdir: Path) -> MBart50TokenizerFast:
+    """mBART-50 токенизатор на основе WordLevel-модели; языковые коды добавляются самим классом."""
+    vocab = {token: idx for idx, token in enumerate(["<s>", "<pad>", "</s>", "<unk>"] + WORDS)}
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer_file = workdir / "tokenizer.json"
+    backend.save(str(tokenizer_file))
+    return MBart50TokenizerFast(tokenizer_file=str(tokenizer_file), src_lang="en_XX", tgt_lang="ru_RU")
+
+
+def build_git(target: Path) -> None:
+    tokenizer = _bert_tokenizer(target)
+    config = GitConfig(
+        vision_config=dict(
+            hidden_size=HIDDEN, intermediate_size=FFN, num_hidden_layers=LAYERS,
+            num_attention_heads=HEADS, image_size=IMAGE_SIZE, patch_size=PATCH,
+        ),
+        vocab_size=len(tokenizer), hidden_size=HIDDEN, num_hidden_layers=LAYERS,
+        num_attention_heads=HEADS, intermediate_size=FFN, max_position_embeddings=64,
+        pad_token_id=tokenizer.pad_token_id, bos_token_id=tokenizer.cls_token_id,
+        eos_token_id=tokenizer.sep_token_id,
+    )
+    image_processor = CLIPImageProcessor(
+        size={"shortest_edge": IMAGE_SIZE}, crop_size={"height": IMAGE_SIZE, "width": IMAGE_SIZE}
+    )
+    GitForCausalLM(config).save_pretrained(target)
+    GitProcessor(image_processor=image_processor, tokenizer=tokenizer).save_pretrained(target)
+
+
+def build_blip(target: Path) -> None:
+    tokenizer = _bert_tokenizer(target)
+    config = BlipConfig(
+        text_config=dict(
+            vocab_size=len(tokenizer), hidden_size=HIDDEN, encoder_hidden_size=HIDDEN,
+            num_hidden_layers=LAYERS, num_attention_heads=HEADS, intermediate_size=FFN,
+            max_position_embeddings=64, pad_token_id=tokenizer.pad_token_id,
+            bos_token_id=tokenizer.cls_token_id, sep_token_id=tokenizer.sep_token_id,
+            eos_token_id=tokenizer.sep_token_id,
+        ),
+        vision_config=dict(
+            hidden_size=HIDDEN, intermediate_size=FFN, num_hidden_layers=LAYERS,
+            num_attention_heads=HEADS, image_size=IMAGE_SIZE, patch_size=PATCH,
+        ),
+        projection_dim=HIDDEN,
+    )
+    image_processor = BlipImageProcessor(size={"height": IMAGE_SIZE, "width": IMAGE_SIZE})
+    BlipForConditionalGeneration(config).save_pretrained(target)
+    BlipProcessor(image_processor=image_processor, tokenizer=tokenizer).save_pretrained(target)
+
+
+def build_vision_encoder_decoder(target: Path) -> None:
+    tokenizer = _bert_tokenizer(target)
+    encoder = ViTConfig(
+        hidden_size=HIDDEN, num_hidden_layers=LAYERS, num_attention_heads=HEADS,
+        intermediate_size=FFN, image_size=IMAGE_SIZE, patch_size=PATCH,
+    )
+    decoder = GPT2Config(
+        vocab_size=len(tokenizer), n_embd=HIDDEN, n_layer=LAYERS, n_head=HEADS, n_positions=64,
+        bos_token_id=tokenizer.cls_token_id, eos_token_id=tokenizer.sep_token_id,
+        add_cross_attention=True, is_decoder=True,
+    )
+    config = VisionEncoderDecoderConfig.from_encoder_decoder_configs(encoder, decoder)
+    config.decoder_start_token_id = tokenizer.cls_token_id
+    config.pad_token_id = tokenizer.pad_token_id
+    config.eos_token_id = tokenizer.sep_token_id
+    VisionEncoderDecoderModel(config=config).save_pretrained(target)
+    ViTImageProcessor(size={"height": IMAGE_SIZE, "width": IMAGE_SIZE}).save_pretrained(target)
+    tokenizer.save_pretrained(target)
+
+
+def build_mbart(target: Path) -> None:
+    tokenizer = _mbart_tokenizer(target)
+    config = MBartConfig(
+        vocab_size=len(tokenizer), d_model=HIDDEN, encoder_layers=LAYERS, decoder_layers=LAYERS,
+        encoder_attention_heads=HEADS, decoder_attention_heads=HEADS,
+        encoder_ffn_dim=FFN, decoder_ffn_dim=FFN, max_position_embeddings=128,
+        pad_token_id=tokenizer.pad_token_id, bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id, decoder_start_token_id=tokenizer.eos_token_id,
+    )
+    MBartForConditionalGeneration(config).save_pretrained(target)
+    tokenizer.save_pretrained(target)
+
+
+def build_florence(target: Path, source_repo: str = "microsoft/Florence-2-base") -> None:
+    """
+    Florence-2 поставляется как remote code, поэтому код модели и процессор берутся
+    из локального снимка хранилища (без сети), а размеры конфигурации уменьшаются.
+    """
+    source = model_store.snapshot_dir(source_repo)
+    if not source.is_dir():
+        raise FileNotFoundError(
+            f"Для Florence-2 нужен локальный снимок {source_repo} в хранилище моделей ({source})"
+        )
+
+    config = AutoConfig.from_pretrained(str(source), trust_remote_code=True)
+    vision = config.vision_config
+    vision.dim_embed = [16, 32, 64, 128]
+    vision.num_heads = [1, 2, 4, 8]
+    vision.num_groups = [1, 2, 4, 8]
+    vision.depths = [1, 1, 1, 1]
+    vision.projection_dim = HIDDEN
+    config.projection_dim = HIDDEN
+
+    text = config.text_config
+    text.d_model = HIDDEN
+    text.encoder_layers = text.decoder_layers = 1
+    text.encoder_attention_heads = text.decoder_attention_heads = HEADS
+    text.encoder_ffn_dim = text.decoder_ffn_dim = FFN
+
+    model = AutoModelForCausalLM.from_config(config, trust_remote_code=True)
+    model.save_pretrained(target)
+    AutoProcessor.from_pretrained(str(source), trust_remote_code=True).save_pretrained(target)
+    # Код remote-модели нужен рядом с весами для trust_remote_code
+    for code_file in source.glob("*.py"):
+        shutil.copy(code_file, target / code_file.name)
+
+
+# Имя в реестре -> (сборщик, реестр, класс модели для реестра)
+TINY_MODELS: Dict[str, Tuple[Callable[[Path], None], dict, str]] = {
+    "tiny-git": (build_git, CAPTIONING_MODEL_NAMES, "AutoModelForCausalLM"),
+    "tiny-blip": (build_blip, CAPTIONING_MODEL_NAMES, "BlipForConditionalGeneration"),
+    "tiny-vit-gpt2": (build_vision_encoder_decoder, CAPTIONING_MODEL_NAMES, "VisionEncoderDecoderModel"),
+    "tiny-florence-2": (build_florence, SEGMENTATION_MODEL_NAMES, "AutoModelForCausalLM"),
+    "tiny-mbart": (build_mbart, TRANSLATION_MODEL_NAMES, "MBartForConditionalGeneration"),
+}
+
+
+def build_tiny_models(root: Path, rebuild: bool = False, seed: int = 0) -> Dict[str, Optional[str]]:
+    """
+    Собирает (или переиспользует) все крошечные модели и регистрирует их в реестрах.
+
+    Returns:
+        Словарь имя -> None при успехе или текст ошибки, если архитектура пропущена
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    status: Dict[str, Optional[str]] = {}
+
+    for name, (builder, registry, class_name) in TINY_MODELS.items():
+        target = root / name
+        marker = target / MANIFEST_NAME
+        try:
+            if rebuild or not marker.exists():
+                shutil.rmtree(target, ignore_errors=True)
+                target.mkdir(parents=True)
+                torch.manual_seed(seed)
+                logger.info("Сборка крошечной модели %s в %s", name, target)
+                builder(target)
+                marker.write_text(json.dumps({"name": name, "class": class_name, "seed": seed}), encoding="utf-8")
+            registry[name] = (str(target), class_name)
+            status[name] = None
+        except Exception as e:
+            shutil.rmtree(target, ignore_errors=True)
+            logger.warning("Крошечная модель %s пропущена: %s", name, e)
+            status[name] = str(e)
+
+    return status
@@ -0,0 +1,127 @@
+# src/cli.py
+"""
+Пакетная обработка изображений из командной строки без веб-интерфейса.
+
+Тот же конвейер обработчиков, что и во вкладках: результаты по изображениям
+печатаются построчно в JSON (или записываются в --output), а с --save-dir файлы
+сохраняются в структуру классов / с новыми именами выбранным способом.
+
+Запуск из директории src:
+    python cli.py classify ../photos --model clip-vit-base-patch32 --language Russian --save-dir ../results
+    python cli.py classify ../dump --group --clusters 20 --save-dir ../results
+    python cli.py rename ../photos/a.jpg ../photos/b.jpg --model blip-image-captioning-base
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Расширения файлов, отбираемых из переданных директорий
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".gif"}
+
+
+def collect_images(inputs: List[str]) -> List[str]:
+    """Файлы изображений из переданных путей (директории обходятся рекурсивно)."""
+    paths = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            paths += sorted(str(path) for path in item.rglob("*") if path.suffix.lower() in IMAGE_SUFFIXES)
+        elif item.is_file():
+            paths.append(str(item))
+    return list(dict.fromkeys(paths))
+
+
+def main() -> Optional[int]:
+    """Разбор аргументов, обработка изображений и сохранение результатов."""
+    from core.constants.models import (
+        CAPTIONING_MODEL_NAMES, CLASSIFICATION_MODEL_NAMES, SEGMENTATION_MODEL_NAMES, TRANSLATION_MODEL_NAMES
+    )
+    from core.constants.web import TRANSFER_STRATEGIES, TRANSLATION_LANGUAGES
+
+    parser = argparse.ArgumentParser(description='Пакетная обработка изображений')
+    parser.add_argument('task', choices=['classify', 'rename'], help='Классификация или переименование')
+    parser.add_argument('inputs', nargs='+', help='Файлы изображений и/или директории')
+    parser.add_argument('--model', type=str, default=None,
+                        help='Модель основного этапа (классификация: Florence-2-*, clip-*, vit-*, convnext-*; '
+                             'переименование: модели подписей)')
+    parser.add_argument('--translation-model', type=str, default='mbart-large-50-many-to-many-mmt',
+                        choices=list(TRANSLATION_MODEL_NAMES), help='Модель перевода')
+    parser.add_argument('--language', type=str, default='Russian', choices=list(TRANSLATION_LANGUAGES),
+                        help='Целевой язык')
+    parser.add_argument('--save-dir', type=str, default=None, help='Сохранить файлы по результатам в директорию')
+    parser.add_argument('--strategy', type=str, default='copy', choices=list(TRANSFER_STRATEGIES.values()),
+                        help='Способ сохранения файлов')
+    parser.add_argument('--output', type=str, default=None, help='Файл JSON Lines с результатами (по умолчанию stdout)')
+    parser.add_argument('--group', action='store_true',
+                        help='Классификация: группировка по визуальному сходству вместо меток объектов')
+    parser.add_argument('--clusters', type=int, default=0, help='Число групп при --group (0 - по размеру пакета)')
+    parser.add_argument('--debug', action='store_true', help='Режим отладки')
+    args = parser.parse_args()
+
+    from core.utils.get_logger import logger
+    logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
+
+    options = {}
+    if args.task == 'classify':
+        from core.handlers.classification_handler import ClassificationHandler as handler
+        from core.handlers.grouping import GroupingOptions
+        models, default_model = {**SEGMENTATION_MODEL_NAMES, **CLASSIFICATION_MODEL_NAMES}, 'Florence-2-base'
+        if args.group:
+            options["grouping"] = GroupingOptions(max(0, args.clusters))
+    else:
+        from core.handlers.renaming_handler import RenamingHandler as handler
+        models, default_model = CAPTIONING_MODEL_NAMES, 'blip-image-captioning-base'
+        if args.group:
+            logger.warning("--group применяется только к классификации и будет проигнорирован")
+    model = args.model or default_model
+    if model not in models:
+        logger.error("Неизвестная модель для задачи %s: %s | Доступные: %s", args.task, model, list(models))
+        return 2
+
+    paths = collect_images(args.inputs)
+    if not paths:
+        logger.error("Не найдено изображений: %s", args.inputs)
+        return 2
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    results = {}
+    start = time.perf_counter()
+    try:
+        for item in handler.handle_photo_generator(paths, model, args.translation_model, None, args.language,
+                                                   **options):
+            if not (isinstance(item, tuple) and len(item) == 2 and 0 <= item[0] < len(paths)):
+                continue
+            index, value = item
+            record = {"index": index, "path": paths[index]}
+            if isinstance(value, tuple):
+                results[index] = value[1]
+                record["original"], record["result"] = value
+            else:
+                record["error"] = value
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    logger.success(
+        "Обработано %s из %s изображений за %.1fс (%.2f изобр./с) | Модель: %s",
+        len(results), len(paths), elapsed, len(paths) / max(elapsed, 1e-9), model
+    )
+
+    if args.save_dir and results:
+        indices = sorted(results)
+        saved = handler.save_photo(
+            [results[index] for index in indices], [paths[index] for index in indices], args.save_dir, args.strategy
+        )
+        logger.info("Сохранение в %s: %s файлов", args.save_dir, len(saved))
+    return 0 if len(results) == len(paths) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
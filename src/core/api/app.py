@@ -0,0 +1,25 @@
+# src/core/api/app.py
+import gradio as gr
+from fastapi import FastAPI
+
+from core.api.jobs import router as jobs_router
+from core.api.metrics import router as metrics_router
+from core.api.search import router as search_router
+from core.utils.get_logger import logger
+from core.utils.settings import settings
+
+
+def create_app(interface: gr.Blocks) -> FastAPI:
+    """
+    Собирает ASGI-приложение: служебные маршруты FastAPI и Gradio-интерфейс в корне.
+    Маршруты FastAPI регистрируются до монтирования Gradio, чтобы иметь приоритет.
+    """
+    app = FastAPI(title="Renamer/Classifier API")
+    app.include_router(metrics_router)
+    app.include_router(jobs_router)
+    app.include_router(search_router)
+    logger.debug("Зарегистрированы маршруты /metrics, /metrics.json, /api/jobs и /api/search")
+
+    interface.show_error = True
+    # Миниатюры галереи отдаются из дискового кэша вне рабочей директории
+    return gr.mount_gradio_app(app, interface, path="/", allowed_paths=[settings.thumbnail_cache_dir])
@@ -0,0 +1,218 @@
+# src/core/api/jobs.py
+"""
+Программный API пакетной обработки.
+
+    POST   /api/jobs               - задача по локальным путям (JSON)
+    POST   /api/jobs/upload        - задача по загруженным файлам (multipart)
+    GET    /api/jobs/{id}          - состояние задачи
+    GET    /api/jobs/{id}/events   - поток результатов по изображениям (SSE, с Last-Event-ID)
+    DELETE /api/jobs/{id}          - отмена
+
+Задачи проходят через тот же менеджер очереди (core.jobs), обработчики и
+генераторы, что и интерфейс Gradio. target_language - название языка либо
+список названий: при нескольких языках поле result события - словарь язык -> перевод.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Literal, Optional, Union
+
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from core.constants.models import (
+    CAPTIONING_MODEL_NAMES, CLASSIFICATION_MODEL_NAMES, SEGMENTATION_MODEL_NAMES, TRANSLATION_MODEL_NAMES
+)
+from core.constants.web import TRANSLATION_LANGUAGES
+from core.handlers.base_handler import BaseHandler
+from core.handlers.classification_handler import ClassificationHandler
+from core.handlers.renaming_handler import RenamingHandler
+from core.jobs.exceptions import QueueFullError
+from core.jobs.job_manager import job_manager
+from core.jobs.runner import END_EVENT, JobRunner
+from core.utils.get_logger import logger
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Задача -> (обработчик, модели основного этапа, модель по умолчанию)
+TASKS = {
+    RenamingHandler.TASK: (RenamingHandler, CAPTIONING_MODEL_NAMES, "blip-image-captioning-base"),
+    ClassificationHandler.TASK: (
+        ClassificationHandler, {**SEGMENTATION_MODEL_NAMES, **CLASSIFICATION_MODEL_NAMES}, "Florence-2-base"
+    ),
+}
+DEFAULT_TRANSLATION_MODEL = "mbart-large-50-many-to-many-mmt"
+
+# Интервал служебных комментариев SSE, чтобы прокси не закрывали простаивающее соединение
+KEEPALIVE_SECONDS = 15.0
+# Сколько завершённых задач хранится для запросов состояния
+FINISHED_RETENTION = 100
+
+_runners: "OrderedDict[str, JobRunner]" = OrderedDict()
+_runners_lock = threading.Lock()
+
+
+class JobRequest(BaseModel):
+    task: Literal["renaming", "classification"]
+    paths: List[str] = Field(..., min_length=1)
+    model: Optional[str] = None
+    translation_model: str = DEFAULT_TRANSLATION_MODEL
+    target_language: Union[str, List[str]] = "Russian"
+
+
+def _session_id(request: Request) -> str:
+    """Сессия API: заголовок X-Session-Id либо адрес клиента."""
+    return request.headers.get("x-session-id") or (request.client.host if request.client else "api")
+
+
+def _validate(task: str, model: Optional[str], translation_model: str,
+              target_language: Union[str, List[str]]) -> str:
+    _, models, default_model = TASKS[task]
+    model = model or default_model
+    if model not in models:
+        raise HTTPException(422, f"Неизвестная модель для задачи {task}: {model}")
+    if translation_model not in TRANSLATION_MODEL_NAMES:
+        raise HTTPException(422, f"Неизвестная модель перевода: {translation_model}")
+    languages = BaseHandler.target_languages(target_language)
+    if not languages:
+        raise HTTPException(422, "Не задан целевой язык")
+    unsupported = [language for language in languages if language not in TRANSLATION_LANGUAGES]
+    if unsupported:
+        raise HTTPException(422, f"Неподдерживаемый целевой язык: {', '.join(unsupported)}")
+    return model
+
+
+def _start(request: Request, task: str, paths: List[str], model: str, translation_model: str,
+           target_language: Union[str, List[str]], cleanup_dir: Optional[str] = None) -> dict:
+    try:
+        job = job_manager.submit(_session_id(request), task, (model, translation_model))
+    except QueueFullError as e:
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+        raise HTTPException(429, str(e), headers={"Retry-After": "10"})
+
+    runner = JobRunner(
+        job, TASKS[task][0], paths, model, translation_model, target_language, cleanup_dir
+    ).start()
+    with _runners_lock:
+        _runners[job.id] = runner
+        finished = [job_id for job_id, item in _runners.items() if item.finished.is_set()]
+        for job_id in finished[:max(0, len(finished) - FINISHED_RETENTION)]:
+            del _runners[job_id]
+
+    logger.info("API: задача %s создана | Тип: %s | Изображений: %s", job.id, task, len(paths))
+    return runner.status()
+
+
+def _runner(job_id: str) -> JobRunner:
+    with _runners_lock:
+        runner = _runners.get(job_id)
+    if runner is None:
+        raise HTTPException(404, f"Задача не найдена: {job_id}")
+    return runner
+
+
+@router.post("", status_code=202)
+def submit_job(body: JobRequest, request: Request) -> dict:
+    """Задача по путям к файлам, доступным серверу."""
+    model = _validate(body.task, body.model, body.translation_model, body.target_language)
+    missing = [path for path in body.paths if not os.path.isfile(path)]
+    if missing:
+        raise HTTPException(422, {"message": "Файлы не найдены", "paths": missing[:20]})
+    return _start(request, body.task, body.paths, model, body.translation_model, body.target_language)
+
+
+@router.post("/upload", status_code=202)
+def submit_upload(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    task: Literal["renaming", "classification"] = Form(...),
+    model: Optional[str] = Form(None),
+    translation_model: str = Form(DEFAULT_TRANSLATION_MODEL),
+    target_language: List[str] = Form(["Russian"]),
+) -> dict:
+    """Задача по загруженным файлам; файлы удаляются после завершения задачи."""
+    model = _validate(task, model, translation_model, target_language)
+    upload_dir = tempfile.mkdtemp(prefix="api_upload_")
+    paths = []
+    for index, upload in enumerate(files):
+        name = Path(upload.filename or f"image_{index}").name
+        path = os.path.join(upload_dir, f"{index:06d}_{name}")
+        with open(path, "wb") as out:
+            shutil.copyfileobj(upload.file, out, 1024 * 1024)
+        paths.append(path)
+    return _start(request, task, paths, model, translation_model, target_language, upload_dir)
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str) -> dict:
+    return _runner(job_id).status()
+
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str) -> dict:
+    runner = _runner(job_id)
+    if not runner.finished.is_set():
+        runner.job.cancel()
+        if runner.job.status == "queued":
+            job_manager.finish(runner.job, "cancelled")
+    return runner.status()
+
+
+def _format_sse(event: Dict) -> str:
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def _last_event_id(request: Request) -> int:
+    """Курсор переподключения: заголовок Last-Event-ID (EventSource передаёт его сам)."""
+    try:
+        return max(0, int(request.headers.get("last-event-id", 0)))
+    except ValueError:
+        return 0
+
+
+async def _event_stream(runner: JobRunner, request: Request) -> AsyncIterator[str]:
+    # Каждый читатель идёт по журналу задачи своим курсором: читатели не делят события,
+    # а событие, отправленное в обрывающееся соединение, повторяется после переподключения
+    cursor = _last_event_id(request)
+    while True:
+        if await request.is_disconnected():
+            # Задача продолжается: к потоку можно переподключиться с Last-Event-ID, а без
+            # читателя обработка остановится на заполненном буфере
+            logger.debug("API: клиент отключился от потока задачи %s", runner.job.id)
+            return
+        events = await run_in_threadpool(runner.read, cursor, KEEPALIVE_SECONDS)
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        for event in events:
+            yield _format_sse(event)
+            # Отправка завершилась: событие считается доставленным
+            cursor = event["id"]
+            runner.acknowledge(cursor)
+            if event["event"] == END_EVENT:
+                return
+        # Отдаём управление циклу событий между пакетами сообщений
+        await asyncio.sleep(0)
+
+
+@router.get("/{job_id}/events")
+def job_events(job_id: str, request: Request) -> StreamingResponse:
+    """
+    Результаты по мере готовности: события status, result, error и end (Server-Sent Events).
+    Клиент, передавший Last-Event-ID, получает события после него (из ограниченного журнала).
+    """
+    runner = _runner(job_id)
+    return StreamingResponse(
+        _event_stream(runner, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,21 @@
+# src/core/api/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from core.utils.metrics import metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """Метрики конвейера в текстовом формате Prometheus."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/metrics.json")
+def metrics_snapshot() -> JSONResponse:
+    """JSON-снимок всех метрик."""
+    return JSONResponse(metrics.snapshot())
@@ -0,0 +1,87 @@
+# src/core/api/search.py
+"""
+API поиска похожих изображений.
+
+    GET    /api/search?path=...&k=12  - похожие на изображение из индекса (без запуска модели)
+    POST   /api/search                - похожие на загруженное изображение (multipart: file, k)
+    POST   /api/search/items          - добавление файлов сервера в индекс (JSON)
+    DELETE /api/search/items?path=... - удаление изображения из индекса
+    GET    /api/search/stats          - состояние индекса
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List
+
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from pydantic import BaseModel, Field
+
+from core.handlers.similarity import find_similar, index_images
+from core.utils.get_logger import logger
+from core.utils.similarity_index import similarity_index
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+# Ограничение размера выдачи
+MAX_K = 200
+
+
+class IndexRequest(BaseModel):
+    paths: List[str] = Field(..., min_length=1)
+
+
+@router.get("")
+def search_by_path(path: str = Query(...), k: int = Query(12, ge=1, le=MAX_K)) -> dict:
+    """Похожие на изображение, уже записанное в индекс."""
+    if similarity_index.vector(os.path.abspath(path)) is None:
+        raise HTTPException(404, f"Изображение не найдено в индексе: {path}")
+    return {"query": path, "results": find_similar(path, k)}
+
+
+@router.post("")
+def search_by_upload(file: UploadFile = File(...), k: int = Form(12, ge=1, le=MAX_K)) -> dict:
+    """Похожие на загруженное изображение (эмбеддинг считается моделью индекса)."""
+    upload_dir = tempfile.mkdtemp(prefix="api_search_")
+    try:
+        path = os.path.join(upload_dir, Path(file.filename or "query").name)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file.file, out, 1024 * 1024)
+        try:
+            return {"query": file.filename, "results": find_similar(path, k)}
+        except Exception as e:
+            logger.error("API: ошибка поиска похожих для %s: %s", file.filename, e, exc_info=True)
+            raise HTTPException(422, f"Не удалось обработать изображение: {e}")
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+@router.post("/items")
+def add_items(body: IndexRequest) -> dict:
+    """Добавление изображений, доступных серверу (повторное добавление обновляет эмбеддинг)."""
+    missing = [path for path in body.paths if not os.path.isfile(path)]
+    if missing:
+        raise HTTPException(422, {"message": "Файлы не найдены", "paths": missing[:20]})
+    try:
+        errors = index_images(body.paths)
+    except ValueError as e:
+        raise HTTPException(409, str(e))
+    logger.info("API: в индекс похожих добавлено %s изображений", len(body.paths) - len(errors))
+    return {
+        "indexed": len(body.paths) - len(errors),
+        "errors": [{"path": path, "error": error} for path, error in errors],
+        **similarity_index.stats(),
+    }
+
+
+@router.delete("/items")
+def remove_item(path: str = Query(...)) -> dict:
+    if not similarity_index.remove(os.path.abspath(path)):
+        raise HTTPException(404, f"Изображение не найдено в индексе: {path}")
+    return similarity_index.stats()
+
+
+@router.get("/stats")
+def index_stats() -> dict:
+    return similarity_index.stats()
@@ -0,0 +1,48 @@
+# src/core/constants/labels.py
+# Словарь меток детекции <OD> Florence-2 для предварительного перевода (tools.build_label_table).
+# Основа - классы COCO и частые метки Objects365/Open Images, которые выдаёт Florence-2;
+# метки, встреченные при работе и отсутствующие в таблице, записываются в UNSEEN_LABELS_PATH
+# и добавляются в словарь при следующей сборке таблицы.
+import os
+
+COCO_LABELS = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog",
+    "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella",
+    "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite",
+    "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle",
+    "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange",
+    "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant",
+    "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone",
+    "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors",
+    "teddy bear", "hair drier", "toothbrush",
+)
+
+EXTRA_LABELS = (
+    # Метка, которую SegmentGenerator возвращает, если объекты не найдены
+    "unknown",
+    "man", "woman", "boy", "girl", "child", "baby", "human face", "human hair", "human hand",
+    "clothing", "dress", "shirt", "jacket", "hat", "sunglasses", "glasses", "shoe", "footwear",
+    "animal", "fish", "insect", "butterfly", "duck", "chicken", "rabbit", "monkey", "lion", "tiger",
+    "building", "house", "tower", "skyscraper", "bridge", "window", "door", "wall", "roof",
+    "fence", "street light", "lamp", "road", "sidewalk", "tree", "flower", "plant", "grass",
+    "mountain", "sky", "cloud", "sea", "beach", "lake", "river", "rock", "sun", "snow",
+    "van", "taxi", "bicycle wheel", "tire", "wheel", "vehicle", "land vehicle", "helicopter",
+    "ship", "sailboat", "table", "desk", "sofa", "cabinet", "shelf", "bookcase", "mirror",
+    "picture frame", "curtain", "pillow", "carpet", "television", "computer monitor", "computer",
+    "mobile phone", "camera", "headphones", "microphone", "guitar", "piano", "drum",
+    "food", "fruit", "vegetable", "bread", "tomato", "strawberry", "lemon", "plate", "glass",
+    "mug", "jug", "kettle", "toy", "doll", "ball", "balloon", "poster", "sign", "flag",
+    "watch", "jewelry", "necklace", "bag", "box", "basket", "candle", "statue", "sculpture",
+    "painting", "tent", "umbrella", "wheelchair", "license plate", "billboard", "fountain",
+)
+
+# Полный словарь без повторов в исходном порядке
+DETECTION_LABELS = tuple(dict.fromkeys(COCO_LABELS + EXTRA_LABELS))
+
+# Исходный язык меток модели
+LABEL_SOURCE_LANGUAGE = "en_XX"
+
+# Таблица переводов (собирается tools.build_label_table) и журнал меток, отсутствующих в ней
+LABEL_TABLE_PATH = os.path.join(os.path.dirname(__file__), "label_translations.json")
+UNSEEN_LABELS_PATH = "../cache/unseen_labels.txt"
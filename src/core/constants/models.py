@@ -11,9 +11,64 @@ TRANSLATION_MODEL_NAMES = {
     "mbart-large-50-many-to-many-mmt": ("facebook/mbart-large-50-many-to-many-mmt", "MBartForConditionalGeneration")
 }
 
+# Компактные модели отдельных языковых пар (MarianMT, ~75M параметров против 611M у mBART-50)
+TRANSLATION_PAIR_MODEL_NAMES = {
+    "opus-mt-en-ru": ("Helsinki-NLP/opus-mt-en-ru", "MarianMTModel"),
+    "opus-mt-en-de": ("Helsinki-NLP/opus-mt-en-de", "MarianMTModel"),
+    "opus-mt-en-fr": ("Helsinki-NLP/opus-mt-en-fr", "MarianMTModel"),
+    "opus-mt-en-es": ("Helsinki-NLP/opus-mt-en-es", "MarianMTModel"),
+    "opus-mt-en-it": ("Helsinki-NLP/opus-mt-en-it", "MarianMTModel"),
+    "opus-mt-en-uk": ("Helsinki-NLP/opus-mt-en-uk", "MarianMTModel"),
+    "opus-mt-en-nl": ("Helsinki-NLP/opus-mt-en-nl", "MarianMTModel"),
+    "opus-mt-en-sv": ("Helsinki-NLP/opus-mt-en-sv", "MarianMTModel"),
+    "opus-mt-en-fi": ("Helsinki-NLP/opus-mt-en-fi", "MarianMTModel"),
+    "opus-mt-en-cs": ("Helsinki-NLP/opus-mt-en-cs", "MarianMTModel"),
+    "opus-mt-en-et": ("Helsinki-NLP/opus-mt-en-et", "MarianMTModel"),
+    "opus-mt-en-hi": ("Helsinki-NLP/opus-mt-en-hi", "MarianMTModel"),
+    "opus-mt-en-id": ("Helsinki-NLP/opus-mt-en-id", "MarianMTModel"),
+    "opus-mt-en-vi": ("Helsinki-NLP/opus-mt-en-vi", "MarianMTModel")
+}
+
+# (исходный язык, целевой язык) -> модель пары; остальные пары переводит выбранная модель TRANSLATION_MODEL_NAMES
+TRANSLATION_PAIR_ROUTES = {
+    ("en_XX", "ru_RU"): "opus-mt-en-ru",
+    ("en_XX", "de_DE"): "opus-mt-en-de",
+    ("en_XX", "fr_XX"): "opus-mt-en-fr",
+    ("en_XX", "es_XX"): "opus-mt-en-es",
+    ("en_XX", "it_IT"): "opus-mt-en-it",
+    ("en_XX", "uk_UA"): "opus-mt-en-uk",
+    ("en_XX", "nl_XX"): "opus-mt-en-nl",
+    ("en_XX", "sv_SE"): "opus-mt-en-sv",
+    ("en_XX", "fi_FI"): "opus-mt-en-fi",
+    ("en_XX", "cs_CZ"): "opus-mt-en-cs",
+    ("en_XX", "et_EE"): "opus-mt-en-et",
+    ("en_XX", "hi_IN"): "opus-mt-en-hi",
+    ("en_XX", "id_ID"): "opus-mt-en-id",
+    ("en_XX", "vi_VN"): "opus-mt-en-vi"
+}
+
 SEGMENTATION_MODEL_NAMES = {
     "Florence-2-large-ft": ("microsoft/Florence-2-large-ft", "AutoModelForCausalLM"),
     "Florence-2-large": ("microsoft/Florence-2-large", "AutoModelForCausalLM"),
     "Florence-2-base-ft": ("microsoft/Florence-2-base-ft", "AutoModelForCausalLM"),
     "Florence-2-base": ("microsoft/Florence-2-base", "AutoModelForCausalLM")
-}
\ No newline at end of file
+}
+
+# Классификация одним прямым проходом вместо генерации <OD>: zero-shot сопоставление
+# изображения с метками (CLIP) либо классификатор с фиксированным набором классов (ImageNet)
+CLASSIFICATION_MODEL_NAMES = {
+    "clip-vit-base-patch32": ("openai/clip-vit-base-patch32", "CLIPModel"),
+    "clip-vit-base-patch16": ("openai/clip-vit-base-patch16", "CLIPModel"),
+    "clip-vit-large-patch14": ("openai/clip-vit-large-patch14", "CLIPModel"),
+    "vit-base-patch16-224": ("google/vit-base-patch16-224", "AutoModelForImageClassification"),
+    "convnext-tiny-224": ("facebook/convnext-tiny-224", "AutoModelForImageClassification")
+}
+
+# Меньшая модель того же семейства: повтор генерации, превысившей бюджет времени, и ступени
+# регулятора производительности (процессор и токенизатор совпадают, входы переиспользуются)
+SMALLER_MODEL_VARIANTS = {
+    "Florence-2-large-ft": "Florence-2-base-ft",
+    "Florence-2-large": "Florence-2-base",
+    "blip-image-captioning-large": "blip-image-captioning-base",
+    "git-large-coco": "git-base-coco"
+}
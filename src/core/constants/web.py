@@ -27,3 +27,14 @@ TRANSLATION_LANGUAGES = {
     "Ukrainian": "uk_UA", "Urdu": "ur_PK",
     "Vietnamese": "vi_VN", "Xhosa": "xh_ZA"
 }
+
+TRANSFER_STRATEGIES = {
+    "Копирование": "copy",
+    "Копирование в ядре (copy_file_range)": "copy_file_range",
+    "Клонирование блоков (reflink)": "reflink",
+    "Жёсткая ссылка (hardlink)": "hardlink",
+    "Перемещение исходных файлов": "rename"
+}
+
+# Количество миниатюр на странице галереи
+GALLERY_PAGE_SIZE = 24
@@ -1,17 +1,28 @@
 # src\core\creators\base_creator.py
 from abc import ABC, abstractmethod
+from importlib.util import find_spec
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Tuple
 import torch
+from core.creators.model_store import model_store
 from core.utils.get_logger import logger
+from core.utils.memory import PeakMemoryTracker
+from core.utils.precision import weights_dtype
 from transformers import (
     AutoModelForCausalLM,
+    AutoModelForImageClassification,
     AutoProcessor, 
     AutoTokenizer, 
     AutoImageProcessor,
     BlipForConditionalGeneration,
+    CLIPModel,
     VisionEncoderDecoderModel,
     BertTokenizerFast,
     MBartForConditionalGeneration,
-    MBart50TokenizerFast
+    MBart50TokenizerFast,
+    MarianMTModel,
+    MarianTokenizer
 )
 
 class BaseCreator(ABC):
@@ -19,6 +30,9 @@ class BaseCreator(ABC):
     Абстрактный базовый класс для создания генеративных моделей.
     Реализует общую логику загрузки моделей и компонентов.
     """
+
+    # Время последнего использования загруженных моделей: (класс, ключ кэша) -> time.monotonic()
+    _last_used: Dict[Tuple[type, Tuple[str, str]], float] = {}
     
     @property
     @abstractmethod
@@ -37,32 +51,49 @@ class BaseCreator(ABC):
                 logger.error(error_msg)
                 raise ValueError(error_msg)
             
-            model_path, model_class_name = self.MODEL_NAMES[self.model_name]
-            logger.info(f"Выбрана модель: {self.model_name} | Путь: {model_path} | Класс: {model_class_name}")
-            return model_path, globals()[model_class_name]
+            repo_id, model_class_name = self.MODEL_NAMES[self.model_name]
+            logger.info("Выбрана модель: %s | Репозиторий: %s | Класс: %s", self.model_name, repo_id, model_class_name)
+            model_class = globals()[model_class_name]
+
+            # Все компоненты (модель, процессор, токенизатор) читаются из локального снимка
+            self.repo_id = repo_id
+            model_path = model_store.resolve(repo_id)
+            logger.debug("Путь к снимку модели %s: %s", self.model_name, model_path)
+            return model_path, model_class
             
         except KeyError as ke:
-            logger.exception(f"Ошибка получения класса модели: {ke}")
+            logger.exception("Ошибка получения класса модели: %s", ke)
             raise
         except Exception as e:
-            logger.critical(f"Неожиданная ошибка при выборе модели: {e}")
+            logger.critical("Неожиданная ошибка при выборе модели: %s", e)
             raise
 
     def _load_base_model(self, model_path, model_class, **kwargs):
         """Базовый метод загрузки модели с улучшенным логированием"""
-        logger.info(f"Начало загрузки модели {self.model_name} на устройство {self.device}")
+        logger.info("Начало загрузки модели %s на устройство %s", self.model_name, self.device)
         
         try:
-            torch_dtype = torch.float32 if self.device == 'cpu' else torch.float16
-            logger.debug(f"Установлен torch_dtype: {torch_dtype} для устройства {self.device}")
+            torch_dtype = weights_dtype(self.device)
+            logger.debug("Установлен torch_dtype: %s для устройства %s", torch_dtype, self.device)
 
-            model = model_class.from_pretrained(
-                model_path,
-                torch_dtype=torch_dtype,
-                **kwargs
-            ).to(self.device)
+            # Веса снимка читаются через mmap напрямую в параметры модели,
+            # без промежуточного полного state dict в оперативной памяти
+            if any(Path(model_path).glob("*.safetensors")):
+                kwargs.setdefault("use_safetensors", True)
+            if find_spec("accelerate") is not None:
+                kwargs.setdefault("low_cpu_mem_usage", True)
+            else:
+                logger.warning("Пакет accelerate не установлен: загрузка с низким потреблением памяти недоступна")
 
-            logger.success(f"Модель {self.model_name} успешно загружена на {self.device}")
+            with PeakMemoryTracker() as tracker:
+                model = model_class.from_pretrained(
+                    model_path,
+                    torch_dtype=torch_dtype,
+                    **kwargs
+                ).to(self.device)
+
+            logger.success("Модель %s успешно загружена на %s", self.model_name, self.device)
+            model_store.record_load(getattr(self, "repo_id", model_path), self.model_name, self.device, tracker.report())
 
             if self.device == 'cuda' and torch.__version__ >= "2.0.0":
                 logger.info("Попытка компиляции модели с torch.compile()")
@@ -71,21 +102,22 @@ class BaseCreator(ABC):
                     logger.info("Модель успешно скомпилирована")
                 except Exception as compile_error:
                     logger.warning(
-                        f"Ошибка компиляции модели: {compile_error}. "
+                        "Ошибка компиляции модели: %s. "
                         "Модель будет работать без компиляции. "
-                        "Рекомендуется обновить версии torch/cuda при возможности"
+                        "Рекомендуется обновить версии torch/cuda при возможности",
+                        compile_error
                     )
 
             return model
 
         except IOError as ioe:
-            logger.exception(f"Ошибка загрузки файлов модели: {ioe}")
+            logger.exception("Ошибка загрузки файлов модели: %s", ioe)
             raise
         except RuntimeError as re:
-            logger.exception(f"Ошибка выполнения при загрузке модели: {re}")
+            logger.exception("Ошибка выполнения при загрузке модели: %s", re)
             raise
         except Exception as e:
-            logger.critical(f"Критическая ошибка при загрузке модели: {e}")
+            logger.critical("Критическая ошибка при загрузке модели: %s", e)
             raise
 
     def _apply_special_optimizations(self, model):
@@ -95,5 +127,36 @@ class BaseCreator(ABC):
             # Реализация в подклассах может добавлять специфичные оптимизации
             return model
         except Exception as opt_error:
-            logger.error(f"Ошибка при применении оптимизаций: {opt_error}")
+            logger.error("Ошибка при применении оптимизаций: %s", opt_error)
             raise
+
+    @classmethod
+    def touch(cls, cache_key: Tuple[str, str]) -> None:
+        """Отмечает использование загруженной модели (для выгрузки по простою)."""
+        BaseCreator._last_used[(cls, cache_key)] = time.monotonic()
+
+    def mark_used(self) -> None:
+        """Отмечает использование модели этого экземпляра."""
+        self.touch((self.model_name, self.device))
+
+    @classmethod
+    def idle_seconds(cls, cache_key: Tuple[str, str]) -> float:
+        return time.monotonic() - BaseCreator._last_used.get((cls, cache_key), 0.0)
+
+    @classmethod
+    def loaded_keys(cls) -> List[Tuple[str, str]]:
+        """Ключи (имя модели, устройство) загруженных моделей этого типа."""
+        return list(cls._model_cache)
+
+    @classmethod
+    def unload(cls, cache_key: Tuple[str, str]) -> Optional[Tuple[Any, ...]]:
+        """
+        Удаляет модель из кэша и возвращает её компоненты для освобождения
+        связанных ресурсов (None - модель не была загружена). Память освобождается,
+        когда на компоненты не остаётся ссылок.
+        """
+        components = cls._model_cache.pop(cache_key, None)
+        BaseCreator._last_used.pop((cls, cache_key), None)
+        if components is not None:
+            logger.info("Модель %s (%s) выгружена из памяти", *cache_key)
+        return components
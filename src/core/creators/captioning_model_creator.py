@@ -8,6 +8,7 @@ from transformers import (
     BertTokenizerFast
 )
 from core.creators.base_creator import BaseCreator
+from core.utils.metrics import LOADED_MODELS
 
 class CaptioningModelCreator(BaseCreator):
     _model_cache = {}
@@ -46,4 +47,8 @@ class CaptioningModelCreator(BaseCreator):
         if cache_key not in self._model_cache:
             model_path, model_class = self._get_model_path_and_class()
             self._model_cache[cache_key] = self._load_components(model_path, model_class)
+        self.touch(cache_key)
         return self._model_cache[cache_key]
+
+
+LOADED_MODELS.labels("captioning").set_function(lambda: len(CaptioningModelCreator._model_cache))
@@ -0,0 +1,45 @@
+# src/core/creators/classification_model_creator.py
+from transformers import AutoImageProcessor, AutoProcessor, CLIPModel
+from core.creators.base_creator import BaseCreator
+from core.utils.metrics import LOADED_MODELS
+
+class ClassificationModelCreator(BaseCreator):
+    _model_cache = {}
+    
+    def __init__(self, model_name, device):
+        self.model_name = model_name
+        self.device = device
+        self.processor, self.model = self._load_model()
+
+    @property
+    def MODEL_NAMES(self):
+        from core.constants.models import CLASSIFICATION_MODEL_NAMES
+        return CLASSIFICATION_MODEL_NAMES
+
+    @property
+    def is_zero_shot(self) -> bool:
+        """Модель сопоставляет изображение с произвольными метками (CLIP), а не с классами обучения."""
+        # Модель, скомпилированная torch.compile, не является экземпляром CLIPModel, но проксирует его методы
+        return hasattr(self.model, "get_image_features")
+
+    def _load_components(self, model_path, model_class):
+        # Процессор CLIP включает токенизатор меток, классификатору нужен только процессор изображений
+        processor = (
+            AutoProcessor.from_pretrained(model_path)
+            if model_class == CLIPModel
+            else AutoImageProcessor.from_pretrained(model_path)
+        )
+        model = self._load_base_model(model_path, model_class)
+        model.eval()
+        return processor, model
+
+    def _load_model(self):
+        cache_key = (self.model_name, self.device)
+        if cache_key not in self._model_cache:
+            model_path, model_class = self._get_model_path_and_class()
+            self._model_cache[cache_key] = self._load_components(model_path, model_class)
+        self.touch(cache_key)
+        return self._model_cache[cache_key]
+
+
+LOADED_MODELS.labels("classification").set_function(lambda: len(ClassificationModelCreator._model_cache))
@@ -0,0 +1,249 @@
+# src/core/creators/model_store.py
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import torch
+from filelock import FileLock
+from huggingface_hub import HfApi, snapshot_download
+from safetensors.torch import save_file
+
+from core.utils.get_logger import logger
+
+# Форматы весов, которые не нужны при наличии safetensors/pytorch весов
+FOREIGN_WEIGHT_PATTERNS = ["*.h5", "*.msgpack", "*.ot", "*.onnx", "*.tflite", "*.gguf", "onnx/*", "flax_model*"]
+
+
+class ModelStore:
+    """
+    Локальное хранилище моделей.
+
+    Каждая модель один раз выгружается из HF Hub в обычную директорию
+    (без структуры кэша хаба), веса конвертируются в safetensors, после чего
+    загрузка идёт только из снимка через memory-mapped чтение. Несколько
+    процессов на одном хосте читают одни и те же файлы через page cache.
+    """
+
+    MANIFEST_NAME = "store.json"
+
+    def __init__(self, root: str = "../models"):
+        self.root = Path(os.environ.get("MODEL_STORE_DIR", root))
+        self._lock = threading.Lock()
+        self._manifest: Optional[Dict] = None
+
+    # ------------------------------------------------------------------
+    # Пути и манифест
+    # ------------------------------------------------------------------
+    def snapshot_dir(self, repo_id: str) -> Path:
+        """Директория снимка модели внутри хранилища."""
+        return self.root / repo_id.replace("/", "--")
+
+    def _manifest_path(self) -> Path:
+        return self.root / self.MANIFEST_NAME
+
+    def _read_manifest(self) -> Dict:
+        if self._manifest is None:
+            try:
+                with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            except FileNotFoundError:
+                self._manifest = {"models": {}}
+            except (OSError, ValueError) as e:
+                logger.warning("Манифест хранилища моделей повреждён, будет пересоздан: %s", e)
+                self._manifest = {"models": {}}
+        return self._manifest
+
+    def _write_manifest(self) -> None:
+        path = self._manifest_path()
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _update_entry(self, repo_id: str, **fields) -> None:
+        """Обновляет запись манифеста под межпроцессной блокировкой."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock, FileLock(str(self._manifest_path()) + ".lock"):
+            # Перечитываем манифест: его могли изменить другие процессы
+            self._manifest = None
+            manifest = self._read_manifest()
+            entry = manifest["models"].setdefault(repo_id, {})
+            for key, value in fields.items():
+                if isinstance(value, dict) and isinstance(entry.get(key), dict):
+                    entry[key].update(value)
+                else:
+                    entry[key] = value
+            self._write_manifest()
+
+    # ------------------------------------------------------------------
+    # Получение снимка
+    # ------------------------------------------------------------------
+    def resolve(self, repo_id: str) -> str:
+        """
+        Возвращает путь к локальному снимку модели, создавая его при первом обращении.
+        Локальные директории (например, тестовые модели) возвращаются как есть.
+        """
+        if Path(repo_id).is_dir():
+            return repo_id
+
+        target = self.snapshot_dir(repo_id)
+        if self._is_ready(repo_id, target):
+            logger.debug("Снимок модели найден в хранилище: %s", target)
+            return str(target)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Межпроцессная блокировка: конвертация выполняется ровно одним процессом
+        with FileLock(str(self.root / f"{target.name}.lock")):
+            self._manifest = None
+            if not self._is_ready(repo_id, target):
+                self._materialize(repo_id, target)
+        return str(target)
+
+    def _is_ready(self, repo_id: str, target: Path) -> bool:
+        entry = self._read_manifest()["models"].get(repo_id, {})
+        return bool(entry.get("ready")) and target.is_dir()
+
+    def _materialize(self, repo_id: str, target: Path) -> None:
+        """Скачивание репозитория в обычную директорию и конвертация весов."""
+        logger.info("Создание снимка модели %s в %s", repo_id, target)
+        start_time = time.monotonic()
+        staging = target.with_name(f"{target.name}.partial")
+
+        try:
+            ignore_patterns = list(FOREIGN_WEIGHT_PATTERNS)
+            if self._has_safetensors(repo_id):
+                ignore_patterns += ["*.bin", "*.pt", "*.pth"]
+
+            try:
+                snapshot_download(repo_id, local_dir=str(staging), ignore_patterns=ignore_patterns)
+            except Exception as e:
+                logger.warning("Загрузка %s из сети недоступна (%s), используется локальный кэш HF", repo_id, e)
+                snapshot_download(
+                    repo_id, local_dir=str(staging),
+                    ignore_patterns=ignore_patterns, local_files_only=True
+                )
+
+            converted = self._convert_bin_weights(staging)
+            shutil.rmtree(staging / ".cache", ignore_errors=True)
+
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(staging, target)
+
+            size_bytes = sum(p.stat().st_size for p in target.rglob("*") if p.is_file())
+            self._update_entry(
+                repo_id,
+                ready=True,
+                path=str(target),
+                converted_from_bin=converted,
+                size_mb=round(size_bytes / 1024 ** 2, 1),
+                created_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            logger.success(
+                "Снимок %s готов за %.1fс | "
+                "Размер: %.1f MB | Конвертация: %s",
+                repo_id, time.monotonic() - start_time, size_bytes / 1024 ** 2, converted
+            )
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logger.error("Ошибка создания снимка модели %s: %s", repo_id, e, exc_info=True)
+            raise
+
+    @staticmethod
+    def _has_safetensors(repo_id: str) -> bool:
+        try:
+            return any(f.endswith(".safetensors") for f in HfApi().list_repo_files(repo_id))
+        except Exception as e:
+            logger.debug("Не удалось получить список файлов %s: %s", repo_id, e)
+            return False
+
+    # ------------------------------------------------------------------
+    # Конвертация весов
+    # ------------------------------------------------------------------
+    def _convert_bin_weights(self, directory: Path) -> bool:
+        """Конвертирует pytorch_model*.bin в safetensors. Возвращает True, если была конвертация."""
+        if any(directory.glob("*.safetensors")):
+            for leftover in directory.glob("pytorch_model*.bin*"):
+                leftover.unlink()
+            return False
+
+        index_path = directory / "pytorch_model.bin.index.json"
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+
+            renamed = {}
+            for shard in sorted(set(index["weight_map"].values())):
+                new_name = shard.replace("pytorch_model", "model").replace(".bin", ".safetensors")
+                self._convert_file(directory / shard, directory / new_name)
+                renamed[shard] = new_name
+
+            index["weight_map"] = {k: renamed[v] for k, v in index["weight_map"].items()}
+            with open(directory / "model.safetensors.index.json", "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2)
+            index_path.unlink()
+            return True
+
+        single = directory / "pytorch_model.bin"
+        if single.exists():
+            self._convert_file(single, directory / "model.safetensors")
+            return True
+
+        logger.warning("В снимке %s не найдено весов для конвертации", directory)
+        return False
+
+    @staticmethod
+    def _convert_file(src: Path, dest: Path) -> None:
+        logger.info("Конвертация весов %s -> %s", src.name, dest.name)
+        try:
+            state_dict = torch.load(str(src), map_location="cpu", weights_only=True, mmap=True)
+        except RuntimeError:
+            # Старый (не zip) формат torch.save не поддерживает mmap
+            state_dict = torch.load(str(src), map_location="cpu", weights_only=True)
+
+        # safetensors не допускает общих хранилищ: связанные веса клонируются
+        seen_storages = set()
+        tensors = {}
+        for name, tensor in state_dict.items():
+            storage_ptr = tensor.untyped_storage().data_ptr()
+            if storage_ptr in seen_storages:
+                tensor = tensor.clone()
+            seen_storages.add(storage_ptr)
+            tensors[name] = tensor.contiguous()
+
+        save_file(tensors, str(dest), metadata={"format": "pt"})
+        del state_dict, tensors
+        src.unlink()
+
+    # ------------------------------------------------------------------
+    # Отчёты о загрузке
+    # ------------------------------------------------------------------
+    def record_load(self, repo_id: str, model_name: str, device: str, report: dict) -> None:
+        """Сохраняет время загрузки и пиковый RSS для модели."""
+        logger.info(
+            "Отчёт загрузки %s (%s) | Время: %sс | "
+            "RSS: %s -> %s MB | "
+            "Пик: %s MB (+%s MB)",
+            model_name, device, report['seconds'], report['rss_before_mb'], report['rss_after_mb'], report['peak_rss_mb'], report['peak_delta_mb']
+        )
+        if Path(repo_id).is_dir():
+            return
+        try:
+            self._update_entry(repo_id, loads={device: report})
+        except OSError as e:
+            logger.warning("Не удалось записать отчёт загрузки %s: %s", model_name, e)
+
+    def load_reports(self) -> Dict[str, dict]:
+        """Отчёты о загрузке всех моделей хранилища."""
+        return {
+            repo_id: entry.get("loads", {})
+            for repo_id, entry in self._read_manifest()["models"].items()
+        }
+
+
+# Глобальное хранилище моделей
+model_store = ModelStore()
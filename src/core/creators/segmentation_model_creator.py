@@ -2,6 +2,7 @@
 import torch
 from transformers import AutoProcessor
 from core.creators.base_creator import BaseCreator
+from core.utils.metrics import LOADED_MODELS
 
 class SegmentationModelCreator(BaseCreator):
     _model_cache = {}
@@ -32,4 +33,8 @@ class SegmentationModelCreator(BaseCreator):
         if cache_key not in self._model_cache:
             model_path, model_class = self._get_model_path_and_class()
             self._model_cache[cache_key] = self._load_components(model_path, model_class)
-        return self._model_cache[cache_key]
\ No newline at end of file
+        self.touch(cache_key)
+        return self._model_cache[cache_key]
+
+
+LOADED_MODELS.labels("segmentation").set_function(lambda: len(SegmentationModelCreator._model_cache))
@@ -3,9 +3,12 @@ from transformers import (
     AutoTokenizer,
     MBartForConditionalGeneration,
     MBart50TokenizerFast,
+    MarianMTModel,
+    MarianTokenizer,
     AutoProcessor
 )
 from core.creators.base_creator import BaseCreator
+from core.utils.metrics import LOADED_MODELS
 
 class TranslationModelCreator(BaseCreator):
     _model_cache = {}
@@ -17,23 +20,29 @@ class TranslationModelCreator(BaseCreator):
 
     @property
     def MODEL_NAMES(self):
-        from core.constants.models import TRANSLATION_MODEL_NAMES
-        return TRANSLATION_MODEL_NAMES
+        from core.constants.models import TRANSLATION_MODEL_NAMES, TRANSLATION_PAIR_MODEL_NAMES
+        return {**TRANSLATION_MODEL_NAMES, **TRANSLATION_PAIR_MODEL_NAMES}
+
+    @property
+    def is_pair_model(self) -> bool:
+        """Модель одной языковой пары: без кодов языков в токенизаторе и forced_bos_token_id."""
+        return isinstance(self.tokenizer, MarianTokenizer)
 
     def _load_components(self, model_path, model_class):
         # Загрузка процессора
         processor = (
             AutoProcessor.from_pretrained(model_path)
-            if model_class != MBartForConditionalGeneration
+            if model_class not in (MBartForConditionalGeneration, MarianMTModel)
             else None
         )
         
         # Загрузка токенизатора
-        tokenizer = (
-            MBart50TokenizerFast.from_pretrained(model_path)
-            if model_class == MBartForConditionalGeneration
-            else AutoTokenizer.from_pretrained(model_path)
-        )
+        if model_class == MBartForConditionalGeneration:
+            tokenizer = MBart50TokenizerFast.from_pretrained(model_path)
+        elif model_class == MarianMTModel:
+            tokenizer = MarianTokenizer.from_pretrained(model_path)
+        else:
+            tokenizer = AutoTokenizer.from_pretrained(model_path)
         
         # Загрузка модели
         model = self._load_base_model(model_path, model_class)
@@ -45,4 +54,8 @@ class TranslationModelCreator(BaseCreator):
         if cache_key not in self._model_cache:
             model_path, model_class = self._get_model_path_and_class()
             self._model_cache[cache_key] = self._load_components(model_path, model_class)
-        return self._model_cache[cache_key]
\ No newline at end of file
+        self.touch(cache_key)
+        return self._model_cache[cache_key]
+
+
+LOADED_MODELS.labels("translation").set_function(lambda: len(TranslationModelCreator._model_cache))
@@ -1,19 +1,22 @@
 # src\core\generators\base_generator.py
 import gc
-from typing import Literal, ClassVar
+from typing import Callable, Literal, ClassVar, Optional
 from abc import ABC, abstractmethod
 import torch
 from torch.cuda import empty_cache
 from core.utils.get_device import get_device
 from core.utils.get_logger import logger
+from core.utils.metrics import MEMORY_BYTES
 
 class BaseGenerator(ABC):
     """Абстрактный базовый класс для всех компонентов генерации."""
     
     device: ClassVar[Literal["cuda", "cpu"]] = get_device()
     
-    def __init__(self):
-        logger.debug(f"Инициализация генератора на устройстве: {self.device}")
+    def __init__(self, should_stop: Optional[Callable[[], bool]] = None):
+        logger.debug("Инициализация генератора на устройстве: %s", self.device)
+        # Флаг отмены задачи-владельца: проверяется на каждом шаге декодирования
+        self.should_stop = should_stop
 
     @classmethod
     @abstractmethod
@@ -31,21 +34,23 @@ class BaseGenerator(ABC):
                 empty_cache()
                 after = torch.cuda.memory_allocated()
                 logger.success(
-                    f"Память GPU освобождена. Использовалось: {before // 1024**2}MB -> "
-                    f"Свободно: {after // 1024**2}MB"
+                    "Память GPU освобождена. Использовалось: %sMB -> "
+                    "Свободно: %sMB",
+                    before // 1024**2, after // 1024**2
                 )
             else:
                 logger.debug("Очистка оперативной памяти CPU...")
-                before = gc.get_objects()
-                gc.collect()
-                after = gc.get_objects()
-                logger.success(
-                    f"Освобождено объектов памяти: {len(before) - len(after)}"
-                )
+                # gc.collect() сам возвращает число собранных объектов: без копий gc.get_objects()
+                collected = gc.collect()
+                logger.debug("Освобождено объектов памяти: %s", collected)
         except Exception as e:
             logger.error(
-                f"Ошибка при очистке памяти ({'GPU' if cls.device == 'cuda' else 'CPU'}): {e}",
+                "Ошибка при очистке памяти (%s): %s", 'GPU' if cls.device == 'cuda' else 'CPU', e,
                 exc_info=True
             )
             raise
-        
\ No newline at end of file
+
+
+if BaseGenerator.device == "cuda":
+    MEMORY_BYTES.labels("cuda_allocated").set_function(torch.cuda.memory_allocated)
+    MEMORY_BYTES.labels("cuda_reserved").set_function(torch.cuda.memory_reserved)
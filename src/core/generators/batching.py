@@ -0,0 +1,264 @@
+# src/core/generators/batching.py
+"""
+Динамическое пакетирование инференса между сессиями.
+
+Для каждой загруженной модели (и набора параметров генерации) работает один
+BatchingServer: вызывающие потоки кладут подготовленные входы в очередь и ждут
+результат, а фоновый поток собирает пакет до max_batch_size элементов или до
+истечения max_wait_ms с момента прихода первого элемента, выполняет один вызов
+model.generate и раздаёт строки результата обратно вызывающим.
+
+Ожидание добора пакета имеет смысл только при нескольких активных клиентах:
+если за последние CLIENT_WINDOW секунд модель вызывал один поток, пакет
+отправляется сразу и одиночная обработка не получает лишней задержки.
+
+Отменённый клиент перестаёт ждать сразу: его запрос не попадает в пакет, а
+идущее декодирование останавливается, когда отменены все запросы пакета.
+
+Остановленный сервер (выгрузка модели) не принимает запросы в очередь: генератор,
+который ещё держит ссылку на сервер, получает результат прямым вызовом generate.
+Запросы, оставшиеся в очереди к моменту остановки, обрабатываются до выхода потока.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import torch
+
+from core.generators.cancellation import ShouldStop
+from core.generators.exceptions import GenerationCancelledError
+from core.utils.get_logger import logger
+from core.utils.metrics import BATCH_SIZE, BATCH_WAIT_SECONDS
+from core.utils.settings import settings
+
+# Окно (с), в котором поток считается активным клиентом сервера
+CLIENT_WINDOW = 2.0
+# Период (с) проверки отмены клиентом, ожидающим результат
+CANCEL_POLL_INTERVAL = 0.05
+
+
+class _Request:
+    __slots__ = ("inputs", "future", "enqueued_at", "client", "should_stop")
+
+    def __init__(self, inputs: Mapping[str, torch.Tensor], should_stop: Optional[ShouldStop] = None):
+        self.inputs = inputs
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+        self.client = threading.get_ident()
+        self.should_stop = should_stop
+
+    @property
+    def cancelled(self) -> bool:
+        return self.future.done() or (self.should_stop is not None and self.should_stop())
+
+    def resolve(self, result: Optional[torch.Tensor] = None, error: Optional[BaseException] = None) -> None:
+        """Передаёт результат клиенту; запрос, отменённый клиентом, пропускается."""
+        try:
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+        except InvalidStateError:
+            pass
+
+
+def _signature(inputs: Mapping[str, torch.Tensor]) -> Tuple:
+    """Входы совместимы для объединения, если совпадают ключи и размеры кроме пакетного."""
+    return tuple((key, tuple(value.shape[1:]), value.dtype) for key, value in sorted(inputs.items()))
+
+
+BatchGenerate = Callable[[Dict[str, torch.Tensor], Optional[ShouldStop]], torch.Tensor]
+
+
+def run_batched(items: List[Mapping[str, torch.Tensor]], generate: BatchGenerate,
+                should_stop: Optional[ShouldStop] = None) -> List[torch.Tensor]:
+    """
+    Объединяет совместимые входы по нулевой оси, вызывает generate один раз на группу
+    и возвращает для каждого входа его строки результата (с сохранением пакетной оси).
+    should_stop передаётся в generate для остановки декодирования при отмене.
+    """
+    groups: Dict[Tuple, List[int]] = {}
+    for position, inputs in enumerate(items):
+        groups.setdefault(_signature(inputs), []).append(position)
+
+    results: List[Optional[torch.Tensor]] = [None] * len(items)
+    for positions in groups.values():
+        merged = {
+            key: torch.cat([items[position][key] for position in positions], dim=0)
+            for key in items[positions[0]].keys()
+        }
+        sizes = [next(iter(items[position].values())).shape[0] for position in positions]
+        outputs = generate(merged, should_stop)
+        offset = 0
+        for position, size in zip(positions, sizes):
+            results[position] = outputs[offset:offset + size]
+            offset += size
+    return results
+
+
+class BatchingServer:
+    """Очередь запросов к одной модели с фоновым формированием пакетов."""
+
+    def __init__(self, name: str, generate: BatchGenerate, max_batch_size: int, max_wait_ms: float):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._generate = generate
+        self._queue: "queue.SimpleQueue[_Request]" = queue.SimpleQueue()
+        self._clients: Dict[int, float] = {}
+        self._clients_lock = threading.Lock()
+        # Защищает закрытие: после сигнала остановки запросы в очередь не попадают
+        self._state_lock = threading.Lock()
+        self._closed = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._loop, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Сервер пакетирования %s запущен | max_batch_size=%s, max_wait_ms=%s",
+            name, max_batch_size, max_wait_ms
+        )
+
+    def submit(self, inputs: Mapping[str, torch.Tensor], should_stop: Optional[ShouldStop] = None) -> torch.Tensor:
+        """
+        Блокирующий вызов: результат generate для данного входа. При отмене
+        (should_stop() возвращает True) ожидание прерывается GenerationCancelledError.
+        """
+        request = _Request(inputs, should_stop)
+        with self._state_lock:
+            closed = self._closed
+            if not closed:
+                with self._clients_lock:
+                    self._clients[request.client] = request.enqueued_at
+                self._queue.put(request)
+        if closed:
+            # Сервер остановлен при выгрузке модели: вызов без пакетирования в потоке клиента
+            logger.debug("Сервер пакетирования %s остановлен, прямой вызов generate", self.name)
+            return run_batched([inputs], self._generate, should_stop)[0]
+        if should_stop is None:
+            return request.future.result()
+        while True:
+            try:
+                return request.future.result(timeout=CANCEL_POLL_INTERVAL)
+            except FutureTimeoutError:
+                if should_stop():
+                    # Запрос помечается завершённым: сервер не включит его в пакет и не вернёт результат
+                    request.future.cancel()
+                    raise GenerationCancelledError("Генерация отменена")
+
+    def _active_clients(self, now: float) -> int:
+        with self._clients_lock:
+            for client, seen in list(self._clients.items()):
+                if now - seen > CLIENT_WINDOW:
+                    del self._clients[client]
+            return len(self._clients)
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                # Уже ожидающие запросы забираются без задержки
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._active_clients(time.monotonic()) <= len(batch):
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if request is None:
+                # Сигнал остановки: текущий пакет обрабатывается, затем поток завершается
+                self._closing = True
+                break
+            batch.append(request)
+        return batch
+
+    def close(self) -> None:
+        """Останавливает фоновый поток (после обработки уже поставленных запросов)."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    def _drain(self) -> List[_Request]:
+        """Запросы, оставшиеся в очереди после сигнала остановки."""
+        remaining = []
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return remaining
+            if request is not None and not request.cancelled:
+                remaining.append(request)
+
+    def _loop(self) -> None:
+        while not self._closing:
+            first = self._queue.get()
+            if first is None:
+                break
+            self._process([request for request in self._collect(first) if not request.cancelled])
+
+        # Ни один поставленный запрос не остаётся без результата или ошибки
+        remaining = self._drain()
+        for offset in range(0, len(remaining), self.max_batch_size):
+            self._process(remaining[offset:offset + self.max_batch_size])
+        logger.info("Сервер пакетирования %s остановлен", self.name)
+
+    def _process(self, batch: List[_Request]) -> None:
+        """Один вызов generate на пакет и раздача результатов (или ошибки) его запросам."""
+        if not batch:
+            return
+        started = time.monotonic()
+        for request in batch:
+            BATCH_WAIT_SECONDS.labels(self.name).observe(started - request.enqueued_at)
+        BATCH_SIZE.labels(self.name).observe(len(batch))
+        logger.debug("Пакет %s: %s элементов", self.name, len(batch))
+
+        try:
+            # Декодирование пакета останавливается, только когда отменены все его запросы
+            results = run_batched(
+                [request.inputs for request in batch], self._generate,
+                lambda: all(request.cancelled for request in batch)
+            )
+        except Exception as e:
+            logger.error("Ошибка пакетного инференса %s: %s", self.name, e, exc_info=True)
+            for request in batch:
+                request.resolve(error=e)
+            return
+        for request, result in zip(batch, results):
+            request.resolve(result)
+
+
+_servers: Dict[Hashable, BatchingServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_batching_server(key: Hashable, name: str, generate: BatchGenerate) -> Optional[BatchingServer]:
+    """
+    Общий сервер для ключа (модель + параметры генерации) либо None,
+    если пакетирование выключено (settings.batch_max_size <= 1).
+    """
+    if settings.batch_max_size <= 1:
+        return None
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None:
+            server = _servers[key] = BatchingServer(
+                name, generate, settings.batch_max_size, settings.batch_max_wait_ms
+            )
+        return server
+
+
+def release_batching_servers(model: Any) -> int:
+    """Останавливает серверы пакетирования выгружаемой модели; возвращает их число."""
+    with _servers_lock:
+        keys = [key for key in _servers if isinstance(key, tuple) and id(model) in key]
+        servers = [_servers.pop(key) for key in keys]
+    for server in servers:
+        server.close()
+    return len(servers)
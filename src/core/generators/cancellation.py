@@ -0,0 +1,42 @@
+# src/core/generators/cancellation.py
+"""
+Отмена генерации внутри model.generate.
+
+Флаг отмены задачи проверяется между изображениями, но одно декодирование
+(например, <OD> Florence-2 с max_new_tokens=512 и лучевым поиском) длится секунды.
+CancellationCriteria подключается к generate как критерий остановки и проверяет
+флаг на каждом шаге декодирования, поэтому после отмены устройство освобождается
+через один шаг. Усечённый результат не возвращается: генератор поднимает
+GenerationCancelledError.
+"""
+
+from typing import Callable, Optional
+
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
+
+from core.generators.exceptions import GenerationCancelledError
+
+ShouldStop = Callable[[], bool]
+
+
+class CancellationCriteria(StoppingCriteria):
+    """Останавливает все строки пакета, когда should_stop() возвращает True."""
+
+    def __init__(self, should_stop: ShouldStop):
+        self.should_stop = should_stop
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.should_stop(), dtype=torch.bool, device=input_ids.device)
+
+
+def cancellation_kwargs(should_stop: Optional[ShouldStop]) -> dict:
+    """Аргументы model.generate с критерием отмены (пусто, если отмена не отслеживается)."""
+    if should_stop is None:
+        return {}
+    return {"stopping_criteria": StoppingCriteriaList([CancellationCriteria(should_stop)])}
+
+
+def raise_if_cancelled(should_stop: Optional[ShouldStop]) -> None:
+    if should_stop is not None and should_stop():
+        raise GenerationCancelledError("Генерация отменена")
@@ -1,18 +1,27 @@
 # src/core/generators/caption_generator.py
 from __future__ import annotations
-import contextlib
 import re
 import time
-from typing import ClassVar, Optional, Tuple
+from typing import ClassVar, Mapping, Optional, Tuple, Union
 
 import torch
 from PIL import Image, UnidentifiedImageError
 from transformers import BatchEncoding
 
+from core.constants.models import SMALLER_MODEL_VARIANTS
 from core.creators.captioning_model_creator import CaptioningModelCreator
 from core.generators.base_generator import BaseGenerator
+from core.generators.cancellation import ShouldStop, cancellation_kwargs, raise_if_cancelled
+from core.generators.deadline import (
+    deadline_kwargs, finished_token_ids, greedy_params, record_degraded, retry_action, unfinished_reason
+)
+from core.generators.batching import get_batching_server
+from core.generators.preprocessing import PreparedImage, get_batch_preprocessor
+from core.utils.decode_governor import DecodeRejectedError, decode_governor
 from core.utils.get_logger import logger
-from core.generators.exceptions import ImageProcessingError, CaptionGenerationError
+from core.utils.metrics import stage_timer
+from core.utils.precision import autocast_context
+from core.generators.exceptions import GenerationCancelledError, ImageProcessingError, CaptionGenerationError
 
 
 class CaptionGenerator(BaseGenerator):
@@ -24,13 +33,15 @@ class CaptionGenerator(BaseGenerator):
         "a close up", "a drawing of", "a rendering of"
     )
     
-    def __init__(self, model_name: str, max_length: int = 50, num_beams: int = 2):
+    def __init__(self, model_name: str, max_length: int = 50, num_beams: int = 2,
+                 should_stop: Optional[ShouldStop] = None):
         """Инициализирует генератор подписей к изображениям."""
-        super().__init__()
+        super().__init__(should_stop)
         try:
             logger.info(
-                f"Инициализация генератора | Модель: {model_name} "
-                f"Параметры: max_length={max_length}, num_beams={num_beams}"
+                "Инициализация генератора | Модель: %s "
+                "Параметры: max_length=%s, num_beams=%s",
+                model_name, max_length, num_beams
             )
             
             self.model_creator = CaptioningModelCreator(model_name, self.device)
@@ -42,48 +53,69 @@ class CaptionGenerator(BaseGenerator):
                 'max_length': max_length,
                 'num_beams': num_beams,
             }
+            # Векторная предобработка в обход поэлементного вызова процессора HF (None - недоступна)
+            self._preprocessor = get_batch_preprocessor(self.model_creator.processor, self.device)
+            # Признаки завершённой строки и число изображений, превысивших бюджет генерации
+            self._finished_ids = finished_token_ids(self.model_creator.model, self.model_creator.tokenizer)
+            self.degraded = 0
+            # Общий для всех сессий сервер пакетирования этой модели и параметров
+            self._batcher = get_batching_server(
+                ("caption", id(self.model_creator.model), tuple(sorted(self.generation_params.items()))),
+                f"caption:{model_name}",
+                self._generate_batch
+            )
             
             logger.success("Генератор успешно инициализирован")
         except Exception as e:
-            logger.critical(f"Ошибка инициализации генератора: {e}", exc_info=True)
+            logger.critical("Ошибка инициализации генератора: %s", e, exc_info=True)
             raise
 
     def generate(self, image_path: str, image_name: Optional[str] = None) -> str:
         """Основной метод для генерации подписи к изображению."""
         image_name = image_name or image_path.split("/")[-1]
-        logger.info(f"Старт обработки: {image_name}")
+        logger.info("Старт обработки: %s", image_name)
         
         try:
             start_time = time.monotonic()
+            # Отметка использования: модель не выгружается по простою посреди длинной задачи
+            self.model_creator.mark_used()
             
-            image = self._process_image(image_path, image_name)
+            with stage_timer("decode"):
+                image = self._process_image(image_path, image_name)
             logger.debug("Этап 1/4: Изображение обработано")
             
-            inputs = self._prepare_inputs(image)
-            logger.debug(f"Этап 2/4: Входные данные подготовлены | Ключи: {inputs.keys()}")
+            with stage_timer("preprocess"):
+                inputs = self._prepare_inputs(image)
+            logger.debug("Этап 2/4: Входные данные подготовлены | Ключи: %s", inputs.keys())
             
-            outputs = self._generate_caption(inputs)
+            with stage_timer("generate"):
+                outputs = self._generate_caption(inputs)
             logger.debug("Этап 3/4: Подпись сгенерирована")
             
-            result = self._postprocess(outputs, image_name)
+            with stage_timer("postprocess"):
+                result = self._postprocess(outputs, image_name)
             logger.debug("Этап 4/4: Постобработка завершена")
             
             exec_time = time.monotonic() - start_time
             logger.success(
-                f"Успешная генерация для '{image_name}' | "
-                f"Результат: '{result}' | Время выполнения: {exec_time:.2f}с"
+                "Успешная генерация для '%s' | "
+                "Результат: '%s' | Время выполнения: %.2fс",
+                image_name, result, exec_time
             )
             return result
             
         except ImageProcessingError as e:
-            logger.error(f"Ошибка обработки изображения '{image_name}': {e}", exc_info=True)
+            logger.error("Ошибка обработки изображения '%s': %s", image_name, e, exc_info=True)
             raise CaptionGenerationError(f"Сбой обработки изображения: {image_name}") from e
+        except GenerationCancelledError:
+            logger.info("Генерация для '%s' отменена", image_name)
+            raise
         except CaptionGenerationError as e:
-            logger.error(f"Ошибка генерации подписи: {e}", exc_info=True)
+            logger.error("Ошибка генерации подписи: %s", e, exc_info=True)
             raise
         except Exception as e:
             logger.critical(
-                f"Критическая ошибка при обработке '{image_name}': {e}",
+                "Критическая ошибка при обработке '%s': %s", image_name, e,
                 exc_info=True
             )
             raise CaptionGenerationError("Непредвиденная ошибка генерации") from e
@@ -91,47 +123,64 @@ class CaptionGenerator(BaseGenerator):
             logger.debug("Очистка памяти")
             self.handle_memory()
 
-    def _process_image(self, image_path: str, image_name: str) -> Image.Image:
+    def _process_image(self, image_path: str, image_name: str) -> Union[Image.Image, PreparedImage]:
         """Загрузка и предобработка изображения."""
         try:
-            logger.info(f"Загрузка изображения: {image_name}")
-            with Image.open(image_path) as img:
+            logger.info("Загрузка изображения: %s", image_name)
+            if self._preprocessor is not None:
+                # Одно масштабирование сразу до входного размера модели
+                prepared = self._preprocessor.load(image_path)
+                logger.info(
+                    "Изображение готово | Размер: %s | Вход модели: %s",
+                    prepared.size, self._preprocessor.input_size
+                )
+                return prepared
+
+            MAX_SIZE = 512
+            with decode_governor.open(image_path, (MAX_SIZE, MAX_SIZE)) as img:
                 # Контроль цветового режима
                 if img.mode != 'RGB':
-                    logger.warning(f"Конвертация {img.mode} в RGB | Изображение: {image_name}")
+                    logger.warning("Конвертация %s в RGB | Изображение: %s", img.mode, image_name)
                     img = img.convert('RGB')
 
                 # Оптимизация размера
-                MAX_SIZE = 512
                 if any(dim > MAX_SIZE for dim in img.size):
-                    logger.debug(f"Уменьшение размера {img.size} -> {MAX_SIZE}px | Алгоритм: LANCZOS")
+                    logger.debug("Уменьшение размера %s -> %spx | Алгоритм: LANCZOS", img.size, MAX_SIZE)
                     img.thumbnail((MAX_SIZE, MAX_SIZE), Image.Resampling.LANCZOS)
 
                 # Предзагрузка данных
                 img.load()
                 logger.info(
-                    f"Изображение готово | Размер: {img.size} | "
-                    f"Объем данных: {len(img.tobytes()) // 1024} KB"
+                    "Изображение готово | Размер: %s | "
+                    "Объем данных: %s KB",
+                    img.size, img.width * img.height * len(img.getbands()) // 1024
                 )
                 return img
             
+        except DecodeRejectedError as e:
+            logger.error("Изображение отклонено до декодирования: %s | %s", image_name, e)
+            raise ImageProcessingError(f"Изображение отклонено: {image_name}: {e}") from e
         except (UnidentifiedImageError, OSError) as e:
-            logger.error(f"Некорректный файл изображения: {image_name}", exc_info=True)
+            logger.error("Некорректный файл изображения: %s", image_name, exc_info=True)
             raise ImageProcessingError(f"Файл поврежден или не является изображением: {image_name}") from e
         except Exception as e:
-            logger.error(f"Ошибка обработки изображения: {image_name}", exc_info=True)
+            logger.error("Ошибка обработки изображения: %s", image_name, exc_info=True)
             raise ImageProcessingError(f"Ошибка обработки: {image_name}") from e
 
-    def _prepare_inputs(self, image: Image.Image) -> BatchEncoding:
+    def _prepare_inputs(self, image: Union[Image.Image, PreparedImage]) -> BatchEncoding:
         """Подготовка данных для модели."""
         try:
             logger.debug("Подготовка тензоров для модели")
-            inputs = self.model_creator.processor(
-                images=image,
-                return_tensors="pt",
-            ).to(self.device, non_blocking=True)
+            if isinstance(image, PreparedImage):
+                inputs = self._preprocessor([image])
+            else:
+                inputs = self.model_creator.processor(
+                    images=image,
+                    return_tensors="pt",
+                )
+            inputs = inputs.to(self.device, non_blocking=True)
             
-            logger.debug(f"Тензоры подготовлены | Устройство: {self.device}")
+            logger.debug("Тензоры подготовлены | Устройство: %s", self.device)
             return inputs
         except Exception as e:
             logger.error("Ошибка подготовки данных", exc_info=True)
@@ -141,40 +190,87 @@ class CaptionGenerator(BaseGenerator):
         """Генерация подписи к изображению."""
         params = self.generation_params
         logger.info(
-            f"Запуск генерации | Параметры: "
-            f"max_length={params['max_length']}, "
-            f"num_beams={params['num_beams']}, "
-            f"Устройство: {self.device}"
+            "Запуск генерации | Параметры: "
+            "max_length=%s, "
+            "num_beams=%s, "
+            "Устройство: %s",
+            params['max_length'], params['num_beams'], self.device
         )
         
         try:
             start_time = time.monotonic()
-            with torch.inference_mode():
-                context = (
-                    torch.autocast(device_type=self.device) 
-                    if self.device == "cuda" 
-                    else contextlib.nullcontext()
-                )
-                with context:
-                    logger.debug("Контекст генерации активирован" + (" (autocast)" if self.device == "cuda" else ""))
-                    outputs = self.model_creator.model.generate(
-                        **inputs,
-                        max_length=params['max_length'],
-                        num_beams=params['num_beams'],
-                        early_stopping=True,
-                        no_repeat_ngram_size=3,
-                        length_penalty=0.8
-                    )
-                    exec_time = time.monotonic() - start_time
-                    logger.info(f"Генерация завершена | Время: {exec_time:.2f}с")
-                    return outputs
+            outputs = (
+                self._batcher.submit(inputs, self.should_stop) if self._batcher
+                else self._generate_batch(inputs, self.should_stop)
+            )
+            # Декодирование, остановленное критерием отмены, даёт усечённый результат
+            raise_if_cancelled(self.should_stop)
+            outputs = self._apply_deadline(inputs, outputs)
+            exec_time = time.monotonic() - start_time
+            logger.info("Генерация завершена | Время: %.2fс", exec_time)
+            return outputs
+        except GenerationCancelledError:
+            raise
         except RuntimeError as e:
-            logger.error(f"Ошибка выполнения генерации: {e}", exc_info=True)
+            logger.error("Ошибка выполнения генерации: %s", e, exc_info=True)
             raise CaptionGenerationError("Сбой в процессе генерации") from e
         except Exception as e:
             logger.error("Непредвиденная ошибка генерации", exc_info=True)
             raise CaptionGenerationError("Ошибка генерации") from e
 
+    def _generate_batch(self, inputs: Mapping[str, torch.Tensor],
+                        should_stop: Optional[ShouldStop] = None,
+                        params: Optional[dict] = None, model: Optional[torch.nn.Module] = None) -> torch.Tensor:
+        """
+        Вызов model.generate для пакета входов (одиночного или собранного сервером).
+        params и model задают профиль повтора после превышения бюджета.
+        """
+        params = params or self.generation_params
+        model = model or self.model_creator.model
+        with torch.inference_mode():
+            context = autocast_context(self.device)
+            with context:
+                logger.debug("Контекст генерации активирован: %s", type(context).__name__)
+                return model.generate(
+                    **inputs,
+                    max_length=params['max_length'],
+                    num_beams=params['num_beams'],
+                    early_stopping=True,
+                    no_repeat_ngram_size=3,
+                    length_penalty=0.8,
+                    **deadline_kwargs(),
+                    **cancellation_kwargs(should_stop)
+                )
+
+    def _apply_deadline(self, inputs: Mapping[str, torch.Tensor], outputs: torch.Tensor) -> torch.Tensor:
+        """Частичный результат или повтор дешёвым профилем для генерации, превысившей бюджет."""
+        reason = unfinished_reason(outputs, self._finished_ids, self.generation_params['max_length'])
+        if reason is None:
+            return outputs
+
+        action = retry_action(reason)
+        model = self.model_creator.model
+        if action == "smaller":
+            fallback = SMALLER_MODEL_VARIANTS.get(self.model_creator.model_name)
+            try:
+                if fallback:
+                    model = CaptioningModelCreator(fallback, self.device).model
+                else:
+                    action = "greedy"
+            except Exception as e:
+                logger.warning("Меньшая модель %s недоступна, повтор исходной моделью: %s", fallback, e)
+                action = "greedy"
+
+        self.degraded += 1
+        record_degraded("captioning", reason, action)
+        logger.warning("Генерация превысила бюджет (%s) | Действие: %s", reason, action)
+        if action == "partial":
+            return outputs
+
+        retried = self._generate_batch(inputs, self.should_stop, greedy_params(self.generation_params), model)
+        raise_if_cancelled(self.should_stop)
+        return retried
+
     def _postprocess(self, generated_ids: torch.Tensor, image_name: str) -> str:
         """Постобработка сгенерированной подписи."""
         try:
@@ -184,7 +280,7 @@ class CaptionGenerator(BaseGenerator):
                 skip_special_tokens=True
             )
             
-            logger.debug(f"Исходная подпись: '{caption}'")
+            logger.debug("Исходная подпись: '%s'", caption)
             
             # Фильтрация нежелательных паттернов
             filtered = self._compiled_pattern.sub('', caption)
@@ -193,12 +289,13 @@ class CaptionGenerator(BaseGenerator):
             
             # Проверка результата
             if not filtered:
-                logger.warning("Пустая подпись после фильтрации | Исходный текст: '{caption}'")
+                logger.warning("Пустая подпись после фильтрации | Исходный текст: '%s'", caption)
                 filtered = "Не удалось сгенерировать подпись"
             
             logger.info(
-                f"Результат постобработки | Исходная: {len(caption)} симв. "
-                f"Очищенная: {len(filtered)} симв."
+                "Результат постобработки | Исходная: %s симв. "
+                "Очищенная: %s симв.",
+                len(caption), len(filtered)
             )
             return filtered
         except Exception as e:
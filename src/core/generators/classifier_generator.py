@@ -0,0 +1,238 @@
+# src/core/generators/classifier_generator.py
+from __future__ import annotations
+import threading
+import time
+import weakref
+from typing import Mapping, Optional, Sequence, Tuple, Union
+
+import torch
+from PIL import Image, UnidentifiedImageError
+from transformers import BatchEncoding
+
+from core.constants.labels import DETECTION_LABELS
+from core.creators.classification_model_creator import ClassificationModelCreator
+from core.generators.base_generator import BaseGenerator
+from core.generators.cancellation import ShouldStop, raise_if_cancelled
+from core.generators.batching import get_batching_server
+from core.generators.preprocessing import PreparedImage, get_batch_preprocessor
+from core.utils.decode_governor import DecodeRejectedError, decode_governor
+from core.utils.get_logger import logger
+from core.utils.metrics import stage_timer
+from core.utils.precision import autocast_context
+from core.generators.exceptions import ClassificationGenerationError, GenerationCancelledError, ImageProcessingError
+
+# Шаблон текстового запроса метки для zero-shot сопоставления
+PROMPT_TEMPLATE = "a photo of a {}"
+# Метки zero-shot классификации: словарь детекции без служебной метки
+ZERO_SHOT_LABELS: Tuple[str, ...] = tuple(label for label in DETECTION_LABELS if label != "unknown")
+
+# Нормированные текстовые эмбеддинги меток: модель -> (метки, эмбеддинги); запись исчезает вместе с моделью
+_label_embeddings: "weakref.WeakKeyDictionary[torch.nn.Module, Tuple[Tuple[str, ...], torch.Tensor]]" = \
+    weakref.WeakKeyDictionary()
+_label_embeddings_lock = threading.Lock()
+
+
+class ClassifierGenerator(BaseGenerator):
+    """
+    Классификация изображения одним прямым проходом модели.
+
+    В отличие от SegmentGenerator, который ради метки наибольшего объекта
+    авторегрессионно генерирует до 512 токенов <OD>, здесь выполняется один
+    прямой проход: для CLIP - эмбеддинг изображения сравнивается с заранее
+    вычисленными эмбеддингами меток (ZERO_SHOT_LABELS), для классификатора -
+    берётся класс с наибольшим логитом. Входы разных сессий объединяются
+    сервером пакетирования.
+    """
+
+    def __init__(self, model_name: str, labels: Sequence[str] = ZERO_SHOT_LABELS,
+                 should_stop: Optional[ShouldStop] = None):
+        """Инициализирует классификатор."""
+        super().__init__(should_stop)
+        try:
+            logger.info("Инициализация классификатора | Модель: %s", model_name)
+            self.model_creator = ClassificationModelCreator(model_name, self.device)
+            self.labels: Tuple[str, ...] = tuple(labels)
+            if self.model_creator.is_zero_shot:
+                self._label_embeddings = self._embed_labels(self.labels)
+                logger.info("Zero-shot классификация по %s меткам", len(self.labels))
+            else:
+                id2label = self.model_creator.model.config.id2label
+                # Классы ImageNet перечисляют синонимы через запятую: метка - первый из них
+                self.labels = tuple(
+                    id2label[index].split(",")[0].strip().lower() for index in sorted(id2label)
+                )
+                logger.info("Классификатор с %s классами", len(self.labels))
+            # Векторная предобработка в обход поэлементного вызова процессора HF (None - недоступна)
+            self._preprocessor = get_batch_preprocessor(self.model_creator.processor, self.device)
+            # Общий для всех сессий сервер пакетирования этой модели и набора меток
+            self._batcher = get_batching_server(
+                ("classify", id(self.model_creator.model), hash(self.labels)),
+                f"classify:{model_name}",
+                self._classify_batch
+            )
+            logger.success("Классификатор успешно инициализирован")
+        except Exception as e:
+            logger.critical("Ошибка инициализации классификатора: %s", e, exc_info=True)
+            raise
+
+    def generate(self, image_path: str, image_name: Optional[str] = None) -> str:
+        """Метка изображения."""
+        image_name = image_name or image_path.split("/")[-1]
+        logger.debug("Старт классификации: %s", image_name)
+        try:
+            start_time = time.monotonic()
+            raise_if_cancelled(self.should_stop)
+            self.model_creator.mark_used()
+
+            with stage_timer("decode"):
+                image = self._process_image(image_path, image_name)
+
+            with stage_timer("preprocess"):
+                inputs = self._prepare_inputs(image)
+
+            with stage_timer("generate"):
+                logits = self._batcher.submit(inputs, self.should_stop) if self._batcher else self._classify_batch(inputs)
+
+            with stage_timer("postprocess"):
+                label, score = self._postprocess(logits)
+
+            logger.success(
+                "Успешная классификация '%s' | Метка: %s | Уверенность: %.2f | Время: %.3fс",
+                image_name, label, score, time.monotonic() - start_time
+            )
+            return label
+
+        except ImageProcessingError as e:
+            logger.error("Ошибка обработки изображения '%s': %s", image_name, e, exc_info=True)
+            raise ClassificationGenerationError(f"Сбой обработки изображения: {image_name}") from e
+        except GenerationCancelledError:
+            logger.info("Классификация '%s' отменена", image_name)
+            raise
+        except ClassificationGenerationError as e:
+            logger.error("Ошибка классификации: %s", e, exc_info=True)
+            raise
+        except Exception as e:
+            logger.critical("Критическая ошибка при классификации '%s': %s", image_name, e, exc_info=True)
+            raise ClassificationGenerationError("Непредвиденная ошибка классификации") from e
+
+    def prepare(self, image_path: str, image_name: Optional[str] = None) -> BatchEncoding:
+        """Декодирование и предобработка изображения для пакетного вызова embed_batch."""
+        image_name = image_name or image_path.split("/")[-1]
+        try:
+            with stage_timer("decode"):
+                image = self._process_image(image_path, image_name)
+            with stage_timer("preprocess"):
+                return self._prepare_inputs(image)
+        except ImageProcessingError as e:
+            raise ClassificationGenerationError(f"Сбой обработки изображения: {image_name}") from e
+
+    def embed_batch(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """
+        Нормированные эмбеддинги изображений пакета (float32, на CPU).
+        Для CLIP - проекция изображения в общее с текстом пространство, для
+        классификатора - усреднённые признаки последнего слоя.
+        """
+        model = self.model_creator.model
+        # Отметка использования: модель не выгружается по простою посреди длинной группировки
+        self.model_creator.mark_used()
+        try:
+            with stage_timer("generate"), torch.inference_mode(), autocast_context(self.device):
+                if self.model_creator.is_zero_shot:
+                    embeddings = model.get_image_features(pixel_values=pixel_values)
+                else:
+                    hidden = model(pixel_values=pixel_values, output_hidden_states=True).hidden_states[-1]
+                    # Свёрточные сети (ConvNeXt): B x C x H x W, трансформеры (ViT): B x T x D
+                    embeddings = hidden.flatten(2).mean(-1) if hidden.dim() == 4 else hidden.mean(1)
+            return torch.nn.functional.normalize(embeddings.float(), dim=-1).cpu()
+        except Exception as e:
+            logger.error("Ошибка вычисления эмбеддингов", exc_info=True)
+            raise ClassificationGenerationError("Сбой вычисления эмбеддингов") from e
+
+    def nearest_label(self, embedding: torch.Tensor) -> Optional[str]:
+        """Метка, ближайшая к эмбеддингу изображения (только zero-shot модели, иначе None)."""
+        if not self.model_creator.is_zero_shot:
+            return None
+        scores = embedding.to(self._label_embeddings.device, torch.float32) @ self._label_embeddings.T
+        return self.labels[int(scores.argmax())]
+
+    def _embed_labels(self, labels: Tuple[str, ...]) -> torch.Tensor:
+        """Нормированные текстовые эмбеддинги меток (вычисляются один раз на модель и набор меток)."""
+        model = self.model_creator.model
+        with _label_embeddings_lock:
+            cached = _label_embeddings.get(model)
+            if cached is not None and cached[0] == labels:
+                return cached[1]
+
+            start_time = time.monotonic()
+            text_inputs = self.model_creator.processor(
+                text=[PROMPT_TEMPLATE.format(label) for label in labels],
+                padding=True,
+                return_tensors="pt"
+            ).to(self.device)
+            with torch.inference_mode(), autocast_context(self.device):
+                embeddings = model.get_text_features(**text_inputs).float()
+            embeddings = torch.nn.functional.normalize(embeddings, dim=-1)
+            _label_embeddings[model] = (labels, embeddings)
+            logger.info("Эмбеддинги %s меток вычислены за %.2fс", len(labels), time.monotonic() - start_time)
+            return embeddings
+
+    def _process_image(self, image_path: str, image_name: str) -> Union[Image.Image, PreparedImage]:
+        """Загрузка изображения, сразу уменьшенного до входного размера модели."""
+        try:
+            if self._preprocessor is not None:
+                return self._preprocessor.load(image_path)
+
+            MAX_SIZE = 512
+            with decode_governor.open(image_path, (MAX_SIZE, MAX_SIZE)) as img:
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+                if any(dim > MAX_SIZE for dim in img.size):
+                    img.thumbnail((MAX_SIZE, MAX_SIZE), Image.Resampling.LANCZOS)
+                img.load()
+                return img
+
+        except DecodeRejectedError as e:
+            logger.error("Изображение отклонено до декодирования: %s | %s", image_name, e)
+            raise ImageProcessingError(f"Изображение отклонено: {image_name}: {e}") from e
+        except (UnidentifiedImageError, OSError) as e:
+            logger.error("Некорректный файл изображения: %s", image_name, exc_info=True)
+            raise ImageProcessingError(f"Файл поврежден или не является изображением: {image_name}") from e
+        except Exception as e:
+            logger.error("Ошибка обработки изображения: %s", image_name, exc_info=True)
+            raise ImageProcessingError(f"Ошибка обработки: {image_name}") from e
+
+    def _prepare_inputs(self, image: Union[Image.Image, PreparedImage]) -> BatchEncoding:
+        """Подготовка pixel_values для модели."""
+        try:
+            if isinstance(image, PreparedImage):
+                inputs = self._preprocessor([image])
+            else:
+                inputs = self.model_creator.processor(images=image, return_tensors="pt")
+            return BatchEncoding({"pixel_values": inputs["pixel_values"]}).to(self.device, non_blocking=True)
+        except Exception as e:
+            logger.error("Ошибка подготовки данных", exc_info=True)
+            raise ClassificationGenerationError("Сбой подготовки входных данных") from e
+
+    def _classify_batch(self, inputs: Mapping[str, torch.Tensor],
+                        should_stop: Optional[ShouldStop] = None) -> torch.Tensor:
+        """
+        Логиты меток для пакета входов (одиночного или собранного сервером).
+        Прямой проход не прерывается: should_stop принимается для совместимости с сервером пакетирования.
+        """
+        model = self.model_creator.model
+        with torch.inference_mode(), autocast_context(self.device):
+            if self.model_creator.is_zero_shot:
+                image_embeddings = model.get_image_features(pixel_values=inputs["pixel_values"]).float()
+                image_embeddings = torch.nn.functional.normalize(image_embeddings, dim=-1)
+                return model.logit_scale.exp().float() * image_embeddings @ self._label_embeddings.T
+            return model(pixel_values=inputs["pixel_values"]).logits.float()
+
+    def _postprocess(self, logits: torch.Tensor) -> Tuple[str, float]:
+        """Метка с наибольшей вероятностью и её вероятность."""
+        try:
+            probabilities = logits[0].softmax(dim=-1)
+            score, index = probabilities.max(dim=-1)
+            return self.labels[int(index)], float(score)
+        except Exception as e:
+            logger.error("Ошибка постобработки", exc_info=True)
+            raise ClassificationGenerationError("Сбой постобработки результатов") from e
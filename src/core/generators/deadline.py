@@ -0,0 +1,73 @@
+# src/core/generators/deadline.py
+"""
+Бюджет генерации на изображение.
+
+Плотные сцены заставляют Florence-2 генерировать сотни токенов лучевым поиском,
+и одно такое изображение задерживает весь пакет. При settings.image_deadline > 0
+генерация получает max_time: generate останавливается по истечении бюджета,
+как и по исчерпании лимита токенов (max_new_tokens/max_length). Незавершённая
+генерация определяется по последнему токену строки: завершённая строка
+заканчивается токеном конца последовательности или паддингом.
+
+Действие при превышении (settings.deadline_policy):
+  - partial: возвращается лучший частичный результат (для <OD> - уже полностью
+    сгенерированные объекты, для подписи - её начало);
+  - greedy:  повтор жадным поиском с тем же бюджетом;
+  - smaller: повтор жадным поиском меньшей моделью того же семейства
+    (SMALLER_MODEL_VARIANTS), при её отсутствии - исходной моделью.
+Повтор выполняется только при превышении времени: при исчерпании лимита токенов
+дешёвый профиль упрётся в тот же лимит, поэтому возвращается частичный результат.
+Каждое такое изображение учитывается в pipeline_degraded_total.
+"""
+
+from typing import Iterable, Optional, Set
+
+import torch
+
+from core.utils.metrics import DEGRADED_TOTAL
+from core.utils.settings import settings
+
+DEADLINE_POLICIES = ("partial", "greedy", "smaller")
+
+
+def deadline_kwargs() -> dict:
+    """Аргументы model.generate с бюджетом времени (пусто, если бюджет не задан)."""
+    if settings.image_deadline <= 0:
+        return {}
+    return {"max_time": settings.image_deadline}
+
+
+def finished_token_ids(model, tokenizer) -> Set[int]:
+    """Токены, которыми заканчивается завершённая строка результата."""
+    candidates = []
+    for source in (getattr(model, "generation_config", None), tokenizer):
+        if source is None:
+            continue
+        for name in ("eos_token_id", "pad_token_id", "sep_token_id"):
+            value = getattr(source, name, None)
+            candidates.extend(value if isinstance(value, (list, tuple)) else [value])
+    return {int(token_id) for token_id in candidates if token_id is not None}
+
+
+def unfinished_reason(outputs: torch.Tensor, finished_ids: Iterable[int], token_limit: int) -> Optional[str]:
+    """Причина незавершённой генерации (tokens/time) либо None, если строка завершена."""
+    finished_ids = set(finished_ids)
+    if not finished_ids or outputs.numel() == 0 or int(outputs[0, -1]) in finished_ids:
+        return None
+    return "tokens" if outputs.shape[-1] >= token_limit else "time"
+
+
+def greedy_params(params: dict) -> dict:
+    """Дешёвый профиль повтора: жадный поиск с прежним лимитом токенов."""
+    return dict(params, num_beams=1)
+
+
+def retry_action(reason: str) -> str:
+    """Действие для причины превышения с учётом settings.deadline_policy."""
+    if reason == "time" and settings.deadline_policy in DEADLINE_POLICIES:
+        return settings.deadline_policy
+    return "partial"
+
+
+def record_degraded(kind: str, reason: str, action: str) -> None:
+    DEGRADED_TOTAL.labels(kind, reason, action).inc()
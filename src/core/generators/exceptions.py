@@ -12,6 +12,13 @@ class SegmentationGenerationError(Exception):
     """Исключение, возникающее при ошибках генерации описания."""
     pass
 
+class ClassificationGenerationError(Exception):
+    """Исключение, возникающее при ошибках классификации изображения."""
+    pass
+
 class TranslationGenerationError(Exception):
     """Исключение, возникающее при ошибках генерации перевода."""
-    pass
\ No newline at end of file
+    pass
+class GenerationCancelledError(Exception):
+    """Исключение, возникающее при отмене задачи во время генерации."""
+    pass
@@ -0,0 +1,81 @@
+# src/core/generators/governed.py
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.jobs.throughput_governor import Profile, ThroughputGovernor
+from core.utils.get_logger import logger
+
+
+class GovernedGenerator:
+    """
+    Генератор основного этапа под управлением регулятора производительности.
+
+    Для каждого профиля лестницы регулятора создаётся свой генератор (при первом
+    переходе на профиль; модели разделяются через кэш создателей), и каждый вызов
+    generate идёт в генератор текущего профиля. Интервал между соседними вызовами -
+    полное время обработки предыдущего изображения - передаётся регулятору; интервал
+    изображения, во время которого загружалась модель профиля, не замеряется.
+
+    Модели профилей не входят в модели задачи (менеджер задач знает только выбранную
+    модель), поэтому каждый вызов отмечает использование моделей всех созданных
+    профилей - иначе при простое профиля дольше model_idle_ttl модель и её сервер
+    пакетирования были бы выгружены. Генератор профиля, модель которого всё же
+    выгружена, создаётся заново.
+    """
+
+    def __init__(self, name: str, governor: ThroughputGovernor, factory: Callable[[Profile], Any]):
+        self._name = name
+        self.governor = governor
+        self._factory = factory
+        self._instances: Dict[int, Any] = {}
+        # Начало предыдущего вызова, его профиль и признак замера
+        self._last: Optional[Tuple[float, int, bool]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._instances)
+
+    @property
+    def degraded(self) -> int:
+        return sum(getattr(instance, "degraded", 0) for instance in self._instances.values())
+
+    def generate(self, *args, **kwargs):
+        with self._lock:
+            now = time.monotonic()
+            if self._last is not None:
+                self.governor.record(now - self._last[0], self._last[1], self._last[2])
+            index, instance, measure = self._current()
+            self._last = (now, index, measure)
+            for profile_instance in self._instances.values():
+                profile_instance.model_creator.mark_used()
+        return instance.generate(*args, **kwargs)
+
+    @staticmethod
+    def _is_loaded(instance: Any) -> bool:
+        """Модель генератора ещё в кэше создателя (не выгружена по простою)."""
+        creator = instance.model_creator
+        return (creator.model_name, creator.device) in type(creator)._model_cache
+
+    def _current(self) -> Tuple[int, Any, bool]:
+        """Генератор текущего профиля (index, генератор, замерять ли вызов)."""
+        while True:
+            index = self.governor.index
+            instance = self._instances.get(index)
+            if instance is not None and self._is_loaded(instance):
+                return index, instance, True
+            if instance is not None:
+                # Сервер пакетирования выгруженной модели закрыт: генератор создаётся заново
+                logger.info("Модель профиля %s выгружена, повторная загрузка", self.governor.ladder[index])
+                del self._instances[index]
+            profile = self.governor.ladder[index]
+            try:
+                logger.info("Активация профиля %s этапа %s", profile, self._name)
+                self._instances[index] = self._factory(profile)
+                return index, self._instances[index], False
+            except Exception as e:
+                logger.warning("Профиль %s недоступен: %s", profile, e)
+                self.governor.mark_unavailable(index)
+                if self.governor.index == index:
+                    raise
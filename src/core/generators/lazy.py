@@ -0,0 +1,39 @@
+# src/core/generators/lazy.py
+import threading
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from core.utils.get_logger import logger
+
+T = TypeVar("T")
+
+
+class LazyGenerator(Generic[T]):
+    """
+    Генератор, создаваемый при первом обращении.
+
+    Этап конвейера, который может не понадобиться (например, перевод меток,
+    найденных в таблице переводов), не загружает модель заранее: фабрика
+    вызывается при первом доступе к атрибуту, далее обращения идут к экземпляру.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self._name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def instance(self) -> T:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    logger.info("Активация этапа %s по первому обращению", self._name)
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.instance, item)
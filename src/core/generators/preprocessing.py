@@ -0,0 +1,246 @@
+# src/core/generators/preprocessing.py
+"""
+Векторизованная предобработка изображений в обход поэлементного вызова процессора HF.
+
+Процессор HF на каждое изображение выполняет resize, rescale и normalize
+поштучно в Python, а после нашего уменьшения до 512px изображение масштабируется
+повторно. BatchPreprocessor читает конфигурацию процессора модели и:
+  - декодирует JPEG сразу в уменьшенном масштабе (draft) и масштабирует один раз
+    до входного размера модели тем же фильтром Pillow, что и HF;
+  - складывает uint8-пиксели пакета в один массив и выполняет rescale + normalize
+    одной векторной операцией с записью в заранее выделенный тензор
+    (в закреплённой памяти при работе на CUDA);
+  - для моделей с текстовым запросом (Florence-2) токенизирует запрос один раз.
+
+При создании результат сверяется с процессором HF дважды:
+  - prepare() на одинаково декодированном изображении - допуск PARITY_ATOL
+    (расхождение только из-за порядка операций с плавающей точкой);
+  - load() на контрольном JPEG, декодированном с draft, против процессора HF на
+    полном декодировании. Draft уменьшает изображение в DCT-области, поэтому
+    пиксели отличаются от уменьшения фильтром Pillow: сравнивается среднее
+    абсолютное расхождение с допуском DRAFT_PARITY_MEAN_ATOL.
+При превышении допусков или неподдерживаемой конфигурации from_processor
+возвращает None и генератор использует процессор HF.
+"""
+
+import io
+import threading
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import BatchEncoding
+
+from core.utils.decode_governor import decode_governor
+from core.utils.get_logger import logger
+
+# Допустимое расхождение с процессором HF (значения после нормализации порядка единиц)
+PARITY_ATOL = 1e-3
+# JPEG декодируется с запасом разрешения относительно входа модели, чтобы
+# последующий фильтр Pillow сохранял сглаживание
+DRAFT_MARGIN = 2
+# Допуск draft-пути: среднее абсолютное расхождение с HF на полном декодировании.
+# На корпусе benchmarks.corpus (2048x1536 и 4000x3000, входы 384 bicubic и 224 bilinear)
+# среднее не превышает 0.005, максимум по отдельным пикселям на границах - 0.22
+DRAFT_PARITY_MEAN_ATOL = 2e-2
+# Размер контрольного JPEG: draft уменьшает его хотя бы вдвое для входов до 384px
+DRAFT_SAMPLE_SIZE = (2048, 1536)
+
+# Флаги процессора, при которых векторный путь не применим
+_UNSUPPORTED_FLAGS = ("do_pad", "do_reduce_labels", "do_flip_channel_order")
+
+
+@dataclass
+class PreparedImage:
+    """Изображение, уже приведённое к входному размеру модели (HxWx3, uint8)."""
+
+    pixels: np.ndarray
+    # Размер декодированного изображения (ширина, высота) для постобработки координат
+    size: Tuple[int, int]
+
+
+class BatchPreprocessor:
+    """Предобработка пакета изображений по конфигурации процессора HF."""
+
+    def __init__(self, image_processor: Any, device: str, text_inputs: Optional[Dict[str, torch.Tensor]] = None,
+                 pin_memory: Optional[bool] = None):
+        self.device = device
+        self.pin_memory = (device == "cuda") if pin_memory is None else pin_memory
+        self.text_inputs = text_inputs or {}
+
+        size = dict(image_processor.size) if getattr(image_processor, "do_resize", True) else {}
+        if "height" in size and "width" in size:
+            self.resize_to: Optional[Tuple[int, int]] = (size["height"], size["width"])
+            self.shortest_edge = None
+        elif set(size) == {"shortest_edge"}:
+            self.resize_to = None
+            self.shortest_edge = int(size["shortest_edge"])
+        else:
+            raise ValueError(f"Неподдерживаемый формат size: {size}")
+
+        self.crop_to = None
+        if getattr(image_processor, "do_center_crop", False):
+            crop = dict(image_processor.crop_size)
+            self.crop_to = (crop["height"], crop["width"])
+        elif self.shortest_edge is not None:
+            raise ValueError("Resize по короткой стороне без center crop даёт входы разного размера")
+
+        resample = getattr(image_processor, "resample", Image.Resampling.BICUBIC)
+        self.resample = Image.Resampling(int(resample))
+
+        # rescale и normalize объединены в одно умножение и вычитание: x * scale - shift
+        rescale = float(image_processor.rescale_factor) if getattr(image_processor, "do_rescale", True) else 1.0
+        if getattr(image_processor, "do_normalize", True):
+            mean = np.asarray(image_processor.image_mean, dtype=np.float32)
+            std = np.asarray(image_processor.image_std, dtype=np.float32)
+        else:
+            mean, std = np.zeros(3, np.float32), np.ones(3, np.float32)
+        self._scale = torch.from_numpy(rescale / std).view(1, 3, 1, 1)
+        self._shift = torch.from_numpy(mean / std).view(1, 3, 1, 1)
+
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """Размер входа модели (высота, ширина)."""
+        if self.crop_to:
+            return self.crop_to
+        return self.resize_to
+
+    @classmethod
+    def from_processor(cls, processor: Any, device: str, text: Optional[str] = None) -> Optional["BatchPreprocessor"]:
+        """
+        Векторный препроцессор для процессора модели либо None, если конфигурация
+        не поддерживается или результат не совпадает с процессором HF.
+        """
+        image_processor = getattr(processor, "image_processor", processor)
+        try:
+            if any(getattr(image_processor, flag, False) for flag in _UNSUPPORTED_FLAGS):
+                raise ValueError("процессор использует неподдерживаемые преобразования")
+            preprocessor = cls(image_processor, device)
+
+            sample = Image.fromarray(
+                np.random.default_rng(0).integers(0, 256, size=(300, 400, 3), dtype=np.uint8), mode="RGB"
+            )
+            reference = processor(images=sample, return_tensors="pt", **({"text": text} if text else {}))
+            # Текстовая часть входа не зависит от изображения: токенизация один раз
+            preprocessor.text_inputs = {
+                key: value for key, value in reference.items() if key != "pixel_values"
+            }
+
+            expected = reference["pixel_values"].float()
+            actual = preprocessor([preprocessor.prepare(sample)])["pixel_values"].cpu()
+            if actual.shape != expected.shape:
+                raise ValueError(f"размер входа {tuple(actual.shape)} вместо {tuple(expected.shape)}")
+            max_diff = (actual - expected).abs().max().item()
+            if max_diff > PARITY_ATOL:
+                raise ValueError(f"расхождение с процессором HF {max_diff:.2e} > {PARITY_ATOL:.0e}")
+
+            # Путь load(): draft-декодирование против HF на полном разрешении
+            control = _control_jpeg()
+            with Image.open(io.BytesIO(control)) as img:
+                expected = processor(images=img.convert("RGB"), return_tensors="pt")["pixel_values"].float()
+            actual = preprocessor([preprocessor.load(io.BytesIO(control))])["pixel_values"].cpu()
+            draft_diff = (actual - expected).abs()
+            draft_mean = draft_diff.mean().item()
+            if draft_mean > DRAFT_PARITY_MEAN_ATOL:
+                raise ValueError(
+                    f"среднее расхождение draft-пути с процессором HF {draft_mean:.2e} > {DRAFT_PARITY_MEAN_ATOL:.0e}"
+                )
+
+            logger.info(
+                "Векторная предобработка включена | Вход: %s | Фильтр: %s | Расхождение с HF: %.2e | "
+                "Draft: среднее %.2e, максимум %.2e",
+                preprocessor.input_size, preprocessor.resample.name, max_diff, draft_mean, draft_diff.max().item()
+            )
+            return preprocessor
+        except Exception as e:
+            logger.warning("Векторная предобработка недоступна, используется процессор HF: %s", e)
+            return None
+
+    def load(self, image_path: Union[str, BinaryIO]) -> PreparedImage:
+        """Декодирование (JPEG - с draft) и единственное масштабирование до входного размера модели."""
+        height, width = self.resize_to or (self.shortest_edge, self.shortest_edge)
+        with decode_governor.open(image_path, (width * DRAFT_MARGIN, height * DRAFT_MARGIN)) as img:
+            return self.prepare(img)
+
+    def prepare(self, img: Image.Image) -> PreparedImage:
+        """Приведение декодированного изображения к входному размеру модели."""
+        size = img.size
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        if self.resize_to:
+            target_height, target_width = self.resize_to
+        else:
+            # Та же формула, что get_resize_output_image_size(default_to_square=False) в HF
+            width, height = img.size
+            short, long = (width, height) if width <= height else (height, width)
+            new_short, new_long = self.shortest_edge, int(self.shortest_edge * long / short)
+            target_width, target_height = (new_short, new_long) if width <= height else (new_long, new_short)
+        img = img.resize((target_width, target_height), resample=self.resample, reducing_gap=None)
+
+        pixels = np.asarray(img)
+        if self.crop_to:
+            crop_height, crop_width = self.crop_to
+            top = int((target_height - crop_height) / 2.0)
+            left = int((target_width - crop_width) / 2.0)
+            pixels = pixels[top:top + crop_height, left:left + crop_width]
+        return PreparedImage(pixels, size)
+
+    def __call__(self, images: Sequence[PreparedImage]) -> BatchEncoding:
+        """Пакет входов модели: pixel_values (N, 3, H, W) и закэшированная текстовая часть."""
+        height, width = self.input_size
+        staging = np.empty((len(images), height, width, 3), dtype=np.uint8)
+        for position, image in enumerate(images):
+            staging[position] = image.pixels
+
+        pixel_values = torch.empty(
+            (len(images), 3, height, width), dtype=torch.float32, pin_memory=self.pin_memory
+        )
+        pixel_values.copy_(torch.from_numpy(staging).permute(0, 3, 1, 2))
+        pixel_values.mul_(self._scale).sub_(self._shift)
+
+        data = {"pixel_values": pixel_values}
+        for key, value in self.text_inputs.items():
+            data[key] = value.expand(len(images), *value.shape[1:]).contiguous()
+        return BatchEncoding(data)
+
+
+def _control_jpeg() -> bytes:
+    """Контрольный JPEG для сверки draft-пути: градиент, цветные блоки и шум, как у фотографии."""
+    width, height = DRAFT_SAMPLE_SIZE
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    pixels = np.stack([64 + 0.05 * x, 192 - 0.06 * y, 96 + 0.03 * (x + y)], axis=-1)
+    for _ in range(4):
+        x0, x1 = sorted(rng.integers(0, width, size=2))
+        y0, y1 = sorted(rng.integers(0, height, size=2))
+        pixels[y0:y1, x0:x1] = rng.uniform(0, 255, size=3)
+    pixels += rng.normal(0, 8, size=pixels.shape)
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), mode="RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+_preprocessors: Dict[Tuple, Optional[BatchPreprocessor]] = {}
+_preprocessors_lock = threading.Lock()
+
+
+def get_batch_preprocessor(processor: Any, device: str, text: Optional[str] = None) -> Optional[BatchPreprocessor]:
+    """
+    Общий препроцессор для загруженного процессора модели: сверка с HF выполняется
+    один раз на модель, а не при каждом создании генератора. None - векторный путь недоступен.
+    """
+    key = (id(processor), device, text)
+    with _preprocessors_lock:
+        if key not in _preprocessors:
+            _preprocessors[key] = BatchPreprocessor.from_processor(processor, device, text)
+        return _preprocessors[key]
+
+
+def release_batch_preprocessor(processor: Any) -> None:
+    """Забывает препроцессор выгружаемой модели (ключи по id не должны пережить объект)."""
+    with _preprocessors_lock:
+        for key in [key for key in _preprocessors if key[0] == id(processor)]:
+            del _preprocessors[key]
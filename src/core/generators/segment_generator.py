@@ -1,71 +1,101 @@
 # src/core/generators/segment_generator.py
 from __future__ import annotations
-import contextlib
-from typing import List, Optional, Tuple
+from typing import List, Mapping, Optional, Tuple, Union
 from transformers import BatchEncoding
 
 import torch
 from PIL import Image, UnidentifiedImageError
 
+from core.constants.models import SMALLER_MODEL_VARIANTS
 from core.creators.segmentation_model_creator import SegmentationModelCreator
 from core.generators.base_generator import BaseGenerator
+from core.generators.cancellation import ShouldStop, cancellation_kwargs, raise_if_cancelled
+from core.generators.deadline import (
+    deadline_kwargs, finished_token_ids, greedy_params, record_degraded, retry_action, unfinished_reason
+)
+from core.generators.batching import get_batching_server
+from core.generators.preprocessing import PreparedImage, get_batch_preprocessor
+from core.utils.decode_governor import DecodeRejectedError, decode_governor
 from core.utils.get_logger import logger
-from core.generators.exceptions import ImageProcessingError, SegmentationGenerationError
+from core.utils.metrics import stage_timer
+from core.utils.precision import autocast_context
+from core.generators.exceptions import GenerationCancelledError, ImageProcessingError, SegmentationGenerationError
 
 
 class SegmentGenerator(BaseGenerator):
     """Генератор сегментации изображений с оптимизированной обработкой."""
     
-    def __init__(self, model_name: str, max_new_tokens: int = 512, num_beams: int = 2):
+    def __init__(self, model_name: str, max_new_tokens: int = 512, num_beams: int = 2,
+                 should_stop: Optional[ShouldStop] = None):
         """Инициализирует генератор сегментации."""
-        super().__init__()
+        super().__init__(should_stop)
         try:
             logger.info(
-                f"Инициализация генератора сегментации | Модель: {model_name} "
-                f"Параметры: max_new_tokens={max_new_tokens}, num_beams={num_beams}"
+                "Инициализация генератора сегментации | Модель: %s "
+                "Параметры: max_new_tokens=%s, num_beams=%s",
+                model_name, max_new_tokens, num_beams
             )
             self.model_creator = SegmentationModelCreator(model_name, self.device)
             self.generation_params = {
                 'max_new_tokens': max_new_tokens,
                 'num_beams': num_beams,
             }
+            # Векторная предобработка в обход поэлементного вызова процессора HF (None - недоступна)
+            self._preprocessor = get_batch_preprocessor(self.model_creator.processor, self.device, text="<OD>")
+            # Признаки завершённой строки и число изображений, превысивших бюджет генерации
+            self._finished_ids = finished_token_ids(self.model_creator.model, self.model_creator.processor.tokenizer)
+            self.degraded = 0
+            # Общий для всех сессий сервер пакетирования этой модели и параметров
+            self._batcher = get_batching_server(
+                ("segment", id(self.model_creator.model), tuple(sorted(self.generation_params.items()))),
+                f"segment:{model_name}",
+                self._generate_batch
+            )
             logger.success("Генератор успешно инициализирован")
         except Exception as e:
-            logger.critical(f"Ошибка инициализации генератора: {e}", exc_info=True)
+            logger.critical("Ошибка инициализации генератора: %s", e, exc_info=True)
             raise
 
     def generate(self, image_path: str, image_name: Optional[str] = None) -> List[Tuple[str, List[float]]]:
         """Основной метод генерации сегментов."""
-        logger.debug(f"Старт обработки изображения: {image_name or 'без имени'}")
+        logger.debug("Старт обработки изображения: %s", image_name or 'без имени')
         try:
-            image = self._process_image(image_path, image_name)
+            with stage_timer("decode"):
+                image = self._process_image(image_path, image_name)
             logger.debug("Этап 1/4: Изображение успешно обработано")
             
-            inputs = self._prepare_inputs(image)
-            logger.debug(f"Этап 2/4: Данные подготовлены | Формат: {inputs.keys()}")
+            with stage_timer("preprocess"):
+                inputs = self._prepare_inputs(image)
+            logger.debug("Этап 2/4: Данные подготовлены | Формат: %s", inputs.keys())
             
-            outputs = self._generate_segments(inputs)
+            with stage_timer("generate"):
+                outputs = self._generate_segments(inputs)
             logger.debug("Этап 3/4: Сегменты сгенерированы")
             
-            detections = self._postprocess(outputs, image.size, image_name)
-            logger.debug(f"Этап 4/4: Постобработка завершена | Найдено объектов: {len(detections)}")
+            with stage_timer("postprocess"):
+                detections = self._postprocess(outputs, image.size, image_name)
+                result = self._get_main_object(detections)
+            logger.debug("Этап 4/4: Постобработка завершена | Найдено объектов: %s", len(detections))
             
-            result = self._get_main_object(detections)
             logger.success(
-                f"Успешная генерация для '{image_name}' | "
-                f"Главный объект: {result[0]} | Размер bbox: {result[1]:.2f}"
+                "Успешная генерация для '%s' | "
+                "Главный объект: %s | Размер bbox: %.2f",
+                image_name, result[0], result[1]
             )
             return result[0]
             
         except ImageProcessingError as e:
-            logger.error(f"Ошибка обработки изображения '{image_name}': {e}", exc_info=True)
+            logger.error("Ошибка обработки изображения '%s': %s", image_name, e, exc_info=True)
             raise SegmentationGenerationError(f"Сбой обработки изображения: {image_name}") from e
+        except GenerationCancelledError:
+            logger.info("Генерация для '%s' отменена", image_name)
+            raise
         except SegmentationGenerationError as e:
-            logger.error(f"Ошибка генерации сегментов: {e}", exc_info=True)
+            logger.error("Ошибка генерации сегментов: %s", e, exc_info=True)
             raise
         except Exception as e:
             logger.critical(
-                f"Критическая ошибка при обработке '{image_name}': {e}",
+                "Критическая ошибка при обработке '%s': %s", image_name, e,
                 exc_info=True
             )
             raise SegmentationGenerationError("Непредвиденная ошибка генерации") from e
@@ -73,48 +103,65 @@ class SegmentGenerator(BaseGenerator):
             logger.debug("Запуск очистки памяти")
             self.handle_memory()
 
-    def _process_image(self, image_path: str, image_name: str) -> Image.Image:
+    def _process_image(self, image_path: str, image_name: str) -> Union[Image.Image, PreparedImage]:
         """Обработка изображения перед генерацией сегментов."""
         try:
-            logger.info(f"Загрузка изображения: {image_name}")
-            with Image.open(image_path) as img:
+            logger.info("Загрузка изображения: %s", image_name)
+            if self._preprocessor is not None:
+                # Одно масштабирование сразу до входного размера модели
+                prepared = self._preprocessor.load(image_path)
+                logger.info(
+                    "Изображение готово | Размер: %s | Вход модели: %s",
+                    prepared.size, self._preprocessor.input_size
+                )
+                return prepared
+
+            MAX_SIZE = 512
+            with decode_governor.open(image_path, (MAX_SIZE, MAX_SIZE)) as img:
                 # Контроль режима изображения
                 if img.mode != 'RGB':
-                    logger.warning(f"Конвертация {img.mode} в RGB | Изображение: {image_name}")
+                    logger.warning("Конвертация %s в RGB | Изображение: %s", img.mode, image_name)
                     img = img.convert('RGB')
 
                 # Оптимизация размера
-                MAX_SIZE = 512
                 if any(dim > MAX_SIZE for dim in img.size):
-                    logger.debug(f"Уменьшение размера {img.size} -> {MAX_SIZE}px | Алгоритм: LANCZOS")
+                    logger.debug("Уменьшение размера %s -> %spx | Алгоритм: LANCZOS", img.size, MAX_SIZE)
                     img.thumbnail((MAX_SIZE, MAX_SIZE), Image.Resampling.LANCZOS)
 
                 # Предзагрузка данных
                 img.load()
                 logger.info(
-                    f"Изображение готово | Размер: {img.size} | "
-                    f"Объем данных: {len(img.tobytes()) // 1024} KB"
+                    "Изображение готово | Размер: %s | "
+                    "Объем данных: %s KB",
+                    img.size, img.width * img.height * len(img.getbands()) // 1024
                 )
                 return img
             
+        except DecodeRejectedError as e:
+            logger.error("Изображение отклонено до декодирования: %s | %s", image_name, e)
+            raise ImageProcessingError(f"Изображение отклонено: {image_name}: {e}") from e
         except (UnidentifiedImageError, OSError) as e:
-            logger.error(f"Некорректный файл изображения: {image_name}", exc_info=True)
+            logger.error("Некорректный файл изображения: %s", image_name, exc_info=True)
             raise ImageProcessingError(f"Файл поврежден или не является изображением: {image_name}") from e
         except Exception as e:
-            logger.error(f"Ошибка обработки изображения: {image_name}", exc_info=True)
+            logger.error("Ошибка обработки изображения: %s", image_name, exc_info=True)
             raise ImageProcessingError(f"Ошибка обработки: {image_name}") from e
 
-    def _prepare_inputs(self, image: Image.Image) -> BatchEncoding:
+    def _prepare_inputs(self, image: Union[Image.Image, PreparedImage]) -> BatchEncoding:
         """Подготовка данных для модели."""
         try:
             logger.debug("Подготовка входных данных для модели")
-            inputs = self.model_creator.processor(
-                text="<OD>",
-                images=image, 
-                return_tensors="pt",
-                padding=True
-            )
-            logger.debug(f"Тензоры подготовлены | Устройство: {self.device}")
+            if isinstance(image, PreparedImage):
+                # input_ids запроса <OD> токенизированы один раз при создании препроцессора
+                inputs = self._preprocessor([image])
+            else:
+                inputs = self.model_creator.processor(
+                    text="<OD>",
+                    images=image, 
+                    return_tensors="pt",
+                    padding=True
+                )
+            logger.debug("Тензоры подготовлены | Устройство: %s", self.device)
             return inputs.to(self.device, non_blocking=True)
         except Exception as e:
             logger.error("Ошибка подготовки данных", exc_info=True)
@@ -124,38 +171,85 @@ class SegmentGenerator(BaseGenerator):
         """Генерация сегментов."""
         params = self.generation_params
         logger.info(
-            f"Запуск генерации | Параметры: "
-            f"max_new_tokens={params['max_new_tokens']}, "
-            f"num_beams={params['num_beams']}, "
-            f"Устройство: {self.device}"
+            "Запуск генерации | Параметры: "
+            "max_new_tokens=%s, "
+            "num_beams=%s, "
+            "Устройство: %s",
+            params['max_new_tokens'], params['num_beams'], self.device
         )
         
         try:
-            with torch.inference_mode():
-                context = (
-                    torch.autocast(device_type=self.device) 
-                    if self.device == "cuda" 
-                    else contextlib.nullcontext()
-                )
-                with context:
-                    logger.debug("Контекст генерации активирован" + (" (autocast)" if self.device == "cuda" else ""))
-                    outputs = self.model_creator.model.generate(
-                        **inputs,
-                        max_new_tokens=params['max_new_tokens'],
-                        num_beams=params['num_beams'],
-                        early_stopping=True,
-                        no_repeat_ngram_size=3,
-                        length_penalty=0.8
-                    )
-                    logger.debug("Генерация завершена успешно")
-                    return outputs
+            outputs = (
+                self._batcher.submit(inputs, self.should_stop) if self._batcher
+                else self._generate_batch(inputs, self.should_stop)
+            )
+            # Декодирование, остановленное критерием отмены, даёт усечённый результат
+            raise_if_cancelled(self.should_stop)
+            outputs = self._apply_deadline(inputs, outputs)
+            logger.debug("Генерация завершена успешно")
+            return outputs
+        except GenerationCancelledError:
+            raise
         except RuntimeError as e:
-            logger.error(f"Ошибка выполнения генерации: {e}", exc_info=True)
+            logger.error("Ошибка выполнения генерации: %s", e, exc_info=True)
             raise SegmentationGenerationError("Сбой в процессе генерации") from e
         except Exception as e:
             logger.error("Непредвиденная ошибка генерации", exc_info=True)
             raise SegmentationGenerationError("Ошибка генерации") from e
 
+    def _generate_batch(self, inputs: Mapping[str, torch.Tensor],
+                        should_stop: Optional[ShouldStop] = None,
+                        params: Optional[dict] = None, model: Optional[torch.nn.Module] = None) -> torch.Tensor:
+        """
+        Вызов model.generate для пакета входов (одиночного или собранного сервером).
+        params и model задают профиль повтора после превышения бюджета.
+        """
+        params = params or self.generation_params
+        model = model or self.model_creator.model
+        with torch.inference_mode():
+            context = autocast_context(self.device)
+            with context:
+                logger.debug("Контекст генерации активирован: %s", type(context).__name__)
+                return model.generate(
+                    **inputs,
+                    max_new_tokens=params['max_new_tokens'],
+                    num_beams=params['num_beams'],
+                    early_stopping=True,
+                    no_repeat_ngram_size=3,
+                    length_penalty=0.8,
+                    **deadline_kwargs(),
+                    **cancellation_kwargs(should_stop)
+                )
+
+    def _apply_deadline(self, inputs: Mapping[str, torch.Tensor], outputs: torch.Tensor) -> torch.Tensor:
+        """Частичный результат или повтор дешёвым профилем для генерации, превысившей бюджет."""
+        reason = unfinished_reason(outputs, self._finished_ids, self.generation_params['max_new_tokens'])
+        if reason is None:
+            return outputs
+
+        action = retry_action(reason)
+        model = self.model_creator.model
+        if action == "smaller":
+            fallback = SMALLER_MODEL_VARIANTS.get(self.model_creator.model_name)
+            try:
+                if fallback:
+                    model = SegmentationModelCreator(fallback, self.device).model
+                else:
+                    action = "greedy"
+            except Exception as e:
+                logger.warning("Меньшая модель %s недоступна, повтор исходной моделью: %s", fallback, e)
+                action = "greedy"
+
+        self.degraded += 1
+        record_degraded("segmentation", reason, action)
+        logger.warning("Генерация превысила бюджет (%s) | Действие: %s", reason, action)
+        if action == "partial":
+            return outputs
+
+        retried = self._generate_batch(inputs, self.should_stop, greedy_params(self.generation_params), model)
+        raise_if_cancelled(self.should_stop)
+        return retried
+
     def _postprocess(self, outputs: torch.Tensor, image_size: Tuple[int, int], image_name: str) -> List[Tuple[str, List[float]]]:
         """Постобработка результатов."""
         try:
@@ -164,6 +258,10 @@ class SegmentGenerator(BaseGenerator):
                 outputs, 
                 skip_special_tokens=False
             )[0]
+            # В пакете короткие ответы дополнены паддингом до самого длинного
+            pad_token = self.model_creator.processor.tokenizer.pad_token
+            if pad_token:
+                detection_text = detection_text.replace(pad_token, "")
             
             logger.debug("Постобработка данных")
             parsed = self.model_creator.processor.post_process_generation(
@@ -172,7 +270,7 @@ class SegmentGenerator(BaseGenerator):
                 image_size=image_size
             )
             
-            logger.info(f"Сырые результаты: {parsed.get('<OD>', {}).get('labels', [])}")
+            logger.info("Сырые результаты: %s", parsed.get('<OD>', {}).get('labels', []))
             return self._parse_detections(parsed)
         except Exception as e:
             logger.error("Ошибка постобработки", exc_info=True)
@@ -187,10 +285,10 @@ class SegmentGenerator(BaseGenerator):
                 for label, bbox in zip(od_results['labels'], od_results['bboxes']):
                     cleaned_label = label.lower().strip()
                     detections.append((cleaned_label, [round(coord, 2) for coord in bbox]))
-            logger.debug(f"Найдено объектов до фильтрации: {len(detections)}")
+            logger.debug("Найдено объектов до фильтрации: %s", len(detections))
             return [d for d in detections if d[1][2] > 0.1 and d[1][3] > 0.1]
         except KeyError as e:
-            logger.error(f"Ошибка парсинга данных: отсутствует ключ {e}", exc_info=True)
+            logger.error("Ошибка парсинга данных: отсутствует ключ %s", e, exc_info=True)
             raise SegmentationGenerationError("Некорректный формат выходных данных") from e
 
     def _get_main_object(self, detections: List[Tuple[str, List[float]]]) -> Tuple[str, float]:
@@ -207,6 +305,6 @@ class SegmentGenerator(BaseGenerator):
             if area > max_area:
                 max_area = area
                 main_obj = obj
-        logger.info(f"Выбран главный объект: {main_obj} | Площадь: {max_area:.2f}")
+        logger.info("Выбран главный объект: %s | Площадь: %.2f", main_obj, max_area)
         return main_obj, max_area
     
\ No newline at end of file
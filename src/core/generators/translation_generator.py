@@ -1,38 +1,90 @@
 # src/core/generators/translation_generator.py
-import contextlib
 from functools import lru_cache
+import threading
+from typing import ClassVar, Dict, List, Optional, Set, Tuple
 import torch
+from transformers.modeling_outputs import BaseModelOutput
+from core.constants.models import TRANSLATION_PAIR_ROUTES
 from core.creators.translation_model_creator import TranslationModelCreator
 from core.generators.base_generator import BaseGenerator
+from core.generators.cancellation import ShouldStop, cancellation_kwargs, raise_if_cancelled
 from core.utils.get_logger import logger
+from core.utils.metrics import stage_timer
+from core.utils.precision import autocast_context
+from core.utils.settings import settings
 from core.constants.web import TRANSLATION_LANGUAGES
 
-from core.generators.exceptions import TranslationGenerationError
+from core.generators.exceptions import GenerationCancelledError, TranslationGenerationError
 
 class TranslationGenerator(BaseGenerator):
-    def __init__(self, model_name: str):
+    """
+    Перевод через компактную модель языковой пары (TRANSLATION_PAIR_ROUTES), если она
+    есть и загружается, иначе через общую многоязычную модель model_name. Обе модели
+    загружаются при первом переводе, которому они нужны.
+    """
+
+    # Модели пар, которые не удалось загрузить (повторно не пробуются до перезапуска)
+    _unavailable_pairs: ClassVar[Set[str]] = set()
+
+    def __init__(self, model_name: str, should_stop: Optional[ShouldStop] = None):
         """Инициализация генератора перевода с указанной моделью."""
-        super().__init__()
-        try:
-            logger.info(f"Инициализация переводчика | Модель: {model_name}")
-            self.model = TranslationModelCreator(model_name, self.device)
-            self.lang_cache = {}
-            self._precache_language_ids()
-            logger.success("Генератор перевода успешно инициализирован")
-        except Exception as e:
-            logger.critical(f"Ошибка инициализации переводчика: {e}", exc_info=True)
-            raise
+        super().__init__(should_stop)
+        logger.info("Инициализация переводчика | Модель: %s", model_name)
+        self.model_name = model_name
+        self.lang_cache = {}
+        self._model: Optional[TranslationModelCreator] = None
+        self._pair_models: Dict[str, TranslationModelCreator] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> TranslationModelCreator:
+        """Общая модель перевода (загружается при первом обращении)."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        model = TranslationModelCreator(self.model_name, self.device)
+                        self._precache_language_ids(model)
+                        self._model = model
+                        logger.success("Генератор перевода успешно инициализирован")
+                    except Exception as e:
+                        logger.critical("Ошибка инициализации переводчика: %s", e, exc_info=True)
+                        raise
+        return self._model
+
+    def backend_for(self, src_lang: str, tgt_lang: str) -> TranslationModelCreator:
+        """Модель для пары кодов языков: модель пары либо общая модель."""
+        pair_name = TRANSLATION_PAIR_ROUTES.get((src_lang, tgt_lang)) if settings.translation_pair_models else None
+        if pair_name is None or pair_name in self._unavailable_pairs:
+            return self.model
+
+        backend = self._pair_models.get(pair_name)
+        if backend is None:
+            with self._lock:
+                backend = self._pair_models.get(pair_name)
+                if backend is None:
+                    try:
+                        backend = self._pair_models[pair_name] = TranslationModelCreator(pair_name, self.device)
+                        logger.info("Пара %s -> %s переводится моделью %s", src_lang, tgt_lang, pair_name)
+                    except Exception as e:
+                        self._unavailable_pairs.add(pair_name)
+                        logger.warning(
+                            "Модель пары %s недоступна, используется %s: %s", pair_name, self.model_name, e
+                        )
+            if backend is None:
+                return self.model
+        return backend
 
-    def _precache_language_ids(self):
+    def _precache_language_ids(self, model: TranslationModelCreator):
         """Кэширование идентификаторов языков для ускорения работы."""
         logger.debug("Предварительное кэширование языковых идентификаторов")
         try:
             for lang_code, lang_name in TRANSLATION_LANGUAGES.items():
-                self.lang_cache[lang_name] = self.model.tokenizer.lang_code_to_id[lang_name]
+                self.lang_cache[lang_name] = model.tokenizer.lang_code_to_id[lang_name]
                 # logger.debug(f"Кэширован язык: {lang_name} -> ID: {self.lang_cache[lang_name]}")
-            logger.info(f"Зарегистрировано языков: {len(self.lang_cache)}")
+            logger.info("Зарегистрировано языков: %s", len(self.lang_cache))
         except KeyError as ke:
-            logger.error(f"Отсутствует языковой код в токенизаторе: {ke}", exc_info=True)
+            logger.error("Отсутствует языковой код в токенизаторе: %s", ke, exc_info=True)
             raise TranslationGenerationError("Некорректная конфигурация языков") from ke
 
     @lru_cache(maxsize=500)
@@ -40,8 +92,9 @@ class TranslationGenerator(BaseGenerator):
         """Перевод текста с исходного языка на целевой."""
         cache_key = (text, src_lang, tgt_lang_str)
         logger.info(
-            f"Запрос перевода | Исходный язык: {src_lang} -> Целевой: {tgt_lang_str} | "
-            f"Длина текста: {len(text)} символов"
+            "Запрос перевода | Исходный язык: %s -> Целевой: %s | "
+            "Длина текста: %s символов",
+            src_lang, tgt_lang_str, len(text)
         )
         
         try:
@@ -56,27 +109,34 @@ class TranslationGenerator(BaseGenerator):
                 raise ValueError(error_msg)
                 
             tgt_lang = TRANSLATION_LANGUAGES[tgt_lang_str]
-            forced_bos_id = self.lang_cache.get(tgt_lang)
-            
-            if not forced_bos_id:
-                error_msg = f"ID языка '{tgt_lang}' не найден в кэше"
-                logger.error(error_msg)
-                raise TranslationGenerationError(error_msg)
+            backend = self.backend_for(src_lang, tgt_lang)
+            backend.mark_used()
+            forced_bos_id = None
+            if not backend.is_pair_model:
+                forced_bos_id = self.lang_cache.get(tgt_lang)
+                if not forced_bos_id:
+                    error_msg = f"ID языка '{tgt_lang}' не найден в кэше"
+                    logger.error(error_msg)
+                    raise TranslationGenerationError(error_msg)
 
             # Подготовка и генерация
-            inputs = self._prepare_inputs(text, src_lang)
-            outputs = self._generate_translation(inputs, forced_bos_id)
-            result = self._decode_output(outputs)
+            with stage_timer("translate"):
+                inputs = self._prepare_inputs(backend, text, src_lang)
+                outputs = self._generate_translation(backend, inputs, forced_bos_id)
+                result = self._decode_output(backend, outputs)
             
             logger.success(
-                f"Успешный перевод | Символы: {len(text)}->{len(result)} | "
-                f"Языки: {src_lang}->{tgt_lang_str}"
+                "Успешный перевод | Символы: %s->%s | "
+                "Языки: %s->%s | Модель: %s",
+                len(text), len(result), src_lang, tgt_lang_str, backend.model_name
             )
             return result
             
+        except GenerationCancelledError:
+            raise
         except Exception as e:
             logger.error(
-                f"Ошибка перевода для текста '{text[:30]}...': {e}",
+                "Ошибка перевода для текста '%s...': %s", text[:30], e,
                 exc_info=True
             )
             raise TranslationGenerationError("Ошибка выполнения перевода") from e
@@ -85,68 +145,158 @@ class TranslationGenerator(BaseGenerator):
             # Логирование кэша
             if self.generate.cache_info().currsize > 0 and self.generate.cache_info().hits > 0:
                 logger.debug(
-                    f"Статистика кэша: Попадания={self.generate.cache_info().hits} "
-                    f"Промахи={self.generate.cache_info().misses}"
+                    "Статистика кэша: Попадания=%s "
+                    "Промахи=%s",
+                    self.generate.cache_info().hits, self.generate.cache_info().misses
+                )
+
+    @lru_cache(maxsize=200)
+    def generate_many(self, text: str, src_lang: str, tgt_lang_strs: Tuple[str, ...]) -> Dict[str, str]:
+        """
+        Перевод текста на несколько целевых языков.
+
+        Языки общей модели переводятся за один проход кодировщика: выход кодировщика
+        вычисляется один раз и повторяется для каждого языка, а декодирование всех
+        языков выполняется одним пакетом со своим языковым токеном в начале каждой
+        строки. Языки с моделью пары переводятся ею, исходный язык не переводится.
+        Возвращает словарь название языка -> перевод в порядке tgt_lang_strs
+        (общий для кэша объект: не изменять).
+        """
+        logger.info(
+            "Запрос перевода на %s языков | Исходный язык: %s | Длина текста: %s символов",
+            len(tgt_lang_strs), src_lang, len(text)
+        )
+        try:
+            unsupported = [name for name in tgt_lang_strs if name not in TRANSLATION_LANGUAGES]
+            if unsupported:
+                error_msg = f"Неподдерживаемые целевые языки: {unsupported}"
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+
+            results: Dict[str, str] = {}
+            shared: List[str] = []
+            for name in tgt_lang_strs:
+                tgt_lang = TRANSLATION_LANGUAGES[name]
+                if tgt_lang == src_lang or not text.strip():
+                    results[name] = text
+                elif self.backend_for(src_lang, tgt_lang).is_pair_model:
+                    results[name] = self.generate(text, src_lang, name)
+                else:
+                    shared.append(name)
+
+            if shared:
+                with stage_timer("translate"):
+                    results.update(zip(shared, self._fan_out(text, src_lang, shared)))
+
+            logger.success("Успешный перевод на %s языков | Общей моделью: %s", len(tgt_lang_strs), len(shared))
+            return {name: results[name] for name in tgt_lang_strs}
+        except (GenerationCancelledError, TranslationGenerationError):
+            raise
+        except Exception as e:
+            logger.error("Ошибка перевода на несколько языков '%s...': %s", text[:30], e, exc_info=True)
+            raise TranslationGenerationError("Ошибка выполнения перевода") from e
+
+    def _fan_out(self, text: str, src_lang: str, tgt_lang_strs: List[str]) -> List[str]:
+        """Один проход кодировщика общей модели и пакетное декодирование на все языки."""
+        backend = self.model
+        backend.mark_used()
+        language_ids = []
+        for name in tgt_lang_strs:
+            language_id = self.lang_cache.get(TRANSLATION_LANGUAGES[name])
+            if not language_id:
+                raise TranslationGenerationError(f"ID языка '{TRANSLATION_LANGUAGES[name]}' не найден в кэше")
+            language_ids.append(language_id)
+
+        inputs = self._prepare_inputs(backend, text, src_lang)
+        count = len(language_ids)
+        with torch.inference_mode():
+            context = autocast_context(self.device)
+            with context:
+                encoder_outputs = backend.model.get_encoder()(
+                    input_ids=inputs.input_ids, attention_mask=inputs.attention_mask, return_dict=True
                 )
+                # Строка декодера: стартовый токен модели и токен целевого языка (как forced_bos_token_id)
+                start_id = backend.model.config.decoder_start_token_id
+                decoder_input_ids = torch.tensor(
+                    [[start_id, language_id] for language_id in language_ids], device=backend.device
+                )
+                outputs = backend.model.generate(
+                    encoder_outputs=BaseModelOutput(
+                        last_hidden_state=encoder_outputs.last_hidden_state.expand(count, -1, -1)
+                    ),
+                    attention_mask=inputs.attention_mask.expand(count, -1),
+                    decoder_input_ids=decoder_input_ids,
+                    max_new_tokens=64,
+                    num_beams=2,
+                    early_stopping=True,
+                    **cancellation_kwargs(self.should_stop)
+                )
+        raise_if_cancelled(self.should_stop)
+        logger.debug("Пакетное декодирование: %s языков | Токены: %s", count, outputs.shape)
+        return backend.tokenizer.batch_decode(outputs, skip_special_tokens=True)
 
-    def _prepare_inputs(self, text: str, src_lang: str):
+    def _prepare_inputs(self, backend: TranslationModelCreator, text: str, src_lang: str):
         """Подготовка текста для модели."""
         logger.debug("Токенизация входного текста")
         try:
-            self.model.tokenizer.src_lang = src_lang
-            inputs = self.model.tokenizer(
+            if not backend.is_pair_model:
+                backend.tokenizer.src_lang = src_lang
+            inputs = backend.tokenizer(
                 text,
                 return_tensors="pt",
                 padding=True,
                 truncation=True,
                 max_length=512
-            ).to(self.model.device)
+            ).to(backend.device)
             
             logger.debug(
-                f"Токены подготовлены | Размер: {inputs.input_ids.shape} | "
-                f"Устройство: {self.model.device}"
+                "Токены подготовлены | Размер: %s | "
+                "Устройство: %s",
+                inputs.input_ids.shape, backend.device
             )
             return inputs
         except Exception as e:
-            logger.error(f"Ошибка токенизации: {e}", exc_info=True)
+            logger.error("Ошибка токенизации: %s", e, exc_info=True)
             raise TranslationGenerationError("Ошибка обработки текста") from e
 
-    def _generate_translation(self, inputs, forced_bos_id):
+    def _generate_translation(self, backend: TranslationModelCreator, inputs, forced_bos_id: Optional[int]):
         """Генерация перевода с использованием модели."""
         logger.info(
             "Генерация перевода | "
-            f"Параметры: max_new_tokens=64, num_beams=2, bos_token_id={forced_bos_id}"
+            "Параметры: max_new_tokens=64, num_beams=2, bos_token_id=%s",
+            forced_bos_id
         )
         try:
             with torch.inference_mode():
-                context = (
-                    torch.autocast(device_type=self.device) 
-                    if self.device == "cuda" 
-                    else contextlib.nullcontext()
-                )
+                context = autocast_context(self.device)
                 with context:
-                    logger.debug(f"Контекст генерации: {type(context).__name__}")
-                    outputs = self.model.model.generate(
+                    logger.debug("Контекст генерации: %s", type(context).__name__)
+                    # Модели пар переводят на единственный целевой язык без forced_bos_token_id
+                    language_kwargs = {"forced_bos_token_id": forced_bos_id} if forced_bos_id is not None else {}
+                    outputs = backend.model.generate(
                         **inputs,
-                        forced_bos_token_id=forced_bos_id,
+                        **language_kwargs,
                         max_new_tokens=64,
                         num_beams=2,
-                        early_stopping=True
+                        early_stopping=True,
+                        **cancellation_kwargs(self.should_stop)
                     )
-                    logger.debug(f"Сгенерированные токены: {outputs.shape}")
-                    return outputs
+            # Усечённый отменой перевод не возвращается и не попадает в кэш
+            raise_if_cancelled(self.should_stop)
+            logger.debug("Сгенерированные токены: %s", outputs.shape)
+            return outputs
         except RuntimeError as re:
-            logger.error(f"Ошибка выполнения: {re}", exc_info=True)
+            logger.error("Ошибка выполнения: %s", re, exc_info=True)
             raise TranslationGenerationError("Ошибка генерации перевода") from re
         except Exception as e:
-            logger.error(f"Непредвиденная ошибка генерации: {e}", exc_info=True)
+            logger.error("Непредвиденная ошибка генерации: %s", e, exc_info=True)
             raise
 
-    def _decode_output(self, generated_tokens):
+    def _decode_output(self, backend: TranslationModelCreator, generated_tokens):
         """Декодирование токенов в текст."""
         logger.debug("Декодирование выходных токенов")
         try:
-            decoded = self.model.tokenizer.batch_decode(
+            decoded = backend.tokenizer.batch_decode(
                 generated_tokens,
                 skip_special_tokens=True
             )
@@ -155,9 +305,9 @@ class TranslationGenerator(BaseGenerator):
             if not result:
                 logger.warning("Пустой результат декодирования")
                 
-            logger.debug(f"Результат декодирования: {result[:60]}...")
+            logger.debug("Результат декодирования: %s...", result[:60])
             return result
         except Exception as e:
-            logger.error(f"Ошибка декодирования: {e}", exc_info=True)
+            logger.error("Ошибка декодирования: %s", e, exc_info=True)
             raise TranslationGenerationError("Ошибка обработки результата") from e
         
\ No newline at end of file
@@ -1,12 +1,24 @@
 # src/core/handlers/base_handler.py
 from abc import ABC, abstractmethod
-import shutil
-from typing import Generator
+from typing import Dict, Generator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
+from core.constants.labels import LABEL_SOURCE_LANGUAGE
+from core.constants.web import TRANSLATION_LANGUAGES
+from core.generators.exceptions import GenerationCancelledError, TranslationGenerationError
+from core.handlers.dedupe import DuplicateDetector
+from core.handlers.similarity import SimilarityRecorder, relocate
+from core.handlers.transfer import DEFAULT_STRATEGY, TransferReport, transfer_file
 from core.utils.get_logger import logger
+from core.utils.metrics import (
+    CACHE_HITS_TOTAL, DEDUPE_RATIO, DUPLICATES_TOTAL, ERRORS_TOTAL, IMAGES_TOTAL, stage_timer
+)
+from core.utils.settings import settings
 
 
 class BaseHandler(ABC):
+    # Имя задачи для меток метрик
+    TASK: str = "base"
+
     @classmethod
     @abstractmethod
     def handle_photo_generator(cls, *args) -> Generator:
@@ -18,8 +30,10 @@ class BaseHandler(ABC):
         pass
 
     @classmethod
-    def _common_processing(cls, photo_tuple, check_cancelled, target_lang):
-        logger.info(f"Начало обработки пакета из {len(photo_tuple)} изображений")
+    def _common_processing(cls, photo_tuple, check_cancelled, target_lang, generators):
+        logger.info("Начало обработки пакета из %s изображений", len(photo_tuple))
+        detector = DuplicateDetector(settings.dedupe_radius) if settings.dedupe_radius >= 0 else None
+        recorder = SimilarityRecorder() if settings.similarity_index else None
         try:
             for i, item in enumerate(photo_tuple):
                 if check_cancelled and check_cancelled():
@@ -27,72 +41,168 @@ class BaseHandler(ABC):
                     return
                 try:
                     path = Path(item[0]) if isinstance(item, tuple) else Path(item)
-                    logger.debug(f"Обработка элемента {i}: {path.name}")
-                    yield from cls._process_single_photo(str(path), i, target_lang)
+                    logger.debug("Обработка элемента %s: %s", i, path.name)
+
+                    duplicate_of = detector.lookup(str(path), i) if detector else None
+                    if duplicate_of is not None:
+                        DUPLICATES_TOTAL.labels(cls.TASK).inc()
+                        IMAGES_TOTAL.labels(cls.TASK).inc()
+                        if recorder:
+                            recorder.record(str(path), duplicate_of[0])
+                        yield (i, duplicate_of)
+                        continue
+
+                    for result in cls._process_single_photo(str(path), i, target_lang, generators):
+                        if detector and isinstance(result, tuple):
+                            detector.remember(i, result[1])
+                        if recorder and isinstance(result, tuple):
+                            recorder.record(str(path), result[1][0])
+                        yield result
+                    IMAGES_TOTAL.labels(cls.TASK).inc()
+                except GenerationCancelledError:
+                    # Отмена внутри generate: декодирование остановлено на текущем шаге
+                    logger.warning("Обработка прервана пользователем во время генерации: %s", path.name)
+                    return
                 except Exception as e:
+                    ERRORS_TOTAL.labels(cls.TASK).inc()
                     logger.error(
-                        f"Ошибка обработки элемента {i} ({path.name}): {e}",
+                        "Ошибка обработки элемента %s (%s): %s", i, path.name, e,
                         exc_info=True
                     )
                     yield (i, f"Ошибка обработки: {str(e)}")
         finally:
+            if recorder:
+                recorder.flush()
+                logger.info("В индекс похожих изображений добавлено: %s", recorder.indexed)
+            primary = generators[0]
+            if getattr(primary, "loaded", True) and getattr(primary, "degraded", 0):
+                logger.warning(
+                    "Генерация превысила бюджет для %s изображений | Действие: %s",
+                    primary.degraded, settings.deadline_policy
+                )
+            if detector and detector.total:
+                DEDUPE_RATIO.labels(cls.TASK).set(detector.ratio)
+                logger.info(
+                    "Дубликаты: %s из %s изображений (%.1f%%) | Радиус: %s",
+                    detector.duplicates, detector.total, detector.ratio * 100, detector.radius
+                )
             logger.info("Завершение обработки пакета изображений")
 
     @classmethod
-    def _process_single_photo(cls, photo_path: str, index: int, target_lang: str) -> Generator:
+    def _process_single_photo(cls, photo_path: str, index: int, target_lang: str, generators) -> Generator:
         photo_name = Path(photo_path).name
-        logger.info(f"Начало обработки изображения [{index}] {photo_name}")
+        logger.info("Начало обработки изображения [%s] %s", index, photo_name)
         yield f"Обработка: {photo_name}"
         
         try:
             # Общая логика обработки
             logger.debug("Генерация основного объекта")
-            original_object = cls._generate_object(photo_path, photo_name)
-            logger.debug("Выполнение перевода объекта")
-            translated = cls._translate_object(original_object, target_lang)
+            primary, translator = generators
+            original_object = cls._generate_object(primary, photo_path, photo_name)
+            translated = cls._translate_result(translator, original_object, target_lang)
             
-            logger.success(f"Успешная обработка изображения [{index}] {photo_name}")
+            logger.success("Успешная обработка изображения [%s] %s", index, photo_name)
             yield (index, (original_object, translated))
             
         except Exception as e:
             logger.error(
-                f"Критическая ошибка обработки изображения [{index}] {photo_name}: {e}",
+                "Критическая ошибка обработки изображения [%s] %s: %s", index, photo_name, e,
                 exc_info=True
             )
             raise
 
+    @classmethod
+    def _translate_result(cls, translator, original_object: str,
+                          target_lang: Union[str, Sequence[str]]) -> Union[str, Dict[str, str]]:
+        """Перевод результата на целевой язык (несколько языков - словарь язык -> перевод)"""
+        targets = cls.target_languages(target_lang)
+        if len(targets) > 1:
+            # Несколько языков: словарь язык -> перевод (колонка результата на каждый язык)
+            logger.debug("Выполнение перевода объекта на %s языков", len(targets))
+            return cls._translate_object_many(translator, original_object, targets)
+        if not targets or TRANSLATION_LANGUAGES.get(targets[0]) == LABEL_SOURCE_LANGUAGE:
+            # Результат моделей уже на исходном языке: переводчик не нужен и не загружается
+            return original_object
+        logger.debug("Выполнение перевода объекта")
+        return cls._translate_object(translator, original_object, targets[0])
+
     @abstractmethod
-    def _generate_object(cls, photo_path: str, photo_name: str):
+    def _generate_object(cls, generator, photo_path: str, photo_name: str):
         """Генерация основного объекта (капшина/сегмента/др.)"""
         pass
 
     @abstractmethod
-    def _translate_object(cls, generated_object, target_lang: str):
+    def _translate_object(cls, translator, generated_object, target_lang: str):
         """Трансляция сгенерированного объекта"""
         pass
 
     @staticmethod
-    def _safe_copy_file(src: Path, dest: Path) -> str:
-        """Потокобезопасное копирование файла с проверкой"""
-        logger.debug(f"Попытка копирования: {src} -> {dest}")
+    def target_languages(target_lang: Union[str, Sequence[str]]) -> List[str]:
+        """Целевые языки задачи: одно название языка или несколько (без повторов)."""
+        if isinstance(target_lang, str):
+            return [target_lang]
+        return list(dict.fromkeys(target_lang or ()))
+
+    @classmethod
+    def _translate_object_many(cls, translator, generated_object, target_langs: List[str]) -> Dict[str, str]:
+        """Перевод объекта на несколько языков за один проход кодировщика"""
         try:
-            if not src.exists():
-                error_msg = f"Файл не найден {src}"
-                logger.error(error_msg)
-                return error_msg
-                
-            if dest.exists():
-                warn_msg = f"Файл уже существует: {dest}"
-                logger.warning(warn_msg)
-                return warn_msg
-                
-            logger.info(f"Копирование файла: {src.name}")
-            shutil.copy(str(src), str(dest))
+            return dict(cls._cached_translate_many(translator, generated_object, LABEL_SOURCE_LANGUAGE, target_langs))
+        except GenerationCancelledError:
+            raise
+        except TranslationGenerationError as e:
+            logger.error("Ошибка перевода '%s' на %s: %s", generated_object, target_langs, e, exc_info=True)
+            raise
+        except Exception as e:
+            logger.error("Непредвиденная ошибка перевода на несколько языков: %s", e, exc_info=True)
+            raise TranslationGenerationError("Ошибка перевода объекта") from e
+
+    @staticmethod
+    def _cached_translate_many(translator, text: str, src_lang: str, tgt_langs: Sequence[str]) -> Dict[str, str]:
+        """Перевод на несколько языков через кэширующий генератор с учётом попаданий в кэш."""
+        hits_before = translator.generate_many.cache_info().hits
+        result = translator.generate_many(text, src_lang, tuple(tgt_langs))
+        if translator.generate_many.cache_info().hits > hits_before:
+            CACHE_HITS_TOTAL.labels("translation").inc()
+        return result
+
+    @staticmethod
+    def _cached_translate(translator, text: str, src_lang: str, tgt_lang: str) -> str:
+        """Перевод через кэширующий генератор с учётом попаданий в кэш в метриках."""
+        hits_before = translator.generate.cache_info().hits
+        result = translator.generate(text, src_lang, tgt_lang)
+        if translator.generate.cache_info().hits > hits_before:
+            CACHE_HITS_TOTAL.labels("translation").inc()
+        return result
+
+    @staticmethod
+    def _safe_transfer_file(src: Path, dest: Path, strategy: str = DEFAULT_STRATEGY,
+                            report: Optional[TransferReport] = None) -> str:
+        """Потокобезопасное сохранение файла выбранной стратегией с проверкой"""
+        logger.debug("Попытка сохранения (%s): %s -> %s", strategy, src, dest)
+        # Свободное имя назначено DestinationIndex, поэтому отдельных проверок exists() нет:
+        # отсутствие источника и гонка за имя приходят как исключения от самого переноса
+        try:
+            logger.info("Сохранение файла: %s", src.name)
+            with stage_timer("copy"):
+                result = transfer_file(src, dest, strategy)
+            if report is not None:
+                report.add(result)
+            # Строка индекса похожих следует за сохранённым файлом
+            relocate(str(src), str(dest))
             
-            success_msg = f"Успешно сохранён: {dest}"
+            success_msg = f"Успешно сохранён ({result.strategy}): {dest}"
             logger.success(success_msg)
             return success_msg
             
+        except FileNotFoundError:
+            error_msg = f"Файл не найден {src}"
+            logger.error(error_msg)
+            return error_msg
+        except FileExistsError:
+            warn_msg = f"Файл уже существует: {dest}"
+            logger.warning(warn_msg)
+            return warn_msg
         except Exception as e:
             error_msg = f"Ошибка копирования {src}: {e}"
             logger.error(error_msg, exc_info=True)
@@ -1,120 +1,247 @@
 # src/core/handlers/classification_handler.py
-from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Generator, List
+from typing import Callable, Dict, Generator, List, Optional, Tuple
 
-from core.generators.exceptions import SegmentationGenerationError, TranslationGenerationError
+from core.constants.models import CLASSIFICATION_MODEL_NAMES
+from core.constants.web import TRANSLATION_LANGUAGES
+from core.generators.caption_generator import CaptionGenerator
+from core.generators.classifier_generator import ClassifierGenerator
+from core.generators.exceptions import (
+    ClassificationGenerationError, GenerationCancelledError, SegmentationGenerationError, TranslationGenerationError
+)
+from core.generators.governed import GovernedGenerator
+from core.generators.lazy import LazyGenerator
 from core.generators.segment_generator import SegmentGenerator
 from core.generators.translation_generator import TranslationGenerator
 from core.handlers.base_handler import BaseHandler
+from core.handlers.destination_index import DestinationIndex
+from core.handlers.grouping import EmbeddingGrouper, GroupingOptions
+from core.handlers.transfer import DEFAULT_STRATEGY, TransferReport
+from core.jobs.throughput_governor import ThroughputGovernor, ThroughputTarget
 
 from core.utils.get_logger import logger
+from core.utils.label_table import label_table
+from core.utils.metrics import CACHE_HITS_TOTAL, IMAGES_TOTAL
 
 class ClassificationHandler(BaseHandler):
-    _segment_generator: SegmentGenerator = None
-    _translation_generator: TranslationGenerator = None
+    TASK = "classification"
 
     @classmethod
-    def initialize_models(cls, seg_model: str, trans_model: str) -> None:
-        """Инициализация моделей с обработкой ошибок"""
+    def initialize_models(cls, seg_model: str, trans_model: str,
+                          check_cancelled: Optional[Callable[[], bool]] = None,
+                          throughput_target: Optional[ThroughputTarget] = None, total: int = 0) -> Tuple:
+        """Инициализация генераторов задачи с обработкой ошибок (генераторы не хранятся в классе)"""
         try:
             logger.info(
-                f"Инициализация моделей | Сегментация: {seg_model} | Перевод: {trans_model}"
+                "Инициализация моделей | Сегментация: %s | Перевод: %s", seg_model, trans_model
             )
-            cls._segment_generator = SegmentGenerator(seg_model)
-            cls._translation_generator = TranslationGenerator(trans_model)
-            logger.success("Модели успешно инициализированы")
+            # Модели загружаются при первом обращении этапа; переводчик - только
+            # для меток, которых нет в таблице переводов
+            generators = (
+                cls._primary_generator(seg_model, check_cancelled, throughput_target, total),
+                LazyGenerator(f"translation:{trans_model}", lambda: TranslationGenerator(trans_model, should_stop=check_cancelled))
+            )
+            logger.success("Этапы классификации подготовлены (модели загружаются по первому обращению)")
+            return generators
         except Exception as e:
-            logger.critical(f"Ошибка инициализации моделей: {e}", exc_info=True)
+            logger.critical("Ошибка инициализации моделей: %s", e, exc_info=True)
             raise
 
+    @staticmethod
+    def _primary_generator(seg_model: str, check_cancelled: Optional[Callable[[], bool]],
+                           throughput_target: Optional[ThroughputTarget], total: int):
+        """Генератор основного этапа: выбранная модель либо профиль регулятора производительности"""
+        if seg_model in CLASSIFICATION_MODEL_NAMES:
+            # Один прямой проход на изображение: регулировать нечего
+            if throughput_target is not None:
+                logger.info("Модель %s не генерирует токены: регулятор производительности не используется", seg_model)
+            return LazyGenerator(
+                f"classification:{seg_model}", lambda: ClassifierGenerator(seg_model, should_stop=check_cancelled)
+            )
+        if throughput_target is None:
+            return LazyGenerator(f"segmentation:{seg_model}", lambda: SegmentGenerator(seg_model, should_stop=check_cancelled))
+        governor = ThroughputGovernor("segmentation", seg_model, throughput_target, total)
+        return GovernedGenerator(
+            f"segmentation:{seg_model}",
+            governor,
+            lambda profile: SegmentGenerator(
+                profile.model_name, max_new_tokens=profile.token_limit, num_beams=profile.num_beams,
+                should_stop=check_cancelled
+            )
+        )
+
     @classmethod
     def handle_photo_generator(cls, photo_tuple: tuple, seg_model: str, trans_model: str, 
-                              check_cancelled: callable, target_language: str) -> Generator:
-        """Обработка фотографий с логированием этапов"""
+                              check_cancelled: callable, target_language: str,
+                              throughput_target: Optional[ThroughputTarget] = None,
+                              grouping: Optional[GroupingOptions] = None) -> Generator:
+        """Обработка фотографий с логированием этапов (grouping - группировка по сходству вместо меток)"""
+        if grouping is not None:
+            yield from cls._grouping_processing(photo_tuple, seg_model, trans_model, check_cancelled,
+                                                target_language, grouping)
+            return
         logger.info("Запуск обработки изображений для классификации")
         try:
-            cls.initialize_models(seg_model, trans_model)
-            yield from super()._common_processing(photo_tuple, check_cancelled, target_language)
+            generators = cls.initialize_models(
+                seg_model, trans_model, check_cancelled, throughput_target, len(photo_tuple)
+            )
+            yield from super()._common_processing(photo_tuple, check_cancelled, target_language, generators)
         except Exception as e:
-            logger.error(f"Критическая ошибка в основном цикле обработки: {e}", exc_info=True)
+            logger.error("Критическая ошибка в основном цикле обработки: %s", e, exc_info=True)
             raise
 
     @classmethod
-    def _generate_object(cls, photo_path: str, photo_name: str) -> str:
+    def _grouping_processing(cls, photo_tuple: tuple, seg_model: str, trans_model: str,
+                             check_cancelled: Optional[Callable[[], bool]], target_language,
+                             grouping: GroupingOptions) -> Generator:
+        """Группировка по сходству эмбеддингов: класс изображения - переведённое название его группы"""
+        # Эмбеддинги даёт выбранная модель прямого прохода, для Florence-2 - модель по умолчанию
+        embedding_model = grouping.embedding_model_for(seg_model)
+        logger.info(
+            "Запуск группировки по сходству | Эмбеддинги: %s | Подписи: %s | Групп: %s",
+            embedding_model, grouping.naming_model, grouping.clusters or "авто"
+        )
+        paths = [str(item[0]) if isinstance(item, tuple) else str(item) for item in photo_tuple]
+        grouper = EmbeddingGrouper(
+            LazyGenerator(
+                f"classification:{embedding_model}",
+                lambda: ClassifierGenerator(embedding_model, should_stop=check_cancelled)
+            ),
+            LazyGenerator(
+                f"captioning:{grouping.naming_model}",
+                lambda: CaptionGenerator(grouping.naming_model, should_stop=check_cancelled)
+            ),
+            grouping.clusters
+        )
+        translator = LazyGenerator(
+            f"translation:{trans_model}", lambda: TranslationGenerator(trans_model, should_stop=check_cancelled)
+        )
+        try:
+            yield from grouper.run(paths, check_cancelled)
+
+            translated: Dict[int, object] = {}
+            for cluster, name in grouper.names.items():
+                try:
+                    translated[cluster] = (name, cls._translate_result(translator, name, target_language))
+                except GenerationCancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Ошибка перевода названия группы '%s': %s", name, e, exc_info=True)
+                    translated[cluster] = f"Ошибка обработки: {e}"
+
+            for index, cluster in sorted(grouper.assignments.items()):
+                IMAGES_TOTAL.labels(cls.TASK).inc()
+                yield (index, translated[cluster])
+        except GenerationCancelledError:
+            logger.warning("Группировка прервана пользователем")
+        except Exception as e:
+            logger.error("Критическая ошибка группировки: %s", e, exc_info=True)
+            raise
+
+    @classmethod
+    def _generate_object(cls, generator: LazyGenerator, photo_path: str, photo_name: str) -> str:
         """Генерация объекта сегментации с обработкой ошибок"""
-        logger.debug(f"Генерация сегмента для {photo_name}")
+        logger.debug("Генерация сегмента для %s", photo_name)
         try:
-            result = cls._segment_generator.generate(photo_path, photo_name)
-            logger.debug(f"Результат сегментации {photo_name}: {result}")
+            result = generator.generate(photo_path, photo_name)
+            logger.debug("Результат сегментации %s: %s", photo_name, result)
             return result
-        except SegmentationGenerationError as e:
-            logger.error(f"Ошибка сегментации {photo_name}: {e}", exc_info=True)
+        except GenerationCancelledError:
+            raise
+        except (SegmentationGenerationError, ClassificationGenerationError) as e:
+            logger.error("Ошибка сегментации %s: %s", photo_name, e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Непредвиденная ошибка сегментации {photo_name}: {e}", exc_info=True)
+            logger.error("Непредвиденная ошибка сегментации %s: %s", photo_name, e, exc_info=True)
             raise SegmentationGenerationError("Ошибка генерации сегмента") from e
 
     @classmethod
-    def _translate_object(cls, generated_object: str, target_lang: str) -> str:
-        """Перевод объекта с обработкой ошибок"""
-        logger.debug(f"Перевод объекта '{generated_object}' на {target_lang}")
+    def _translate_object(cls, translator: LazyGenerator, generated_object: str, target_lang: str) -> str:
+        """Перевод объекта: таблица переводов меток, для отсутствующих в ней меток - модель"""
+        logger.debug("Перевод объекта '%s' на %s", generated_object, target_lang)
         try:
-            result = cls._translation_generator.generate(generated_object, "en_XX", target_lang)
-            logger.debug(f"Результат перевода: {result}")
+            cached = label_table.lookup(generated_object, TRANSLATION_LANGUAGES.get(target_lang, ""))
+            if cached is not None:
+                CACHE_HITS_TOTAL.labels("label_table").inc()
+                logger.debug("Перевод из таблицы меток: %s", cached)
+                return cached
+
+            label_table.record_unseen(generated_object)
+            result = cls._cached_translate(translator, generated_object, "en_XX", target_lang)
+            logger.debug("Результат перевода: %s", result)
             return result
+        except GenerationCancelledError:
+            raise
         except TranslationGenerationError as e:
-            logger.error(f"Ошибка перевода '{generated_object}': {e}", exc_info=True)
+            logger.error("Ошибка перевода '%s': %s", generated_object, e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Непредвиденная ошибка перевода: {e}", exc_info=True)
+            logger.error("Непредвиденная ошибка перевода: %s", e, exc_info=True)
             raise TranslationGenerationError("Ошибка перевода объекта") from e
 
     @classmethod
-    def save_photo(cls, class_names: List[str], photo_paths: List[str], save_dir: str) -> List[str]:
-        """Сохранение классифицированных фотографий с улучшенным логированием"""
-        logger.info(f"Сохранение {len(photo_paths)} фото в директорию: {save_dir}")
-        save_path = Path(save_dir) / 'classified_photos'
-        
+    def _translate_object_many(cls, translator: LazyGenerator, generated_object: str,
+                               target_langs: List[str]) -> Dict[str, str]:
+        """Перевод метки на несколько языков: таблица переводов, остальные языки - одним проходом модели"""
+        logger.debug("Перевод объекта '%s' на %s", generated_object, target_langs)
         try:
-            save_path.mkdir(parents=True, exist_ok=True)
-            logger.debug(f"Создана директория для сохранения: {save_path}")
-        except Exception as e:
-            logger.error(f"Ошибка создания директории {save_path}: {e}", exc_info=True)
+            translations: Dict[str, str] = {}
+            missing = []
+            for target_lang in target_langs:
+                cached = label_table.lookup(generated_object, TRANSLATION_LANGUAGES.get(target_lang, ""))
+                if cached is None:
+                    missing.append(target_lang)
+                else:
+                    CACHE_HITS_TOTAL.labels("label_table").inc()
+                    translations[target_lang] = cached
+
+            if missing:
+                label_table.record_unseen(generated_object)
+                translations.update(cls._cached_translate_many(translator, generated_object, "en_XX", missing))
+            return {target_lang: translations[target_lang] for target_lang in target_langs}
+        except GenerationCancelledError:
+            raise
+        except TranslationGenerationError as e:
+            logger.error("Ошибка перевода '%s': %s", generated_object, e, exc_info=True)
             raise
+        except Exception as e:
+            logger.error("Непредвиденная ошибка перевода: %s", e, exc_info=True)
+            raise TranslationGenerationError("Ошибка перевода объекта") from e
+
+    @classmethod
+    def save_photo(cls, class_names: List[str], photo_paths: List[str], save_dir: str,
+                   strategy: str = DEFAULT_STRATEGY) -> List[str]:
+        """Сохранение классифицированных фотографий с улучшенным логированием"""
+        logger.info("Сохранение %s фото в директорию: %s | Стратегия: %s", len(photo_paths), save_dir, strategy)
+        save_path = Path(save_dir) / 'classified_photos'
 
         photo_paths = [Path(p) for p in photo_paths]
-        class_files = defaultdict(list)
+        index = DestinationIndex()
+        tasks = []
         
-        # Группировка по классам
+        # Группировка по классам и назначение свободных имён с учётом существующих файлов
         for class_name, photo_path in zip(class_names, photo_paths):
-            class_files[class_name].append(photo_path)
-            logger.debug(f"Классификация: {photo_path.name} -> {class_name}")
+            dest = index.reserve(save_path / class_name, photo_path.stem, photo_path.suffix)
+            tasks.append((photo_path, dest))
+            logger.debug("Классификация: %s -> %s", photo_path.name, class_name)
+
+        try:
+            created = index.create_directories()
+            logger.debug("Созданы директории для сохранения: %s (новых: %s)", save_path, created)
+        except Exception as e:
+            logger.error("Ошибка создания директорий в %s: %s", save_path, e, exc_info=True)
+            raise
 
         results = []
+        report = TransferReport()
         try:
             with ThreadPoolExecutor() as executor:
-                futures = []
-                logger.info(f"Запуск пула потоков для сохранения {len(photo_paths)} файлов")
-                
-                for class_name, paths in class_files.items():
-                    class_dir = save_path / class_name
-                    try:
-                        class_dir.mkdir(exist_ok=True)
-                        logger.debug(f"Создана директория класса: {class_name}")
-                    except Exception as e:
-                        logger.error(f"Ошибка создания директории {class_name}: {e}", exc_info=True)
-                        continue
-
-                    for path in paths:
-                        dest = class_dir / path.name
-                        futures.append(executor.submit(
-                            cls._safe_copy_file, 
-                            path, 
-                            dest
-                        ))
-                        logger.debug(f"Добавлена задача копирования: {path.name}")
+                logger.info("Запуск пула потоков для сохранения %s файлов", len(tasks))
+                futures = [
+                    executor.submit(cls._safe_transfer_file, path, dest, strategy, report)
+                    for path, dest in tasks
+                ]
 
                 # Обработка результатов
                 for future in as_completed(futures):
@@ -127,9 +254,10 @@ class ClassificationHandler(BaseHandler):
                         logger.error(error_msg, exc_info=True)
                         results.append(error_msg)
 
-            logger.success(f"Успешно сохранено {len(results)} файлов")
+            report.log()
+            logger.success("Успешно сохранено %s файлов", len(results))
             return results
 
         except Exception as e:
-            logger.critical(f"Критическая ошибка при сохранении: {e}", exc_info=True)
+            logger.critical("Критическая ошибка при сохранении: %s", e, exc_info=True)
             raise
@@ -0,0 +1,53 @@
+# src/core/handlers/dedupe.py
+"""Поиск почти одинаковых кадров (серийная съёмка) до запуска моделей."""
+
+from typing import Any, Dict, Optional
+
+from core.utils.get_logger import logger
+from core.utils.image_hash import BKTree, hamming, image_hashes
+from core.utils.metrics import stage_timer
+
+
+class DuplicateDetector:
+    """
+    Индекс перцептивных хэшей одного пакета.
+
+    Кандидаты ищутся в BK-дереве по dHash и подтверждаются по pHash; для
+    подтверждённого дубликата возвращается результат его представителя
+    (первого похожего кадра), и повторный инференс не выполняется.
+    """
+
+    def __init__(self, radius: int):
+        self.radius = radius
+        self._tree: BKTree = BKTree()
+        self._results: Dict[int, Any] = {}
+        self.total = 0
+        self.duplicates = 0
+
+    def lookup(self, image_path: str, index: int) -> Optional[Any]:
+        """Результат представителя для дубликата либо None (изображение становится представителем)."""
+        self.total += 1
+        try:
+            with stage_timer("hash"):
+                dhash, phash = image_hashes(image_path)
+        except Exception as e:
+            # Ошибку чтения файла сообщит основной этап обработки
+            logger.debug("Не удалось вычислить хэш для %s: %s", image_path, e)
+            return None
+
+        for _, (representative, representative_phash) in self._tree.search(dhash, self.radius):
+            if representative in self._results and hamming(phash, representative_phash) <= self.radius:
+                self.duplicates += 1
+                logger.debug("Изображение #%s - дубликат #%s", index + 1, representative + 1)
+                return self._results[representative]
+
+        self._tree.add(dhash, (index, phash))
+        return None
+
+    def remember(self, index: int, result: Any) -> None:
+        """Сохраняет результат представителя для последующих дубликатов."""
+        self._results[index] = result
+
+    @property
+    def ratio(self) -> float:
+        return self.duplicates / self.total if self.total else 0.0
@@ -0,0 +1,74 @@
+# src/core/handlers/destination_index.py
+"""
+Индекс директорий назначения для сохранения без коллизий имён.
+
+Каждая целевая директория читается одним os.scandir при первом обращении,
+после чего свободные имена выдаются из памяти в стиле "имя", "имя 2", "имя 3"...
+с учётом как уже существующих файлов, так и имён, выданных в этом сохранении.
+Отсутствующие директории создаются одним проходом перед запуском переноса.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from core.utils.get_logger import logger
+
+
+class DestinationIndex:
+    """Резервирование свободных имён файлов в директориях назначения."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names: Dict[Path, Set[str]] = {}
+        self._counters: Dict[Tuple[Path, str, str], int] = {}
+        self._missing: List[Path] = []
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        return os.path.normcase(name)
+
+    def _directory_names(self, directory: Path) -> Set[str]:
+        names = self._names.get(directory)
+        if names is not None:
+            return names
+
+        names = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    names.add(self._normalize(entry.name))
+            logger.debug("Индекс директории %s: %s записей", directory, len(names))
+        except FileNotFoundError:
+            self._missing.append(directory)
+            logger.debug("Директория %s будет создана", directory)
+        self._names[directory] = names
+        return names
+
+    def reserve(self, directory: Path, stem: str, suffix: str) -> Path:
+        """Возвращает свободный путь directory/"stem[ N]suffix" и помечает его занятым."""
+        with self._lock:
+            names = self._directory_names(directory)
+            key = (directory, self._normalize(stem), self._normalize(suffix))
+            count = self._counters.get(key, 1)
+            while True:
+                name = f"{stem}{suffix}" if count == 1 else f"{stem} {count}{suffix}"
+                normalized = self._normalize(name)
+                if normalized not in names:
+                    break
+                count += 1
+            names.add(normalized)
+            self._counters[key] = count + 1
+        return directory / name
+
+    def create_directories(self) -> int:
+        """Создаёт все отсутствующие директории назначения (родительские - раньше вложенных)."""
+        with self._lock:
+            missing = sorted(self._missing, key=lambda path: len(path.parts))
+            self._missing = []
+        for directory in missing:
+            directory.mkdir(parents=True, exist_ok=True)
+        if missing:
+            logger.debug("Создано директорий назначения: %s", len(missing))
+        return len(missing)
@@ -0,0 +1,161 @@
+# src/core/handlers/grouping.py
+"""
+Группировка изображений по визуальному сходству без заданных меток.
+
+Для больших неразмеченных выгрузок вместо одной найденной метки на изображение:
+эмбеддинги изображений вычисляются пакетами (CLIP либо признаки классификатора),
+складываются в матрицу float16 на диске и кластеризуются мини-пакетным k-means
+(core.utils.clustering). Название группы - самое частое содержательное слово подписей
+нескольких изображений, ближайших к центру кластера; без подписей - ближайшая к центру
+zero-shot метка.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Generator, List, Optional, Sequence, Tuple, Union
+
+import torch
+
+from core.constants.models import CLASSIFICATION_MODEL_NAMES
+from core.generators.exceptions import GenerationCancelledError
+from core.utils.clustering import EmbeddingMatrix, assign_clusters, minibatch_kmeans, suggest_clusters
+from core.utils.get_logger import logger
+from core.utils.metrics import stage_timer
+from core.utils.settings import settings
+
+# Модели по умолчанию: эмбеддинги (если выбранная модель их не даёт) и подписи для названий групп
+DEFAULT_EMBEDDING_MODEL = "clip-vit-base-patch32"
+DEFAULT_NAMING_MODEL = "blip-image-captioning-base"
+# Изображений группы, ближайших к центру, по подписям которых выбирается название
+NAME_SAMPLES = 3
+# Слова подписей, не подходящие для названия группы
+STOPWORDS = frozenset((
+    "a", "an", "the", "and", "or", "of", "on", "in", "at", "to", "with", "by", "for", "from", "into", "over",
+    "under", "near", "next", "behind", "front", "top", "side", "there", "this", "that", "these", "those", "it",
+    "its", "is", "are", "be", "has", "have", "his", "her", "their", "some", "two", "three", "several", "many",
+    "other", "one", "up", "close", "view", "image", "picture", "photo", "photograph", "background", "sitting",
+    "standing", "holding", "looking", "laying", "lying", "arafed", "araffe", "blurry",
+))
+
+
+@dataclass(frozen=True)
+class GroupingOptions:
+    """Параметры группировки: число групп (0 - по размеру пакета) и модели эмбеддингов и подписей."""
+
+    clusters: int = 0
+    embedding_model: str = DEFAULT_EMBEDDING_MODEL
+    naming_model: str = DEFAULT_NAMING_MODEL
+
+    @classmethod
+    def from_inputs(cls, enabled: Optional[bool], clusters: Optional[float]) -> Optional["GroupingOptions"]:
+        """Параметры из полей интерфейса; None - режим выключен."""
+        return cls(max(0, int(clusters or 0))) if enabled else None
+
+    def embedding_model_for(self, model_name: str) -> str:
+        """Модель эмбеддингов: выбранная модель прямого прохода, для Florence-2 - embedding_model."""
+        return model_name if model_name in CLASSIFICATION_MODEL_NAMES else self.embedding_model
+
+    def models(self, model_name: str) -> Tuple[str, str]:
+        """
+        Модели, которые загружает группировка: регистрируются в задаче, чтобы
+        выгрузка простаивающих моделей не затронула их во время обработки.
+        """
+        return self.embedding_model_for(model_name), self.naming_model
+
+
+def name_from_captions(captions: Sequence[str]) -> Optional[str]:
+    """Самое частое содержательное слово подписей (при равенстве - встретившееся раньше)."""
+    counts: Counter = Counter()
+    for caption in captions:
+        # Слово учитывается один раз на подпись
+        for word in dict.fromkeys(re.findall(r"[a-z]+", caption.lower())):
+            if len(word) > 2 and word not in STOPWORDS:
+                counts[word] += 1
+    return max(counts, key=counts.__getitem__) if counts else None
+
+
+class EmbeddingGrouper:
+    """
+    Группировка одного пакета изображений.
+
+    run() вычисляет эмбеддинги и кластеры, выдавая строки прогресса и ошибки
+    изображений (index, сообщение); затем assignments содержит номер группы
+    каждого обработанного изображения, а names - названия групп на английском.
+    """
+
+    def __init__(self, embedder, captioner, clusters: int = 0):
+        self.embedder = embedder
+        self.captioner = captioner
+        self.clusters = clusters
+        self.assignments: Dict[int, int] = {}
+        self.names: Dict[int, str] = {}
+
+    def run(self, paths: Sequence[str], check_cancelled=None) -> Generator[Union[str, Tuple[int, str]], None, None]:
+        with EmbeddingMatrix(len(paths), settings.embedding_cache_dir) as matrix:
+            indices: List[int] = []
+            for start in range(0, len(paths), settings.embedding_batch_size):
+                if check_cancelled and check_cancelled():
+                    raise GenerationCancelledError("Группировка прервана пользователем")
+                batch, batch_indices = [], []
+                for index in range(start, min(start + settings.embedding_batch_size, len(paths))):
+                    try:
+                        batch.append(self.embedder.prepare(paths[index])["pixel_values"])
+                        batch_indices.append(index)
+                    except Exception as e:
+                        logger.error("Изображение %s исключено из группировки: %s", paths[index], e)
+                        yield (index, f"Ошибка обработки: {e}")
+                if batch:
+                    embeddings = self.embedder.embed_batch(torch.cat(batch)).numpy()
+                    matrix.write(len(indices), embeddings)
+                    indices += batch_indices
+                yield f"Эмбеддинги: {len(indices)}/{len(paths)}"
+
+            if not indices:
+                return
+            # Строки неудачных изображений в конце матрицы не заполнены и не кластеризуются
+            data = matrix.data[:len(indices)]
+            k = min(self.clusters or suggest_clusters(len(indices)), len(indices))
+            logger.info("Кластеризация %s эмбеддингов (%s) на %s групп", len(indices), data.shape[1], k)
+            with stage_timer("cluster"):
+                centers = minibatch_kmeans(data, k)
+                labels, similarity = assign_clusters(data, centers)
+
+        self.assignments = {index: int(label) for index, label in zip(indices, labels)}
+        yield "Названия групп"
+        self.names = self._name_clusters(paths, indices, labels, similarity, centers, check_cancelled)
+        logger.success(
+            "Сгруппировано %s изображений: %s", len(indices),
+            ", ".join(f"{self.names[c]} ({n})" for c, n in Counter(self.assignments.values()).most_common())
+        )
+
+    def _name_clusters(self, paths, indices, labels, similarity, centers, check_cancelled) -> Dict[int, str]:
+        """Уникальные названия непустых групп по подписям изображений, ближайших к центру."""
+        names: Dict[int, str] = {}
+        used: Counter = Counter()
+        # Порядок: по номеру группы, внутри группы - по убыванию сходства с центром
+        order = sorted(range(len(indices)), key=lambda row: (labels[row], -similarity[row]))
+        members: Dict[int, List[int]] = {}
+        for row in order:
+            members.setdefault(int(labels[row]), []).append(indices[row])
+
+        for cluster, cluster_members in members.items():
+            if check_cancelled and check_cancelled():
+                raise GenerationCancelledError("Группировка прервана пользователем")
+            captions = []
+            for index in cluster_members[:NAME_SAMPLES]:
+                try:
+                    captions.append(self.captioner.generate(paths[index]))
+                except GenerationCancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Подпись для названия группы не получена (%s): %s", paths[index], e)
+            name = (
+                name_from_captions(captions)
+                or self.embedder.nearest_label(torch.from_numpy(centers[cluster]))
+                or "group"
+            )
+            used[name] += 1
+            names[cluster] = name if used[name] == 1 else f"{name} {used[name]}"
+            logger.debug("Группа %s: %s | Подписи: %s", cluster, names[cluster], captions)
+        return names
@@ -1,119 +1,154 @@
 # src/core/handlers/renaming_handler.py
-from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Generator, List
+from typing import Callable, Generator, List, Optional, Tuple
 
 from core.generators.caption_generator import CaptionGenerator
+from core.generators.governed import GovernedGenerator
+from core.generators.lazy import LazyGenerator
 from core.generators.translation_generator import TranslationGenerator
 from core.handlers.base_handler import BaseHandler
+from core.handlers.destination_index import DestinationIndex
+from core.handlers.transfer import DEFAULT_STRATEGY, TransferReport
+from core.jobs.throughput_governor import ThroughputGovernor, ThroughputTarget
 from core.utils.get_logger import logger
-from core.generators.exceptions import CaptionGenerationError, TranslationGenerationError
+from core.generators.exceptions import GenerationCancelledError, CaptionGenerationError, TranslationGenerationError
 
 
 class RenamingHandler(BaseHandler):
-    _caption_generator: CaptionGenerator = None
-    _translation_generator: TranslationGenerator = None
+    TASK = "renaming"
 
     @classmethod
-    def initialize_models(cls, caption_model: str, trans_model: str) -> None:
-        """Инициализация моделей с логированием и обработкой ошибок"""
+    def initialize_models(cls, caption_model: str, trans_model: str,
+                          check_cancelled: Optional[Callable[[], bool]] = None,
+                          throughput_target: Optional[ThroughputTarget] = None, total: int = 0) -> Tuple:
+        """
+        Инициализация генераторов задачи с логированием и обработкой ошибок.
+        Генераторы принадлежат вызывающей задаче и передаются по цепочке вызовов,
+        поэтому параллельные сессии не подменяют модели друг друга. Модели загружаются
+        при первом обращении этапа: задача, отменённая до первого изображения или
+        не требующая перевода, не загружает лишних моделей.
+        """
         try:
             logger.info(
-                f"Инициализация моделей | Генерация подписей: {caption_model} | "
-                f"Перевод: {trans_model}"
+                "Инициализация моделей | Генерация подписей: %s | "
+                "Перевод: %s",
+                caption_model, trans_model
             )
-            cls._caption_generator = CaptionGenerator(caption_model)
-            cls._translation_generator = TranslationGenerator(trans_model)
-            logger.success("Модели для переименования успешно инициализированы")
+            generators = (
+                cls._primary_generator(caption_model, check_cancelled, throughput_target, total),
+                LazyGenerator(f"translation:{trans_model}", lambda: TranslationGenerator(trans_model, should_stop=check_cancelled))
+            )
+            logger.success("Этапы переименования подготовлены (модели загружаются по первому обращению)")
+            return generators
         except Exception as e:
-            logger.critical(f"Ошибка инициализации моделей: {e}", exc_info=True)
+            logger.critical("Ошибка инициализации моделей: %s", e, exc_info=True)
             raise
 
+    @staticmethod
+    def _primary_generator(caption_model: str, check_cancelled: Optional[Callable[[], bool]],
+                           throughput_target: Optional[ThroughputTarget], total: int):
+        """Генератор основного этапа: выбранная модель либо профиль регулятора производительности"""
+        if throughput_target is None:
+            return LazyGenerator(f"caption:{caption_model}", lambda: CaptionGenerator(caption_model, should_stop=check_cancelled))
+        governor = ThroughputGovernor("captioning", caption_model, throughput_target, total)
+        return GovernedGenerator(
+            f"caption:{caption_model}",
+            governor,
+            lambda profile: CaptionGenerator(
+                profile.model_name, max_length=profile.token_limit, num_beams=profile.num_beams,
+                should_stop=check_cancelled
+            )
+        )
+
     @classmethod
     def handle_photo_generator(cls, photo_tuple: tuple, caption_model: str, 
                               trans_model: str, check_cancelled: callable, 
-                              target_language: str) -> Generator:
+                              target_language: str,
+                              throughput_target: Optional[ThroughputTarget] = None) -> Generator:
         """Обработка потока фотографий с улучшенным логированием"""
         logger.info("Запуск процесса переименования фотографий")
         try:
-            cls.initialize_models(caption_model, trans_model)
-            yield from super()._common_processing(photo_tuple, check_cancelled, target_language)
+            generators = cls.initialize_models(
+                caption_model, trans_model, check_cancelled, throughput_target, len(photo_tuple)
+            )
+            yield from super()._common_processing(photo_tuple, check_cancelled, target_language, generators)
         except Exception as e:
-            logger.error(f"Критическая ошибка в обработчике переименования: {e}", exc_info=True)
+            logger.error("Критическая ошибка в обработчике переименования: %s", e, exc_info=True)
             raise
 
     @classmethod
-    def _generate_object(cls, photo_path: str, photo_name: str) -> str:
+    def _generate_object(cls, generator: LazyGenerator, photo_path: str, photo_name: str) -> str:
         """Генерация подписи с обработкой ошибок"""
-        logger.debug(f"Генерация подписи для {photo_name}")
+        logger.debug("Генерация подписи для %s", photo_name)
         try:
-            caption = cls._caption_generator.generate(photo_path, photo_name)
-            logger.debug(f"Сгенерирована подпись для {photo_name}: {caption}")
+            caption = generator.generate(photo_path, photo_name)
+            logger.debug("Сгенерирована подпись для %s: %s", photo_name, caption)
             return caption
+        except GenerationCancelledError:
+            raise
         except CaptionGenerationError as e:
-            logger.error(f"Ошибка генерации подписи для {photo_name}: {e}", exc_info=True)
+            logger.error("Ошибка генерации подписи для %s: %s", photo_name, e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Непредвиденная ошибка генерации подписи: {e}", exc_info=True)
+            logger.error("Непредвиденная ошибка генерации подписи: %s", e, exc_info=True)
             raise CaptionGenerationError("Ошибка создания подписи") from e
 
     @classmethod
-    def _translate_object(cls, generated_object: str, target_lang: str) -> str:
+    def _translate_object(cls, translator: LazyGenerator, generated_object: str, target_lang: str) -> str:
         """Перевод подписи с логированием"""
-        logger.debug(f"Перевод подписи '{generated_object}' на {target_lang}")
+        logger.debug("Перевод подписи '%s' на %s", generated_object, target_lang)
         try:
-            translation = cls._translation_generator.generate(generated_object, "en_XX", target_lang)
-            logger.debug(f"Перевод завершен: '{generated_object}' -> '{translation}'")
+            translation = cls._cached_translate(translator, generated_object, "en_XX", target_lang)
+            logger.debug("Перевод завершен: '%s' -> '%s'", generated_object, translation)
             return translation
+        except GenerationCancelledError:
+            raise
         except TranslationGenerationError as e:
-            logger.error(f"Ошибка перевода '{generated_object}': {e}", exc_info=True)
+            logger.error("Ошибка перевода '%s': %s", generated_object, e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Непредвиденная ошибка перевода: {e}", exc_info=True)
+            logger.error("Непредвиденная ошибка перевода: %s", e, exc_info=True)
             raise TranslationGenerationError("Ошибка перевода подписи") from e
 
     @classmethod
-    def save_photo(cls, new_names: List[str], photo_paths: List[str], save_dir: str) -> List[str]:
+    def save_photo(cls, new_names: List[str], photo_paths: List[str], save_dir: str,
+                   strategy: str = DEFAULT_STRATEGY) -> List[str]:
         """Сохранение переименованных файлов с улучшенным логированием"""
-        logger.info(f"Сохранение {len(photo_paths)} файлов в {save_dir}")
+        logger.info("Сохранение %s файлов в %s | Стратегия: %s", len(photo_paths), save_dir, strategy)
         
         try:
             save_path = Path(save_dir)
             if len(photo_paths) > 1:
                 save_path /= 'renamed_photos'
-                logger.debug(f"Использование групповой директории: {save_path}")
+                logger.debug("Использование групповой директории: %s", save_path)
 
-            logger.debug("Проверка и создание директории для сохранения")
-            save_path.mkdir(parents=True, exist_ok=True)
-            
             photo_paths = [Path(p) for p in photo_paths]
-            name_counter = defaultdict(int)
+            index = DestinationIndex()
             results = []
+            report = TransferReport()
+
+            # Свободные имена назначаются заранее с учётом файлов, уже лежащих в директории
+            tasks = []
+            for new_name, path in zip(new_names, photo_paths):
+                try:
+                    dest = index.reserve(save_path, new_name.strip(), path.suffix)
+                    logger.debug("Подготовка к копированию: %s -> %s", path.name, dest.name)
+                    tasks.append((path, dest))
+                except Exception as e:
+                    error_msg = f"Ошибка подготовки файла {path.name}: {e}"
+                    logger.error(error_msg, exc_info=True)
+                    results.append(error_msg)
+
+            logger.debug("Проверка и создание директории для сохранения")
+            index.create_directories()
             
             with ThreadPoolExecutor() as executor:
-                futures = []
-                logger.info(f"Запуск пула потоков для {len(photo_paths)} задач копирования")
-
-                for new_name, path in zip(new_names, photo_paths):
-                    try:
-                        base_name = new_name.strip()
-                        name_counter[base_name] += 1
-                        count = name_counter[base_name]
-                        
-                        final_name = f"{base_name} {count}" if count > 1 else base_name
-                        dest = save_path / f"{final_name}{path.suffix}"
-                        
-                        logger.debug(f"Подготовка к копированию: {path.name} -> {dest.name}")
-                        futures.append(executor.submit(
-                            cls._safe_copy_file,
-                            path,
-                            dest
-                        ))
-                    except Exception as e:
-                        error_msg = f"Ошибка подготовки файла {path.name}: {e}"
-                        logger.error(error_msg, exc_info=True)
-                        results.append(error_msg)
+                logger.info("Запуск пула потоков для %s задач копирования", len(tasks))
+                futures = [
+                    executor.submit(cls._safe_transfer_file, path, dest, strategy, report)
+                    for path, dest in tasks
+                ]
 
                 # Обработка результатов выполнения задач
                 for future in as_completed(futures):
@@ -126,13 +161,15 @@ class RenamingHandler(BaseHandler):
                         logger.error(error_msg, exc_info=True)
                         results.append(error_msg)
 
+            report.log()
             success_count = sum(1 for r in results if "Успешно" in r)
             logger.success(
-                f"Сохранение завершено | Успешно: {success_count} | "
-                f"С ошибками: {len(results) - success_count}"
+                "Сохранение завершено | Успешно: %s | "
+                "С ошибками: %s",
+                success_count, len(results) - success_count
             )
             return results
 
         except Exception as e:
-            logger.critical(f"Критическая ошибка при сохранении: {e}", exc_info=True)
+            logger.critical("Критическая ошибка при сохранении: %s", e, exc_info=True)
             raise
\ No newline at end of file
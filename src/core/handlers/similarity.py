@@ -0,0 +1,113 @@
+# src/core/handlers/similarity.py
+"""
+Наполнение индекса похожих изображений и запросы к нему.
+
+При settings.similarity_index обработчики передают каждое обработанное изображение
+SimilarityRecorder: эмбеддинги считаются пакетами моделью settings.similarity_model и
+дописываются в индекс вместе с результатом обработки, а при сохранении результатов
+строка индекса переносится на путь сохранённого файла. Запрос по изображению из
+индекса модель не запускает - используется сохранённый эмбеддинг.
+"""
+
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from core.generators.classifier_generator import ClassifierGenerator
+from core.generators.lazy import LazyGenerator
+from core.utils.get_logger import logger
+from core.utils.settings import settings
+from core.utils.similarity_index import similarity_index
+
+
+def _embedder() -> LazyGenerator:
+    model_name = settings.similarity_model
+    return LazyGenerator(f"classification:{model_name}", lambda: ClassifierGenerator(model_name))
+
+
+def index_images(paths: Sequence[str], texts: Optional[Sequence[str]] = None,
+                 embedder: Optional[LazyGenerator] = None) -> List[Tuple[str, str]]:
+    """Вычисление эмбеддингов изображений пакетами и вставка в индекс; возвращает ошибки (путь, сообщение)."""
+    embedder = embedder or _embedder()
+    texts = list(texts) if texts is not None else [""] * len(paths)
+    errors = []
+    for start in range(0, len(paths), settings.embedding_batch_size):
+        batch, batch_paths, batch_texts = [], [], []
+        for path, text in zip(paths[start:start + settings.embedding_batch_size],
+                              texts[start:start + settings.embedding_batch_size]):
+            try:
+                batch.append(embedder.prepare(path)["pixel_values"])
+                batch_paths.append(os.path.abspath(path))
+                batch_texts.append(text)
+            except Exception as e:
+                errors.append((path, str(e)))
+        if batch:
+            vectors = embedder.embed_batch(torch.cat(batch)).numpy()
+            similarity_index.add(batch_paths, vectors, settings.similarity_model, batch_texts)
+    return errors
+
+
+class SimilarityRecorder:
+    """Запись обработанных изображений задачи в индекс пакетами по settings.embedding_batch_size."""
+
+    def __init__(self):
+        self._embedder = _embedder()
+        self._buffer: List[Tuple[str, str]] = []
+        self.indexed = 0
+
+    def record(self, path: str, text: str) -> None:
+        self._buffer.append((path, text))
+        if len(self._buffer) >= settings.embedding_batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Запись накопленных изображений; ошибка индекса не прерывает обработку задачи."""
+        if not self._buffer:
+            return
+        paths, texts = zip(*self._buffer)
+        self._buffer.clear()
+        try:
+            errors = index_images(paths, texts, self._embedder)
+            self.indexed += len(paths) - len(errors)
+            for path, error in errors:
+                logger.warning("Изображение не добавлено в индекс похожих: %s | %s", path, error)
+        except Exception as e:
+            logger.error("Ошибка записи в индекс похожих изображений: %s", e, exc_info=True)
+
+
+def relocate(source: str, destination: str) -> None:
+    """Перенос строки индекса на путь сохранённого файла (без записи индекса - ничего)."""
+    if not settings.similarity_index:
+        return
+    try:
+        similarity_index.relocate(os.path.abspath(source), os.path.abspath(destination))
+    except Exception as e:
+        logger.warning("Не удалось перенести строку индекса %s -> %s: %s", source, destination, e)
+
+
+def query_vector(image_path: str) -> np.ndarray:
+    """Эмбеддинг запроса: сохранённый в индексе либо вычисленный моделью индекса."""
+    vector = similarity_index.vector(os.path.abspath(image_path))
+    if vector is not None:
+        return vector
+    embedder = _embedder()
+    return embedder.embed_batch(embedder.prepare(image_path)["pixel_values"]).numpy()[0]
+
+
+def find_similar(image_path: str, k: int = 12) -> List[dict]:
+    """
+    Top-k похожих изображений (путь, сходство, результат обработки) без самого запроса.
+    Строки удалённых с диска файлов исключаются из индекса при обнаружении.
+    """
+    vector = query_vector(image_path)
+    exclude = os.path.abspath(image_path)
+    while True:
+        found = similarity_index.search(vector, k, exclude=exclude)
+        missing = [path for path, _, _ in found if not os.path.exists(path)]
+        for path in missing:
+            similarity_index.remove(path)
+        if not missing:
+            return [{"path": path, "score": round(score, 4), "text": text} for path, score, text in found]
+        logger.info("Удалено из индекса похожих %s отсутствующих файлов", len(missing))
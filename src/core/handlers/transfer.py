@@ -0,0 +1,235 @@
+# src/core/handlers/transfer.py
+"""
+Стратегии переноса файлов при сохранении результатов.
+
+  - rename: перемещение исходного файла (без копирования данных, исходник исчезает);
+  - hardlink: жёсткая ссылка на исходный файл (данные общие, место не расходуется);
+  - reflink: клонирование блоков через ioctl FICLONE (Btrfs, XFS, bcachefs) - копия
+    без записи данных, изменения копии не затрагивают исходник;
+  - copy_file_range: копирование внутри ядра (copy_file_range/sendfile) без
+    передачи данных через пространство пользователя;
+  - copy: обычное копирование.
+
+При недоступности стратегии (другая файловая система, нет поддержки в ФС или ОС)
+выполняется переход к следующей по цепочке FALLBACKS. Копирующие стратегии пишут
+во временный файл в директории назначения и публикуют его атомарно, поэтому
+прерванная запись не оставляет обрезанных файлов под итоговым именем.
+"""
+
+import errno
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.utils.get_logger import logger
+from core.utils.metrics import TRANSFER_BYTES_TOTAL, TRANSFER_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# _IOW(0x94, 9, int) из linux/fs.h
+FICLONE = 0x40049409
+
+DEFAULT_STRATEGY = "copy"
+
+# Следующая стратегия при невозможности выполнить текущую
+FALLBACKS: Dict[str, Optional[str]] = {
+    "rename": "copy_file_range",
+    "hardlink": "reflink",
+    "reflink": "copy_file_range",
+    "copy_file_range": "copy",
+    "copy": None,
+}
+
+# Ошибки "операция не поддерживается для этих файлов" - повод перейти к запасной стратегии
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EPERM, errno.EINVAL, errno.ENOTTY, errno.ENOSYS,
+    errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EMLINK,
+}
+
+_CHUNK_SIZE = 1 << 30
+
+
+class TransferUnsupported(OSError):
+    """Стратегия неприменима к паре файлов (другая ФС, нет поддержки)."""
+
+
+@dataclass
+class TransferResult:
+    requested: str
+    strategy: str
+    bytes_moved: int
+    seconds: float
+
+
+class TransferReport:
+    """Потокобезопасная сводка по сохранению: число файлов, байты и время по стратегиям."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+
+    def add(self, result: TransferResult) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(result.strategy, {"files": 0, "bytes": 0, "seconds": 0.0})
+            stats["files"] += 1
+            stats["bytes"] += result.bytes_moved
+            stats["seconds"] += result.seconds
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                strategy: {**stats, "seconds": round(stats["seconds"], 3)}
+                for strategy, stats in self._stats.items()
+            }
+
+    def log(self) -> None:
+        for strategy, stats in self.summary().items():
+            logger.info(
+                "Стратегия %s | Файлов: %s | Записано: %.1f MB | Время: %.2fс",
+                strategy, stats["files"], stats["bytes"] / 1024 ** 2, stats["seconds"]
+            )
+
+
+def _is_unsupported(error: OSError) -> bool:
+    return isinstance(error, TransferUnsupported) or error.errno in _UNSUPPORTED_ERRNOS
+
+
+def _publish(tmp_path: str, dest: Path) -> None:
+    """Атомарная публикация временного файла под итоговым именем без перезаписи существующего."""
+    try:
+        os.link(tmp_path, dest)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        if not _is_unsupported(e):
+            raise
+        # ФС без жёстких ссылок: os.rename на Windows не перезаписывает, на POSIX проверяем заранее
+        if os.name != "nt" and dest.exists():
+            raise FileExistsError(errno.EEXIST, "Файл уже существует", str(dest))
+        os.rename(tmp_path, dest)
+        return
+    os.unlink(tmp_path)
+
+
+def _write_via_temp(src: Path, dest: Path, writer) -> int:
+    """Запись во временный файл рядом с dest и атомарная публикация; возвращает число байт."""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{dest.name}.", suffix=".part", dir=dest.parent)
+    try:
+        with open(src, "rb") as fsrc, os.fdopen(fd, "wb") as fdst:
+            written = writer(fsrc, fdst)
+        shutil.copymode(src, tmp_path)
+        _publish(tmp_path, dest)
+        return written
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _reflink(fsrc, fdst) -> int:
+    if fcntl is None:
+        raise TransferUnsupported(errno.ENOTSUP, "FICLONE недоступен на этой платформе")
+    fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    # Данные не копируются: блоки разделяются до первого изменения
+    return 0
+
+
+def _kernel_copy(fsrc, fdst) -> int:
+    size = os.fstat(fsrc.fileno()).st_size
+    in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+    copied = 0
+    copy = getattr(os, "copy_file_range", None)
+    if copy is None:
+        copy = getattr(os, "sendfile", None)
+        if copy is None:
+            raise TransferUnsupported(errno.ENOSYS, "copy_file_range/sendfile недоступны")
+        copy = lambda i, o, count: os.sendfile(o, i, None, count)
+    try:
+        while copied < size:
+            sent = copy(in_fd, out_fd, min(_CHUNK_SIZE, size - copied))
+            if sent == 0:
+                break
+            copied += sent
+    except OSError as e:
+        if copied == 0 and _is_unsupported(e):
+            raise TransferUnsupported(e.errno, str(e)) from e
+        raise
+    return copied
+
+
+def _plain_copy(fsrc, fdst) -> int:
+    shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+    return fdst.tell()
+
+
+def _run_strategy(strategy: str, src: Path, dest: Path) -> int:
+    if strategy == "rename":
+        try:
+            # Ссылка + удаление исходника - атомарный перенос без перезаписи существующего файла
+            os.link(src, dest)
+        except FileExistsError:
+            raise
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                raise
+            if os.name != "nt" and dest.exists():
+                raise FileExistsError(errno.EEXIST, "Файл уже существует", str(dest))
+            os.rename(src, dest)
+            return 0
+        os.unlink(src)
+        return 0
+    if strategy == "hardlink":
+        os.link(src, dest)
+        return 0
+    if strategy == "reflink":
+        return _write_via_temp(src, dest, _reflink)
+    if strategy == "copy_file_range":
+        return _write_via_temp(src, dest, _kernel_copy)
+    if strategy == "copy":
+        return _write_via_temp(src, dest, _plain_copy)
+    raise ValueError(f"Неизвестная стратегия сохранения: {strategy}")
+
+
+def transfer_file(src: Path, dest: Path, strategy: str = DEFAULT_STRATEGY) -> TransferResult:
+    """
+    Перенос src в dest выбранной стратегией с автоматическим переходом на запасные.
+    Существующий dest не перезаписывается (FileExistsError).
+    """
+    if strategy not in FALLBACKS:
+        raise ValueError(f"Неизвестная стратегия сохранения: {strategy}")
+
+    requested = strategy
+    source_removed = False
+    start = time.perf_counter()
+    while True:
+        try:
+            moved = _run_strategy(strategy, src, dest)
+            break
+        except FileExistsError:
+            raise
+        except OSError as e:
+            fallback = FALLBACKS[strategy]
+            if fallback is None or not _is_unsupported(e):
+                raise
+            logger.debug("Стратегия %s недоступна для %s (%s), переход к %s", strategy, src.name, e, fallback)
+            # Перемещение между файловыми системами - копия с последующим удалением исходника
+            source_removed = source_removed or strategy == "rename"
+            strategy = fallback
+
+    if source_removed:
+        os.unlink(src)
+    elapsed = time.perf_counter() - start
+
+    TRANSFER_BYTES_TOTAL.labels(strategy).inc(moved)
+    TRANSFER_SECONDS.labels(strategy).observe(elapsed)
+    return TransferResult(requested, strategy, moved, elapsed)
@@ -0,0 +1,13 @@
+# src/core/jobs/exceptions.py
+
+class JobError(Exception):
+    """Базовое исключение менеджера задач."""
+    pass
+
+class QueueFullError(JobError):
+    """Исключение, возникающее при переполнении очереди задач."""
+    pass
+
+class JobNotFoundError(JobError):
+    """Исключение, возникающее при обращении к неизвестной задаче."""
+    pass
@@ -0,0 +1,237 @@
+# src/core/jobs/job_manager.py
+"""
+Менеджер задач обработки: изоляция по сессиям, ограниченная общая очередь,
+лимиты параллельности на модель и справедливое распределение между сессиями.
+
+Задача ставится в очередь вызовом submit() и ждёт своей очереди в wait_turn().
+Планировщик обходит сессии по кругу: первой рассматривается сессия, дольше всех
+не получавшая слот, из неё берётся первая задача, для которой свободны все её модели.
+Поэтому пользователь с сотней задач не блокирует пользователя с одной.
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from core.jobs.exceptions import JobNotFoundError, QueueFullError
+from core.ui.logic.processing_state import ProcessingState
+from core.utils.get_logger import logger
+from core.utils.metrics import JOB_QUEUE_WAIT_SECONDS, JOBS_QUEUED, JOBS_RUNNING, JOBS_TOTAL
+from core.utils.settings import settings
+
+DEFAULT_SESSION = "local"
+
+T = TypeVar("T")
+
+
+class Job:
+    """Задача обработки одной сессии со своим состоянием отмены."""
+
+    def __init__(self, session_id: str, task: str, models: Tuple[str, ...]):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.task = task
+        self.models = tuple(model for model in models if model)
+        self.state = ProcessingState()
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._started = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.state.is_cancelled
+
+    def cancel(self) -> None:
+        if not self.state.is_cancelled:
+            self.state.set_cancellation_state(True)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "task": self.task,
+            "models": list(self.models),
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Общая очередь задач всех сессий."""
+
+    def __init__(self, max_queued: int, max_running: int, model_concurrency: int):
+        self.max_queued = max_queued
+        self.max_running = max_running
+        self.model_concurrency = model_concurrency
+        self._lock = threading.Lock()
+        # Очереди ожидающих задач по сессиям и номер последнего обслуживания сессии
+        self._sessions: Dict[str, Deque[Job]] = {}
+        self._last_served: Dict[str, int] = {}
+        self._tick = 0
+        self._jobs: Dict[str, Job] = {}
+        self._running: Dict[str, Job] = {}
+        self._model_load: Dict[str, int] = {}
+        self._queued = 0
+
+    # --- Постановка и ожидание -------------------------------------------------
+
+    def submit(self, session_id: Optional[str], task: str, models: Iterable[str]) -> Job:
+        """Ставит задачу в очередь сессии; при переполнении общей очереди - QueueFullError."""
+        job = Job(session_id or DEFAULT_SESSION, task, tuple(models))
+        with self._lock:
+            if self._queued >= self.max_queued:
+                logger.warning("Очередь задач заполнена (%s), задача %s отклонена", self.max_queued, task)
+                raise QueueFullError(f"Очередь задач заполнена: {self.max_queued}")
+            self._sessions.setdefault(job.session_id, deque()).append(job)
+            self._jobs[job.id] = job
+            self._queued += 1
+            self._schedule()
+        logger.info(
+            "Задача %s поставлена в очередь | Сессия: %s | Тип: %s | Модели: %s",
+            job.id, job.session_id, task, job.models
+        )
+        return job
+
+    def wait_turn(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Ожидание запуска задачи; False - истёк таймаут (задача остаётся в очереди)."""
+        return job._started.wait(timeout)
+
+    def position(self, job: Job) -> int:
+        """Примерная позиция задачи в общей очереди (1 - следующая), 0 - уже запущена."""
+        with self._lock:
+            if job.status != "queued":
+                return 0
+            ahead = 0
+            for jobs in self._sessions.values():
+                for queued in jobs:
+                    if queued is job:
+                        break
+                    if queued.created_at <= job.created_at:
+                        ahead += 1
+            return ahead + 1
+
+    # --- Завершение и отмена ---------------------------------------------------
+
+    def finish(self, job: Job, status: Optional[str] = None) -> None:
+        """Освобождает слоты задачи (или убирает её из очереди) и запускает следующие."""
+        with self._lock:
+            if job.finished_at is not None:
+                return
+            if job.status == "queued":
+                self._remove_queued(job)
+                status = status or "cancelled"
+            elif job.id in self._running:
+                del self._running[job.id]
+                for model in job.models:
+                    self._model_load[model] -= 1
+            job.status = status or ("cancelled" if job.is_cancelled else "done")
+            job.finished_at = time.time()
+            self._jobs.pop(job.id, None)
+            if not any(other.session_id == job.session_id for other in self._jobs.values()):
+                self._last_served.pop(job.session_id, None)
+            # Будим ожидающих при отмене в очереди
+            job._started.set()
+            self._schedule()
+        JOBS_TOTAL.labels(job.status).inc()
+        logger.info("Задача %s завершена со статусом %s", job.id, job.status)
+
+    def cancel(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"Задача не найдена: {job_id}")
+        job.cancel()
+        if job.status == "queued":
+            self.finish(job, "cancelled")
+        return job
+
+    def cancel_session(self, session_id: Optional[str]) -> List[Job]:
+        """Отмена всех активных задач сессии; задачи других сессий не затрагиваются."""
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.session_id == session_id]
+        for job in jobs:
+            self.cancel(job.id)
+        logger.info("Отменено задач сессии %s: %s", session_id, len(jobs))
+        return jobs
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"Задача не найдена: {job_id}")
+        return job
+
+    # --- Планирование ------------------------------------------------------------
+
+    def _remove_queued(self, job: Job) -> None:
+        jobs = self._sessions.get(job.session_id)
+        if jobs is not None and job in jobs:
+            jobs.remove(job)
+            self._queued -= 1
+            if not jobs:
+                del self._sessions[job.session_id]
+
+    def _can_start(self, job: Job) -> bool:
+        return all(self._model_load.get(model, 0) < self.model_concurrency for model in job.models)
+
+    def _schedule(self) -> None:
+        """Запуск задач по кругу сессий, пока есть свободные слоты (под self._lock)."""
+        while len(self._running) < self.max_running and self._sessions:
+            started = None
+            for session_id in sorted(self._sessions, key=lambda session: self._last_served.get(session, 0)):
+                started = next((job for job in self._sessions[session_id] if self._can_start(job)), None)
+                if started is not None:
+                    break
+            if started is None:
+                return
+
+            self._remove_queued(started)
+            self._tick += 1
+            self._last_served[started.session_id] = self._tick
+            self._running[started.id] = started
+            for model in started.models:
+                self._model_load[model] = self._model_load.get(model, 0) + 1
+
+            started.status = "running"
+            started.started_at = time.time()
+            JOB_QUEUE_WAIT_SECONDS.observe(started.started_at - started.created_at)
+            started._started.set()
+            logger.debug("Запуск задачи %s (сессия %s)", started.id, started.session_id)
+
+    # --- Модели ------------------------------------------------------------------
+
+    def models_in_use(self) -> List[str]:
+        """Модели выполняющихся задач."""
+        with self._lock:
+            return [model for model, load in self._model_load.items() if load > 0]
+
+    def run_if_idle(self, model: str, action: Callable[[], T]) -> Optional[T]:
+        """
+        Выполняет action, если модель не используется ни одной выполняющейся задачей;
+        на время выполнения запуск новых задач приостанавливается. None - модель занята.
+        """
+        with self._lock:
+            if self._model_load.get(model, 0) > 0:
+                return None
+            return action()
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+
+# Глобальный менеджер задач: лимиты берутся из настроек, заданных в main.py до импорта интерфейса
+job_manager = JobManager(settings.max_queued_jobs, settings.max_running_jobs, settings.model_concurrency)
+
+JOBS_QUEUED.labels().set_function(lambda: job_manager.queued)
+JOBS_RUNNING.labels().set_function(lambda: job_manager.running)
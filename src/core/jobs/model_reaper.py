@@ -0,0 +1,117 @@
+# src/core/jobs/model_reaper.py
+"""
+Выгрузка простаивающих моделей.
+
+Модели загружаются при первом обращении этапа конвейера и остаются в кэше
+создателя. Фоновый поток периодически проверяет время последнего использования
+каждой загруженной модели: модели выполняющихся задач считаются используемыми,
+а модель, простаивающая дольше settings.model_idle_ttl секунд, выгружается вместе
+с её сервером пакетирования, препроцессором и кэшем переводов. Выгрузка идёт под
+блокировкой менеджера задач, поэтому задача не может начать работу с моделью,
+которая в этот момент выгружается; следующая задача загрузит её заново.
+"""
+
+import gc
+import threading
+from typing import Optional, Tuple, Type
+
+import torch
+
+from core.creators.base_creator import BaseCreator
+from core.creators.captioning_model_creator import CaptioningModelCreator
+from core.creators.classification_model_creator import ClassificationModelCreator
+from core.creators.segmentation_model_creator import SegmentationModelCreator
+from core.creators.translation_model_creator import TranslationModelCreator
+from core.generators.batching import release_batching_servers
+from core.generators.preprocessing import release_batch_preprocessor
+from core.generators.translation_generator import TranslationGenerator
+from core.jobs.job_manager import job_manager
+from core.utils.get_logger import logger
+from core.utils.metrics import MODEL_UNLOADS_TOTAL
+
+CREATORS: Tuple[Tuple[str, Type[BaseCreator]], ...] = (
+    ("captioning", CaptioningModelCreator),
+    ("segmentation", SegmentationModelCreator),
+    ("classification", ClassificationModelCreator),
+    ("translation", TranslationModelCreator),
+)
+
+
+class ModelReaper:
+    """Фоновый поток выгрузки моделей, не используемых дольше ttl секунд."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.interval = max(1.0, min(ttl / 4, 30.0))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="model-reaper", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info("Выгрузка простаивающих моделей через %.0fс (проверка каждые %.0fс)", self.ttl, self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error("Ошибка выгрузки простаивающих моделей: %s", e, exc_info=True)
+
+    def sweep(self) -> int:
+        """Один проход проверки; возвращает число выгруженных моделей."""
+        in_use = set(job_manager.models_in_use())
+        unloaded = 0
+        for kind, creator in CREATORS:
+            for cache_key in creator.loaded_keys():
+                model_name = cache_key[0]
+                if model_name in in_use:
+                    creator.touch(cache_key)
+                    continue
+                if creator.idle_seconds(cache_key) < self.ttl:
+                    continue
+                components = job_manager.run_if_idle(model_name, lambda: creator.unload(cache_key))
+                if components is None:
+                    continue
+                self._release(kind, components)
+                unloaded += 1
+        if unloaded:
+            self._collect_memory()
+        return unloaded
+
+    @staticmethod
+    def _release(kind: str, components: tuple) -> None:
+        """Освобождает ресурсы, удерживающие ссылки на компоненты выгруженной модели."""
+        servers = 0
+        for component in components:
+            servers += release_batching_servers(component)
+            release_batch_preprocessor(component)
+        if kind == "translation":
+            # Кэш переводов хранит ссылки на экземпляры генераторов, а через них на модель
+            TranslationGenerator.generate.cache_clear()
+            TranslationGenerator.generate_many.cache_clear()
+        MODEL_UNLOADS_TOTAL.labels(kind).inc()
+        logger.debug("Ресурсы выгруженной модели (%s) освобождены | Серверов пакетирования: %s", kind, servers)
+
+    @staticmethod
+    def _collect_memory() -> None:
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+_reaper: Optional[ModelReaper] = None
+
+
+def start_model_reaper(ttl: float) -> Optional[ModelReaper]:
+    """Запускает фоновую выгрузку (ttl <= 0 - модели остаются загруженными)."""
+    global _reaper
+    if ttl <= 0:
+        logger.info("Выгрузка простаивающих моделей выключена")
+        return None
+    if _reaper is None:
+        _reaper = ModelReaper(ttl)
+        _reaper.start()
+    return _reaper
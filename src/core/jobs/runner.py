@@ -0,0 +1,152 @@
+# src/core/jobs/runner.py
+"""
+Фоновое выполнение задачи для программного API.
+
+Задача выполняется тем же стеком обработчиков и генераторов, что и вкладки
+интерфейса, но в отдельном потоке. Результаты по изображениям передаются через
+ограниченный журнал событий с последовательными id:
+  - каждый читатель идёт по журналу своим курсором, поэтому несколько читателей
+    получают все события, а переподключившийся клиент продолжает с Last-Event-ID;
+  - после доставки событие хранится ещё settings.api_result_buffer событий,
+    чтобы его можно было повторить клиенту, отключившемуся при отправке;
+  - если недоставленных событий api_result_buffer, поток обработки ждёт читателя
+    (обратное давление), а после settings.api_stall_timeout секунд без чтения
+    задача отменяется. Неограниченного накопления результатов нет.
+"""
+
+import shutil
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Type, Union
+
+from core.handlers.base_handler import BaseHandler
+from core.jobs.job_manager import Job, job_manager
+from core.utils.get_logger import logger
+from core.utils.settings import settings
+
+END_EVENT = "end"
+
+
+class JobRunner:
+    """Выполнение одной задачи API с потоковой выдачей результатов."""
+
+    def __init__(self, job: Job, handler: Type[BaseHandler], paths: List[str], primary_model: str,
+                 translation_model: str, target_language: Union[str, List[str]], cleanup_dir: Optional[str] = None):
+        self.job = job
+        self.handler = handler
+        self.paths = paths
+        self.primary_model = primary_model
+        self.translation_model = translation_model
+        self.target_language = target_language
+        self.cleanup_dir = cleanup_dir
+        self.total = len(paths)
+        self.completed = 0
+        self.errors = 0
+        self.buffer = max(1, settings.api_result_buffer)
+        # Журнал событий: недоставленные и последние buffer доставленных
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._last_id = 0
+        # Наибольший id, доставленный хотя бы одному читателю
+        self._delivered = 0
+        self._condition = threading.Condition()
+        self.finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-{job.id[:8]}", daemon=True)
+
+    def start(self) -> "JobRunner":
+        self._thread.start()
+        return self
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.job.to_dict(),
+            "total": self.total,
+            "completed": self.completed,
+            "errors": self.errors,
+            "buffered": self._last_id - self._delivered,
+            "queue_position": job_manager.position(self.job),
+        }
+
+    def _put(self, event: Dict[str, Any], wait: bool = True) -> bool:
+        """
+        Запись события в журнал. wait - ждать, пока недоставленных событий меньше
+        buffer; False - читатель пропал, задача отменена. Служебные события error
+        и end записываются без ожидания.
+        """
+        with self._condition:
+            if wait and not self._condition.wait_for(
+                lambda: self._last_id - self._delivered < self.buffer, settings.api_stall_timeout
+            ):
+                logger.warning(
+                    "Задача %s: результаты не читаются %s с, задача отменяется",
+                    self.job.id, settings.api_stall_timeout
+                )
+                self.job.cancel()
+                return False
+            self._last_id += 1
+            self._events.append({"id": self._last_id, **event})
+            self._condition.notify_all()
+            return True
+
+    def read(self, after: int, timeout: float) -> List[Dict[str, Any]]:
+        """
+        События с id больше after (ожидание до timeout секунд). Если часть из них
+        уже вытеснена из журнала, возвращаются сохранившиеся.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id > after, timeout)
+            return [event for event in self._events if event["id"] > after]
+
+    def acknowledge(self, event_id: int) -> None:
+        """Событие доставлено читателю: освобождает место для записи и вытесняет старые события."""
+        with self._condition:
+            if event_id <= self._delivered:
+                return
+            self._delivered = min(event_id, self._last_id)
+            while self._events and self._events[0]["id"] <= self._delivered - self.buffer:
+                self._events.popleft()
+            self._condition.notify_all()
+
+    def _result_event(self, index: int, value: Any) -> Dict[str, Any]:
+        event = {"event": "result", "index": index, "path": self.paths[index]}
+        if isinstance(value, tuple):
+            self.completed += 1
+            event["original"], event["result"] = value
+        else:
+            self.errors += 1
+            event["error"] = value
+        return event
+
+    def _run(self) -> None:
+        job = self.job
+        status = None
+        try:
+            job_manager.wait_turn(job)
+            if job.is_cancelled:
+                return
+            self._put({"event": "status", "status": job.status, "started_at": job.started_at})
+
+            results = self.handler.handle_photo_generator(
+                self.paths,
+                self.primary_model,
+                self.translation_model,
+                lambda: job.is_cancelled,
+                self.target_language
+            )
+            for result in results:
+                if isinstance(result, tuple) and len(result) == 2 and 0 <= result[0] < self.total:
+                    if not self._put(self._result_event(*result)):
+                        break
+        except Exception as e:
+            status = "failed"
+            logger.error("Ошибка выполнения задачи %s: %s", job.id, e, exc_info=True)
+            self._put({"event": "error", "message": str(e)}, wait=False)
+        finally:
+            job_manager.finish(job, status)
+            if self.cleanup_dir:
+                shutil.rmtree(self.cleanup_dir, ignore_errors=True)
+            self.finished.set()
+            # Событие завершения не блокирует поток и остаётся в журнале для переподключения
+            self._put(self.end_event(), wait=False)
+
+    def end_event(self) -> Dict[str, Any]:
+        return {"event": END_EVENT, **self.status()}
@@ -0,0 +1,176 @@
+# src/core/jobs/throughput_governor.py
+"""
+Регулятор производительности задачи.
+
+Пользователь задаёт цель вместо выбора модели наугад: скорость («не меньше 5 изобр./с»)
+и/или срок («обработать пакет за 60 минут»). Регулятор строит лестницу профилей
+генерации от лучшего качества к самому дешёвому: большая модель семейства с лучевым
+поиском, она же с жадным поиском, базовая модель (SMALLER_MODEL_VARIANTS) с лучевым и
+жадным поиском и, наконец, базовая модель с сокращённым лимитом токенов.
+
+Скорость измеряется окнами по несколько изображений: интервал между соседними
+вызовами генерации покрывает всю обработку изображения (декодирование, генерацию,
+перевод). После каждого окна регулятор сравнивает измеренную скорость профиля с
+требуемой (для срока - оставшиеся изображения на оставшееся время): медленный профиль
+сменяется более дешёвым, а при запасе скорости регулятор поднимается на ступень выше,
+если скорость верхнего профиля (измеренная либо оценённая) покрывает цель с запасом.
+Измеренная скорость верхнего профиля, не справившегося с целью, не даёт вернуться на
+него, пока требуемая скорость не снизится, поэтому профили не переключаются по кругу.
+
+Размер пакета регулятором не меняется: сервер пакетирования общий для всех сессий
+(settings.batch_max_size), а изображения одной задачи обрабатываются по очереди.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from core.constants.models import CAPTIONING_MODEL_NAMES, SEGMENTATION_MODEL_NAMES, SMALLER_MODEL_VARIANTS
+from core.utils.get_logger import logger
+from core.utils.metrics import GOVERNOR_SWITCHES_TOTAL
+
+# Модели и лимиты токенов (полный, сокращённый) по видам генерации
+MODEL_NAMES = {"captioning": CAPTIONING_MODEL_NAMES, "segmentation": SEGMENTATION_MODEL_NAMES}
+TOKEN_LIMITS = {"captioning": (50, 30), "segmentation": (512, 256)}
+# Изображений в окне измерения скорости
+WINDOW = 4
+# Оценка замедления на ступень вверх (для ещё не измеренного профиля) и требуемый запас скорости
+STEP_COST = 1.6
+HEADROOM = 1.15
+
+
+@dataclass(frozen=True)
+class ThroughputTarget:
+    """Цель задачи: скорость (изобр./с) и/или срок (с) на весь пакет; 0 - не задано."""
+
+    rate: float = 0.0
+    deadline: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 or self.deadline > 0
+
+    @classmethod
+    def from_inputs(cls, rate: Optional[float], minutes: Optional[float]) -> Optional["ThroughputTarget"]:
+        """Цель из полей интерфейса (скорость и срок в минутах); None - режим выключен."""
+        target = cls(max(0.0, float(rate or 0)), max(0.0, float(minutes or 0)) * 60)
+        return target if target.enabled else None
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Ступень лестницы: модель и параметры декодирования."""
+
+    model_name: str
+    num_beams: int
+    token_limit: int
+
+    def __str__(self) -> str:
+        return f"{self.model_name} (beams={self.num_beams}, tokens={self.token_limit})"
+
+
+def build_ladder(kind: str, model_name: str) -> List[Profile]:
+    """Профили семейства выбранной модели от лучшего качества к самому дешёвому."""
+    larger = {small: large for large, small in SMALLER_MODEL_VARIANTS.items()}
+    large = model_name if model_name in SMALLER_MODEL_VARIANTS else larger.get(model_name)
+    models = [large, SMALLER_MODEL_VARIANTS[large]] if large else [model_name]
+    models = [name for name in models if name in MODEL_NAMES[kind]] or [model_name]
+
+    full, reduced = TOKEN_LIMITS[kind]
+    ladder = [Profile(name, beams, full) for name in models for beams in (2, 1)]
+    ladder.append(Profile(models[-1], 1, reduced))
+    return ladder
+
+
+class ThroughputGovernor:
+    """Выбор профиля генерации по измеренной скорости и цели задачи."""
+
+    def __init__(self, kind: str, model_name: str, target: ThroughputTarget, total: int, window: int = WINDOW):
+        self.kind = kind
+        self.target = target
+        self.total = total
+        self.window = window
+        self.ladder = build_ladder(kind, model_name)
+        # Начальный профиль - выбранная пользователем модель с параметрами по умолчанию
+        start = [i for i, profile in enumerate(self.ladder) if profile.model_name == model_name]
+        self.index = start[0] if start else 0
+        self._measured: Dict[int, float] = {}
+        self._unavailable: Set[int] = set()
+        self._samples: List[float] = []
+        self._done = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        logger.info(
+            "Регулятор производительности | Цель: %.2f изобр./с, срок %.0fс | Профиль: %s | Ступеней: %s",
+            target.rate, target.deadline, self.profile, len(self.ladder)
+        )
+
+    @property
+    def profile(self) -> Profile:
+        return self.ladder[self.index]
+
+    def required_rate(self) -> float:
+        """Требуемая скорость: цель по скорости и/или остаток пакета на остаток срока."""
+        rates = [self.target.rate]
+        if self.target.deadline > 0:
+            remaining_time = self.target.deadline - (time.monotonic() - self._started)
+            rates.append(max(0, self.total - self._done) / max(remaining_time, 1e-3))
+        return max(rates)
+
+    def record(self, seconds: float, index: int, measure: bool = True) -> None:
+        """Учёт изображения, обработанного профилем index за seconds (measure=False - без замера)."""
+        with self._lock:
+            self._done += 1
+            if not measure or index != self.index:
+                return
+            self._samples.append(seconds)
+            if len(self._samples) < self.window:
+                return
+            rate = len(self._samples) / max(sum(self._samples), 1e-6)
+            self._samples.clear()
+            previous = self._measured.get(index)
+            self._measured[index] = rate if previous is None else (previous + rate) / 2
+            self._adjust(self._measured[index])
+
+    def mark_unavailable(self, index: int) -> None:
+        """Профиль не удалось запустить (модель не загружается): переход на соседнюю ступень."""
+        with self._lock:
+            self._unavailable.add(index)
+            if index == self.index:
+                cheaper = self._next_available(index, 1)
+                self._move(cheaper if cheaper is not None else self._next_available(index, -1), "unavailable")
+
+    def _adjust(self, rate: float) -> None:
+        required = self.required_rate()
+        if rate < required:
+            target = self._next_available(self.index, 1)
+            if target is not None:
+                self._move(target, "down", rate, required)
+            return
+
+        target = self._next_available(self.index, -1)
+        if target is None:
+            return
+        expected = self._measured.get(target, rate / STEP_COST ** (self.index - target))
+        if expected >= required * HEADROOM:
+            self._move(target, "up", rate, required)
+
+    def _next_available(self, index: int, step: int) -> Optional[int]:
+        index += step
+        while 0 <= index < len(self.ladder):
+            if index not in self._unavailable:
+                return index
+            index += step
+        return None
+
+    def _move(self, index: Optional[int], direction: str, rate: float = 0.0, required: float = 0.0) -> None:
+        if index is None:
+            return
+        logger.info(
+            "Регулятор: %s -> %s | Скорость: %.2f изобр./с | Требуется: %.2f изобр./с",
+            self.profile, self.ladder[index], rate, required
+        )
+        GOVERNOR_SWITCHES_TOTAL.labels(self.kind, direction).inc()
+        self.index = index
+        self._samples.clear()
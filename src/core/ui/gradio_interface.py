@@ -4,6 +4,7 @@ from typing import List, Optional
 from core.utils.get_logger import logger
 from core.ui.tabs.renaming_tab import create_renaming_tab
 from core.ui.tabs.classification_tab import create_classification_tab
+from core.ui.tabs.search_tab import create_search_tab
 
 def gradio_interface() -> Optional[gr.TabbedInterface]:
     """
@@ -22,7 +23,7 @@ def gradio_interface() -> Optional[gr.TabbedInterface]:
             tabs.append(renaming_tab)
             logger.success("Вкладка переименования успешно создана")
         except Exception as e:
-            logger.critical(f"Ошибка создания вкладки переименования: {e}", exc_info=True)
+            logger.critical("Ошибка создания вкладки переименования: %s", e, exc_info=True)
             raise
 
         try:
@@ -30,7 +31,15 @@ def gradio_interface() -> Optional[gr.TabbedInterface]:
             tabs.append(classification_tab)
             logger.success("Вкладка классификации успешно создана")
         except Exception as e:
-            logger.critical(f"Ошибка создания вкладки классификации: {e}", exc_info=True)
+            logger.critical("Ошибка создания вкладки классификации: %s", e, exc_info=True)
+            raise
+
+        try:
+            search_tab = create_search_tab()
+            tabs.append(search_tab)
+            logger.success("Вкладка поиска похожих успешно создана")
+        except Exception as e:
+            logger.critical("Ошибка создания вкладки поиска похожих: %s", e, exc_info=True)
             raise
 
         # Выбор темы с fallback
@@ -39,10 +48,10 @@ def gradio_interface() -> Optional[gr.TabbedInterface]:
             try:
                 gr.themes.ThemeClass.from_hub(theme)
                 selected_theme = theme
-                logger.debug(f"Тема '{theme}' доступна, используется")
+                logger.debug("Тема '%s' доступна, используется", theme)
                 break
             except Exception:
-                logger.warning(f"Тема '{theme}' недоступна, попытка следующей")
+                logger.warning("Тема '%s' недоступна, попытка следующей", theme)
 
         if not selected_theme:
             selected_theme = gr.themes.Default()
@@ -50,20 +59,21 @@ def gradio_interface() -> Optional[gr.TabbedInterface]:
 
         interface = gr.TabbedInterface(
             tabs,
-            tab_names=['Автоматическое переименование фото', 'Автоматическая классификация фото'],
+            tab_names=['Автоматическое переименование фото', 'Автоматическая классификация фото', 'Поиск похожих фото'],
             theme=selected_theme
         )
         
         logger.info(
-            f"Интерфейс успешно инициализирован | "
-            f"Количество вкладок: {len(tabs)} | "
-            f"Тема: {selected_theme if isinstance(selected_theme, str) else 'default'}"
+            "Интерфейс успешно инициализирован | "
+            "Количество вкладок: %s | "
+            "Тема: %s",
+            len(tabs), selected_theme if isinstance(selected_theme, str) else 'default'
         )
         return interface
 
     except Exception as e:
         logger.critical(
-            f"Критическая ошибка инициализации интерфейса: {e}",
+            "Критическая ошибка инициализации интерфейса: %s", e,
             exc_info=True
         )
         gr.Warning("Произошла критическая ошибка при запуске интерфейса")
@@ -4,35 +4,34 @@
 from typing import List
 import gradio as gr
 from core.utils.get_logger import logger
-from .processing_state import ProcessingState
+from core.jobs.job_manager import job_manager
 
 
-def cancel_operation() -> List:
-    """Обрабатывает запрос на отмену текущей операции."""
+def cancel_operation(request: gr.Request = None) -> List:
+    """Обрабатывает запрос на отмену задач текущей сессии (задачи других сессий не затрагиваются)."""
     try:
-        state = ProcessingState()
-        
-        if not state.is_cancelled:
-            logger.warning("Инициирована отмена операции пользователем")
-            state.set_cancellation_state(True)
-            logger.debug("Флаг отмены успешно установлен")
+        session_id = getattr(request, "session_hash", None)
+        jobs = job_manager.cancel_session(session_id)
+
+        if jobs:
+            logger.warning("Инициирована отмена %s задач пользователем (сессия %s)", len(jobs), session_id)
             try:
                 gr.Info("Operation cancellation requested. Please wait...")
             except Exception as e:
-                logger.error(f"Ошибка отображения уведомления Gradio: {e}", exc_info=True)
+                logger.error("Ошибка отображения уведомления Gradio: %s", e, exc_info=True)
         else:
-            logger.debug("Повторный запрос отмены уже активной операции")
+            logger.debug("Нет активных задач для отмены в сессии %s", session_id)
             
         return []
 
     except Exception as e:
         logger.critical(
-            f"Критическая ошибка при обработке отмены: {e}", 
+            "Критическая ошибка при обработке отмены: %s", e, 
             exc_info=True
         )
         try:
             gr.Warning("Failed to process cancellation request")
         except Exception as gradio_error:
-            logger.error(f"Ошибка отображения предупреждения Gradio: {gradio_error}")
+            logger.error("Ошибка отображения предупреждения Gradio: %s", gradio_error)
         return []
     
\ No newline at end of file
@@ -8,6 +8,7 @@ import tempfile
 from typing import List, Tuple
 import gradio as gr
 import pandas as pd
+from core.handlers.transfer import DEFAULT_STRATEGY
 from core.utils.get_logger import logger
 
 
@@ -18,10 +19,12 @@ def save_processing_results(
     metadata_column: str,
     default_prefix: str,
     save_handler: callable,
+    strategy: str = DEFAULT_STRATEGY,
     progress_tracker: gr.Progress = gr.Progress()
 ) -> None:
     """
     Сохраняет результаты обработки изображений с улучшенным логированием.
+    strategy - способ переноса файлов (см. core.handlers.transfer).
     """
     try:
         logger.info("Начало сохранения результатов обработки")
@@ -42,11 +45,11 @@ def save_processing_results(
             
             invalid_count = len(is_valid) - sum(is_valid)
             if invalid_count > 0:
-                logger.warning(f"Найдено {invalid_count} невалидных индексов")
+                logger.warning("Найдено %s невалидных индексов", invalid_count)
 
             filtered_indices = valid_indices[is_valid]
         except KeyError as ke:
-            logger.error(f"Отсутствует обязательная колонка '№': {ke}", exc_info=True)
+            logger.error("Отсутствует обязательная колонка '№': %s", ke, exc_info=True)
             gr.Warning("Missing required column '№' in metadata")
             return
 
@@ -57,7 +60,7 @@ def save_processing_results(
             
             empty_names = processed_names.empty or processed_names.str.len() == 0
             if empty_names.any():
-                logger.debug(f"Найдено {empty_names.sum()} пустых имен, используются значения по умолчанию")
+                logger.debug("Найдено %s пустых имен, используются значения по умолчанию", empty_names.sum())
 
             default_names = [
                 f"{default_prefix}_{idx+1}" if default_prefix else str(idx+1)
@@ -65,7 +68,7 @@ def save_processing_results(
             ]
             final_names = processed_names.where(processed_names.ne(""), default_names)
         except Exception as e:
-            logger.error(f"Ошибка обработки имен файлов: {e}", exc_info=True)
+            logger.error("Ошибка обработки имен файлов: %s", e, exc_info=True)
             gr.Warning("Error processing filenames")
             return
 
@@ -76,9 +79,9 @@ def save_processing_results(
                 try:
                     path = Path(original_images[idx][0]) if isinstance(original_images[idx], tuple) else Path(original_images[idx])
                     image_paths.append(path)
-                    logger.debug(f"Обработка пути: {path}")
+                    logger.debug("Обработка пути: %s", path)
                 except (IndexError, TypeError) as te:
-                    logger.error(f"Ошибка доступа к изображению по индексу {idx}: {te}")
+                    logger.error("Ошибка доступа к изображению по индексу %s: %s", idx, te)
                     continue
 
             if not image_paths:
@@ -86,29 +89,29 @@ def save_processing_results(
                 gr.Warning("No valid image paths found")
                 return
         except Exception as e:
-            logger.error(f"Критическая ошибка подготовки путей: {e}", exc_info=True)
+            logger.error("Критическая ошибка подготовки путей: %s", e, exc_info=True)
             gr.Warning("Path preparation error")
             return
 
         # Сохранение файлов
         try:
             progress_tracker(0.3, desc="Saving files...")
-            logger.info(f"Сохранение {len(image_paths)} файлов в {output_dir}")
+            logger.info("Сохранение %s файлов в %s", len(image_paths), output_dir)
 
             os.makedirs(output_dir, exist_ok=True)
-            logger.debug(f"Создана выходная директория: {output_dir}")
+            logger.debug("Создана выходная директория: %s", output_dir)
 
             str_paths = [str(p) for p in image_paths]
-            save_results = save_handler(final_names.tolist(), str_paths, output_dir)
+            save_results = save_handler(final_names.tolist(), str_paths, output_dir, strategy)
 
             success_count = sum(1 for res in save_results if "успешно" in res.lower())
             error_count = len(save_results) - success_count
             
-            logger.info(f"Результаты сохранения: Успешно - {success_count}, Ошибок - {error_count}")
+            logger.info("Результаты сохранения: Успешно - %s, Ошибок - %s", success_count, error_count)
 
             if error_count > 0:
                 error_examples = [res for res in save_results if "ошибка" in res.lower()][:3]
-                logger.warning(f"Примеры ошибок при сохранении: {error_examples}")
+                logger.warning("Примеры ошибок при сохранении: %s", error_examples)
 
             if success_count == len(image_paths):
                 gr.Info(f"Successfully saved {success_count} files")
@@ -119,13 +122,13 @@ def save_processing_results(
             logger.success("Процесс сохранения завершен")
 
         except Exception as e:
-            logger.error(f"Ошибка в процессе сохранения файлов: {e}", exc_info=True)
+            logger.error("Ошибка в процессе сохранения файлов: %s", e, exc_info=True)
             gr.Warning("File saving error")
             progress_tracker(1.0, desc="Error occurred!")
 
     except Exception as error:
         logger.critical(
-            f"Критическая ошибка при сохранении результатов: {error}",
+            "Критическая ошибка при сохранении результатов: %s", error,
             exc_info=True
         )
         gr.Warning(f"Save error: {str(error)}")
@@ -138,7 +141,7 @@ def clear_temporary_data() -> List:
         temp_directory = tempfile.gettempdir()
         gradio_cache = os.path.join(temp_directory, "gradio")
         
-        logger.info(f"Очистка временных данных в директории: {gradio_cache}")
+        logger.info("Очистка временных данных в директории: %s", gradio_cache)
 
         if not os.path.exists(gradio_cache):
             logger.debug("Временная директория не найдена, пропуск очистки")
@@ -150,12 +153,12 @@ def clear_temporary_data() -> List:
             
             if os.path.exists(gradio_cache):
                 remaining = len(os.listdir(gradio_cache))
-                logger.warning(f"Не удалось удалить {remaining} элементов в кэше")
+                logger.warning("Не удалось удалить %s элементов в кэше", remaining)
             
             gr.Info("Temporary data cleared successfully")
         except OSError as error:
             logger.error(
-                f"Ошибка очистки временных данных: {error}",
+                "Ошибка очистки временных данных: %s", error,
                 exc_info=True
             )
             gr.Warning("Failed to clear temporary data")
@@ -164,7 +167,7 @@ def clear_temporary_data() -> List:
 
     except Exception as e:
         logger.critical(
-            f"Критическая ошибка при очистке временных данных: {e}",
+            "Критическая ошибка при очистке временных данных: %s", e,
             exc_info=True
         )
         return []
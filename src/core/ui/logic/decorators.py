@@ -1,8 +1,14 @@
 # src\core\ui\logic\decorators.py
 """Модуль декораторов с расширенным логированием и обработкой ошибок."""
 
+import os
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, List, Optional, Union
+import gradio as gr
+from core.constants.web import TRANSLATION_LANGUAGES
+from core.handlers.grouping import GroupingOptions
+from core.handlers.transfer import DEFAULT_STRATEGY
+from core.jobs.throughput_governor import ThroughputTarget
 from core.utils.get_logger import logger
 from .image_processing import process_images
 from .data_management import save_processing_results
@@ -13,11 +19,18 @@ def create_processing_tab(handler_class: Any, process_name: str) -> Callable:
     
     def decorator(func: Callable) -> Callable:
         @wraps(func)
-        def wrapper(photo_tuple: tuple, model_param1: str, model_param2: str, tgt_lang_str: str) -> Any:
+        def wrapper(photo_tuple: tuple, model_param1: str, model_param2: str, tgt_lang_str: Union[str, List[str]],
+                    target_rate: Optional[float] = None, target_minutes: Optional[float] = None,
+                    group_enabled: Optional[bool] = None, group_count: Optional[float] = None,
+                    request: Optional[gr.Request] = None) -> Any:
+            session_id = getattr(request, "session_hash", None)
+            throughput_target = ThroughputTarget.from_inputs(target_rate, target_minutes)
+            grouping = GroupingOptions.from_inputs(group_enabled, group_count)
             logger.info(
-                f"Запуск процесса '{process_name}' | "
-                f"Модели: {model_param1}/{model_param2} | "
-                f"Язык: {tgt_lang_str}"
+                "Запуск процесса '%s' | "
+                "Модели: %s/%s | "
+                "Язык: %s | Сессия: %s | Цель: %s | Группировка: %s",
+                process_name, model_param1, model_param2, tgt_lang_str, session_id, throughput_target, grouping
             )
             
             try:
@@ -28,21 +41,25 @@ def create_processing_tab(handler_class: Any, process_name: str) -> Callable:
                     model_param2,
                     tgt_lang_str,
                     f"Начало процесса {process_name}...",
-                    f"Процесс {process_name} завершен"
+                    f"Процесс {process_name} завершен",
+                    handler_class.TASK,
+                    session_id,
+                    throughput_target,
+                    grouping
                 ):
                     yield progress, result
                     
-                logger.success(f"Процесс '{process_name}' успешно завершен")
+                logger.success("Процесс '%s' успешно завершен", process_name)
 
             except Exception as e:
                 logger.critical(
-                    f"Критическая ошибка в процессе '{process_name}': {e}",
+                    "Критическая ошибка в процессе '%s': %s", process_name, e,
                     exc_info=True
                 )
                 raise
                 
             finally:
-                logger.debug(f"Завершение обработки для '{process_name}'")
+                logger.debug("Завершение обработки для '%s'", process_name)
 
         return wrapper
     return decorator
@@ -53,10 +70,11 @@ def create_save_decorator(handler_class: Any, column_name: str, default_prefix:
     
     def decorator(func: Callable) -> Callable:
         @wraps(func)
-        def wrapper(df_data: Any, photo_tuple: list, save_dir: str) -> Any:
+        def wrapper(df_data: Any, photo_tuple: list, save_dir: str, strategy: str = DEFAULT_STRATEGY) -> Any:
             logger.info(
-                f"Сохранение результатов | Колонка: {column_name} | "
-                f"Префикс: {default_prefix} | Директория: {save_dir}"
+                "Сохранение результатов | Колонка: %s | "
+                "Префикс: %s | Директория: %s | Стратегия: %s",
+                column_name, default_prefix, save_dir, strategy
             )
             
             try:
@@ -65,21 +83,40 @@ def create_save_decorator(handler_class: Any, column_name: str, default_prefix:
                     logger.error(error_msg)
                     raise AttributeError(error_msg)
 
-                save_processing_results(
-                    df_data,
-                    photo_tuple,
-                    save_dir,
-                    column_name,
-                    default_prefix,
-                    handler_class.save_photo
-                )
+                # Несколько целевых языков: отдельное дерево сохранения на каждую колонку языка
+                languages = [] if column_name in df_data.columns else [
+                    column for column in df_data.columns if column in TRANSLATION_LANGUAGES
+                ]
+                if not languages:
+                    save_processing_results(
+                        df_data,
+                        photo_tuple,
+                        save_dir,
+                        column_name,
+                        default_prefix,
+                        handler_class.save_photo,
+                        strategy
+                    )
+                for position, language in enumerate(languages):
+                    # Перемещаются исходные файлы только в последнее дерево, в остальные - копируются
+                    tree_strategy = "copy" if strategy == "rename" and position < len(languages) - 1 else strategy
+                    logger.info("Сохранение дерева языка %s | Стратегия: %s", language, tree_strategy)
+                    save_processing_results(
+                        df_data,
+                        photo_tuple,
+                        os.path.join(save_dir, language),
+                        language,
+                        default_prefix,
+                        handler_class.save_photo,
+                        tree_strategy
+                    )
                 
                 logger.success("Результаты сохранения успешно обработаны")
                 return photo_tuple, df_data
                 
             except Exception as e:
                 logger.error(
-                    f"Ошибка сохранения результатов: {e}",
+                    "Ошибка сохранения результатов: %s", e,
                     exc_info=True
                 )
                 raise
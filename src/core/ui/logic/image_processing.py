@@ -2,9 +2,16 @@
 """Модуль для обработки изображений с расширенным логированием."""
 
 import gradio as gr
-from typing import Generator, List, Tuple, Any
+import pandas as pd
+from typing import Generator, List, Optional, Sequence, Tuple, Any, Union
+from core.handlers.base_handler import BaseHandler
+from core.handlers.grouping import GroupingOptions
+from core.jobs.exceptions import QueueFullError
+from core.jobs.job_manager import job_manager
+from core.jobs.throughput_governor import ThroughputTarget
 from core.utils.get_logger import logger
-from .processing_state import ProcessingState
+from core.utils.settings import settings
+from .progress_stream import ProgressStream
 
 
 def process_images(
@@ -12,88 +19,133 @@ def process_images(
     processing_pipeline: callable,
     primary_model: Any,
     secondary_model: Any,
-    target_language: str,
+    target_language: Union[str, Sequence[str]],
     start_message: str,
     finish_message: str,
+    task: str = "base",
+    session_id: Optional[str] = None,
+    throughput_target: Optional[ThroughputTarget] = None,
+    grouping: Optional[GroupingOptions] = None,
     progress_tracker: gr.Progress = gr.Progress()
-) -> Generator[Tuple[List, List], None, None]:
+) -> Generator[Tuple[List, Any], None, None]:
     """
     Универсальный обработчик изображений с использованием генератора.
-    """
-    state = ProcessingState()
-    state.set_cancellation_state(False)
 
+    Результаты накапливаются в ProgressStream по одной строке, а в интерфейс
+    отправляются не чаще settings.progress_refresh_hz раз в секунду. Галерея
+    не меняется во время обработки, поэтому вместо списка изображений
+    отдаётся gr.update(). Финальный полный снимок отправляется всегда.
+
+    Обработка выполняется как задача менеджера core.jobs: со своим состоянием
+    отмены (session_id - идентификатор сессии Gradio) и ожиданием в общей очереди.
+
+    При нескольких целевых языках таблица отдаётся как DataFrame с колонкой
+    на каждый язык (заголовок - название языка).
+
+    throughput_target включает регулятор производительности: модель семейства и
+    параметры декодирования подбираются под заданную скорость или срок.
+
+    grouping (только классификация) заменяет метки названиями групп изображений,
+    найденных кластеризацией эмбеддингов; результаты приходят после кластеризации.
+    """
     if not images:
         logger.warning("Не загружено изображений для обработки")
         gr.Warning("No images uploaded for processing")
         yield [], []
         return
 
+    try:
+        # Модели группировки загружаются по ходу задачи и тоже защищены от выгрузки по простою
+        models = (primary_model, secondary_model) + (grouping.models(primary_model) if grouping else ())
+        job = job_manager.submit(session_id, task, tuple(dict.fromkeys(models)))
+    except QueueFullError as error:
+        logger.warning("Задача не принята: %s", error)
+        gr.Warning("Server is busy: processing queue is full, please try again later")
+        yield [], gr.update()
+        return
+
+    state = job.state
+    job_status = None
     total_images = len(images)
-    processing_results = [None] * total_images
+    languages = BaseHandler.target_languages(target_language)
+    stream = ProgressStream(total_images, settings.progress_refresh_hz, max(1, len(languages)))
+
+    def table():
+        rows = stream.snapshot()
+        return pd.DataFrame(rows, columns=["№", *languages]) if len(languages) > 1 else rows
+
     logger.info(
-        f"Начало обработки {total_images} изображений | "
-        f"Модели: {primary_model}/{secondary_model} | "
-        f"Язык: {target_language}"
+        "Начало обработки %s изображений | "
+        "Модели: %s/%s | "
+        "Язык: %s",
+        total_images, primary_model, secondary_model, target_language
     )
 
     try:
+        while not job_manager.wait_turn(job, timeout=0.5):
+            progress_tracker(0, desc=f"В очереди: позиция {job_manager.position(job)}")
+        if state.is_cancelled:
+            logger.warning("Задача %s отменена до запуска", job.id)
+            gr.Warning("Operation cancelled by user")
+            yield [], images
+            return
+
         progress_tracker(0, desc=start_message)
         gr.Info(start_message)
-        logger.info(f"Старт обработки: {start_message}")
+        logger.info("Старт обработки: %s", start_message)
 
         processing_generator = processing_pipeline(
             images,
             primary_model,
             secondary_model,
             lambda: state.is_cancelled,
-            target_language
+            target_language,
+            throughput_target=throughput_target,
+            **({"grouping": grouping} if grouping is not None else {})
         )
 
         for result in processing_generator:
             if state.is_cancelled:
                 logger.warning("Обработка прервана пользователем")
                 gr.Warning("Operation cancelled by user")
-                yield _generate_progress_report(processing_results), images
+                yield table(), images
                 return
 
             if _is_valid_processing_result(result, total_images):
                 image_idx, processed_data = result
-                processing_results[image_idx] = processed_data
-                logger.debug(f"Обработано изображение #{image_idx + 1}/{total_images}")
-            else:
-                logger.warning(f"Некорректный результат обработки: {result}")
-
-            yield _generate_progress_report(processing_results), images
+                stream.update(image_idx, processed_data)
+                logger.debug("Обработано изображение #%s/%s", image_idx + 1, total_images)
+            elif grouping is not None and isinstance(result, str):
+                # Результаты группировки приходят после кластеризации: до этого - этап в описании прогресса
+                progress_tracker(stream.completed / total_images, desc=result)
+
+            if stream.should_emit():
+                stream.mark_emitted()
+                logger.debug("Обновление прогресса: %s/%s строк", stream.completed, total_images)
+                progress_tracker(stream.completed / total_images, desc=start_message)
+                yield table(), gr.update()
 
         if not state.is_cancelled:
             progress_tracker(1.0, desc="Completed!")
             logger.success(finish_message)
             gr.Info(finish_message)
-            yield _generate_progress_report(processing_results), images
+            yield table(), images
 
     except Exception as error:
+        job_status = "failed"
         logger.critical(
-            f"Критическая ошибка обработки: {str(error)} | "
-            f"Прогресс: {len([x for x in processing_results if x is not None])}/{total_images}",
+            "Критическая ошибка обработки: %s | "
+            "Прогресс: %s/%s",
+            str(error), stream.completed, total_images,
             exc_info=True
         )
         gr.Warning(f"Processing error: {str(error)}")
-        yield _generate_progress_report(processing_results), images
+        yield table(), images
     finally:
+        job_manager.finish(job, job_status)
         logger.debug("Завершение процесса обработки изображений")
 
 
-def _generate_progress_report(processing_status: List) -> List:
-    """Генерирует отчет о текущем прогрессе обработки."""
-    logger.debug(f"Формирование отчёта для {len(processing_status)} элементов")
-    return [
-        [idx + 1, value[1] if isinstance(value, tuple) else value]
-        for idx, value in enumerate(processing_status)
-        if value is not None
-    ]
-
-
 def _is_valid_processing_result(result: Any, max_index: int) -> bool:
     """Проверяет валидность результата обработки."""
     is_valid = (
@@ -102,5 +154,6 @@ def _is_valid_processing_result(result: Any, max_index: int) -> bool:
         0 <= result[0] < max_index
     )
     if not is_valid:
-        logger.warning(f"Невалидный результат обработки: {result}")
+        # Строковые статусы ("Обработка: ...") приходят на каждое изображение
+        logger.debug("Пропущен промежуточный результат обработки: %s", result)
     return is_valid
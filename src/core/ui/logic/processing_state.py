@@ -2,42 +2,30 @@
 """Модуль для thread-safe управления состоянием обработки с логированием."""
 
 import threading
-from typing import Optional
 from core.utils.get_logger import logger
 
 
 class ProcessingState:
-    """Класс для управления состоянием обработки с thread-safe доступом (Singleton).
+    """Класс для управления состоянием обработки одной задачи с thread-safe доступом.
     
+    Экземпляр создаётся на каждую задачу (см. core.jobs), поэтому отмена
+    в одной сессии не влияет на задачи других пользователей.
     Логирует ключевые изменения состояния и ошибки доступа.
     """
     
-    _instance: Optional['ProcessingState'] = None
-    _lock: threading.Lock = threading.Lock()
-    
-    def __new__(cls) -> 'ProcessingState':
-        with cls._lock:
-            if cls._instance is None:
-                try:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._is_cancelled = False
-                    cls._instance._state_lock = threading.RLock()
-                    logger.success("Инициализирован ProcessingState (Singleton)")
-                except Exception as e:
-                    logger.critical(f"Ошибка создания Singleton: {e}", exc_info=True)
-                    raise
-        return cls._instance
+    def __init__(self) -> None:
+        self._is_cancelled = False
+        self._state_lock = threading.RLock()
     
     @property
     def is_cancelled(self) -> bool:
-        """Возвращает текущее состояние флага отмены с логированием."""
-        try:
-            with self._state_lock:
-                logger.debug(f"Запрос состояния отмены: {self._is_cancelled}")
-                return self._is_cancelled
-        except Exception as e:
-            logger.error(f"Ошибка доступа к состоянию: {e}", exc_info=True)
-            raise
+        """
+        Возвращает текущее состояние флага отмены.
+
+        Флаг опрашивается на каждом изображении, поэтому чтение выполняется
+        без блокировки и логирования: присваивание bool атомарно.
+        """
+        return self._is_cancelled
 
     def set_cancellation_state(self, value: bool) -> None:
         """Устанавливает флаг отмены с валидацией и логированием."""
@@ -51,12 +39,13 @@ class ProcessingState:
                 prev_state = self._is_cancelled
                 self._is_cancelled = value
                 logger.info(
-                    f"Изменение состояния отмены: {prev_state} -> {value} "
-                    f"(Поток: {threading.get_ident()})"
+                    "Изменение состояния отмены: %s -> %s "
+                    "(Поток: %s)",
+                    prev_state, value, threading.get_ident()
                 )
                 
         except Exception as e:
-            logger.error(f"Ошибка установки состояния: {e}", exc_info=True)
+            logger.error("Ошибка установки состояния: %s", e, exc_info=True)
             raise
 
     def reset(self) -> None:
@@ -67,6 +56,6 @@ class ProcessingState:
                     self._is_cancelled = False
                     logger.warning("Сброс состояния обработки в исходное положение")
         except Exception as e:
-            logger.error(f"Ошибка сброса состояния: {e}", exc_info=True)
+            logger.error("Ошибка сброса состояния: %s", e, exc_info=True)
             raise
         
\ No newline at end of file
@@ -0,0 +1,69 @@
+# src\core\ui\logic\progress_stream.py
+"""Инкрементальное накопление результатов обработки с ограничением частоты обновлений."""
+
+import time
+from bisect import bisect_left
+from typing import Any, List, Optional
+
+
+class ProgressStream:
+    """
+    Таблица результатов, обновляемая по одной строке.
+
+    Вместо пересборки всей таблицы после каждого изображения поток хранит готовые
+    строки в порядке индексов: позиция ищется бинарным поиском за O(log n), вставка
+    в середину списка стоит O(n), а при обычном порядке поступления (по возрастанию
+    индексов) сводится к добавлению в конец. Gradio принимает таблицу только целиком,
+    поэтому в интерфейс отправляется полный снимок, но не чаще max_refresh_hz раз
+    в секунду и только при наличии изменений; финальный снимок отдаётся всегда.
+    """
+
+    def __init__(self, total: int, max_refresh_hz: float = 4.0, columns: int = 1):
+        self.total = total
+        # Число колонок результата (по одной на целевой язык)
+        self.columns = columns
+        self._min_interval = 1.0 / max_refresh_hz if max_refresh_hz > 0 else 0.0
+        self._indices: List[int] = []
+        self._rows: List[list] = []
+        self._dirty = False
+        self._last_emit = 0.0
+
+    def make_row(self, index: int, value: Any) -> list:
+        """Строка таблицы: номер изображения и итоговые значения (переводы по языкам или сообщение об ошибке)."""
+        if isinstance(value, tuple):
+            translated = value[1]
+            values = list(translated.values()) if isinstance(translated, dict) else [translated]
+        else:
+            values = [value]
+        return [index + 1] + values + [""] * (self.columns - len(values))
+
+    @property
+    def completed(self) -> int:
+        return len(self._rows)
+
+    def update(self, index: int, value: Any) -> None:
+        """Добавляет или заменяет строку результата для изображения index."""
+        row = self.make_row(index, value)
+        position = bisect_left(self._indices, index)
+        if position < len(self._indices) and self._indices[position] == index:
+            self._rows[position] = row
+        else:
+            self._indices.insert(position, index)
+            self._rows.insert(position, row)
+        self._dirty = True
+
+    def should_emit(self, now: Optional[float] = None) -> bool:
+        """Есть ли изменения и прошло ли минимальное время с прошлой отправки."""
+        if not self._dirty:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self._last_emit >= self._min_interval
+
+    def mark_emitted(self) -> None:
+        """Отмечает отправку снимка: изменения сброшены, отсчёт интервала начат заново."""
+        self._dirty = False
+        self._last_emit = time.monotonic()
+
+    def snapshot(self) -> List[list]:
+        """Полный снимок таблицы (неглубокая копия: строки не пересобираются)."""
+        return list(self._rows)
@@ -6,14 +6,16 @@ from PyQt5.QtWidgets import QApplication, QFileDialog
 import sys
 import os
 import gradio as gr
+from core.constants.web import GALLERY_PAGE_SIZE
 from core.utils.get_logger import logger
+from core.utils.thumbnails import get_thumbnails, prefetch_thumbnails
 
 
 def select_directory(dialog_title: str, initial_dir: str = "") -> str:
     """
     Отображает диалог выбора директории с обработкой ошибок.
     """
-    logger.info(f"Запрос выбора директории: '{dialog_title}'")
+    logger.info("Запрос выбора директории: '%s'", dialog_title)
     selected_path = initial_dir
     app = None
     
@@ -23,11 +25,11 @@ def select_directory(dialog_title: str, initial_dir: str = "") -> str:
         
         selected_path = QFileDialog.getExistingDirectory(None, dialog_title, initial_dir)
         status = "успешно" if selected_path else "отменено"
-        logger.info(f"Выбор директории {status}: {selected_path or initial_dir}")
+        logger.info("Выбор директории %s: %s", status, selected_path or initial_dir)
         
     except Exception as e:
         logger.error(
-            f"Ошибка при выборе директории: {e}",
+            "Ошибка при выборе директории: %s", e,
             exc_info=True
         )
         gr.Warning(f"Ошибка выбора директории: {str(e)}")
@@ -40,56 +42,100 @@ def select_directory(dialog_title: str, initial_dir: str = "") -> str:
     return selected_path if selected_path else initial_dir
 
 
-def initialize_photo_gallery(uploaded_photos: List[Tuple[str, str]]) -> Tuple[List, List]:
+def initialize_photo_gallery(uploaded_photos: List[Any]) -> Tuple[List, List, List, int, str]:
     """
-    Инициализирует галерею изображений с валидацией данных.
+    Инициализирует список загруженных изображений с валидацией данных.
+
+    Возвращает список фото (путь, подпись), строки таблицы и первую страницу
+    галереи. В браузер отправляются только миниатюры видимой страницы.
     """
     logger.info("Инициализация галереи изображений")
     
     if not uploaded_photos:
         logger.warning("Попытка инициализации пустой галереи")
-        return [], []
+        return [], [], [], 1, ""
 
-    gallery_items = []
+    photos = []
     dataframe_entries = []
     error_count = 0
 
     try:
         for idx, photo in enumerate(uploaded_photos, start=1):
             try:
-                if not isinstance(photo, tuple) or len(photo) < 1:
+                photo_path = photo[0] if isinstance(photo, tuple) else getattr(photo, "name", photo)
+                if not isinstance(photo_path, str) or not photo_path:
                     raise ValueError("Некорректный формат элемента")
-                    
-                photo_path = photo[0]
                 if not os.path.exists(photo_path):
                     raise FileNotFoundError(f"Файл не найден: {photo_path}")
                 
-                item = (photo_path, f'{idx}) {os.path.basename(photo_path)}')
-                gallery_items.append(item)
-                dataframe_entries.append([idx, ""])
+                photos.append((photo_path, f'{len(photos) + 1}) {os.path.basename(photo_path)}'))
+                dataframe_entries.append([len(photos), ""])
                 
-                logger.debug(f"Добавлено изображение #{idx}: {photo_path}")
+                logger.debug("Добавлено изображение #%s: %s", idx, photo_path)
                 
             except Exception as e:
                 error_count += 1
                 logger.warning(
-                    f"Ошибка обработки элемента #{idx}: {e}",
+                    "Ошибка обработки элемента #%s: %s", idx, e,
                     exc_info=True
                 )
 
         logger.info(
-            f"Галерея инициализирована | Успешно: {len(gallery_items)} | "
-            f"Ошибки: {error_count}"
+            "Галерея инициализирована | Успешно: %s | "
+            "Ошибки: %s",
+            len(photos), error_count
         )
         
     except Exception as e:
         logger.error(
-            f"Критическая ошибка инициализации галереи: {e}",
+            "Критическая ошибка инициализации галереи: %s", e,
             exc_info=True
         )
-        return [], []
+        return [], [], [], 1, ""
+
+    gallery_items, page, page_info = render_gallery_page(photos, 1)
+    return photos, dataframe_entries, gallery_items, page, page_info
+
+
+def render_gallery_page(photos: List[Tuple[str, str]], page: Any) -> Tuple[List, int, str]:
+    """
+    Миниатюры одной страницы галереи, номер страницы (в допустимых пределах) и подпись.
+    Миниатюры следующей страницы готовятся в фоне.
+    """
+    if not photos:
+        return [], 1, ""
 
-    return gallery_items, dataframe_entries
+    page_count = (len(photos) + GALLERY_PAGE_SIZE - 1) // GALLERY_PAGE_SIZE
+    try:
+        page = min(max(int(page or 1), 1), page_count)
+    except (TypeError, ValueError):
+        page = 1
+
+    start = (page - 1) * GALLERY_PAGE_SIZE
+    visible = photos[start:start + GALLERY_PAGE_SIZE]
+    thumbnails = get_thumbnails([path for path, _ in visible])
+    # Если миниатюру создать не удалось, показывается исходный файл: индексы галереи
+    # должны совпадать с позициями в списке фото
+    gallery_items = [
+        (thumbnail or path, caption)
+        for thumbnail, (path, caption) in zip(thumbnails, visible)
+    ]
+    prefetch_thumbnails([path for path, _ in photos[start + GALLERY_PAGE_SIZE:start + 2 * GALLERY_PAGE_SIZE]])
+
+    logger.debug("Страница галереи %s/%s: %s миниатюр", page, page_count, len(gallery_items))
+    return gallery_items, page, f"Страница {page} из {page_count} · фото {start + 1}–{start + len(visible)} из {len(photos)}"
+
+
+def open_full_image(photos: List[Tuple[str, str]], page: Any, evt: gr.SelectData) -> Any:
+    """Оригинал выбранного в галерее изображения: полный файл отправляется только по запросу."""
+    try:
+        index = (int(page or 1) - 1) * GALLERY_PAGE_SIZE + evt.index
+        photo_path = photos[index][0]
+        logger.debug("Открыто изображение #%s: %s", index + 1, photo_path)
+        return gr.update(value=photo_path, label=photos[index][1], visible=True)
+    except (IndexError, TypeError, ValueError) as e:
+        logger.warning("Не удалось открыть выбранное изображение: %s", e)
+        return gr.update(value=None, visible=False)
 
 
 def update_button_states(is_processing: bool, 
@@ -103,9 +149,10 @@ def update_button_states(is_processing: bool,
             raise TypeError(f"Некорректный тип флага обработки: {type(is_processing)}")
             
         logger.debug(
-            f"Обновление состояния кнопок | Обработка: {is_processing} | "
-            f"Кнопка процесса: {'активна' if not is_processing else 'неактивна'} | "
-            f"Кнопка отмены: {'видима' if is_processing else 'скрыта'}"
+            "Обновление состояния кнопок | Обработка: %s | "
+            "Кнопка процесса: %s | "
+            "Кнопка отмены: %s",
+            is_processing, 'активна' if not is_processing else 'неактивна', 'видима' if is_processing else 'скрыта'
         )
         
         return {
@@ -115,7 +162,7 @@ def update_button_states(is_processing: bool,
         
     except Exception as e:
         logger.error(
-            f"Ошибка обновления состояния кнопок: {e}",
+            "Ошибка обновления состояния кнопок: %s", e,
             exc_info=True
         )
         return {}
@@ -2,10 +2,12 @@
 import gradio as gr
 from core.utils.get_logger import logger
 from core.handlers.classification_handler import ClassificationHandler
-from core.constants.web import TRANSLATION_LANGUAGES
-from core.constants.models import SEGMENTATION_MODEL_NAMES, TRANSLATION_MODEL_NAMES
+from core.constants.web import TRANSLATION_LANGUAGES, TRANSFER_STRATEGIES
+from core.constants.models import CLASSIFICATION_MODEL_NAMES, SEGMENTATION_MODEL_NAMES, TRANSLATION_MODEL_NAMES
 from core.ui.logic.decorators import create_processing_tab, create_save_decorator
-from core.ui.logic.ui_utils import initialize_photo_gallery, update_button_states, select_directory
+from core.ui.logic.ui_utils import (
+    initialize_photo_gallery, render_gallery_page, open_full_image, update_button_states, select_directory
+)
 from core.ui.logic.cancellation import cancel_operation
 from core.ui.logic.data_management import clear_temporary_data
 
@@ -16,8 +18,10 @@ def create_classification_tab():
                 with gr.Row():
                     segmentation_model = gr.Dropdown(
                         label="Выберите модель для классификации",
-                        choices=list(SEGMENTATION_MODEL_NAMES.keys()),
+                        choices=list(SEGMENTATION_MODEL_NAMES.keys()) + list(CLASSIFICATION_MODEL_NAMES.keys()),
                         value="Florence-2-base",
+                        info="Florence-2 - генеративная детекция объектов; CLIP/ViT/ConvNeXt - один прямой проход "
+                             "(миллисекунды на изображение)",
                     )
                     translation_model = gr.Dropdown(
                         label="Выберите модель для перевода",
@@ -25,9 +29,49 @@ def create_classification_tab():
                         value="mbart-large-50-many-to-many-mmt",
                     )
                     tgt_lang_str = gr.Dropdown(
-                        label='Выберите целевой язык перевода',
+                        label='Выберите целевые языки перевода',
                         choices=list(TRANSLATION_LANGUAGES.keys()),
-                        value='Russian',
+                        value=['Russian'],
+                        multiselect=True,
+                        info="Несколько языков - колонка и дерево сохранения на каждый язык",
+                    )
+
+                with gr.Accordion("Режим целевой производительности", open=False):
+                    with gr.Row():
+                        target_rate = gr.Number(
+                            label="Целевая скорость, изобр./с",
+                            value=0,
+                            minimum=0,
+                            info="0 - не задана",
+                        )
+                        target_minutes = gr.Number(
+                            label="Обработать пакет за, мин",
+                            value=0,
+                            minimum=0,
+                            info="0 - без срока",
+                        )
+                    gr.Markdown(
+                        "При заданной цели модель семейства, число лучей и лимит токенов подбираются "
+                        "автоматически по измеренной скорости: лучшее качество, укладывающееся в цель."
+                    )
+
+                with gr.Accordion("Группировка по сходству", open=False):
+                    with gr.Row():
+                        group_enabled = gr.Checkbox(
+                            label="Группировать по визуальному сходству",
+                            value=False,
+                            info="Вместо метки объекта - группа похожих изображений",
+                        )
+                        group_count = gr.Number(
+                            label="Число групп",
+                            value=0,
+                            minimum=0,
+                            precision=0,
+                            info="0 - по размеру пакета",
+                        )
+                    gr.Markdown(
+                        "Эмбеддинги считает выбранная модель CLIP/ViT/ConvNeXt (для Florence-2 - CLIP), "
+                        "группы находит k-means; название группы берётся из подписей её типичных изображений."
                     )
 
                 save_dir = gr.Textbox(
@@ -37,24 +81,45 @@ def create_classification_tab():
                     interactive=False
                 )
 
+                transfer_strategy = gr.Dropdown(
+                    label="Способ сохранения файлов",
+                    choices=list(TRANSFER_STRATEGIES.items()),
+                    value="copy",
+                    info="Ссылки и reflink не занимают место на диске; перемещение удаляет исходные файлы"
+                )
+
                 with gr.Row():
-                    photo_tuple = gr.Gallery(
-                        label="Загрузите фото",
-                        format="jpeg",
-                        height="auto",
-                        scale=1,
-                        interactive=True,
-                        columns=3,
-                        object_fit="cover",
-                        show_download_button=False,
-                        show_share_button=False,
-                        show_fullscreen_button=False,
-                    )
+                    with gr.Column(scale=1):
+                        photo_upload = gr.File(
+                            label="Загрузите фото",
+                            file_count="multiple",
+                            file_types=["image"],
+                            height=140,
+                        )
+                        # Загруженные фото (путь, подпись); в браузер уходят только миниатюры страницы
+                        photo_tuple = gr.State([])
+                        photo_gallery = gr.Gallery(
+                            label="Загруженные фото",
+                            height="auto",
+                            interactive=False,
+                            columns=3,
+                            object_fit="cover",
+                            allow_preview=False,
+                            show_download_button=False,
+                            show_share_button=False,
+                            show_fullscreen_button=False,
+                        )
+                        with gr.Row():
+                            prev_page_btn = gr.Button("←", size='sm')
+                            gallery_page = gr.Number(value=1, precision=0, minimum=1, show_label=False, container=False)
+                            next_page_btn = gr.Button("→", size='sm')
+                        page_info = gr.Markdown()
+                        full_image = gr.Image(label="Оригинал", type="filepath", interactive=False, visible=False)
 
                     classes_df = gr.Dataframe(
                         headers=["№", "Класс"],
                         datatype=["number", "str"],
-                        col_count=(2, "fixed"),
+                        col_count=(2, "dynamic"),
                         row_count=(0, "dynamic"),
                         interactive=[False, True],
                         label="Классы изображений",
@@ -63,10 +128,40 @@ def create_classification_tab():
                     )
 
                     # Инициализация галереи через общую функцию
-                    photo_tuple.upload(
+                    photo_upload.upload(
                         initialize_photo_gallery,
-                        inputs=photo_tuple,
-                        outputs=[photo_tuple, classes_df],
+                        inputs=photo_upload,
+                        outputs=[photo_tuple, classes_df, photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    ).then(
+                        lambda: None,
+                        None,
+                        photo_upload,
+                        show_progress=False
+                    )
+
+                    gallery_page.submit(
+                        render_gallery_page,
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=[photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    )
+                    prev_page_btn.click(
+                        lambda photos, page: render_gallery_page(photos, (page or 1) - 1),
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=[photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    )
+                    next_page_btn.click(
+                        lambda photos, page: render_gallery_page(photos, (page or 1) + 1),
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=[photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    )
+                    photo_gallery.select(
+                        open_full_image,
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=full_image,
                         show_progress=False
                     )
 
@@ -75,11 +170,13 @@ def create_classification_tab():
                         cancel_btn = gr.Button("Отменить", size='sm', variant="stop", visible=False)
 
                         @create_processing_tab(ClassificationHandler, "классификации")
-                        def generic_process_classification(photo_tuple, segmentation_model, translation_model, tgt_lang_str):
+                        def generic_process_classification(photo_tuple, segmentation_model, translation_model, tgt_lang_str,
+                                                           target_rate, target_minutes, group_enabled, group_count,
+                                                           request: gr.Request):
                             try:
-                                logger.info(f"Запуск классификации с моделями: {segmentation_model}/{translation_model}")
+                                logger.info("Запуск классификации с моделями: %s/%s", segmentation_model, translation_model)
                             except Exception as e:
-                                logger.critical(f"Ошибка инициализации обработки: {e}", exc_info=True)
+                                logger.critical("Ошибка инициализации обработки: %s", e, exc_info=True)
                                 raise
 
                         process_event = classify_btn.click(
@@ -88,8 +185,10 @@ def create_classification_tab():
                             outputs=[classify_btn, cancel_btn]
                         ).then(
                             generic_process_classification,
-                            inputs=[photo_tuple, segmentation_model, translation_model, tgt_lang_str],
-                            outputs=[classes_df, photo_tuple]
+                            inputs=[photo_tuple, segmentation_model, translation_model, tgt_lang_str, target_rate, target_minutes,
+                                    group_enabled, group_count],
+                            outputs=[classes_df, photo_tuple],
+                            concurrency_limit=None
                         ).then(
                             lambda is_processing: update_button_states(is_processing, classify_btn, cancel_btn),
                             inputs=[gr.State(False)],
@@ -122,16 +221,16 @@ def create_classification_tab():
                         save_btn = gr.Button("Сохранить классы", size='sm')
 
                         @create_save_decorator(ClassificationHandler, "Класс", "Неизвестный_класс")
-                        def generic_save_classification(df_data, photo_tuple, save_dir):
+                        def generic_save_classification(df_data, photo_tuple, save_dir, transfer_strategy):
                             try:
-                                logger.info(f"Сохранение результатов в {save_dir}")
+                                logger.info("Сохранение результатов в %s", save_dir)
                             except Exception as e:
-                                logger.error(f"Ошибка подготовки сохранения: {e}", exc_info=True)
+                                logger.error("Ошибка подготовки сохранения: %s", e, exc_info=True)
                                 raise
 
                         save_btn.click(
                             fn=generic_save_classification,
-                            inputs=[classes_df, photo_tuple, save_dir],
+                            inputs=[classes_df, photo_tuple, save_dir, transfer_strategy],
                             outputs=[photo_tuple, classes_df],
                             show_progress=True,
                         ).then(
@@ -158,9 +257,9 @@ def create_classification_tab():
                         
                         clear_components_btn = gr.Button("Cбросить компоненты", size='sm')
                         clear_components_btn.click(
-                            fn=lambda: ([],[]),
+                            fn=lambda: ([], [], [], 1, "", gr.update(value=None, visible=False)),
                             inputs=None,
-                            outputs=[photo_tuple, classes_df]
+                            outputs=[photo_tuple, classes_df, photo_gallery, gallery_page, page_info, full_image]
                         ).then(
                             lambda: gr.Info("Компоненты сброшены"),
                             None,
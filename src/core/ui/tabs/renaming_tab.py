@@ -2,10 +2,12 @@
 import gradio as gr
 from core.utils.get_logger import logger
 from core.handlers.renaming_handler import RenamingHandler
-from core.constants.web import TRANSLATION_LANGUAGES
+from core.constants.web import TRANSLATION_LANGUAGES, TRANSFER_STRATEGIES
 from core.constants.models import CAPTIONING_MODEL_NAMES, TRANSLATION_MODEL_NAMES
 from core.ui.logic.decorators import create_processing_tab, create_save_decorator
-from core.ui.logic.ui_utils import initialize_photo_gallery, update_button_states, select_directory
+from core.ui.logic.ui_utils import (
+    initialize_photo_gallery, render_gallery_page, open_full_image, update_button_states, select_directory
+)
 from core.ui.logic.cancellation import cancel_operation
 from core.ui.logic.data_management import clear_temporary_data
 
@@ -25,9 +27,30 @@ def create_renaming_tab():
                         value="mbart-large-50-many-to-many-mmt",
                     )
                     tgt_lang_str = gr.Dropdown(
-                        label='Выберите целевой язык перевода',
+                        label='Выберите целевые языки перевода',
                         choices=list(TRANSLATION_LANGUAGES.keys()),
-                        value='Russian',
+                        value=['Russian'],
+                        multiselect=True,
+                        info="Несколько языков - колонка и дерево сохранения на каждый язык",
+                    )
+
+                with gr.Accordion("Режим целевой производительности", open=False):
+                    with gr.Row():
+                        target_rate = gr.Number(
+                            label="Целевая скорость, изобр./с",
+                            value=0,
+                            minimum=0,
+                            info="0 - не задана",
+                        )
+                        target_minutes = gr.Number(
+                            label="Обработать пакет за, мин",
+                            value=0,
+                            minimum=0,
+                            info="0 - без срока",
+                        )
+                    gr.Markdown(
+                        "При заданной цели модель семейства, число лучей и лимит токенов подбираются "
+                        "автоматически по измеренной скорости: лучшее качество, укладывающееся в цель."
                     )
 
                 save_dir = gr.Textbox(
@@ -37,24 +60,45 @@ def create_renaming_tab():
                     interactive=False
                 )
 
+                transfer_strategy = gr.Dropdown(
+                    label="Способ сохранения файлов",
+                    choices=list(TRANSFER_STRATEGIES.items()),
+                    value="copy",
+                    info="Ссылки и reflink не занимают место на диске; перемещение удаляет исходные файлы"
+                )
+
                 with gr.Row():
-                    photo_tuple = gr.Gallery(
-                        label="Загрузите фото",
-                        format="jpeg",
-                        height="auto",
-                        scale=1,
-                        interactive=True,
-                        columns=3,
-                        object_fit="cover",
-                        show_download_button=False,
-                        show_share_button=False,
-                        show_fullscreen_button=False,
-                    )
+                    with gr.Column(scale=1):
+                        photo_upload = gr.File(
+                            label="Загрузите фото",
+                            file_count="multiple",
+                            file_types=["image"],
+                            height=140,
+                        )
+                        # Загруженные фото (путь, подпись); в браузер уходят только миниатюры страницы
+                        photo_tuple = gr.State([])
+                        photo_gallery = gr.Gallery(
+                            label="Загруженные фото",
+                            height="auto",
+                            interactive=False,
+                            columns=3,
+                            object_fit="cover",
+                            allow_preview=False,
+                            show_download_button=False,
+                            show_share_button=False,
+                            show_fullscreen_button=False,
+                        )
+                        with gr.Row():
+                            prev_page_btn = gr.Button("←", size='sm')
+                            gallery_page = gr.Number(value=1, precision=0, minimum=1, show_label=False, container=False)
+                            next_page_btn = gr.Button("→", size='sm')
+                        page_info = gr.Markdown()
+                        full_image = gr.Image(label="Оригинал", type="filepath", interactive=False, visible=False)
 
                     translated_names_df = gr.Dataframe(
                         headers=["№", "Новое имя"],
                         datatype=["number", "str"],
-                        col_count=(2, "fixed"),
+                        col_count=(2, "dynamic"),
                         row_count=(0, "dynamic"),
                         interactive=[False, True],
                         label="Целевые имена",
@@ -63,10 +107,40 @@ def create_renaming_tab():
                     )
 
                     # Инициализация галереи через общую функцию
-                    photo_tuple.upload(
+                    photo_upload.upload(
                         initialize_photo_gallery,
-                        inputs=photo_tuple,
-                        outputs=[photo_tuple, translated_names_df],
+                        inputs=photo_upload,
+                        outputs=[photo_tuple, translated_names_df, photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    ).then(
+                        lambda: None,
+                        None,
+                        photo_upload,
+                        show_progress=False
+                    )
+
+                    gallery_page.submit(
+                        render_gallery_page,
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=[photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    )
+                    prev_page_btn.click(
+                        lambda photos, page: render_gallery_page(photos, (page or 1) - 1),
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=[photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    )
+                    next_page_btn.click(
+                        lambda photos, page: render_gallery_page(photos, (page or 1) + 1),
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=[photo_gallery, gallery_page, page_info],
+                        show_progress=False
+                    )
+                    photo_gallery.select(
+                        open_full_image,
+                        inputs=[photo_tuple, gallery_page],
+                        outputs=full_image,
                         show_progress=False
                     )
 
@@ -75,15 +149,17 @@ def create_renaming_tab():
                         cancel_btn = gr.Button("Отменить", size='sm', variant="stop", visible=False)
 
                         @create_processing_tab(RenamingHandler, "переименования")
-                        def generic_process_renaming(photo_tuple, captioning_model, translation_model, tgt_lang_str):
+                        def generic_process_renaming(photo_tuple, captioning_model, translation_model, tgt_lang_str,
+                                                     target_rate, target_minutes, request: gr.Request):
                             try:
                                 logger.info(
-                                    f"Запуск процесса переименования | "
-                                    f"Модели: {captioning_model}/{translation_model} | "
-                                    f"Язык: {tgt_lang_str}"
+                                    "Запуск процесса переименования | "
+                                    "Модели: %s/%s | "
+                                    "Язык: %s",
+                                    captioning_model, translation_model, tgt_lang_str
                                 )
                             except Exception as e:
-                                logger.critical(f"Ошибка инициализации процесса: {e}", exc_info=True)
+                                logger.critical("Ошибка инициализации процесса: %s", e, exc_info=True)
                                 raise
 
                         process_event = process_btn.click(
@@ -92,8 +168,9 @@ def create_renaming_tab():
                             outputs=[process_btn, cancel_btn]
                         ).then(
                             fn=generic_process_renaming,
-                            inputs=[photo_tuple, captioning_model, translation_model, tgt_lang_str],
-                            outputs=[translated_names_df, photo_tuple]
+                            inputs=[photo_tuple, captioning_model, translation_model, tgt_lang_str, target_rate, target_minutes],
+                            outputs=[translated_names_df, photo_tuple],
+                            concurrency_limit=None
                         ).then(
                             fn=lambda is_processing: update_button_states(is_processing, process_btn, cancel_btn),
                             inputs=[gr.State(False)],
@@ -126,16 +203,16 @@ def create_renaming_tab():
                         save_btn = gr.Button("Сохранить фото", size='sm')
 
                         @create_save_decorator(RenamingHandler, "Новое имя", "")
-                        def generic_save_renaming(df_data, photo_tuple, save_dir):
+                        def generic_save_renaming(df_data, photo_tuple, save_dir, transfer_strategy):
                             try:
-                                logger.info(f"Сохранение {len(photo_tuple)} файлов в {save_dir}")
+                                logger.info("Сохранение %s файлов в %s", len(photo_tuple), save_dir)
                             except Exception as e:
-                                logger.error(f"Ошибка подготовки сохранения: {e}", exc_info=True)
+                                logger.error("Ошибка подготовки сохранения: %s", e, exc_info=True)
                                 raise
 
                         save_btn.click(
                             fn=generic_save_renaming,
-                            inputs=[translated_names_df, photo_tuple, save_dir],
+                            inputs=[translated_names_df, photo_tuple, save_dir, transfer_strategy],
                             outputs=[photo_tuple, translated_names_df],
                             show_progress=True
                         ).then(
@@ -162,9 +239,9 @@ def create_renaming_tab():
 
                         clear_components_btn = gr.Button("Cбросить компоненты", size='sm')
                         clear_components_btn.click(
-                            fn=lambda: ([],[]),
+                            fn=lambda: ([], [], [], 1, "", gr.update(value=None, visible=False)),
                             inputs=None,
-                            outputs=[photo_tuple, translated_names_df]
+                            outputs=[photo_tuple, translated_names_df, photo_gallery, gallery_page, page_info, full_image]
                         ).then(
                             lambda: gr.Info("Компоненты сброшены"),
                             None,
@@ -0,0 +1,75 @@
+# src\core\ui\tabs\search_tab.py
+import os
+from typing import List, Tuple
+
+import gradio as gr
+from core.utils.get_logger import logger
+from core.handlers.similarity import find_similar
+from core.utils.similarity_index import similarity_index
+from core.utils.settings import settings
+from core.utils.thumbnails import get_thumbnails
+
+
+def index_summary() -> str:
+    """Состояние индекса для интерфейса."""
+    stats = similarity_index.stats()
+    if not stats["rows"]:
+        hint = "" if settings.similarity_index else " Запись включается параметром `--similarity-index`."
+        return f"Индекс пуст.{hint}"
+    return (
+        f"В индексе: {stats['images']} изображений · модель {stats['model']} · "
+        f"списков: {stats['lists'] or 'точный перебор'}"
+    )
+
+
+def search_similar(query_path: str, k: float) -> Tuple[List, str]:
+    """Похожие изображения для галереи: (миниатюра, подпись) и сводка поиска."""
+    if not query_path:
+        gr.Warning("Upload an image to search for similar photos")
+        return [], index_summary()
+    try:
+        results = find_similar(query_path, int(k or 12))
+    except Exception as e:
+        logger.error("Ошибка поиска похожих изображений: %s", e, exc_info=True)
+        gr.Warning(f"Search error: {str(e)}")
+        return [], index_summary()
+
+    thumbnails = get_thumbnails([item["path"] for item in results])
+    gallery_items = [
+        (thumbnail or item["path"], f"{item['score']:.3f} · {os.path.basename(item['path'])} · {item['text']}")
+        for thumbnail, item in zip(thumbnails, results)
+    ]
+    logger.info("Поиск похожих: %s | Найдено: %s", os.path.basename(query_path), len(results))
+    return gallery_items, f"Найдено: {len(results)}. {index_summary()}"
+
+
+def create_search_tab():
+    with gr.Blocks() as search_tab:
+        with gr.Row():
+            with gr.Column(scale=2):
+                query_image = gr.Image(label="Изображение-запрос", type="filepath", height=280)
+                top_k = gr.Slider(label="Число результатов", minimum=1, maximum=100, step=1, value=12)
+                search_btn = gr.Button("Найти похожие", size='sm', variant="primary")
+                refresh_btn = gr.Button("Обновить состояние индекса", size='sm')
+                summary = gr.Markdown()
+
+            with gr.Column(scale=5):
+                results_gallery = gr.Gallery(
+                    label="Похожие изображения (сходство · файл · результат обработки)",
+                    height="auto",
+                    interactive=False,
+                    columns=4,
+                    object_fit="cover",
+                    show_share_button=False,
+                )
+
+        search_btn.click(
+            search_similar,
+            inputs=[query_image, top_k],
+            outputs=[results_gallery, summary],
+            concurrency_limit=None
+        )
+        refresh_btn.click(index_summary, inputs=None, outputs=summary, show_progress=False)
+        search_tab.load(index_summary, inputs=None, outputs=summary, show_progress=False)
+
+    return search_tab
@@ -0,0 +1,141 @@
+# src/core/utils/clustering.py
+"""
+Хранение эмбеддингов изображений и их кластеризация мини-пакетным k-means.
+
+Эмбеддинги пишутся пакетами в матрицу float16, отображённую в память (numpy.memmap):
+100 тыс. эмбеддингов CLIP (512) занимают 100 МБ на диске, а в оперативной памяти
+находится только обрабатываемый блок. Кластеризация - сферический мини-пакетный
+k-means (Sculley, 2010) по косинусному сходству нормированных векторов: центры
+инициализируются k-means++ по выборке строк, затем уточняются случайными мини-пакетами
+с темпом обучения 1/число_точек_центра. Стоимость шага не зависит от размера пакета
+изображений, поэтому метод масштабируется на большие выгрузки.
+"""
+
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Строк в блоке чтения/записи матрицы и размер мини-пакета k-means
+CHUNK_ROWS = 4096
+BATCH_SIZE = 1024
+# Выборка инициализации k-means++ (строк на кластер) и порог сходимости (максимальный сдвиг центра)
+INIT_SAMPLES_PER_CLUSTER = 32
+TOLERANCE = 1e-4
+
+
+class EmbeddingMatrix:
+    """Матрица эмбеддингов (rows x dim, float16) во временном файле, отображённом в память."""
+
+    def __init__(self, rows: int, directory: str):
+        self.rows = rows
+        self.directory = Path(directory)
+        self.path: Optional[Path] = None
+        self.data: Optional[np.memmap] = None
+
+    def write(self, start: int, block: np.ndarray) -> None:
+        """Запись блока эмбеддингов начиная со строки start (файл создаётся по первому блоку)."""
+        if self.data is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(suffix=".f16", dir=self.directory)
+            os.close(fd)
+            self.path = Path(name)
+            self.data = np.memmap(self.path, dtype=np.float16, mode="w+", shape=(self.rows, block.shape[1]))
+        self.data[start:start + len(block)] = block.astype(np.float16)
+
+    def release(self) -> None:
+        """Закрытие отображения и удаление файла."""
+        if self.data is not None:
+            self.data._mmap.close()
+            self.data = None
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+
+    def __enter__(self) -> "EmbeddingMatrix":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _rows(matrix: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Строки матрицы в float32 (индексы сортируются для последовательного чтения файла)."""
+    return _normalize(matrix[np.sort(indices)].astype(np.float32))
+
+
+def suggest_clusters(rows: int) -> int:
+    """Число кластеров по умолчанию: sqrt(n / 2), от 2 до 64."""
+    return int(min(64, max(2, round(math.sqrt(rows / 2)))))
+
+
+def _kmeans_plus_plus(sample: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Начальные центры: каждый следующий выбирается с вероятностью, пропорциональной квадрату расстояния."""
+    centers = [sample[rng.integers(len(sample))]]
+    distance = 1.0 - sample @ centers[0]
+    for _ in range(1, k):
+        weights = np.maximum(distance, 0.0) ** 2
+        total = weights.sum()
+        index = rng.choice(len(sample), p=weights / total) if total > 0 else rng.integers(len(sample))
+        centers.append(sample[index])
+        distance = np.minimum(distance, 1.0 - sample @ sample[index])
+    return np.stack(centers)
+
+
+def minibatch_kmeans(matrix: np.ndarray, k: int, batch_size: int = BATCH_SIZE,
+                     max_steps: Optional[int] = None, seed: int = 0) -> np.ndarray:
+    """
+    Центры k кластеров (k x dim, float32, нормированы) для строк matrix.
+    По умолчанию выполняется до трёх проходов по данным мини-пакетами; обучение
+    останавливается раньше, когда центры перестают сдвигаться.
+    """
+    rows = len(matrix)
+    k = max(1, min(k, rows))
+    rng = np.random.default_rng(seed)
+
+    sample = _rows(matrix, rng.choice(rows, min(rows, max(k * INIT_SAMPLES_PER_CLUSTER, batch_size)), replace=False))
+    centers = _kmeans_plus_plus(sample, k, rng)
+    counts = np.zeros(k)
+    batch_size = min(batch_size, rows)
+    max_steps = max_steps or max(10, 3 * math.ceil(rows / batch_size))
+
+    for _ in range(max_steps):
+        batch = _rows(matrix, rng.choice(rows, batch_size, replace=False))
+        nearest = np.argmax(batch @ centers.T, axis=1)
+        sizes = np.bincount(nearest, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, nearest, batch)
+
+        hit = sizes > 0
+        counts[hit] += sizes[hit]
+        rate = (sizes[hit] / counts[hit])[:, None]
+        previous = centers.copy()
+        centers[hit] = (1 - rate) * centers[hit] + rate * (sums[hit] / sizes[hit][:, None])
+        centers = _normalize(centers)
+        if np.max(np.linalg.norm(centers - previous, axis=1)) < TOLERANCE:
+            break
+    return centers
+
+
+def iter_chunks(matrix: np.ndarray, rows: int = CHUNK_ROWS) -> Iterator[Tuple[int, np.ndarray]]:
+    """Последовательные блоки строк (начало, блок float32)."""
+    for start in range(0, len(matrix), rows):
+        yield start, _normalize(np.asarray(matrix[start:start + rows], dtype=np.float32))
+
+
+def assign_clusters(matrix: np.ndarray, centers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Ближайший центр каждой строки и косинусное сходство с ним (чтение блоками)."""
+    labels = np.empty(len(matrix), dtype=np.int32)
+    similarity = np.empty(len(matrix), dtype=np.float32)
+    for start, block in iter_chunks(matrix):
+        scores = block @ centers.T
+        labels[start:start + len(block)] = np.argmax(scores, axis=1)
+        similarity[start:start + len(block)] = np.max(scores, axis=1)
+    return labels, similarity
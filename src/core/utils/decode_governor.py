@@ -0,0 +1,156 @@
+# src/core/utils/decode_governor.py
+"""
+Ограничение памяти при декодировании изображений.
+
+Image.open читает только заголовок, поэтому размер декодированного кадра
+известен до декодирования. DecodeGovernor.open():
+  - отклоняет файлы с числом пикселей в заголовке больше settings.max_image_pixels
+    (decompression bomb) до выделения памяти;
+  - для JPEG выбирает декодирование в уменьшенном масштабе (draft) под нужный
+    размер, так что панорама на 200 Мп декодируется в 1/2-1/8 масштаба;
+  - оценивает пиковый объём декодированных данных (кадр + копия при смене режима)
+    и резервирует его в общем байтовом бюджете: потоки, которым не хватает бюджета,
+    ждут освобождения, а не декодируют одновременно. Изображение, которое не
+    поместится в бюджет даже одно, отклоняется.
+
+Декодируется только первый кадр многокадровых файлов (TIFF, GIF, WebP).
+
+Встроенная защита Pillow (Image.MAX_IMAGE_PIXELS) остаётся включённой для всего
+процесса, включая загрузки Gradio; её лимит поднимается до max_image_pixels, чтобы
+не отклонять изображения, которые governor принимает и декодирует через draft.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from PIL import Image
+
+from core.utils.get_logger import logger
+from core.utils.metrics import DECODE_BUDGET_BYTES, DECODE_BYTES, DECODE_REJECTED_TOTAL, DECODE_WAIT_SECONDS
+from core.utils.settings import settings
+
+
+
+def align_pillow_pixel_limit(max_pixels: int) -> None:
+    """
+    Поднимает конечный лимит Pillow до max_pixels (не снимая его): изображения,
+    принятые governor, не должны отклоняться Pillow, а остальные PIL-вызовы
+    процесса сохраняют защиту от decompression bomb.
+    """
+    if Image.MAX_IMAGE_PIXELS is not None and Image.MAX_IMAGE_PIXELS < max_pixels:
+        Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+class DecodeRejectedError(ValueError):
+    """Изображение отклонено до декодирования."""
+
+
+def _bytes_per_pixel(mode: str) -> int:
+    """Размер пикселя во внутреннем представлении Pillow (многоканальные режимы - 32 бита)."""
+    if Image.getmodebands(mode) > 1 or mode in ("I", "F"):
+        return 4
+    return 2 if mode.startswith("I;16") else 1
+
+
+def estimate_decode_bytes(size: Tuple[int, int], mode: str, target_mode: Optional[str] = None) -> int:
+    """Пиковая память декодирования: кадр в исходном режиме и его копия после convert."""
+    pixels = size[0] * size[1]
+    total = pixels * _bytes_per_pixel(mode)
+    if target_mode and target_mode != mode:
+        total += pixels * _bytes_per_pixel(target_mode)
+    return total
+
+
+class ByteBudget:
+    """Семафор по байтам: acquire(n) ждёт, пока в бюджете не освободится n байт."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, amount: int) -> float:
+        """Резервирует amount байт; возвращает время ожидания (с)."""
+        start = time.monotonic()
+        with self._condition:
+            while self.in_use and self.in_use + amount > self.capacity:
+                self._condition.wait()
+            self.in_use += amount
+        return time.monotonic() - start
+
+    def release(self, amount: int) -> None:
+        with self._condition:
+            self.in_use -= amount
+            self._condition.notify_all()
+
+
+class DecodeGovernor:
+    """Открытие изображений с оценкой памяти, уменьшенным декодированием и общим бюджетом."""
+
+    def __init__(self, budget_bytes: int, max_pixels: int):
+        self.budget = ByteBudget(budget_bytes)
+        self.max_pixels = max_pixels
+        align_pillow_pixel_limit(max_pixels)
+
+    def _reject(self, reason: str, message: str) -> None:
+        DECODE_REJECTED_TOTAL.labels(reason).inc()
+        raise DecodeRejectedError(message)
+
+    @contextmanager
+    def open(self, path: str, target_size: Optional[Tuple[int, int]] = None,
+             mode: Optional[str] = "RGB") -> Iterator[Image.Image]:
+        """
+        Открывает изображение и резервирует бюджет на его декодирование.
+
+        target_size - минимальный нужный размер (ширина, высота): для JPEG декодер
+        уменьшит изображение, не опускаясь ниже него. mode - режим, в который вызывающий
+        код переведёт изображение (учитывается в оценке). Декодирование, convert и
+        уменьшение должны выполняться внутри блока with.
+        """
+        try:
+            opened = Image.open(path)
+        except Image.DecompressionBombError as e:
+            # Заголовок больше удвоенного лимита Pillow: отклонение до чтения данных
+            self._reject("pixels", f"Слишком большое изображение: {e}")
+        with opened as img:
+            width, height = img.size
+            if width <= 0 or height <= 0:
+                self._reject("invalid", f"Некорректный размер изображения: {width}x{height}")
+            if width * height > self.max_pixels:
+                self._reject(
+                    "pixels",
+                    f"Слишком большое изображение: {width}x{height} ({width * height / 1e6:.0f} Мп, "
+                    f"лимит {self.max_pixels / 1e6:.0f} Мп)"
+                )
+
+            if target_size and img.format == "JPEG":
+                img.draft(mode if mode in ("RGB", "L") else None, target_size)
+
+            estimate = estimate_decode_bytes(img.size, img.mode, mode)
+            if estimate > self.budget.capacity:
+                self._reject(
+                    "budget",
+                    f"Декодирование {img.size[0]}x{img.size[1]} требует {estimate / 2**20:.0f} МБ "
+                    f"при бюджете {self.budget.capacity / 2**20:.0f} МБ"
+                )
+
+            waited = self.budget.acquire(estimate)
+            DECODE_WAIT_SECONDS.observe(waited)
+            DECODE_BYTES.observe(estimate)
+            logger.debug(
+                "Декодирование %s | Заголовок: %sx%s | Декодируется: %sx%s | Память: %.1f МБ | Ожидание: %.3fс",
+                path, width, height, img.size[0], img.size[1], estimate / 2**20, waited
+            )
+            try:
+                yield img
+            finally:
+                self.budget.release(estimate)
+
+
+# Общий для всех потоков бюджет декодирования
+decode_governor = DecodeGovernor(settings.decode_budget_mb * 2**20, settings.max_image_pixels)
+
+DECODE_BUDGET_BYTES.labels("in_use").set_function(lambda: decode_governor.budget.in_use)
+DECODE_BUDGET_BYTES.labels("capacity").set_function(lambda: decode_governor.budget.capacity)
@@ -46,27 +46,29 @@ def get_device(
                 torch.set_num_threads(cpu_threads)
                 torch.set_num_interop_threads(interop_threads)
                 logger.debug(
-                    f"Настройки потоков CPU: "
-                    f"num_threads={cpu_threads}, "
-                    f"interop_threads={interop_threads}"
+                    "Настройки потоков CPU: "
+                    "num_threads=%s, "
+                    "interop_threads=%s",
+                    cpu_threads, interop_threads
                 )
             except RuntimeError as e:
-                logger.error(f"Ошибка настройки потоков CPU: {e}")
+                logger.error("Ошибка настройки потоков CPU: %s", e)
 
         # Логирование информации об устройстве
         if device == 'cuda':
             logger.info(
-                f"Используется CUDA устройство: {torch.cuda.get_device_name(0)} | "
-                f"Память: {torch.cuda.get_device_properties(0).total_memory/1024**3:.2f} GB"
+                "Используется CUDA устройство: %s | "
+                "Память: %.2f GB",
+                torch.cuda.get_device_name(0), torch.cuda.get_device_properties(0).total_memory/1024**3
             )
         elif device == 'mps':
             logger.info("Используется MPS (Metal Performance Shaders)")
         else:
-            logger.info(f"Используется CPU | Потоки: {torch.get_num_threads()}")
+            logger.info("Используется CPU | Потоки: %s", torch.get_num_threads())
 
         return device
 
     except Exception as e:
-        logger.critical(f"Критическая ошибка инициализации устройства: {e}", exc_info=True)
+        logger.critical("Критическая ошибка инициализации устройства: %s", e, exc_info=True)
         return 'cpu'
     
\ No newline at end of file
@@ -1,9 +1,14 @@
 # src\core\utils\get_logger.py
+import atexit
 import os
 import logging
+import queue
 import sys
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO, Tuple
 
 # Конфигурация форматов логов
 FILE_FORMAT = '%(asctime)s - [%(levelname)s] - %(name)s - (%(filename)s).%(funcName)s(%(lineno)d) - %(message)s'
@@ -13,25 +18,139 @@ CONSOLE_FORMAT = '[%(levelname)s] %(message)s'
 SUCCESS_LEVEL = 25
 logging.addLevelName(SUCCESS_LEVEL, "SUCCESS")
 
+# Ограничение частоты по умолчанию: сообщений в секунду с одной строки кода (0 - без ограничений)
+DEFAULT_RATE_LIMIT = 5.0
+DEFAULT_RATE_BURST = 20
+
 class EnhancedLogger(logging.Logger):
     """Кастомный логгер с дополнительными функциями"""
-    
+
     def success(self, msg, *args, **kwargs):
         """Логирование успешных операций"""
         if self.isEnabledFor(SUCCESS_LEVEL):
+            kwargs.setdefault("stacklevel", 2)
             self._log(SUCCESS_LEVEL, msg, args, **kwargs)
 
     def critical(self, msg, *args, **kwargs):
         """Добавляем автоматическое логирование исключений"""
-        super().critical(msg, *args, exc_info=True, **kwargs)
+        kwargs.setdefault("exc_info", True)
+        kwargs.setdefault("stacklevel", 2)
+        super().critical(msg, *args, **kwargs)
 
 logging.setLoggerClass(EnhancedLogger)
 
-def setup_logger(name: str = 'main') -> EnhancedLogger:
-    """Инициализация и настройка логгера"""
-    
+
+class ColorFormatter(logging.Formatter):
+    """Форматирование с цветовой разметкой для терминала (форматтеры создаются один раз)"""
+    COLORS = {
+        logging.DEBUG: "\033[37m",     # Белый
+        logging.INFO: "\033[94m",       # Синий
+        SUCCESS_LEVEL: "\033[92m",      # Зеленый
+        logging.WARNING: "\033[93m",    # Желтый
+        logging.ERROR: "\033[91m",      # Красный
+        logging.CRITICAL: "\033[41m"    # Красный фон
+    }
+    RESET = "\033[0m"
+
+    def __init__(self, fmt: str = CONSOLE_FORMAT):
+        super().__init__(fmt)
+        self._formatters: Dict[int, logging.Formatter] = {
+            level: logging.Formatter(f"{color}{fmt}{self.RESET}")
+            for level, color in self.COLORS.items()
+        }
+
+    def format(self, record):
+        formatter = self._formatters.get(record.levelno)
+        return formatter.format(record) if formatter else super().format(record)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничение частоты сообщений по месту вызова (файл + строка).
+
+    Каждая строка кода получает корзину токенов: burst сообщений сразу,
+    затем rate сообщений в секунду. Предупреждения и ошибки не ограничиваются.
+    Число пропущенных сообщений дописывается к следующему пропущенному фильтром.
+
+    Фильтр ставится только на консольный обработчик: файловый журнал DEBUG
+    остаётся полным. Сообщение дополняется уже после записи в файл, так как
+    QueueListener вызывает обработчики по порядку (файл, затем консоль).
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE_LIMIT, burst: int = DEFAULT_RATE_BURST,
+                 max_level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self._buckets: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno >= self.max_level:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # [токены, время последнего пополнения, пропущено]
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            record.msg = f"{record.msg} (пропущено похожих сообщений: {suppressed})"
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Помещает запись в очередь без форматирования: очередь внутрипроцессная,
+    поэтому сообщение и аргументы форматируются уже в потоке QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listeners: Dict[str, QueueListener] = {}
+
+
+def _stop_listeners() -> None:
+    for listener in list(_listeners.values()):
+        try:
+            listener.stop()
+        except Exception:
+            pass
+    _listeners.clear()
+
+
+atexit.register(_stop_listeners)
+
+
+def setup_logger(
+    name: str = 'main',
+    log_dir: str = "../logs",
+    console_stream: Optional[TextIO] = None,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    rate_burst: int = DEFAULT_RATE_BURST,
+) -> EnhancedLogger:
+    """
+    Инициализация и настройка логгера.
+
+    Вызывающий поток только создаёт запись и кладёт её в очередь; форматирование
+    и запись в файл/консоль выполняет фоновый QueueListener. Ограничение частоты
+    (rate_limit) действует только на консоль, файл получает все записи.
+    """
+
     # Создание основной директории для логов
-    log_dir = "../logs"
     try:
         os.makedirs(log_dir, exist_ok=True)
     except PermissionError as e:
@@ -51,35 +170,42 @@ def setup_logger(name: str = 'main') -> EnhancedLogger:
     file_handler.setLevel(logging.DEBUG)
 
     # Настройка цветного вывода в консоль
-    class ColorFormatter(logging.Formatter):
-        """Форматирование с цветовой разметкой для терминала"""
-        COLORS = {
-            logging.DEBUG: "\033[37m",     # Белый
-            logging.INFO: "\033[94m",       # Синий
-            SUCCESS_LEVEL: "\033[92m",      # Зеленый
-            logging.WARNING: "\033[93m",    # Желтый
-            logging.ERROR: "\033[91m",      # Красный
-            logging.CRITICAL: "\033[41m"    # Красный фон
-        }
-        RESET = "\033[0m"
-
-        def format(self, record):
-            color = self.COLORS.get(record.levelno, "")
-            fmt = f"{color}{CONSOLE_FORMAT}{self.RESET}"
-            return logging.Formatter(fmt).format(record)
-
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(console_stream or sys.stdout)
     console_handler.setFormatter(ColorFormatter())
     console_handler.setLevel(logging.INFO)
+    console_handler.addFilter(RateLimitFilter(rate_limit, rate_burst))
+
+    # Перенастройка: останавливаем прежний слушатель и снимаем старые обработчики
+    if name in _listeners:
+        _listeners.pop(name).stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
 
-    # Добавление обработчиков
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Неблокирующая очередь между вызывающими потоками и обработчиками
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
 
     # Отключение дублирования логов
     logger.propagate = False
 
     return logger
 
+
+def set_rate_limit(rate: float, burst: int = DEFAULT_RATE_BURST, name: str = 'main') -> None:
+    """Изменение ограничения частоты сообщений в консоли (0 - без ограничений)."""
+    listener = _listeners.get(name)
+    for handler in (listener.handlers if listener else ()):
+        for log_filter in handler.filters:
+            if isinstance(log_filter, RateLimitFilter):
+                log_filter.rate = rate
+                log_filter.burst = burst
+
+
 # Инициализация глобального логгера
 logger = setup_logger()
@@ -0,0 +1,116 @@
+# src/core/utils/image_hash.py
+"""
+Перцептивные хэши изображений и поиск близких хэшей по расстоянию Хэмминга.
+
+dHash (разности соседних пикселей 9x8) используется как ключ поиска в BK-дереве,
+pHash (знаки низкочастотных коэффициентов DCT 32x32) - для подтверждения
+кандидатов. Оба хэша 64-битные и считаются по одному уменьшенному изображению:
+для JPEG декодирование выполняется сразу в уменьшенном масштабе (draft).
+"""
+
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from PIL import Image
+
+from core.utils.decode_governor import decode_governor
+
+HASH_SIZE = 8
+_PHASH_SIZE = 32
+
+T = TypeVar("T")
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Ортонормированная матрица DCT-II: коэффициенты = D @ X @ D.T"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(_PHASH_SIZE)
+_BIT_WEIGHTS = (1 << np.arange(HASH_SIZE * HASH_SIZE - 1, -1, -1, dtype=np.uint64)).astype(np.uint64)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int(np.bitwise_or.reduce(bits.ravel().astype(np.uint64) * _BIT_WEIGHTS))
+
+
+def _load_grayscale(image_path: str) -> Image.Image:
+    # Для JPEG декодер сразу уменьшает изображение в 2-8 раз
+    with decode_governor.open(image_path, (_PHASH_SIZE * 2, _PHASH_SIZE * 2), mode="L") as img:
+        return img.convert("L").resize((_PHASH_SIZE, _PHASH_SIZE), Image.Resampling.BILINEAR)
+
+
+def dhash_array(pixels: np.ndarray) -> int:
+    """dHash по полутоновому массиву произвольного размера."""
+    image = Image.fromarray(pixels).resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+    small = np.asarray(image, dtype=np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash_array(pixels: np.ndarray) -> int:
+    """pHash по полутоновому массиву 32x32."""
+    coefficients = _DCT @ pixels.astype(np.float64) @ _DCT.T
+    low = coefficients[:HASH_SIZE, :HASH_SIZE]
+    # Постоянная составляющая не участвует в вычислении медианы
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+def image_hashes(image_path: str) -> Tuple[int, int]:
+    """Пара (dHash, pHash) для файла изображения."""
+    pixels = np.asarray(_load_grayscale(image_path), dtype=np.uint8)
+    return dhash_array(pixels), phash_array(pixels)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree(Generic[T]):
+    """
+    BK-дерево по метрике Хэмминга: поиск всех хэшей в радиусе r
+    без полного перебора (поддеревья вне [d - r, d + r] отсекаются).
+    """
+
+    def __init__(self):
+        # Узел: [хэш, значение, {расстояние: дочерний узел}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: T) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [key, value, {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(key, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, value, {}]
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, T]]:
+        """Все (расстояние, значение) в радиусе radius, по возрастанию расстояния."""
+        if self._root is None:
+            return []
+        found: List[Tuple[int, Any]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(key, node[0])
+            if distance <= radius:
+                found.append((distance, node[1]))
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
@@ -0,0 +1,127 @@
+# src/core/utils/label_table.py
+"""
+Таблица заранее переведённых меток детекции.
+
+Метки <OD> Florence-2 образуют небольшой закрытый словарь, поэтому их переводы
+на все TRANSLATION_LANGUAGES собираются заранее (python -m tools.build_label_table)
+и хранятся в компактном JSON: список меток и для каждого языка список переводов
+в том же порядке. При загрузке строится словарь язык -> {метка: перевод}, и поиск
+выполняется за O(1) без обращения к модели перевода.
+
+Метки, которых нет в таблице, переводятся моделью и дописываются в журнал
+UNSEEN_LABELS_PATH, чтобы попасть в таблицу при следующей сборке.
+
+Переводы используются как имена папок, поэтому значения с пояснениями в скобках
+("bank (zitmeubel)") или пустые отбрасываются при загрузке: такие метки
+переводятся моделью, как отсутствующие в таблице.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Set
+
+from core.constants.labels import LABEL_SOURCE_LANGUAGE, LABEL_TABLE_PATH, UNSEEN_LABELS_PATH
+from core.utils.get_logger import logger
+
+TABLE_VERSION = 1
+
+# Пояснение в скобках после перевода: "шатыр (палатка)"
+_GLOSS_RE = re.compile(r"\s*[(（][^)）]*[)）]")
+
+
+def normalize_label(label: str) -> str:
+    return " ".join(label.lower().split())
+
+
+def clean_translation(text: str) -> str:
+    """Перевод метки без пояснений в скобках и лишних пробелов."""
+    return " ".join(_GLOSS_RE.sub(" ", text).split())
+
+
+def is_valid_translation(text: str) -> bool:
+    """Перевод пригоден как имя папки: непустой и без пояснений в скобках."""
+    return bool(text.strip()) and not any(bracket in text for bracket in "()（）")
+
+
+class LabelTranslationTable:
+    """Поиск перевода метки по коду языка с журналированием отсутствующих меток."""
+
+    def __init__(self, path: str = LABEL_TABLE_PATH, unseen_path: str = UNSEEN_LABELS_PATH):
+        self.path = path
+        self.unseen_path = unseen_path
+        self.model: Optional[str] = None
+        self._table: Optional[Dict[str, Dict[str, str]]] = None
+        self._unseen: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        if self._table is not None:
+            return self._table
+        with self._lock:
+            if self._table is None:
+                self._table = {}
+                try:
+                    with open(self.path, encoding="utf-8") as source:
+                        data = json.load(source)
+                    if data.get("version") != TABLE_VERSION:
+                        raise ValueError(f"неподдерживаемая версия {data.get('version')}")
+                    labels = data["labels"]
+                    self.model = data.get("model")
+                    rejected = 0
+                    for lang, translations in data["translations"].items():
+                        entries = {}
+                        for label, translation in zip(labels, translations):
+                            if is_valid_translation(translation):
+                                entries[label] = translation
+                            else:
+                                rejected += 1
+                        self._table[lang] = entries
+                    if rejected:
+                        logger.warning("Таблица переводов меток: отброшено некорректных переводов: %s", rejected)
+                    logger.info(
+                        "Таблица переводов меток загружена | Меток: %s | Языков: %s | Модель: %s",
+                        len(labels), len(self._table), self.model
+                    )
+                except FileNotFoundError:
+                    logger.info("Таблица переводов меток не найдена (%s): все метки переводятся моделью", self.path)
+                except Exception as e:
+                    logger.warning("Таблица переводов меток не загружена: %s", e)
+        return self._table
+
+    def lookup(self, label: str, lang_code: str) -> Optional[str]:
+        """Перевод метки на язык lang_code (например, ru_RU) либо None, если его нет в таблице."""
+        key = normalize_label(label)
+        if lang_code == LABEL_SOURCE_LANGUAGE:
+            return key
+        return self._load().get(lang_code, {}).get(key)
+
+    def record_unseen(self, label: str) -> None:
+        """Запоминает метку, отсутствующую в таблице (один раз на метку)."""
+        key = normalize_label(label)
+        with self._lock:
+            if self._unseen is None:
+                self._unseen = set(read_unseen_labels(self.unseen_path))
+            if key in self._unseen:
+                return
+            self._unseen.add(key)
+            try:
+                os.makedirs(os.path.dirname(self.unseen_path) or ".", exist_ok=True)
+                with open(self.unseen_path, "a", encoding="utf-8") as out:
+                    out.write(key + "\n")
+            except OSError as e:
+                logger.warning("Не удалось записать метку '%s' в журнал: %s", key, e)
+        logger.debug("Метка отсутствует в таблице переводов: %s", key)
+
+
+def read_unseen_labels(path: str = UNSEEN_LABELS_PATH) -> List[str]:
+    try:
+        with open(path, encoding="utf-8") as source:
+            return [line.strip() for line in source if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+# Общая таблица приложения (загружается при первом обращении)
+label_table = LabelTranslationTable()
@@ -0,0 +1,101 @@
+# src/core/utils/memory.py
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:  # psutil не входит в обязательные зависимости
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Текущий резидентный размер процесса (RSS) в байтах или None, если недоступен."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Пиковый RSS процесса за всё время работы в байтах или None, если недоступен."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux отдаёт килобайты, macOS - байты
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def to_mb(value: Optional[int]) -> Optional[float]:
+    """Перевод байтов в мегабайты с округлением для отчётов."""
+    return None if value is None else round(value / 1024 ** 2, 1)
+
+
+class PeakMemoryTracker:
+    """
+    Контекстный менеджер, отслеживающий пиковый RSS внутри блока.
+    Фоновый поток опрашивает RSS с заданным интервалом, поэтому пик
+    измеряется именно для блока, а не за всю жизнь процесса.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.start_rss: Optional[int] = None
+        self.end_rss: Optional[int] = None
+        self.peak_rss: Optional[int] = None
+        self.elapsed: float = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+
+    def _sample(self) -> None:
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakMemoryTracker":
+        self.start_rss = current_rss_bytes()
+        self.peak_rss = self.start_rss
+        self._started_at = time.monotonic()
+        if self.start_rss is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.elapsed = time.monotonic() - self._started_at
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        self.end_rss = current_rss_bytes()
+
+    def report(self) -> dict:
+        """Сводка по блоку в мегабайтах и секундах."""
+        return {
+            "seconds": round(self.elapsed, 3),
+            "rss_before_mb": to_mb(self.start_rss),
+            "rss_after_mb": to_mb(self.end_rss),
+            "peak_rss_mb": to_mb(self.peak_rss),
+            "peak_delta_mb": to_mb(
+                self.peak_rss - self.start_rss
+                if self.peak_rss is not None and self.start_rss is not None else None
+            ),
+        }
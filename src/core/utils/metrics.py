@@ -0,0 +1,360 @@
+# src/core/utils/metrics.py
+"""
+Структурированные метрики конвейера: гистограммы задержек, счётчики и датчики.
+
+Запись в метрику - это один захват мьютекса и несколько арифметических операций,
+поэтому инструментирование горячего пути практически бесплатно. Экспорт выполняется
+в текстовом формате Prometheus и в виде JSON-снимка.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.utils.memory import current_rss_bytes, peak_rss_bytes
+
+# Границы корзин для задержек (секунды): от миллисекунды до минуты
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Базовое семейство метрик с опциональными метками."""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Дочерняя метрика для набора значений меток."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}, получено {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[Tuple[Tuple[str, ...], object]]:
+        return list(self._children.items())
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in self.samples()
+        ]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {",".join(key) or "value": child.value for key, child in self.samples()}
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], Optional[float]]] = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], Optional[float]]) -> None:
+        """Значение вычисляется в момент экспорта, а не на горячем пути."""
+        self.function = function
+
+    def get(self) -> Optional[float]:
+        if self.function is None:
+            return self.value
+        try:
+            return self.function()
+        except Exception:
+            return None
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self.samples():
+            value = child.get()
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {",".join(key) or "value": child.get() for key, child in self.samples()}
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self._child = child
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля по верхним границам корзин."""
+        if not self.count:
+            return None
+        threshold = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += bucket_count
+            if cumulative >= threshold:
+                return bound
+        return float("inf")
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self, *label_values: str) -> _Timer:
+        """Контекстный менеджер, замеряющий длительность блока."""
+        return self.labels(*label_values).time()
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self.samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {child.count}")
+        return lines
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            ",".join(key) or "value": {
+                "count": child.count,
+                "sum": round(child.sum, 6),
+                "mean": round(child.sum / child.count, 6) if child.count else None,
+                "p50": child.quantile(0.5),
+                "p95": child.quantile(0.95),
+                "p99": child.quantile(0.99),
+            }
+            for key, child in self.samples()
+        }
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        """Экспорт в текстовом формате Prometheus (version 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, dict]:
+        """JSON-совместимый снимок всех метрик."""
+        return {
+            name: {"type": metric.TYPE, "help": metric.documentation, "values": metric.snapshot()}
+            for name, metric in list(self._metrics.items())
+        }
+
+
+# Глобальный реестр метрик
+metrics = MetricsRegistry()
+
+# Задержки этапов: hash, thumbnail, decode, preprocess, generate, postprocess, translate, copy
+STAGE_SECONDS = metrics.histogram(
+    "pipeline_stage_seconds", "Длительность этапов конвейера обработки", ("stage",)
+)
+IMAGES_TOTAL = metrics.counter(
+    "pipeline_images_total", "Количество обработанных изображений", ("task",)
+)
+ERRORS_TOTAL = metrics.counter(
+    "pipeline_errors_total", "Количество ошибок обработки", ("task",)
+)
+DUPLICATES_TOTAL = metrics.counter(
+    "pipeline_duplicates_total", "Изображения, результат которых взят у похожего кадра", ("task",)
+)
+DEDUPE_RATIO = metrics.gauge(
+    "pipeline_dedupe_ratio", "Доля дубликатов в последнем пакете", ("task",)
+)
+CACHE_HITS_TOTAL = metrics.counter(
+    "pipeline_cache_hits_total", "Попадания в кэши конвейера", ("cache",)
+)
+LOADED_MODELS = metrics.gauge(
+    "pipeline_loaded_models", "Количество загруженных моделей", ("kind",)
+)
+MODEL_UNLOADS_TOTAL = metrics.counter(
+    "pipeline_model_unloads_total", "Модели, выгруженные после простоя", ("kind",)
+)
+GOVERNOR_SWITCHES_TOTAL = metrics.counter(
+    "pipeline_governor_switches_total", "Смены профиля генерации регулятором производительности",
+    ("kind", "direction")
+)
+DEGRADED_TOTAL = metrics.counter(
+    "pipeline_degraded_total", "Изображения, генерация которых превысила бюджет", ("kind", "reason", "action")
+)
+BATCH_SIZE = metrics.histogram(
+    "inference_batch_size", "Размер пакетов динамического пакетирования", ("model",),
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64)
+)
+BATCH_WAIT_SECONDS = metrics.histogram(
+    "inference_batch_wait_seconds", "Ожидание элемента в очереди пакетирования", ("model",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+JOBS_QUEUED = metrics.gauge("jobs_queued", "Задачи, ожидающие в очереди")
+JOBS_RUNNING = metrics.gauge("jobs_running", "Выполняющиеся задачи")
+JOBS_TOTAL = metrics.counter("jobs_total", "Завершённые задачи", ("status",))
+JOB_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "job_queue_wait_seconds", "Время ожидания задачи в общей очереди до запуска"
+)
+TRANSFER_BYTES_TOTAL = metrics.counter(
+    "file_transfer_bytes_total", "Байты, физически записанные при сохранении файлов", ("strategy",)
+)
+TRANSFER_SECONDS = metrics.histogram(
+    "file_transfer_seconds", "Длительность сохранения одного файла", ("strategy",)
+)
+DECODE_BYTES = metrics.histogram(
+    "image_decode_bytes", "Оценка памяти на декодирование одного изображения",
+    buckets=tuple(2 ** power for power in range(20, 32))
+)
+DECODE_WAIT_SECONDS = metrics.histogram(
+    "image_decode_wait_seconds", "Ожидание бюджета памяти перед декодированием",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DECODE_BUDGET_BYTES = metrics.gauge(
+    "image_decode_budget_bytes", "Бюджет памяти декодирования", ("type",)
+)
+DECODE_REJECTED_TOTAL = metrics.counter(
+    "image_decode_rejected_total", "Изображения, отклонённые до декодирования", ("reason",)
+)
+MEMORY_BYTES = metrics.gauge(
+    "process_memory_bytes", "Потребление памяти процессом", ("type",)
+)
+
+MEMORY_BYTES.labels("rss").set_function(current_rss_bytes)
+MEMORY_BYTES.labels("peak_rss").set_function(peak_rss_bytes)
+
+
+def stage_timer(stage: str) -> _Timer:
+    """Замер длительности этапа конвейера: `with stage_timer("decode"): ...`"""
+    return STAGE_SECONDS.labels(stage).time()
@@ -0,0 +1,75 @@
+# src/core/utils/precision.py
+"""
+Точность вычислений моделей.
+
+На CUDA генераторы работают в autocast float16 с весами float16. На CPU по
+умолчанию используется float32; режим settings.cpu_precision="bf16" включает
+autocast bfloat16 (matmul/conv в bfloat16 через oneDNN, на Xeon с AVX-512 BF16/AMX -
+аппаратно), а settings.bf16_weights дополнительно хранит веса в bfloat16, вдвое
+уменьшая резидентную память. Режим "auto" включает bfloat16 только при аппаратной
+поддержке. Если процессор её не имеет, запрошенный bfloat16 заменяется на float32:
+эмуляция bfloat16 медленнее float32.
+"""
+
+import contextlib
+from functools import lru_cache
+from typing import ContextManager
+
+import torch
+
+from core.utils.get_logger import logger
+from core.utils.settings import settings
+
+# Флаги /proc/cpuinfo, означающие аппаратные инструкции bfloat16
+BF16_CPU_FLAGS = ("avx512_bf16", "amx_bf16")
+
+
+@lru_cache(maxsize=1)
+def cpu_supports_bf16() -> bool:
+    """Аппаратная поддержка bfloat16 процессором (oneDNN либо флаги /proc/cpuinfo)."""
+    try:
+        if torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported():
+            return True
+    except (AttributeError, RuntimeError):
+        pass
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            flags = next((line for line in cpuinfo if line.startswith("flags")), "").split()
+        return any(flag in flags for flag in BF16_CPU_FLAGS)
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _resolve_cpu_bf16(mode: str) -> bool:
+    if mode == "fp32":
+        return False
+    supported = cpu_supports_bf16()
+    if mode == "bf16" and not supported:
+        logger.warning("Процессор не поддерживает bfloat16 аппаратно: вычисления на CPU выполняются в float32")
+    if supported:
+        logger.info("Вычисления на CPU в bfloat16 (autocast)%s", " | Веса: bfloat16" if settings.bf16_weights else "")
+    return supported
+
+
+def cpu_bf16_enabled() -> bool:
+    """Включён ли режим bfloat16 на CPU с учётом настроек и поддержки процессором."""
+    return _resolve_cpu_bf16(settings.cpu_precision)
+
+
+def autocast_context(device: str) -> ContextManager:
+    """Контекст пониженной точности для инференса на устройстве device."""
+    if device == "cuda":
+        return torch.autocast(device_type="cuda")
+    if device == "cpu" and cpu_bf16_enabled():
+        return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def weights_dtype(device: str) -> torch.dtype:
+    """Тип хранения весов модели на устройстве device."""
+    if device != "cpu":
+        return torch.float16
+    if settings.bf16_weights and cpu_bf16_enabled():
+        return torch.bfloat16
+    return torch.float32
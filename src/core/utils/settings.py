@@ -0,0 +1,54 @@
+# src/core/utils/settings.py
+from dataclasses import dataclass
+
+
+@dataclass
+class Settings:
+    """
+    Параметры времени выполнения, переопределяемые аргументами командной строки.
+    Значения по умолчанию подходят для локального запуска одним пользователем.
+    """
+
+    # Максимальная частота обновления таблицы результатов в интерфейсе (Гц, 0 - без ограничения)
+    progress_refresh_hz: float = 4.0
+    # Радиус Хэмминга (из 64 бит) для поиска почти одинаковых кадров (отрицательное - выключено)
+    dedupe_radius: int = 6
+    # Общая очередь задач: максимум ожидающих, одновременно выполняющихся и задач на одну модель
+    max_queued_jobs: int = 32
+    max_running_jobs: int = 4
+    model_concurrency: int = 4
+    # Динамическое пакетирование инференса между сессиями (batch_max_size <= 1 - выключено)
+    batch_max_size: int = 8
+    batch_max_wait_ms: float = 20.0
+    # HTTP API: буфер непрочитанных результатов задачи и время ожидания читателя (с)
+    api_result_buffer: int = 64
+    api_stall_timeout: float = 300.0
+    # Декодирование изображений: общий бюджет памяти (МБ) и лимит пикселей в заголовке
+    decode_budget_mb: int = 1024
+    max_image_pixels: int = 250_000_000
+    # Дисковый кэш миниатюр галереи (ключ - хэш содержимого файла)
+    thumbnail_cache_dir: str = "../cache/thumbnails"
+    # Точность на CPU: fp32, bf16 (autocast bfloat16 при поддержке процессором) или auto; веса в bfloat16
+    cpu_precision: str = "fp32"
+    bf16_weights: bool = False
+    # Компактные модели языковых пар (TRANSLATION_PAIR_ROUTES) вместо общей модели перевода
+    translation_pair_models: bool = True
+    # Выгрузка моделей, не используемых дольше указанного времени (с, 0 - не выгружать)
+    model_idle_ttl: float = 600.0
+    # Бюджет генерации на изображение (с, 0 - без ограничения) и действие при его превышении:
+    # partial - частичный результат, greedy - повтор жадным поиском, smaller - повтор меньшей моделью
+    image_deadline: float = 0.0
+    deadline_policy: str = "partial"
+    # Группировка по сходству: директория временных матриц эмбеддингов и размер пакета эмбеддингов
+    embedding_cache_dir: str = "../cache/embeddings"
+    embedding_batch_size: int = 32
+    # Индекс похожих изображений: запись эмбеддингов при обработке, директория, модель эмбеддингов
+    # и число просматриваемых инвертированных списков на запрос
+    similarity_index: bool = False
+    similarity_index_dir: str = "../cache/similarity"
+    similarity_model: str = "clip-vit-base-patch32"
+    similarity_nprobe: int = 8
+
+
+# Глобальные настройки приложения
+settings = Settings()
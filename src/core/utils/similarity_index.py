@@ -0,0 +1,362 @@
+# src/core/utils/similarity_index.py
+"""
+Индекс поиска похожих изображений (IVF) по эмбеддингам обработанных изображений.
+
+Эмбеддинги хранятся в дописываемом файле float16 (vectors.f16), отображённом в
+память: миллион эмбеддингов CLIP (512) занимает 1 ГБ на диске, а в оперативной памяти
+находятся только просматриваемые строки. Пути и тексты результатов - журнал
+items.jsonl (вставки, переносы файлов, удаления), который воспроизводится при
+загрузке; удаление - отметка строки (tombstone), строка исключается из выдачи.
+
+Пока строк меньше TRAIN_MIN_ROWS, запрос просматривает все строки блоками. Затем
+строки разбиваются мини-пакетным k-means (core.utils.clustering) на sqrt(n)
+инвертированных списков, и запрос просматривает только nprobe списков с ближайшими
+центрами. Новые строки сразу относятся к ближайшему центру; при росте индекса в
+RETRAIN_GROWTH раз центры обучаются заново в фоновом потоке по снимку строк,
+а вставки и запросы тем временем продолжают работать со старыми центрами.
+Новые центры и списки подменяются целиком под блокировкой; строки, вставленные
+во время обучения, перед подменой относятся к новым центрам.
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.utils.clustering import BATCH_SIZE, assign_clusters, iter_chunks, minibatch_kmeans
+from core.utils.get_logger import logger
+from core.utils.metrics import stage_timer
+from core.utils.settings import settings
+
+INDEX_VERSION = 1
+# Порог обучения списков, рост индекса до переобучения и шагов обучения центров
+TRAIN_MIN_ROWS = 4096
+RETRAIN_GROWTH = 4
+TRAIN_STEPS = 100
+# Строк, добавленных после сборки списков, до их пересборки
+PENDING_LIMIT = 65536
+
+
+def _grow(array: np.ndarray, size: int, fill) -> np.ndarray:
+    """Массив вместимостью не меньше size (удвоение), новые элементы - fill."""
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array), 1024), fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SimilarityIndex:
+    """Персистентный индекс эмбеддингов с поиском top-k по косинусному сходству."""
+
+    def __init__(self, directory: Optional[str] = None):
+        # Директория читается из настроек при первом обращении (после разбора аргументов)
+        self._directory = directory
+        self._reset()
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._training: Optional[threading.Thread] = None
+
+    def _reset(self) -> None:
+        self.model: Optional[str] = None
+        self.dim: Optional[int] = None
+        self.count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._paths: List[Optional[str]] = []
+        self._texts: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._live = np.zeros(0, dtype=bool)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_rows = 0
+        self._postings: Optional[List[np.ndarray]] = None
+        self._pending: Dict[int, List[int]] = {}
+
+    @property
+    def directory(self) -> Path:
+        return Path(self._directory or settings.similarity_index_dir)
+
+    # --- Загрузка и запись ---
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            return
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("version") != INDEX_VERSION:
+                raise ValueError(f"неподдерживаемая версия {meta.get('version')}")
+            self.model, self.dim = meta["model"], meta["dim"]
+            vectors_path = self.directory / "vectors.f16"
+            self.count = vectors_path.stat().st_size // (self.dim * 2) if vectors_path.exists() else 0
+            self._remap()
+
+            self._live = _grow(self._live, self.count, False)
+            self._paths = [None] * self.count
+            self._texts = [""] * self.count
+            with open(self.directory / "items.jsonl", encoding="utf-8") as log:
+                for line in log:
+                    self._replay(json.loads(line))
+
+            lists_path = self.directory / "lists.i4"
+            if meta.get("trained_rows") and (self.directory / "centroids.npy").exists():
+                self._centroids = np.load(self.directory / "centroids.npy")
+                self._trained_rows = meta["trained_rows"]
+                lists = np.fromfile(lists_path, dtype=np.int32) if lists_path.exists() else np.zeros(0, np.int32)
+                self._lists = _grow(lists, self.count, -1)
+                if len(lists) < self.count:
+                    # Прерванная запись: строки без списка относятся к ближайшим центрам заново
+                    self._assign_rows(len(lists), self.count)
+            logger.info(
+                "Индекс похожих изображений загружен | Строк: %s | Актуальных: %s | Списков: %s | Модель: %s",
+                self.count, len(self._rows), 0 if self._centroids is None else len(self._centroids), self.model
+            )
+        except Exception as e:
+            logger.error("Индекс похожих изображений не загружен (%s): %s", self.directory, e, exc_info=True)
+            self._reset()
+
+    def _replay(self, entry: dict) -> None:
+        row = entry["row"]
+        if row >= self.count:
+            return
+        if entry.get("deleted"):
+            self._tombstone(row)
+            return
+        previous = self._paths[row]
+        if previous is not None and self._rows.get(previous) == row:
+            del self._rows[previous]
+        replaced = self._rows.get(entry["path"])
+        if replaced is not None and replaced != row:
+            self._tombstone(replaced)
+        self._paths[row] = entry["path"]
+        self._texts[row] = entry.get("text", self._texts[row])
+        self._rows[entry["path"]] = row
+        self._live[row] = True
+
+    def _tombstone(self, row: int) -> None:
+        path = self._paths[row]
+        if path is not None and self._rows.get(path) == row:
+            del self._rows[path]
+        self._paths[row] = None
+        self._live[row] = False
+
+    def _log(self, entries: Sequence[dict]) -> None:
+        with open(self.directory / "items.jsonl", "a", encoding="utf-8") as log:
+            log.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+
+    def _write_meta(self) -> None:
+        meta = {"version": INDEX_VERSION, "model": self.model, "dim": self.dim, "trained_rows": self._trained_rows}
+        (self.directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    def _remap(self) -> None:
+        """Отображение файла эмбеддингов после дописывания строк."""
+        self._vectors = (
+            np.memmap(self.directory / "vectors.f16", dtype=np.float16, mode="r", shape=(self.count, self.dim))
+            if self.count else None
+        )
+
+    # --- Изменение индекса ---
+
+    def add(self, paths: Sequence[str], vectors: np.ndarray, model: str, texts: Optional[Sequence[str]] = None) -> None:
+        """Вставка эмбеддингов изображений (повторная вставка пути заменяет его прежнюю строку)."""
+        if not len(paths):
+            return
+        texts = list(texts) if texts is not None else [""] * len(paths)
+        with self._lock:
+            self._load()
+            if self.dim is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self.model, self.dim = model, int(vectors.shape[1])
+                self._write_meta()
+            elif model != self.model or vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Эмбеддинги {model} ({vectors.shape[1]}) несовместимы с индексом {self.model} ({self.dim})"
+                )
+
+            start = self.count
+            with open(self.directory / "vectors.f16", "ab") as out:
+                out.write(np.ascontiguousarray(vectors, dtype=np.float16).tobytes())
+            self.count += len(paths)
+            self._remap()
+            self._live = _grow(self._live, self.count, False)
+            self._paths += [None] * len(paths)
+            self._texts += [""] * len(paths)
+
+            entries = [{"row": start + i, "path": path, "text": text} for i, (path, text) in enumerate(zip(paths, texts))]
+            self._log(entries)
+            for entry in entries:
+                self._replay(entry)
+
+            if self._centroids is not None:
+                self._lists = _grow(self._lists, self.count, -1)
+                self._assign_rows(start, self.count)
+            if self._training is None and self.count >= max(TRAIN_MIN_ROWS, RETRAIN_GROWTH * self._trained_rows):
+                self._training = threading.Thread(
+                    target=self._train, args=(self.count, self._vectors), name="similarity-index-train", daemon=True
+                )
+                self._training.start()
+
+    def remove(self, path: str) -> bool:
+        """Удаление изображения из выдачи; False - пути нет в индексе."""
+        with self._lock:
+            self._load()
+            row = self._rows.get(path)
+            if row is None:
+                return False
+            self._log([{"row": row, "deleted": True}])
+            self._tombstone(row)
+            return True
+
+    def relocate(self, source: str, destination: str) -> bool:
+        """Перенос строки на новый путь файла (сохранение результатов); False - пути нет в индексе."""
+        with self._lock:
+            self._load()
+            row = self._rows.get(source)
+            if row is None or source == destination:
+                return False
+            entry = {"row": row, "path": destination, "text": self._texts[row]}
+            self._log([entry])
+            self._replay(entry)
+            return True
+
+    # --- Инвертированные списки ---
+
+    def _assign_rows(self, start: int, end: int) -> None:
+        """Отнесение строк [start, end) к ближайшим центрам с дописыванием в lists.i4."""
+        labels, _ = assign_clusters(self._vectors[start:end], self._centroids)
+        self._lists[start:end] = labels
+        with open(self.directory / "lists.i4", "ab") as out:
+            out.write(labels.astype(np.int32).tobytes())
+        if self._postings is not None:
+            for offset, label in enumerate(labels):
+                self._pending.setdefault(int(label), []).append(start + offset)
+            if sum(map(len, self._pending.values())) > PENDING_LIMIT:
+                self._postings = None
+
+    def _train(self, rows: int, vectors: np.memmap) -> None:
+        """
+        Фоновое обучение центров по первым rows строкам (снимок vectors) без блокировки
+        индекса и атомарная подмена центров и списков.
+        """
+        try:
+            nlist = int(min(4096, max(16, math.sqrt(rows))))
+            logger.info("Обучение индекса похожих изображений | Строк: %s | Списков: %s", rows, nlist)
+            with stage_timer("index_train"):
+                centroids = minibatch_kmeans(vectors, nlist, batch_size=max(BATCH_SIZE, 4 * nlist), max_steps=TRAIN_STEPS)
+                labels, _ = assign_clusters(vectors, centroids)
+
+            with self._lock:
+                # Строки, вставленные во время обучения, отнесены к старым центрам (или ни к каким)
+                if self.count > rows:
+                    tail, _ = assign_clusters(self._vectors[rows:self.count], centroids)
+                    labels = np.concatenate([labels, tail])
+                labels = labels.astype(np.int32)
+                lists_path = self.directory / "lists.i4"
+                labels.tofile(lists_path.with_suffix(".tmp"))
+                os.replace(lists_path.with_suffix(".tmp"), lists_path)
+                np.save(self.directory / "centroids.npy", centroids)
+
+                self._centroids = centroids
+                self._lists = _grow(labels, self.count, -1)
+                self._trained_rows = rows
+                self._postings = None
+                self._pending = {}
+                self._write_meta()
+            logger.info("Индекс похожих изображений обучен | Строк: %s | Списков: %s", rows, nlist)
+        except Exception as e:
+            logger.error("Ошибка обучения индекса похожих изображений: %s", e, exc_info=True)
+        finally:
+            self._training = None
+
+    def wait_training(self, timeout: Optional[float] = None) -> bool:
+        """Ожидание фонового обучения списков; False - обучение ещё идёт."""
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+            return not training.is_alive()
+        return True
+
+    def _build_postings(self) -> None:
+        lists = self._lists[:self.count]
+        order = np.argsort(lists, kind="stable").astype(np.int64)
+        bounds = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+        self._postings = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+        self._pending = {}
+
+    def _candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Строки nprobe списков с центрами, ближайшими к запросу."""
+        if self._postings is None:
+            self._build_postings()
+        probe = np.argsort(self._centroids @ query)[::-1][:nprobe]
+        parts = [self._postings[int(i)] for i in probe]
+        parts += [np.asarray(self._pending[int(i)], dtype=np.int64) for i in probe if int(i) in self._pending]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    # --- Запросы ---
+
+    def vector(self, path: str) -> Optional[np.ndarray]:
+        """Сохранённый эмбеддинг изображения (float32) либо None."""
+        with self._lock:
+            self._load()
+            row = self._rows.get(path)
+            return None if row is None else np.asarray(self._vectors[row], dtype=np.float32)
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               exclude: Optional[str] = None) -> List[Tuple[str, float, str]]:
+        """Top-k актуальных изображений по косинусному сходству: (путь, сходство, текст результата)."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        with self._lock, stage_timer("search"):
+            self._load()
+            if not self.count or query.shape[0] != self.dim:
+                return []
+            excluded = self._rows.get(exclude) if exclude else None
+
+            if self._centroids is None:
+                # Небольшой индекс: точный перебор блоками
+                rows_parts, score_parts = [], []
+                for start, block in iter_chunks(self._vectors):
+                    rows = np.arange(start, start + len(block))
+                    live = self._live[rows]
+                    rows_parts.append(rows[live])
+                    score_parts.append(block[live] @ query)
+                rows, scores = np.concatenate(rows_parts), np.concatenate(score_parts)
+            else:
+                rows = self._candidates(query, nprobe or settings.similarity_nprobe)
+                rows = np.sort(rows[self._live[rows]])
+                scores = np.asarray(self._vectors[rows], dtype=np.float32) @ query
+
+            if excluded is not None:
+                keep = rows != excluded
+                rows, scores = rows[keep], scores[keep]
+            k = min(k, len(rows))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._paths[rows[i]], float(scores[i]), self._texts[rows[i]]) for i in top]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load()
+            return {
+                "model": self.model,
+                "dim": self.dim,
+                "rows": self.count,
+                "images": len(self._rows),
+                "lists": 0 if self._centroids is None else len(self._centroids),
+                "trained_rows": self._trained_rows,
+                "training": self._training is not None,
+                "directory": str(self.directory),
+            }
+
+
+# Общий индекс приложения (settings.similarity_index_dir)
+similarity_index = SimilarityIndex()
@@ -0,0 +1,104 @@
+# src/core/utils/thumbnails.py
+"""
+Миниатюры для галереи интерфейса.
+
+Миниатюра создаётся один раз и хранится на диске под именем хэша содержимого
+исходного файла, поэтому повторная загрузка тех же фотографий (в том числе под
+другими именами или из другой временной папки Gradio) не требует повторного
+декодирования. Пакет миниатюр формируется параллельно в пуле потоков: декодирование
+JPEG (в уменьшенном масштабе через draft) и сжатие в Pillow освобождают GIL.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import ImageOps
+
+from core.utils.decode_governor import decode_governor
+from core.utils.get_logger import logger
+from core.utils.metrics import CACHE_HITS_TOTAL, stage_timer
+from core.utils.settings import settings
+
+THUMBNAIL_SIZE = 256
+THUMBNAIL_QUALITY = 80
+_HASH_CHUNK = 1024 * 1024
+
+# (путь, размер, mtime) -> путь миниатюры: повторный показ страницы не перечитывает файл
+_known: Dict[Tuple[str, int, int], str] = {}
+_known_lock = threading.Lock()
+
+_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="thumbnail")
+# Отдельный небольшой пул для упреждающей подготовки, чтобы она не задерживала видимую страницу
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail-prefetch")
+
+
+def _content_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _render(source_path: str, target_path: str) -> None:
+    """Уменьшенная копия в JPEG; запись через временный файл, чтобы не оставить обрезанную миниатюру."""
+    with decode_governor.open(source_path, (THUMBNAIL_SIZE, THUMBNAIL_SIZE)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(target_path))
+        try:
+            with os.fdopen(fd, "wb") as out:
+                img.save(out, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def get_thumbnail(path: str) -> Optional[str]:
+    """Путь к миниатюре изображения (создаётся при первом обращении) либо None при ошибке."""
+    try:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with _known_lock:
+            cached = _known.get(key)
+        if cached and os.path.exists(cached):
+            CACHE_HITS_TOTAL.labels("thumbnail").inc()
+            return cached
+
+        digest = _content_hash(path)
+        directory = os.path.join(settings.thumbnail_cache_dir, digest[:2])
+        target = os.path.join(directory, f"{digest}.jpg")
+        if os.path.exists(target):
+            CACHE_HITS_TOTAL.labels("thumbnail").inc()
+        else:
+            os.makedirs(directory, exist_ok=True)
+            with stage_timer("thumbnail"):
+                _render(path, target)
+            logger.debug("Создана миниатюра %s для %s", target, path)
+
+        with _known_lock:
+            _known[key] = target
+        return target
+    except Exception as e:
+        logger.warning("Не удалось создать миниатюру для %s: %s", path, e)
+        return None
+
+
+def get_thumbnails(paths: Sequence[str]) -> List[Optional[str]]:
+    """Миниатюры для списка изображений в исходном порядке (параллельно)."""
+    if len(paths) <= 1:
+        return [get_thumbnail(path) for path in paths]
+    return list(_pool.map(get_thumbnail, paths))
+
+
+def prefetch_thumbnails(paths: Sequence[str]) -> None:
+    """Фоновая подготовка миниатюр (например, следующих страниц галереи) без ожидания."""
+    for path in paths:
+        _prefetch_pool.submit(get_thumbnail, path)
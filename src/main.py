@@ -1,7 +1,6 @@
 # src\main.py
 import argparse
 import sys
-import signal
 import logging
 from typing import Optional
 
@@ -14,52 +13,125 @@ def main() -> Optional[int]:
     parser.add_argument('--port', type=int, default=7860, help='Порт для запуска сервера')
     parser.add_argument('--host', type=str, default='127.0.0.1', help='Хост для запуска сервера')
     parser.add_argument('--debug', action='store_true', help='Режим отладки')
+    parser.add_argument('--log-rate-limit', type=float, default=5.0,
+                        help='Лимит сообщений INFO в консоли в секунду с одной строки кода; файловый лог не ограничивается (0 - без ограничений)')
+    parser.add_argument('--progress-refresh-hz', type=float, default=4.0,
+                        help='Максимальная частота обновления таблицы результатов в секунду (0 - без ограничений)')
+    parser.add_argument('--dedupe-radius', type=int, default=6,
+                        help='Радиус Хэмминга для поиска почти одинаковых кадров (-1 - выключить)')
+    parser.add_argument('--max-queued-jobs', type=int, default=32, help='Размер общей очереди задач')
+    parser.add_argument('--max-running-jobs', type=int, default=4, help='Число одновременно выполняющихся задач')
+    parser.add_argument('--model-concurrency', type=int, default=4,
+                        help='Число задач, одновременно использующих одну модель')
+    parser.add_argument('--batch-max-size', type=int, default=8,
+                        help='Максимальный размер пакета инференса между сессиями (1 - без пакетирования)')
+    parser.add_argument('--batch-max-wait-ms', type=float, default=20.0,
+                        help='Максимальное ожидание добора пакета, мс')
+    parser.add_argument('--decode-budget-mb', type=int, default=1024,
+                        help='Общий бюджет памяти на одновременное декодирование изображений, МБ')
+    parser.add_argument('--max-image-pixels', type=int, default=250_000_000,
+                        help='Максимальное число пикселей в заголовке изображения (защита от decompression bomb)')
+    parser.add_argument('--thumbnail-cache-dir', type=str, default='../cache/thumbnails',
+                        help='Директория дискового кэша миниатюр галереи')
+    parser.add_argument('--cpu-precision', choices=['fp32', 'bf16', 'auto'], default='fp32',
+                        help='Точность инференса на CPU: bf16 - autocast bfloat16 (float32, если процессор не поддерживает '
+                             'bfloat16), auto - bfloat16 только при аппаратной поддержке')
+    parser.add_argument('--bf16-weights', action='store_true',
+                        help='Хранить веса моделей на CPU в bfloat16 (вдвое меньше памяти; только в режиме bfloat16)')
+    parser.add_argument('--no-pair-translation', action='store_true',
+                        help='Переводить все языковые пары общей моделью перевода (без компактных моделей пар)')
+    parser.add_argument('--model-idle-ttl', type=float, default=600.0,
+                        help='Выгружать модели, не используемые дольше указанного времени, с (0 - не выгружать)')
+    parser.add_argument('--image-deadline', type=float, default=0.0,
+                        help='Бюджет генерации подписи/сегментов на изображение, с (0 - без ограничения)')
+    parser.add_argument('--deadline-policy', choices=['partial', 'greedy', 'smaller'], default='partial',
+                        help='Действие при превышении бюджета: частичный результат, повтор жадным поиском '
+                             'или жадным поиском меньшей модели того же семейства')
+    parser.add_argument('--embedding-cache-dir', type=str, default='../cache/embeddings',
+                        help='Директория временных матриц эмбеддингов (группировка по сходству)')
+    parser.add_argument('--embedding-batch-size', type=int, default=32,
+                        help='Размер пакета при вычислении эмбеддингов для группировки')
+    parser.add_argument('--similarity-index', action='store_true',
+                        help='Записывать эмбеддинги обработанных изображений в индекс поиска похожих')
+    parser.add_argument('--similarity-index-dir', type=str, default='../cache/similarity',
+                        help='Директория индекса похожих изображений')
+    parser.add_argument('--similarity-model', type=str, default='clip-vit-base-patch32',
+                        help='Модель эмбеддингов индекса (CLASSIFICATION_MODEL_NAMES)')
+    parser.add_argument('--similarity-nprobe', type=int, default=8,
+                        help='Число просматриваемых списков индекса на запрос (больше - точнее и медленнее)')
     args = parser.parse_args()
 
     # Инициализация логгера
-    from core.utils.get_logger import logger
+    from core.utils.get_logger import logger, set_rate_limit
     logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
+    set_rate_limit(args.log_rate_limit)
+
+    from core.utils.settings import settings
+    settings.progress_refresh_hz = args.progress_refresh_hz
+    settings.dedupe_radius = args.dedupe_radius
+    settings.max_queued_jobs = args.max_queued_jobs
+    settings.max_running_jobs = args.max_running_jobs
+    settings.model_concurrency = args.model_concurrency
+    settings.batch_max_size = args.batch_max_size
+    settings.batch_max_wait_ms = args.batch_max_wait_ms
+    settings.decode_budget_mb = args.decode_budget_mb
+    settings.max_image_pixels = args.max_image_pixels
+    settings.thumbnail_cache_dir = args.thumbnail_cache_dir
+    settings.cpu_precision = args.cpu_precision
+    settings.bf16_weights = args.bf16_weights
+    settings.translation_pair_models = not args.no_pair_translation
+    settings.model_idle_ttl = args.model_idle_ttl
+    settings.image_deadline = args.image_deadline
+    settings.deadline_policy = args.deadline_policy
+    settings.embedding_cache_dir = args.embedding_cache_dir
+    settings.embedding_batch_size = max(1, args.embedding_batch_size)
+    settings.similarity_index = args.similarity_index
+    settings.similarity_index_dir = args.similarity_index_dir
+    settings.similarity_model = args.similarity_model
+    settings.similarity_nprobe = max(1, args.similarity_nprobe)
 
     try:
         # Проверка зависимостей
         import gradio as gr
         import torch
+        import uvicorn
+        from core.api.app import create_app
+        from core.jobs.model_reaper import start_model_reaper
         from core.ui.gradio_interface import gradio_interface
         
         logger.info("Запуск приложения")
-        logger.debug(f"Версия PyTorch: {torch.__version__}")
-        logger.debug(f"Версия Gradio: {gr.__version__}")
+        logger.debug("Версия PyTorch: %s", torch.__version__)
+        logger.debug("Версия Gradio: %s", gr.__version__)
 
         # Создание интерфейса
-        app = gradio_interface()
-        if app is None:
+        interface = gradio_interface()
+        if interface is None:
             raise RuntimeError("Не удалось инициализировать интерфейс")
 
-        # Настройка обработчика сигналов
-        def graceful_shutdown(signum, frame):
-            logger.info("Получен сигнал завершения, останавливаю сервер...")
-            if app.server is not None:
-                app.server.close()
-            sys.exit(0)
+        # Gradio монтируется в FastAPI-приложение рядом со служебными маршрутами;
+        # uvicorn сам корректно завершает работу по SIGINT/SIGTERM
+        app = create_app(interface)
+        server = uvicorn.Server(uvicorn.Config(
+            app,
+            host=args.host,
+            port=args.port,
+            log_level="debug" if args.debug else "info"
+        ))
 
-        signal.signal(signal.SIGINT, graceful_shutdown)
-        signal.signal(signal.SIGTERM, graceful_shutdown)
+        # Фоновая выгрузка простаивающих моделей
+        start_model_reaper(settings.model_idle_ttl)
 
         # Запуск приложения
-        logger.info(f"Сервер запущен на http://{args.host}:{args.port}")
-        app.launch(
-            server_name=args.host,
-            server_port=args.port,
-            show_error=True,
-            debug=args.debug
-        )
+        logger.info("Сервер запущен на http://%s:%s | API: /api/jobs | Метрики: /metrics, /metrics.json", args.host, args.port)
+        server.run()
+        logger.info("Сервер остановлен")
         return 0
 
     except ImportError as e:
-        logger.critical(f"Отсутствует обязательная зависимость: {e.name}", exc_info=True)
+        logger.critical("Отсутствует обязательная зависимость: %s", e.name, exc_info=True)
         return 1
     except Exception as e:
-        logger.critical(f"Критическая ошибка: {str(e)}", exc_info=True)
+        logger.critical("Критическая ошибка: %s", str(e), exc_info=True)
         return 2
 
 if __name__ == "__main__":
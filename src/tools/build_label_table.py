@@ -0,0 +1,97 @@
+# src/tools/build_label_table.py
+"""
+Сборка таблицы переводов меток детекции для ClassificationHandler.
+
+Перечисляет словарь меток (core.constants.labels.DETECTION_LABELS, а с флагом
+--include-unseen ещё и метки из журнала неизвестных меток), переводит его пакетами
+на все TRANSLATION_LANGUAGES выбранной моделью перевода и сохраняет компактную
+таблицу в LABEL_TABLE_PATH. Пояснения в скобках удаляются из переводов: значения
+таблицы становятся именами папок. Выполняется офлайн, один раз на версию словаря.
+
+Запуск из директории src:
+    python -m tools.build_label_table --include-unseen
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import torch
+
+from core.constants.labels import DETECTION_LABELS, LABEL_SOURCE_LANGUAGE, LABEL_TABLE_PATH
+from core.constants.web import TRANSLATION_LANGUAGES
+from core.creators.translation_model_creator import TranslationModelCreator
+from core.generators.base_generator import BaseGenerator
+from core.utils.get_logger import logger
+from core.utils.label_table import (
+    TABLE_VERSION, clean_translation, is_valid_translation, normalize_label, read_unseen_labels
+)
+
+
+def translate_batch(creator: TranslationModelCreator, labels: List[str], lang_code: str) -> List[str]:
+    """Перевод пакета меток одним вызовом generate."""
+    tokenizer = creator.tokenizer
+    tokenizer.src_lang = LABEL_SOURCE_LANGUAGE
+    inputs = tokenizer(labels, return_tensors="pt", padding=True).to(creator.device)
+    with torch.inference_mode():
+        outputs = creator.model.generate(
+            **inputs,
+            forced_bos_token_id=tokenizer.lang_code_to_id[lang_code],
+            max_new_tokens=32,
+            num_beams=2,
+            early_stopping=True
+        )
+    return [clean_translation(text) for text in tokenizer.batch_decode(outputs, skip_special_tokens=True)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Сборка таблицы переводов меток детекции")
+    parser.add_argument("--model", type=str, default="mbart-large-50-many-to-many-mmt", help="Модель перевода")
+    parser.add_argument("--languages", type=str, nargs="*", default=None,
+                        help="Названия языков из TRANSLATION_LANGUAGES (по умолчанию все)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Меток в одном вызове generate")
+    parser.add_argument("--include-unseen", action="store_true",
+                        help="Добавить метки из журнала меток, отсутствовавших в таблице")
+    parser.add_argument("--output", type=str, default=LABEL_TABLE_PATH, help="Файл таблицы")
+    args = parser.parse_args()
+
+    labels = [normalize_label(label) for label in DETECTION_LABELS]
+    if args.include_unseen:
+        labels += [normalize_label(label) for label in read_unseen_labels()]
+    labels = list(dict.fromkeys(labels))
+
+    languages = args.languages or list(TRANSLATION_LANGUAGES)
+    unknown = [name for name in languages if name not in TRANSLATION_LANGUAGES]
+    if unknown:
+        logger.error("Неизвестные языки: %s", unknown)
+        return 2
+
+    creator = TranslationModelCreator(args.model, BaseGenerator.device)
+    logger.info("Перевод %s меток на %s языков моделью %s", len(labels), len(languages), args.model)
+
+    translations = {}
+    for name in languages:
+        lang_code = TRANSLATION_LANGUAGES[name]
+        if lang_code == LABEL_SOURCE_LANGUAGE:
+            continue
+        start = time.monotonic()
+        translated: List[str] = []
+        for offset in range(0, len(labels), args.batch_size):
+            translated += translate_batch(creator, labels[offset:offset + args.batch_size], lang_code)
+        invalid = [label for label, text in zip(labels, translated) if not is_valid_translation(text)]
+        if invalid:
+            logger.warning("Язык %s: некорректные переводы (будут переводиться моделью): %s", name, invalid)
+        translations[lang_code] = translated
+        logger.info("Язык %s (%s): %.1fс", name, lang_code, time.monotonic() - start)
+
+    table = {"version": TABLE_VERSION, "model": args.model, "labels": labels, "translations": translations}
+    Path(args.output).write_text(json.dumps(table, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    logger.success("Таблица переводов сохранена: %s | Меток: %s | Языков: %s", args.output, len(labels), len(translations))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())